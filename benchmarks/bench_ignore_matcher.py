@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+忽略规则匹配基准测试
+
+对比旧的逐规则匹配（每个文件 x 每条规则 x 路径深度）与编译后的
+IgnoreMatcher。默认在内存中生成 200k 个文件路径和 50 条规则；
+加 --on-disk 时在临时目录生成真实文件树并比较完整遍历耗时。
+
+用法:
+    python benchmarks/bench_ignore_matcher.py
+    python benchmarks/bench_ignore_matcher.py --files 50000 --on-disk
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from binary_manager_v2.domain.services import FileScanner, IgnoreMatcher  # noqa: E402
+
+
+EXTENSIONS = ['.bin', '.so', '.a', '.o', '.h', '.c', '.py', '.pyc', '.json', '.txt', '.log', '.tmp']
+DIR_NAMES = ['src', 'lib', 'include', 'docs', 'build', 'tests', 'tools', 'assets', 'out', 'cache',
+             'node_modules', '__pycache__', 'vendor', 'third_party', 'data']
+
+
+def make_patterns(count: int):
+    """生成规则：字面名称、后缀通配、锚定路径、'**' 与取反各占一部分"""
+    base = list(FileScanner.DEFAULT_IGNORE_PATTERNS)
+    extra = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            extra.append(f'*.gen{i}')
+        elif kind == 1:
+            extra.append(f'tmp_{i}')
+        elif kind == 2:
+            extra.append(f'/assets/generated_{i}/')
+        elif kind == 3:
+            extra.append(f'**/fixtures_{i}/*.dat')
+        else:
+            extra.append(f'!keep_{i}.so')
+    return (base + extra)[:count]
+
+
+def make_paths(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        depth = rng.randint(0, 6)
+        parts = [rng.choice(DIR_NAMES) + ('' if rng.random() < 0.7 else str(rng.randint(0, 9)))
+                 for _ in range(depth)]
+        parts.append(f'file_{i}{rng.choice(EXTENSIONS)}')
+        paths.append('/'.join(parts))
+    return paths
+
+
+def legacy_should_ignore(file_path: Path, patterns) -> bool:
+    """改造前 FileScanner._should_ignore 的实现
+    
+    它只按文件名匹配 build、dist 等目录规则，所以保留的文件比新实现多。
+    """
+    for pattern in patterns:
+        if pattern.startswith('.'):
+            if file_path.name == pattern:
+                return True
+            if any(part == pattern for part in file_path.parts):
+                return True
+        if '*' in pattern:
+            if file_path.match(pattern):
+                return True
+        if file_path.name == pattern:
+            return True
+    return False
+
+
+def build_tree(paths):
+    tree = {}
+    for path in paths:
+        node = tree
+        parts = path.split('/')
+        for part in parts[:-1]:
+            node = node.setdefault(part + '/', {})
+        node[parts[-1]] = None
+    return tree
+
+
+def walk_in_memory(tree, matcher: IgnoreMatcher):
+    """按目录树遍历并剪枝，模拟 FileScanner.iter_files 的判定次数"""
+    kept = 0
+    stack = [('', tree)]
+    while stack:
+        prefix, node = stack.pop()
+        for name, child in node.items():
+            if child is None:
+                if not matcher.match(prefix + name, False):
+                    kept += 1
+            else:
+                rel = prefix + name[:-1]
+                if not matcher.match(rel, True):
+                    stack.append((rel + '/', child))
+    return kept
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f'  {label:<34} {elapsed * 1000:10.1f} ms   kept={result}')
+    return elapsed
+
+
+def run_in_memory(files: int, pattern_count: int):
+    patterns = make_patterns(pattern_count)
+    paths = make_paths(files)
+    print(f'in-memory: {files} paths, {len(patterns)} patterns')
+    
+    compile_start = time.perf_counter()
+    matcher = IgnoreMatcher(patterns)
+    print(f'  {"compile":<34} {(time.perf_counter() - compile_start) * 1000:10.1f} ms')
+    
+    legacy = timed('legacy per-file matching',
+                   lambda: sum(not legacy_should_ignore(Path(p), patterns) for p in paths))
+    compiled = timed('compiled per-file (with parents)',
+                     lambda: sum(not matcher.is_ignored(p) for p in paths))
+    tree = build_tree(paths)
+    pruned = timed('compiled tree walk (pruned)', lambda: walk_in_memory(tree, matcher))
+    print(f'  speedup: per-file {legacy / compiled:.1f}x, pruned walk {legacy / pruned:.1f}x')
+
+
+def run_on_disk(files: int, pattern_count: int):
+    patterns = make_patterns(pattern_count)
+    paths = make_paths(files)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for rel in paths:
+            target = root / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.touch()
+        print(f'on-disk: {files} files, {len(patterns)} patterns')
+        
+        timed('legacy rglob + matching',
+              lambda: sum(1 for p in root.rglob('*')
+                          if p.is_file() and not legacy_should_ignore(p, patterns)))
+        scanner = FileScanner(patterns)
+        timed('FileScanner.iter_files', lambda: sum(1 for _ in scanner.iter_files(root)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ignore matcher benchmark')
+    parser.add_argument('--files', type=int, default=200_000, help='文件数')
+    parser.add_argument('--patterns', type=int, default=50, help='规则数')
+    parser.add_argument('--on-disk', action='store_true', help='同时在临时目录中测试真实遍历')
+    args = parser.parse_args()
+    
+    run_in_memory(args.files, args.patterns)
+    if args.on_disk:
+        run_on_disk(args.files, args.patterns)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
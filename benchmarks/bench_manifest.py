@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+文件清单内存基准测试
+
+每种表示在独立子进程中构建 N 条记录并写出到磁盘，报告峰值 RSS
+（ru_maxrss）与耗时：
+  legacy  - 改造前：每个文件一个 FileInfo + Hash 对象，json.dump(indent=2)
+  compact - FileManifest 列式存储，流式写出 gzip NDJSON
+
+用法:
+    python benchmarks/bench_manifest.py --files 250000
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def synthetic_paths(count: int):
+    for i in range(count):
+        yield f"bsp/board_{i % 40}/drivers/module_{i % 900}/src/file_{i}.c"
+
+
+def peak_rss_mb() -> float:
+    # Linux 上 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LegacyHash:
+    def __init__(self, value, algorithm='sha256'):
+        self._value = value
+        self._algorithm = algorithm
+    
+    def __str__(self):
+        return f"{self._algorithm}:{self._value}"
+
+
+class LegacyFileInfo:
+    def __init__(self, path, size, hash_value):
+        self._path = path
+        self._size = size
+        self._hash = hash_value
+    
+    def to_dict(self):
+        return {'path': self._path, 'size': self._size, 'hash': str(self._hash)}
+
+
+def run_legacy(count: int, out_dir: str):
+    files = [LegacyFileInfo(path, i, LegacyHash(hashlib.sha256(path.encode()).hexdigest()))
+             for i, path in enumerate(synthetic_paths(count))]
+    with open(os.path.join(out_dir, 'legacy.json'), 'w') as f:
+        json.dump({'files': [info.to_dict() for info in files]}, f, indent=2)
+    return os.path.getsize(os.path.join(out_dir, 'legacy.json'))
+
+
+def run_compact(count: int, out_dir: str):
+    from binary_manager_v2.domain.entities import FileManifest
+    
+    manifest = FileManifest('sha256')
+    for i, path in enumerate(synthetic_paths(count)):
+        manifest.add(path, i, hashlib.sha256(path.encode()).digest())
+    target = os.path.join(out_dir, 'manifest.ndjson.gz')
+    manifest.save(target)
+    return os.path.getsize(target)
+
+
+def child(mode: str, count: int):
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as out_dir:
+        size = (run_legacy if mode == 'legacy' else run_compact)(count, out_dir)
+    print(json.dumps({
+        'mode': mode,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': baseline,
+        'output_bytes': size
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manifest memory benchmark')
+    parser.add_argument('--files', type=int, default=250_000, help='文件数')
+    parser.add_argument('--child', choices=['legacy', 'compact'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args.child, args.files)
+        return 0
+    
+    print(f'{args.files} files')
+    for mode in ('legacy', 'compact'):
+        output = subprocess.run([sys.executable, __file__, '--child', mode, '--files', str(args.files)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        print(f"  {mode:<8} peak RSS {result['peak_rss_mb']:8.1f} MB "
+              f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f})  "
+              f"{result['seconds']:6.2f} s  output {result['output_bytes'] / 1024 / 1024:7.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+基准结果对比工具
+
+把 suite.py 的结果与保存的基线逐项对比，超过阈值的指标标记为回退：
+  seconds        默认 +10%（且绝对差超过 5 ms）
+  peak_rss_mb    默认 +15%（且绝对差超过 2 MB）
+  syscalls       read+write 系统调用次数，默认 +20%
+
+只有两份结果都包含的基准才参与对比；目录树参数（profile/seed/scale）
+不同时给出警告，因为此时数字没有可比性。
+
+用法:
+    python benchmarks/compare.py baseline.json results.json
+    python benchmarks/compare.py baseline.json results.json --time-threshold 0.05
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+RESULT_FORMAT = 'binary-manager-bench'
+TREE_KEYS = ('profile', 'seed', 'scale', 'hash_algorithm')
+
+# 指标 -> (默认相对阈值, 绝对噪声下限)
+METRICS = {
+    'seconds': (0.10, 0.005),
+    'peak_rss_mb': (0.15, 2.0),
+    'syscalls': (0.20, 50),
+}
+
+
+def load_report(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('format') != RESULT_FORMAT:
+        raise ValueError(f"Not a benchmark result file: {path}")
+    return report
+
+
+def _metric(result: Dict, metric: str) -> Optional[float]:
+    if metric == 'syscalls':
+        if result.get('syscalls_read') is None or result.get('syscalls_write') is None:
+            return None
+        return result['syscalls_read'] + result['syscalls_write']
+    return result.get(metric)
+
+
+def compare_reports(baseline: Dict, current: Dict, thresholds: Optional[Dict[str, float]] = None) -> Dict:
+    """逐项对比，返回 {'rows', 'regressions', 'improvements', 'warnings'}"""
+    thresholds = dict({name: spec[0] for name, spec in METRICS.items()}, **(thresholds or {}))
+    warnings = [
+        f"{key} differs: baseline={baseline['meta'].get(key)} current={current['meta'].get(key)}"
+        for key in TREE_KEYS
+        if baseline['meta'].get(key) != current['meta'].get(key)
+    ]
+    
+    rows: List[Dict] = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, (_, noise_floor) in METRICS.items():
+            old, new = _metric(base, metric), _metric(result, metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            if change > thresholds[metric] and new - old > noise_floor:
+                status = 'regression'
+            elif change < -thresholds[metric] and old - new > noise_floor:
+                status = 'improvement'
+            else:
+                status = 'ok'
+            rows.append({'benchmark': name, 'metric': metric, 'baseline': old, 'current': new,
+                         'change': change, 'status': status})
+    
+    return {
+        'rows': rows,
+        'regressions': [row for row in rows if row['status'] == 'regression'],
+        'improvements': [row for row in rows if row['status'] == 'improvement'],
+        'warnings': warnings
+    }
+
+
+def format_comparison(comparison: Dict) -> str:
+    lines = [f"warning: {warning}" for warning in comparison['warnings']]
+    lines.append(f"{'benchmark':<12} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>8}")
+    marks = {'regression': '  REGRESSION', 'improvement': '  improved', 'ok': ''}
+    for row in comparison['rows']:
+        lines.append(f"{row['benchmark']:<12} {row['metric']:<12} {row['baseline']:>12.4g} "
+                     f"{row['current']:>12.4g} {row['change']:>+7.1%}{marks[row['status']]}")
+    lines.append(f"{len(comparison['regressions'])} regression(s), "
+                 f"{len(comparison['improvements'])} improvement(s)")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+    parser.add_argument('baseline', help='基线结果 JSON')
+    parser.add_argument('current', help='本次结果 JSON')
+    parser.add_argument('--time-threshold', type=float, default=METRICS['seconds'][0],
+                        help='耗时回退阈值（比例）')
+    parser.add_argument('--rss-threshold', type=float, default=METRICS['peak_rss_mb'][0],
+                        help='峰值内存回退阈值（比例）')
+    parser.add_argument('--syscall-threshold', type=float, default=METRICS['syscalls'][0],
+                        help='系统调用次数回退阈值（比例）')
+    args = parser.parse_args()
+    
+    comparison = compare_reports(load_report(args.baseline), load_report(args.current), {
+        'seconds': args.time_threshold,
+        'peak_rss_mb': args.rss_threshold,
+        'syscalls': args.syscall_threshold
+    })
+    print(format_comparison(comparison))
+    return 1 if comparison['regressions'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Release Portal 负载测试
+
+在一台机器上离线完成全部流程：
+  1. 在工作目录中初始化 SQLite 数据库和包存储，写入 N 个用户、许可证、
+     发布及其二进制包
+  2. 在独立子进程中用 create_app() 启动门户（werkzeug 多线程服务器），
+     并统计每个端点执行的 SQL 语句数与打开的连接数
+  3. 按配置的并发数和请求比例驱动 登录 / 发布列表 / 可下载包列表 / 下载，
+     报告每类请求的 p50/p95/p99 延迟、每秒请求数和错误数
+
+服务器与压测客户端分属两个进程，避免共享 GIL 扭曲延迟。
+
+用法:
+    python benchmarks/portal_load.py --users 200 --releases 50 -c 8 --duration 30
+    python benchmarks/portal_load.py --mix login=1,releases=4,packages=4,download=1 -o load.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_MIX = 'login=1,releases=3,packages=3,download=1'
+OPERATIONS = ('login', 'releases', 'packages', 'download')
+STATS_PATH = '/__loadtest/stats'
+
+
+# ---------------------------------------------------------------------------
+# 数据准备（在服务器子进程中执行）
+# ---------------------------------------------------------------------------
+
+def seed_portal(db_path: str, users: int, licenses: int, releases: int, package_kb: int,
+                seed: int) -> Dict:
+    """写入用户、许可证、发布和包，返回压测客户端需要的凭据与发布ID
+    
+    包通过 ReleaseService.add_package 走正常的发布流程写入 ./releases，
+    调用方需要先切换到工作目录。
+    """
+    from release_portal.domain.value_objects import AccessLevel, ContentType, ResourceType
+    from release_portal.initializer import DatabaseInitializer, create_container
+    
+    rng = random.Random(seed)
+    DatabaseInitializer(db_path).initialize()
+    container = create_container(db_path)
+    
+    resource_types = list(ResourceType)
+    license_ids = [
+        container.license_service.create_license(
+            organization=f"load-org-{index}",
+            access_level=AccessLevel.FULL_ACCESS if index % 2 == 0 else AccessLevel.BINARY_ACCESS,
+            allowed_resource_types=resource_types,
+            expires_at=datetime.now() + timedelta(days=365)
+        ).license_id
+        for index in range(max(1, licenses))
+    ]
+    
+    credentials = []
+    for index in range(users):
+        username, password = f"loaduser{index}", f"load-pass-{index}"
+        container.auth_service.register(
+            username=username,
+            email=f"{username}@load.test",
+            password=password,
+            role_id='role_customer',
+            license_id=license_ids[index % len(license_ids)]
+        )
+        credentials.append([username, password])
+    
+    release_ids = []
+    with tempfile.TemporaryDirectory() as source_root:
+        for index in range(releases):
+            release = container.release_service.create_draft(
+                resource_type=resource_types[index % len(resource_types)],
+                version=f"1.{index}.0",
+                publisher_id='loadtest',
+                description=f"load test release {index}"
+            )
+            source = Path(source_root) / release.release_id
+            source.mkdir()
+            (source / 'firmware.bin').write_bytes(rng.randbytes(package_kb * 1024))
+            (source / 'README.txt').write_text(f"release {index}\n" * 64)
+            
+            container.release_service.add_package(release.release_id, ContentType.BINARY,
+                                                  str(source), extract_git=False)
+            container.release_service.publish_release(release.release_id)
+            release_ids.append(release.release_id)
+    
+    return {'credentials': credentials, 'release_ids': release_ids}
+
+
+class SQLCounter:
+    """按端点统计 SQL 语句数和连接数
+    
+    在服务器进程中包装 sqlite3.connect，为每个连接注册 trace 回调；
+    计数落在当前请求线程上，请求结束时按 "方法 路由" 汇总。
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def install(self, app) -> None:
+        from flask import jsonify, request
+        
+        original_connect = sqlite3.connect
+        counter = self
+        
+        def counting_connect(*args, **kwargs):
+            conn = original_connect(*args, **kwargs)
+            counter._bump('connections')
+            conn.set_trace_callback(lambda statement: counter._bump('statements'))
+            return conn
+        
+        sqlite3.connect = counting_connect
+        
+        @app.before_request
+        def _reset_sql_counts():
+            self._local.counts = {'statements': 0, 'connections': 0}
+        
+        @app.after_request
+        def _record_sql_counts(response):
+            counts = getattr(self._local, 'counts', None)
+            if counts is not None and request.path != STATS_PATH:
+                rule = request.url_rule.rule if request.url_rule else request.path
+                key = f"{request.method} {rule}"
+                with self._lock:
+                    stats = self._stats.setdefault(key, {'requests': 0, 'statements': 0, 'connections': 0})
+                    stats['requests'] += 1
+                    stats['statements'] += counts['statements']
+                    stats['connections'] += counts['connections']
+            self._local.counts = None
+            return response
+        
+        @app.route(STATS_PATH)
+        def _loadtest_stats():
+            with self._lock:
+                return jsonify(self._stats)
+    
+    def _bump(self, key: str) -> None:
+        counts = getattr(self._local, 'counts', None)
+        if counts is not None:
+            counts[key] += 1
+
+
+def serve(args) -> None:
+    """服务器子进程入口：准备数据、启动应用，首行 stdout 输出就绪信息"""
+    from werkzeug.serving import make_server
+    
+    # 日志默认写 stdout；就绪信息改走复制出的描述符，其余输出全部并入 stderr
+    ready = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    
+    workdir = Path(args.workdir).resolve()
+    os.chdir(workdir)
+    db_path = str(workdir / 'portal.db')
+    # 各端点内部通过 create_container() 取默认数据库，需与 create_app 指向同一个
+    os.environ['RELEASE_PORTAL_DB'] = db_path
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    
+    started = time.perf_counter()
+    seeded = seed_portal(db_path, args.users, args.licenses, args.releases, args.package_kb, args.seed)
+    seed_seconds = time.perf_counter() - started
+    
+    from release_portal.presentation.web.app import create_app
+    
+    app = create_app(db_path)
+    SQLCounter().install(app)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    
+    ready.write(json.dumps(dict(seeded, port=server.server_port, seed_seconds=seed_seconds)) + '\n')
+    ready.close()
+    server.serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# 压测客户端
+# ---------------------------------------------------------------------------
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """解析 'login=1,releases=3' 形式的请求比例"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Request mix has no positive weights")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """最近秩百分位数，sorted_values 需已排序"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadClient:
+    """单个虚拟用户：先登录，然后按比例随机发起请求"""
+    
+    def __init__(self, port: int, credentials: Tuple[str, str], release_ids: List[str],
+                 mix: Dict[str, int], rng: random.Random):
+        self._port = port
+        self._credentials = credentials
+        self._release_ids = release_ids
+        self._operations = [name for name in mix if mix[name] > 0]
+        self._weights = [mix[name] for name in self._operations]
+        self._rng = rng
+        self._token: Optional[str] = None
+    
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, bytes]:
+        conn = http.client.HTTPConnection('127.0.0.1', self._port, timeout=60)
+        try:
+            headers = {}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers['Content-Type'] = 'application/json'
+            if self._token:
+                headers['Authorization'] = f"Bearer {self._token}"
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+    
+    def login(self) -> Tuple[int, int]:
+        username, password = self._credentials
+        self._token = None
+        status, data = self._request('POST', '/api/auth/login',
+                                     {'username': username, 'password': password})
+        if status == 200:
+            self._token = json.loads(data)['token']
+        return status, len(data)
+    
+    def run_one(self) -> Tuple[str, int, int, float]:
+        """执行一次随机请求，返回 (操作, 状态码, 响应字节数, 秒)"""
+        operation = self._rng.choices(self._operations, self._weights)[0]
+        release_id = self._rng.choice(self._release_ids) if self._release_ids else 'none'
+        started = time.perf_counter()
+        
+        if operation == 'login' or self._token is None:
+            operation = 'login'
+            status, size = self.login()
+        elif operation == 'releases':
+            status, data = self._request('GET', '/api/releases')
+            size = len(data)
+        elif operation == 'packages':
+            status, data = self._request('GET', f"/api/downloads/{release_id}/packages")
+            size = len(data)
+        else:
+            status, data = self._request('GET', f"/api/downloads/{release_id}/download/BINARY")
+            size = len(data)
+        
+        return operation, status, size, time.perf_counter() - started
+
+
+def drive_load(port: int, seeded: Dict, mix: Dict[str, int], concurrency: int,
+               duration: float, max_requests: Optional[int], seed: int) -> Tuple[Dict, float]:
+    """并发驱动请求，返回 (操作 -> 样本, 实际耗时)"""
+    samples: Dict[str, Dict] = {name: {'latencies': [], 'errors': 0, 'bytes': 0, 'status': {}}
+                                for name in OPERATIONS}
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration
+    
+    def worker(index: int) -> None:
+        credentials = seeded['credentials'][index % len(seeded['credentials'])]
+        client = LoadClient(port, credentials, seeded['release_ids'], mix, random.Random(seed + index))
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and issued[0] >= max_requests:
+                    return
+                issued[0] += 1
+            try:
+                operation, status, size, seconds = client.run_one()
+            except (OSError, http.client.HTTPException):
+                operation, status, size, seconds = 'error', 0, 0, 0.0
+            with lock:
+                sample = samples.setdefault(operation, {'latencies': [], 'errors': 0, 'bytes': 0, 'status': {}})
+                sample['latencies'].append(seconds)
+                sample['bytes'] += size
+                sample['status'][str(status)] = sample['status'].get(str(status), 0) + 1
+                if not 200 <= status < 300:
+                    sample['errors'] += 1
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: Dict[str, Dict], elapsed: float) -> Dict:
+    operations = {}
+    total = 0
+    for name, sample in samples.items():
+        latencies = sorted(sample['latencies'])
+        if not latencies:
+            continue
+        total += len(latencies)
+        operations[name] = {
+            'requests': len(latencies),
+            'errors': sample['errors'],
+            'status': sample['status'],
+            'rps': round(len(latencies) / elapsed, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'bytes': sample['bytes']
+        }
+    return {'elapsed_seconds': round(elapsed, 3), 'requests': total,
+            'rps': round(total / elapsed, 2) if elapsed else None, 'operations': operations}
+
+
+def _fetch_sql_stats(port: int) -> Dict:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', STATS_PATH)
+        stats = json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+    for entry in stats.values():
+        entry['statements_per_request'] = round(entry['statements'] / entry['requests'], 1)
+        entry['connections_per_request'] = round(entry['connections'] / entry['requests'], 1)
+    return stats
+
+
+def format_report(report: Dict) -> str:
+    meta, load = report['meta'], report['load']
+    lines = [
+        f"{meta['users']} users, {meta['releases']} releases, concurrency {meta['concurrency']}, "
+        f"{load['requests']} requests in {load['elapsed_seconds']}s = {load['rps']} req/s",
+        f"{'operation':<10} {'reqs':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)"
+    ]
+    for name, op in load['operations'].items():
+        lines.append(f"{name:<10} {op['requests']:>6} {op['errors']:>5} {op['rps']:>8.1f} "
+                     f"{op['p50_ms']:>8.1f} {op['p95_ms']:>8.1f} {op['p99_ms']:>8.1f} {op['max_ms']:>8.1f}")
+    lines.append(f"{'endpoint':<50} {'reqs':>6} {'sql/req':>8} {'conn/req':>9}")
+    for endpoint, stats in sorted(report['sql'].items()):
+        lines.append(f"{endpoint:<50} {stats['requests']:>6} {stats['statements_per_request']:>8.1f} "
+                     f"{stats['connections_per_request']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def run(args) -> Dict:
+    mix = parse_mix(args.mix)
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='portal-load-'))
+    if args.workdir:
+        # 指定的工作目录每次重建；mkdtemp 创建的目录已存在且为空
+        shutil.rmtree(workdir, ignore_errors=True)
+        workdir.mkdir(parents=True)
+    
+    command = [sys.executable, __file__, '--serve', '--workdir', str(workdir),
+               '--users', str(args.users), '--licenses', str(args.licenses),
+               '--releases', str(args.releases), '--package-kb', str(args.package_kb),
+               '--seed', str(args.seed)]
+    with open(workdir / 'server.log', 'w') as server_log:
+        server = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=server_log, text=True,
+                                  cwd=str(ROOT))
+    try:
+        ready = server.stdout.readline()
+        if not ready:
+            raise RuntimeError(f"Portal failed to start, see {workdir / 'server.log'}")
+        seeded = json.loads(ready)
+        print(f"seeded in {seeded['seed_seconds']:.1f}s, portal on port {seeded['port']}", file=sys.stderr)
+        
+        samples, elapsed = drive_load(seeded['port'], seeded, mix, args.concurrency, args.duration,
+                                      args.requests, args.seed)
+        sql = _fetch_sql_stats(seeded['port'])
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'users': args.users,
+            'licenses': args.licenses,
+            'releases': args.releases,
+            'package_kb': args.package_kb,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'mix': mix,
+            'seed': args.seed
+        },
+        'load': summarize(samples, elapsed),
+        'sql': sql
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Release Portal load test')
+    parser.add_argument('--users', type=int, default=100, help='用户数')
+    parser.add_argument('--licenses', type=int, default=10, help='许可证数')
+    parser.add_argument('--releases', type=int, default=20, help='发布数（每个含一个二进制包）')
+    parser.add_argument('--package-kb', type=int, default=256, help='每个包的数据大小（KB）')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='并发虚拟用户数')
+    parser.add_argument('--duration', type=float, default=20.0, help='压测时长（秒）')
+    parser.add_argument('--requests', type=int, help='总请求数上限（先到先停）')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'请求比例（默认 {DEFAULT_MIX}）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--workdir', help='工作目录（会被清空；默认使用临时目录并在结束后删除）')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args)
+        return 0
+    
+    report = run(args)
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Binary Manager V2 性能基准套件
+
+在合成目录树（见 treegen.py）上测量核心路径：
+  walk          FileScanner.iter_files（只遍历，不哈希）
+  scan          FileScanner.scan_directory（遍历 + 哈希）
+  hash          HashCalculator 逐文件哈希
+  zip_create    Packager.create_zip
+  zip_extract   Packager.extract_zip（ParallelZipExtractor）
+  zip_extractall  ZipFile.extractall（单线程对照，用 --profile small/huge
+                对比大量小文件与少量大文件）
+  publish       PublisherService.publish
+  download      DownloaderService.download_by_id
+
+准备工作（建树、扫描清单、打包、预发布）在父进程完成且不计时；每次
+测量都在独立子进程中执行，报告：
+  seconds        多次运行的中位数
+  mb_per_sec     处理字节数 / seconds
+  peak_rss_mb    子进程峰值 RSS（ru_maxrss）
+  syscalls_*     read/write 类系统调用次数（/proc/self/io 的 syscr/syscw）
+  io_*_bytes     实际落到块设备的读写字节数
+  ctx_switches   主动 + 被动上下文切换次数
+
+结果写成 JSON，可用 compare.py 与保存的基线对比。
+
+用法:
+    python benchmarks/suite.py --profile mixed --scale 0.1 -o results.json
+    python benchmarks/suite.py --only scan hash --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from treegen import PROFILES, generate_tree  # noqa: E402
+
+RESULT_FORMAT = 'binary-manager-bench'
+RESULT_VERSION = 1
+BENCH_PACKAGE = 'bench'
+
+
+# ---------------------------------------------------------------------------
+# 各项基准：返回 (处理字节数, 处理条目数)，只有函数体内部计时
+# ---------------------------------------------------------------------------
+
+def bench_walk(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.domain.services import FileScanner
+    
+    files = total = 0
+    for _, path in FileScanner().iter_files(ctx['tree']):
+        files += 1
+        total += path.stat().st_size
+    return total, files
+
+
+def bench_scan(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.domain.services import FileScanner
+    
+    _, info = FileScanner(hash_algorithm=ctx['hash_algorithm']).scan_directory(ctx['tree'])
+    return info['total_size'], info['total_files']
+
+
+def bench_hash(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.domain.entities import FileManifest
+    from binary_manager_v2.domain.services.hash_calculator import HashCalculator
+    
+    calculator = HashCalculator(ctx['hash_algorithm'])
+    files = total = 0
+    for record in FileManifest.iter_file(ctx['manifest']):
+        calculator.digest_file(os.path.join(ctx['tree'], record['path']))
+        files += 1
+        total += record['size']
+    return total, files
+
+
+def bench_zip_create(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.domain.entities import FileManifest
+    from binary_manager_v2.domain.services import Packager
+    
+    manifest = FileManifest.load(ctx['manifest'])
+    Packager(ctx['scratch'], ctx['hash_algorithm']).create_zip(ctx['tree'], manifest,
+                                                               BENCH_PACKAGE, '0.0.0')
+    return manifest.total_size, len(manifest)
+
+
+def bench_zip_extract(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.domain.services import Packager
+    
+    names = Packager(ctx['scratch']).extract_zip(ctx['archive'], ctx['scratch'])
+    return ctx['tree_bytes'], len(names)
+
+
+def bench_zip_extractall(ctx: Dict) -> Tuple[int, int]:
+    import zipfile
+    
+    with zipfile.ZipFile(ctx['archive']) as zipf:
+        zipf.extractall(ctx['scratch'])
+        return ctx['tree_bytes'], len(zipf.namelist())
+
+
+def bench_publish(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.application import PublisherService
+    
+    publisher = PublisherService(db_path=os.path.join(ctx['scratch'], 'bench.db'),
+                                 storage_path=os.path.join(ctx['scratch'], 'releases'))
+    result = publisher.publish(ctx['tree'], BENCH_PACKAGE, '1.0.0', extract_git=False,
+                               hash_algorithm=ctx['hash_algorithm'])
+    return ctx['tree_bytes'], result['package'].file_count
+
+
+def bench_download(ctx: Dict) -> Tuple[int, int]:
+    from binary_manager_v2.application import DownloaderService
+    
+    downloader = DownloaderService(db_path=ctx['published_db'], storage_path=ctx['published_storage'])
+    downloader.download_by_id(ctx['package_id'], ctx['scratch'])
+    return ctx['tree_bytes'], ctx['tree_files']
+
+
+BENCHMARKS: Dict[str, Callable[[Dict], Tuple[int, int]]] = {
+    'walk': bench_walk,
+    'scan': bench_scan,
+    'hash': bench_hash,
+    'zip_create': bench_zip_create,
+    'zip_extract': bench_zip_extract,
+    'zip_extractall': bench_zip_extractall,
+    'publish': bench_publish,
+    'download': bench_download,
+}
+
+
+# ---------------------------------------------------------------------------
+# 子进程：执行一次基准并输出计量
+# ---------------------------------------------------------------------------
+
+def _read_proc_io() -> Dict[str, int]:
+    """Linux 的 /proc/self/io；其他平台返回空字典"""
+    try:
+        with open('/proc/self/io') as f:
+            return {key: int(value) for key, value in (line.split(': ') for line in f)}
+    except OSError:
+        return {}
+
+
+def run_child(name: str, ctx: Dict) -> Dict:
+    benchmark = BENCHMARKS[name]
+    # 提前导入被测模块，避免把导入耗时计入测量
+    import binary_manager_v2.application  # noqa: F401
+    
+    io_before = _read_proc_io()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    rss_before = usage_before.ru_maxrss
+    start = time.perf_counter()
+    
+    processed_bytes, items = benchmark(ctx)
+    
+    seconds = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    io_after = _read_proc_io()
+    
+    def io_delta(key: str) -> Optional[int]:
+        if key not in io_after:
+            return None
+        return io_after[key] - io_before[key]
+    
+    return {
+        'seconds': seconds,
+        'bytes': processed_bytes,
+        'items': items,
+        # Linux 上 ru_maxrss 单位为 KB
+        'peak_rss_mb': usage.ru_maxrss / 1024,
+        'rss_growth_mb': (usage.ru_maxrss - rss_before) / 1024,
+        'cpu_seconds': (usage.ru_utime - usage_before.ru_utime) + (usage.ru_stime - usage_before.ru_stime),
+        'syscalls_read': io_delta('syscr'),
+        'syscalls_write': io_delta('syscw'),
+        'io_read_bytes': io_delta('read_bytes'),
+        'io_write_bytes': io_delta('write_bytes'),
+        'ctx_switches': (usage.ru_nvcsw - usage_before.ru_nvcsw) + (usage.ru_nivcsw - usage_before.ru_nivcsw)
+    }
+
+
+# ---------------------------------------------------------------------------
+# 父进程：准备数据、调度子进程、汇总结果
+# ---------------------------------------------------------------------------
+
+def prepare(workdir: Path, args) -> Dict:
+    """生成目录树及各基准所需的前置产物（不计时）"""
+    from binary_manager_v2.application import PublisherService
+    from binary_manager_v2.domain.services import FileScanner, Packager
+    
+    tree = workdir / f"tree-{args.profile}-{args.seed}-{args.scale:g}"
+    info = generate_tree(str(tree), args.profile, args.seed, args.scale)
+    
+    fixtures = workdir / 'fixtures'
+    if fixtures.exists():
+        shutil.rmtree(fixtures)
+    fixtures.mkdir()
+    
+    manifest, _ = FileScanner(hash_algorithm=args.hash_algorithm).scan_directory(str(tree))
+    manifest_path = fixtures / 'manifest.ndjson.gz'
+    manifest.save(str(manifest_path))
+    
+    ctx = {
+        'tree': str(tree),
+        'tree_bytes': info['bytes'],
+        'tree_files': info['files'],
+        'hash_algorithm': args.hash_algorithm,
+        'manifest': str(manifest_path)
+    }
+    
+    selected = set(args.only or BENCHMARKS)
+    if selected & {'zip_extract', 'zip_extractall'}:
+        archive = Packager(str(fixtures), args.hash_algorithm).create_zip(
+            str(tree), manifest, BENCH_PACKAGE, 'fixture')
+        ctx['archive'] = archive['archive_path']
+    if 'download' in selected:
+        publisher = PublisherService(db_path=str(fixtures / 'published.db'),
+                                     storage_path=str(fixtures / 'releases'))
+        published = publisher.publish(str(tree), BENCH_PACKAGE, '1.0.0', extract_git=False,
+                                      hash_algorithm=args.hash_algorithm)
+        ctx.update(published_db=str(fixtures / 'published.db'),
+                   published_storage=str(fixtures / 'releases'),
+                   package_id=published['package_id'])
+    return ctx
+
+
+def _drop_page_cache() -> bool:
+    """尽力清空页缓存（需要 root），用于冷缓存测量"""
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return True
+    except OSError:
+        return False
+
+
+def measure(name: str, ctx: Dict, workdir: Path, repeat: int, cold: bool) -> Dict:
+    runs = []
+    for index in range(repeat):
+        scratch = workdir / f"scratch-{name}-{index}"
+        shutil.rmtree(scratch, ignore_errors=True)
+        scratch.mkdir()
+        if cold:
+            _drop_page_cache()
+        
+        payload = json.dumps(dict(ctx, scratch=str(scratch)))
+        output = subprocess.run([sys.executable, __file__, '--child', name],
+                                input=payload, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+        shutil.rmtree(scratch, ignore_errors=True)
+    
+    seconds = statistics.median(run['seconds'] for run in runs)
+    result = {
+        'runs': [round(run['seconds'], 6) for run in runs],
+        'seconds': round(seconds, 6),
+        'bytes': runs[0]['bytes'],
+        'items': runs[0]['items'],
+        'mb_per_sec': round(runs[0]['bytes'] / seconds / (1024 * 1024), 2) if seconds > 0 else None,
+        'items_per_sec': round(runs[0]['items'] / seconds, 1) if seconds > 0 else None,
+        'peak_rss_mb': round(max(run['peak_rss_mb'] for run in runs), 1),
+        'rss_growth_mb': round(max(run['rss_growth_mb'] for run in runs), 1),
+        'cpu_seconds': round(statistics.median(run['cpu_seconds'] for run in runs), 6)
+    }
+    # 计数类指标在各次运行间几乎不变，取中位数
+    for key in ('syscalls_read', 'syscalls_write', 'io_read_bytes', 'io_write_bytes', 'ctx_switches'):
+        values = [run[key] for run in runs if run[key] is not None]
+        result[key] = int(statistics.median(values)) if values else None
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args) -> Dict:
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='bm-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        ctx = prepare(workdir, args)
+        print(f"tree: {ctx['tree_files']} files, {ctx['tree_bytes'] / 1024 / 1024:.1f} MB "
+              f"({args.profile}, seed={args.seed}, scale={args.scale:g})", file=sys.stderr)
+        
+        results = {}
+        for name in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(name, ctx, workdir, args.repeat, args.cold)
+            r = results[name]
+            print(f"  {name:<14} {r['seconds']:8.3f}s  {r['mb_per_sec'] or 0:9.1f} MB/s  "
+                  f"rss {r['peak_rss_mb']:7.1f} MB  "
+                  f"syscalls r/w {r['syscalls_read']}/{r['syscalls_write']}", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'format': RESULT_FORMAT,
+        'version': RESULT_VERSION,
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'profile': args.profile,
+            'seed': args.seed,
+            'scale': args.scale,
+            'hash_algorithm': args.hash_algorithm,
+            'repeat': args.repeat,
+            'cold_cache': args.cold,
+            'tree_files': ctx['tree_files'],
+            'tree_bytes': ctx['tree_bytes']
+        },
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binary Manager V2 benchmark suite')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed', help='目录树形态')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--scale', type=float, default=0.1, help='目录树缩放比例')
+    parser.add_argument('--hash-algorithm', default='sha256', help='摘要算法')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数（取中位数）')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='只运行指定基准')
+    parser.add_argument('--cold', action='store_true', help='每次运行前清空页缓存（需要 root）')
+    parser.add_argument('--workdir', help='工作目录（保留并复用生成的目录树）')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件（默认输出到 stdout）')
+    parser.add_argument('--baseline', help='与基线结果对比，有回退时返回非零')
+    parser.add_argument('--child', choices=sorted(BENCHMARKS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(run_child(args.child, json.load(sys.stdin))))
+        return 0
+    
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    else:
+        print(text)
+    
+    if args.baseline:
+        from compare import compare_reports, format_comparison, load_report
+        comparison = compare_reports(load_report(args.baseline), report)
+        print(format_comparison(comparison), file=sys.stderr)
+        return 1 if comparison['regressions'] else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,13 @@
 import json
-import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from ..domain.entities import Package
-from ..domain.services import Packager
+from ..domain.services import Packager, DependencyGraph, ParallelZipExtractor
 from ..infrastructure.storage import LocalStorage, S3Storage
 from ..infrastructure.database import SQLitePackageRepository
 from ..shared.logger import Logger
+from ..shared.instrumentation import StageTimer
 from ..shared.progress import ConsoleProgress
 
 
@@ -18,10 +19,12 @@ class DownloaderService:
         package_repository: Optional[SQLitePackageRepository] = None,
         storage: Optional[LocalStorage] = None,
         db_path: Optional[str] = None,
-        storage_path: Optional[str] = None
+        storage_path: Optional[str] = None,
+        extractor: Optional[ParallelZipExtractor] = None
     ):
         self.package_repository = package_repository or SQLitePackageRepository(db_path)
         self.storage = storage or LocalStorage(storage_path or './releases')
+        self.extractor = extractor or ParallelZipExtractor()
         self.logger = Logger.get(self.__class__.__name__)
         self.progress = ConsoleProgress()
     
@@ -46,16 +49,22 @@ class DownloaderService:
         output_path.mkdir(parents=True, exist_ok=True)
         
         archive_path = output_path / archive_name
+        timer = StageTimer('download', package=package_name, version=version)
         
-        if download_url:
-            self._download_from_url(download_url, archive_path)
-        else:
-            self._download_from_storage(archive_name, archive_path)
+        with timer.stage('fetch') as stage:
+            if download_url:
+                self._download_from_url(download_url, archive_path)
+            else:
+                self._download_from_storage(archive_name, archive_path)
+            stage.bytes = archive_path.stat().st_size
         
-        if not self._verify_hash(archive_path, expected_hash):
-            raise ValueError(f"Hash verification failed for {archive_path}")
+        with timer.stage('verify') as stage:
+            stage.bytes = archive_path.stat().st_size
+            if not self._verify_hash(archive_path, expected_hash):
+                raise ValueError(f"Hash verification failed for {archive_path}")
         
-        self._extract_package(archive_path, output_path)
+        with timer.stage('extract') as stage:
+            stage.items, stage.bytes = self._extract_package(archive_path, output_path)
         
         self.logger.info(f"Package downloaded to: {output_path}")
         
@@ -63,7 +72,8 @@ class DownloaderService:
             'package_name': package_name,
             'version': version,
             'output_path': str(output_path),
-            'archive_path': str(archive_path)
+            'archive_path': str(archive_path),
+            'timings': timer.summary()
         }
     
     def download_by_id(self, package_id: int, output_dir: str) -> Dict:
@@ -82,12 +92,35 @@ class DownloaderService:
         
         return self._download_package(package, output_dir)
     
-    def download_group(self, group_id: int, output_dir: str) -> Dict:
-        """下载分组中的所有包"""
+    def download_latest(self, package_name: str, constraint: Optional[str],
+                        output_dir: str) -> Dict:
+        """下载满足版本约束（如 ^1.2、>=1.0,<2）的最高版本"""
+        package = self.package_repository.latest(package_name, constraint)
+        if package is None and constraint:
+            # 非语义化版本号（如 "1.2"、"nightly"）按原样精确匹配
+            package = self.package_repository.find_by_name_and_version(package_name, constraint)
+        if package is None:
+            raise ValueError(f"No version of {package_name} matches '{constraint or '*'}'")
+        
+        self.logger.info(f"Resolved {package_name} {constraint or '*'} -> v{package.version}")
+        return self._download_package(package, output_dir)
+    
+    def download_group(self, group_id: int, output_dir: str, max_workers: int = 4) -> Dict:
+        """下载分组中的所有包
+        
+        按成员依赖构建 DAG：所有包的下载和校验并发进行，解压在其依赖
+        全部解压完成后才开始，互不依赖的包同时解压。
+        
+        Args:
+            group_id: 分组ID
+            output_dir: 输出目录（每个包解压到以包名命名的子目录）
+            max_workers: 并发下载/解压的线程数
+        """
         from ..infrastructure.database import SQLiteGroupRepository
         
+        # 成员包实体随分组一次加载，不再逐个 find_by_id
         group_repo = SQLiteGroupRepository(self.package_repository.db_path)
-        group = group_repo.find_by_id(group_id)
+        group = group_repo.find_by_id(group_id, include_packages=True)
         
         if group is None:
             raise ValueError(f"Group not found: {group_id}")
@@ -97,32 +130,103 @@ class DownloaderService:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        downloaded = []
-        
-        for pkg_ref in sorted(group.packages, key=lambda p: p.install_order):
-            package = self.package_repository.find_by_id(pkg_ref.package_id)
-            if package is None:
+        # 以包ID为节点：同名不同版本的成员也能共存
+        members = {}
+        ids_by_name: Dict[str, List[int]] = {}
+        for pkg_ref in group.packages:
+            if pkg_ref.package is None:
                 if pkg_ref.required:
                     self.logger.error(f"Required package not found: {pkg_ref.package_id}")
                     raise ValueError(f"Required package not found: {pkg_ref.package_id}")
-                else:
-                    self.logger.warning(f"Optional package not found: {pkg_ref.package_id}")
-                    continue
-            
-            pkg_output = output_path / str(package.package_name)
-            result = self._download_package(package, str(pkg_output))
-            downloaded.append(result)
+                self.logger.warning(f"Optional package not found: {pkg_ref.package_id}")
+                continue
+            members[pkg_ref.package_id] = pkg_ref
+            ids_by_name.setdefault(pkg_ref.package_name, []).append(pkg_ref.package_id)
+        
+        # 缺失的可选包视为已满足的依赖
+        graph = DependencyGraph(
+            {
+                package_id: [dep_id for dep in ref.depends_on for dep_id in ids_by_name.get(dep, [])]
+                for package_id, ref in members.items()
+            },
+            {package_id: ref.install_order for package_id, ref in members.items()}
+        )
+        plan = graph.levels()
+        order = [package_id for level in plan for package_id in level]
+        
+        results = self._install_plan(graph, order, members, output_path, max_workers)
+        downloaded = [results[package_id] for package_id in order]
         
         self.logger.info(f"Downloaded {len(downloaded)} packages")
         
         return {
             'group_name': group.group_name,
             'version': group.version,
+            'install_plan': [[members[package_id].package_name for package_id in level] for level in plan],
             'packages': downloaded
         }
     
+    def _install_plan(self, graph: DependencyGraph, order: List[int], members: Dict,
+                      output_path: Path, max_workers: int) -> Dict[int, Dict]:
+        """并发执行安装计划，返回 包ID -> 下载结果"""
+        waiting_on = {package_id: set(graph.dependencies(package_id)) for package_id in order}
+        fetched: Dict[int, Path] = {}
+        results: Dict[int, Dict] = {}
+        tasks = {}
+        timers = {
+            package_id: StageTimer('download', package=str(members[package_id].package.package_name),
+                                   version=members[package_id].package.version)
+            for package_id in order
+        }
+        
+        def package_dir(package_id: int) -> Path:
+            return output_path / str(members[package_id].package.package_name)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            try:
+                for package_id in order:
+                    future = pool.submit(self._fetch_package, members[package_id].package,
+                                         str(package_dir(package_id)), timers[package_id])
+                    tasks[future] = ('fetch', package_id)
+                
+                pending = set(tasks)
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        stage, package_id = tasks[future]
+                        value = future.result()
+                        if stage == 'fetch':
+                            fetched[package_id] = value
+                        else:
+                            results[package_id] = value
+                            for dependent in graph.dependents(package_id):
+                                waiting_on[dependent].discard(package_id)
+                    
+                    # 依赖已全部解压且自身已下载的包进入解压
+                    for package_id in order:
+                        if package_id in fetched and not waiting_on[package_id]:
+                            future = pool.submit(self._install_fetched, members[package_id].package,
+                                                 fetched.pop(package_id), package_dir(package_id),
+                                                 timers[package_id])
+                            tasks[future] = ('extract', package_id)
+                            pending.add(future)
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+        
+        return results
+    
     def _download_package(self, package: Package, output_dir: str) -> Dict:
         """下载单个包"""
+        timer = StageTimer('download', package=str(package.package_name), version=package.version)
+        archive_path = self._fetch_package(package, output_dir, timer)
+        return self._install_fetched(package, archive_path, Path(output_dir), timer)
+    
+    def _fetch_package(self, package: Package, output_dir: str,
+                       timer: Optional[StageTimer] = None) -> Path:
+        """下载并校验包归档，返回归档路径（fetch/verify 阶段记入 timer）"""
+        timer = timer or StageTimer('download')
         self.logger.info(f"Downloading {package.package_name} v{package.version}")
         
         output_path = Path(output_dir)
@@ -131,29 +235,41 @@ class DownloaderService:
         archive_name = f"{package.package_name}_v{package.version}.zip"
         archive_path = output_path / archive_name
         
-        if package.storage_location:
-            if package.storage_location.storage_type.value == 's3':
-                self._download_from_s3(package.storage_location.path, archive_path)
-            else:
-                self._download_from_storage(package.storage_location.path, archive_path)
-        else:
-            local_archive = self.storage.base_path / archive_name
-            if local_archive.exists():
-                import shutil
-                shutil.copy2(local_archive, archive_path)
+        with timer.stage('fetch') as stage:
+            if package.storage_location:
+                if package.storage_location.storage_type.value == 's3':
+                    self._download_from_s3(package.storage_location.path, archive_path)
+                else:
+                    self._download_from_storage(package.storage_location.path, archive_path)
             else:
-                raise ValueError(f"Package archive not found: {archive_name}")
+                local_archive = self.storage.base_path / archive_name
+                if local_archive.exists():
+                    import shutil
+                    shutil.copy2(local_archive, archive_path)
+                else:
+                    raise ValueError(f"Package archive not found: {archive_name}")
+            stage.bytes = package.archive_size
         
-        if not self._verify_hash(archive_path, str(package.archive_hash)):
-            raise ValueError(f"Hash verification failed for {archive_path}")
+        with timer.stage('verify') as stage:
+            stage.bytes = package.archive_size
+            if not self._verify_hash(archive_path, str(package.archive_hash)):
+                raise ValueError(f"Hash verification failed for {archive_path}")
         
-        self._extract_package(archive_path, output_path)
+        return archive_path
+    
+    def _install_fetched(self, package: Package, archive_path: Path, output_path: Path,
+                         timer: Optional[StageTimer] = None) -> Dict:
+        """解压已下载的归档（extract 阶段记入 timer）"""
+        timer = timer or StageTimer('download')
+        with timer.stage('extract') as stage:
+            stage.items, stage.bytes = self._extract_package(archive_path, output_path)
         
         return {
             'package_name': str(package.package_name),
             'version': package.version,
             'output_path': str(output_path),
-            'archive_path': str(archive_path)
+            'archive_path': str(archive_path),
+            'timings': timer.summary()
         }
     
     def _download_from_url(self, url: str, output_path: Path) -> None:
@@ -212,11 +328,11 @@ class DownloaderService:
             self.logger.error("Hash verification failed")
             return False
     
-    def _extract_package(self, archive_path: Path, output_dir: Path) -> None:
-        """解压包"""
+    def _extract_package(self, archive_path: Path, output_dir: Path) -> Tuple[int, int]:
+        """解压包，返回 (文件数, 解压后字节数)"""
         self.logger.info(f"Extracting: {archive_path}")
         
-        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-            zip_ref.extractall(output_dir)
+        members, info = self.extractor.extract(str(archive_path), str(output_dir))
         
-        self.logger.info(f"Extracted to: {output_dir}")
+        self.logger.info(f"Extracted to: {output_dir} ({info['files']} files, {info['workers']} workers)")
+        return len(members), info['bytes']
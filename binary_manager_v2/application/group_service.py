@@ -1,7 +1,9 @@
+import json
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from ..domain.entities import Group, GroupPackage
 from ..domain.value_objects import PackageName
+from ..domain.services import DependencyGraph
 from ..infrastructure.database import SQLiteGroupRepository, SQLitePackageRepository
 from ..shared.logger import Logger
 
@@ -29,26 +31,20 @@ class GroupService:
         metadata: Optional[Dict] = None,
         created_by: Optional[str] = None
     ) -> Dict:
-        """创建分组"""
-        group_packages = []
+        """创建分组
         
-        for pkg_spec in packages:
-            package = self._find_package(pkg_spec)
-            if package is None:
-                raise ValueError(
-                    f"Package not found: {pkg_spec['package_name']} v{pkg_spec['version']}"
-                )
-            
-            group_packages.append(
-                GroupPackage(
-                    package_name=pkg_spec['package_name'],
-                    package_version=pkg_spec['version'],
-                    package_id=package_id_from_package(package),
-                    install_order=pkg_spec.get('install_order', 0),
-                    required=pkg_spec.get('required', True)
-                )
+        所有包规格用一次批量查询解析为包ID，成员行在同一事务中批量插入。
+        包规格可带 depends_on（同组成员的包名称列表），依赖存在环或引用
+        非成员时在保存前抛出 ValueError。
+        """
+        group_packages, missing = self._resolve_packages(packages)
+        if missing:
+            raise ValueError(
+                "Package not found: " + ", ".join(f"{name} v{version}" for name, version in missing)
             )
         
+        self._validate_dependencies(group_packages)
+        
         group = Group(
             group_name=PackageName(group_name),
             version=version,
@@ -104,14 +100,23 @@ class GroupService:
         """获取分组"""
         return self.group_repository.find_by_id(group_id)
     
+    def get_group_with_packages(self, group_id: int) -> Optional[Group]:
+        """获取分组，成员的 Package 实体一并加载"""
+        return self.group_repository.find_by_id(group_id, include_packages=True)
+    
     def list_groups(self, filters: Optional[Dict] = None) -> List[Group]:
         """列出分组"""
         return self.group_repository.find_all(filters)
     
+    def list_group_summaries(self, filters: Optional[Dict] = None) -> List[Dict]:
+        """列出分组摘要（id、名称、版本、成员数等），用于列表展示"""
+        return self.group_repository.list_summaries(filters)
+    
     def export_group(self, group_id: int, output_dir: str) -> Optional[str]:
-        """导出分组为JSON"""
-        import json
+        """导出分组为JSON
         
+        成员信息按批读取并逐条写出，内存占用不随分组大小增长。
+        """
         group = self.group_repository.find_by_id(group_id)
         if group is None:
             self.logger.error(f"Group not found: {group_id}")
@@ -122,36 +127,36 @@ class GroupService:
         
         export_file = output_path / f"{str(group.group_name)}_v{group.version}.json"
         
-        export_data = {
+        header = {
             'group_name': str(group.group_name),
             'version': group.version,
             'description': group.description,
             'environment_config': group.environment_config,
-            'metadata': group.metadata,
-            'packages': []
+            'metadata': group.metadata
         }
         
-        for pkg in group.packages:
-            package = self.package_repository.find_by_id(pkg.package_id)
-            if package:
-                export_data['packages'].append({
-                    'package_name': str(package.package_name),
-                    'version': package.version,
-                    'install_order': pkg.install_order,
-                    'required': pkg.required,
-                    'git_commit': package.git_info.commit_short if package.git_info else None
-                })
-        
         with open(export_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
+            f.write('{\n')
+            for key, value in header.items():
+                f.write(f'  {json.dumps(key)}: {json.dumps(value)},\n')
+            f.write('  "packages": [')
+            
+            written = 0
+            for entry in self._iter_export_packages(group.packages):
+                f.write(',\n    ' if written else '\n    ')
+                f.write(json.dumps(entry))
+                written += 1
+            
+            f.write('\n  ]\n}\n' if written else ']\n}\n')
         
         self.logger.info(f"Group exported to: {export_file}")
         return str(export_file)
     
     def import_group(self, group_json_path: str) -> Optional[int]:
-        """从JSON导入分组"""
-        import json
+        """从JSON导入分组
         
+        包规格分批解析（每批一次查询），找不到的包记录警告后跳过。
+        """
         json_path = Path(group_json_path)
         if not json_path.exists():
             self.logger.error(f"File not found: {group_json_path}")
@@ -160,36 +165,15 @@ class GroupService:
         with open(json_path, 'r') as f:
             data = json.load(f)
         
-        packages = []
-        for pkg_data in data.get('packages', []):
-            package = self.package_repository.find_by_name_and_version(
-                pkg_data['package_name'],
-                pkg_data['version']
-            )
-            if package is None:
-                self.logger.warning(
-                    f"Package not found: {pkg_data['package_name']} v{pkg_data['version']}"
-                )
-                continue
-            
-            packages.append({
-                'package_name': str(package.package_name),
-                'package_version': package.version,
-                'package_id': package_id_from_package(package),
-                'install_order': pkg_data.get('install_order', 0),
-                'required': pkg_data.get('required', True)
-            })
-        
-        group_packages = [
-            GroupPackage(
-                package_name=p['package_name'],
-                package_version=p['package_version'],
-                package_id=p['package_id'],
-                install_order=p['install_order'],
-                required=p['required']
-            )
-            for p in packages
-        ]
+        group_packages, missing = self._resolve_packages(data.get('packages', []))
+        for name, version in missing:
+            self.logger.warning(f"Package not found: {name} v{version}")
+        
+        # 跳过的包不能再作为依赖
+        member_names = {pkg.package_name for pkg in group_packages}
+        for pkg in group_packages:
+            pkg.depends_on = [dep for dep in pkg.depends_on if dep in member_names]
+        self._validate_dependencies(group_packages)
         
         group = Group(
             group_name=PackageName(data['group_name']),
@@ -212,12 +196,59 @@ class GroupService:
         """删除分组"""
         return self.group_repository.delete(group_id)
     
-    def _find_package(self, pkg_spec: Dict) -> Optional:
-        """查找包"""
-        return self.package_repository.find_by_name_and_version(
-            pkg_spec['package_name'],
-            pkg_spec['version']
-        )
+    EXPORT_BATCH_SIZE = 500
+    
+    def _resolve_packages(self, specs: List[Dict]) -> Tuple[List[GroupPackage], List[Tuple[str, str]]]:
+        """批量解析包规格，返回 (成员列表, 未找到的 (名称, 版本))"""
+        pairs = [(str(spec['package_name']), str(spec['version'])) for spec in specs]
+        resolved = self.package_repository.resolve_ids(pairs)
+        
+        group_packages = []
+        missing = []
+        for spec, pair in zip(specs, pairs):
+            package_id = resolved.get(pair)
+            if package_id is None:
+                missing.append(pair)
+                continue
+            
+            group_packages.append(
+                GroupPackage(
+                    package_name=pair[0],
+                    package_version=pair[1],
+                    package_id=package_id,
+                    install_order=spec.get('install_order', 0),
+                    required=spec.get('required', True),
+                    depends_on=spec.get('depends_on')
+                )
+            )
+        
+        return group_packages, missing
+    
+    @staticmethod
+    def _validate_dependencies(group_packages: List[GroupPackage]) -> None:
+        """声明了依赖的分组按包名称建图，校验依赖均为成员且无环"""
+        if any(pkg.depends_on for pkg in group_packages):
+            DependencyGraph.from_group_packages(group_packages).validate()
+    
+    def _iter_export_packages(self, group_packages: List[GroupPackage]):
+        """按批读取成员包摘要，逐条产出导出记录"""
+        for start in range(0, len(group_packages), self.EXPORT_BATCH_SIZE):
+            batch = group_packages[start:start + self.EXPORT_BATCH_SIZE]
+            summaries = self.package_repository.find_summaries_by_ids(
+                [pkg.package_id for pkg in batch]
+            )
+            
+            for pkg in batch:
+                summary = summaries.get(pkg.package_id)
+                if summary:
+                    yield {
+                        'package_name': summary['package_name'],
+                        'version': summary['version'],
+                        'install_order': pkg.install_order,
+                        'required': pkg.required,
+                        'depends_on': pkg.depends_on,
+                        'git_commit': summary['git_commit_short']
+                    }
 
 
 def package_id_from_package(package) -> int:
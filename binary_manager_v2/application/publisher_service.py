@@ -1,12 +1,13 @@
 from pathlib import Path
 from typing import Optional, Dict, List
-from ..domain.services import FileScanner, HashCalculator, Packager
+from ..domain.services import FileScanner, Packager
 from ..domain.entities import Package, FileInfo
 from ..domain.value_objects import PackageName, Hash, StorageLocation, StorageType, GitInfo
 from ..infrastructure.git import GitService
 from ..infrastructure.storage import LocalStorage, S3Storage
 from ..infrastructure.database import SQLitePackageRepository
 from ..shared.logger import Logger
+from ..shared.instrumentation import StageTimer
 
 
 class PublisherService:
@@ -31,9 +32,16 @@ class PublisherService:
         description: Optional[str] = None,
         metadata: Optional[Dict] = None,
         ignore_patterns: Optional[List[str]] = None,
-        extract_git: bool = True
+        extract_git: bool = True,
+        hash_algorithm: str = 'sha256'
     ) -> Dict:
-        """发布包"""
+        """发布包
+        
+        hash_algorithm 决定文件和归档摘要的算法，记录为 'algo:value'，
+        下载校验时按记录的算法计算，因此不同算法发布的包可以共存。
+        结果中的 'timings' 按阶段（git/scan/hash/zip/archive_hash/db_save/config）
+        给出耗时与字节数。
+        """
         source_path = Path(source_dir).resolve()
         if not source_path.exists():
             raise ValueError(f"Source directory does not exist: {source_dir}")
@@ -41,25 +49,20 @@ class PublisherService:
         self.logger.info(f"Publishing {package_name} v{version}")
         self.logger.info(f"Source: {source_dir}")
         
-        git_info = None
-        if extract_git:
-            git_service = GitService(str(source_path))
-            if git_service.is_git_repo():
-                git_info = git_service.get_git_info()
-                self.logger.info(f"Git commit: {git_info.commit_short if git_info else 'N/A'}")
+        timer = StageTimer('publish', package=package_name, version=version)
         
-        file_scanner = FileScanner(ignore_patterns)
-        files, scan_info = file_scanner.scan_directory(str(source_path))
+        git_info = self._extract_git_info(source_path, extract_git, timer)
+        files = self._scan_files(source_path, ignore_patterns, hash_algorithm, timer)
         self.logger.info(f"Scanned {len(files)} files")
         
-        hash_calculator = HashCalculator()
-        packager = Packager(str(self.storage.base_path))
+        packager = Packager(str(self.storage.base_path), hash_algorithm)
         
         archive_name = f"{package_name}_v{version}.zip"
-        result = packager.create_zip(str(source_path), files, package_name, version)
+        result = self._create_archive(packager, source_path, files, package_name, version, timer)
         archive_path = result['archive_path']
         
-        archive_hash = hash_calculator.calculate_file(str(archive_path))
+        # 打包时已计算过归档摘要，无需再读一遍
+        archive_hash = Hash.from_string(result['hash'])
         archive_size = result['size']
         
         package = Package(
@@ -74,20 +77,24 @@ class PublisherService:
             metadata=metadata or {}
         )
         
-        for file_info in files:
-            package.add_file(file_info)
+        package.set_manifest(files)
         
-        package_id = self.package_repository.save(package)
+        with timer.stage('db_save') as stage:
+            package_id = self.package_repository.save(package)
+            stage.items = 1
         self.logger.info(f"Package saved to database with ID: {package_id}")
         
-        config_path = self._save_config(package, self.storage.base_path)
+        with timer.stage('config') as stage:
+            config_path = self._save_config(package, self.storage.base_path)
+            stage.items = len(files)
         self.logger.info(f"Config saved: {config_path}")
         
         return {
             'package_id': package_id,
             'package': package,
             'archive_path': str(archive_path),
-            'config_path': config_path
+            'config_path': config_path,
+            'timings': timer.summary()
         }
     
     def publish_to_s3(
@@ -99,7 +106,8 @@ class PublisherService:
         description: Optional[str] = None,
         metadata: Optional[Dict] = None,
         ignore_patterns: Optional[List[str]] = None,
-        extract_git: bool = True
+        extract_git: bool = True,
+        hash_algorithm: str = 'sha256'
     ) -> Dict:
         """发布包到S3"""
         source_path = Path(source_dir).resolve()
@@ -108,29 +116,25 @@ class PublisherService:
         
         self.logger.info(f"Publishing {package_name} v{version} to S3")
         
-        git_info = None
-        if extract_git:
-            git_service = GitService(str(source_path))
-            if git_service.is_git_repo():
-                git_info = git_service.get_git_info()
-        
-        file_scanner = FileScanner(ignore_patterns)
-        files, scan_info = file_scanner.scan_directory(str(source_path))
+        timer = StageTimer('publish_s3', package=package_name, version=version)
         
-        hash_calculator = HashCalculator()
+        git_info = self._extract_git_info(source_path, extract_git, timer)
+        files = self._scan_files(source_path, ignore_patterns, hash_algorithm, timer)
         
         temp_dir = Path('/tmp')
-        packager = Packager(str(temp_dir))
+        packager = Packager(str(temp_dir), hash_algorithm)
         
         archive_name = f"{package_name}_v{version}.zip"
-        result = packager.create_zip(str(source_path), files, package_name, version)
+        result = self._create_archive(packager, source_path, files, package_name, version, timer)
         temp_archive_path = result['archive_path']
         
-        archive_hash = hash_calculator.calculate_file(str(temp_archive_path))
+        archive_hash = Hash.from_string(result['hash'])
         archive_size = result['size']
         
         s3_key = f"packages/{package_name}/{version}/{archive_name}"
-        s3_storage.upload_file(str(temp_archive_path), s3_key)
+        with timer.stage('upload') as stage:
+            s3_storage.upload_file(str(temp_archive_path), s3_key)
+            stage.bytes = archive_size
         
         package = Package(
             package_name=PackageName(package_name),
@@ -144,26 +148,65 @@ class PublisherService:
             metadata=metadata or {}
         )
         
-        for file_info in files:
-            package.add_file(file_info)
+        package.set_manifest(files)
         
-        package_id = self.package_repository.save(package)
+        with timer.stage('db_save') as stage:
+            package_id = self.package_repository.save(package)
+            stage.items = 1
         self.logger.info(f"Package saved to database with ID: {package_id}")
         
-        temp_archive_path.unlink()
+        Path(temp_archive_path).unlink()
         
         return {
             'package_id': package_id,
             'package': package,
-            's3_key': s3_key
+            's3_key': s3_key,
+            'timings': timer.summary()
         }
     
+    def _extract_git_info(self, source_path: Path, extract_git: bool,
+                          timer: StageTimer) -> Optional[GitInfo]:
+        if not extract_git:
+            return None
+        
+        with timer.stage('git'):
+            git_service = GitService(str(source_path))
+            if not git_service.is_git_repo():
+                return None
+            git_info = git_service.get_git_info()
+        
+        self.logger.info(f"Git commit: {git_info.commit_short if git_info else 'N/A'}")
+        return git_info
+    
+    def _scan_files(self, source_path: Path, ignore_patterns: Optional[List[str]],
+                    hash_algorithm: str, timer: StageTimer):
+        """扫描并哈希源文件，遍历和哈希分别记为 scan/hash 阶段"""
+        file_scanner = FileScanner(ignore_patterns, hash_algorithm=hash_algorithm)
+        files, scan_info = file_scanner.scan_directory(str(source_path))
+        
+        timer.add('scan', scan_info['scan_seconds'], items=scan_info['total_files'])
+        timer.add('hash', scan_info['hash_seconds'], bytes=scan_info['total_size'],
+                  items=scan_info['total_files'])
+        return files
+    
+    def _create_archive(self, packager: Packager, source_path: Path, files, package_name: str,
+                        version: str, timer: StageTimer) -> Dict:
+        result = packager.create_zip(str(source_path), files, package_name, version)
+        
+        timer.add('zip', result['zip_seconds'], bytes=files.total_size, items=len(files))
+        timer.add('archive_hash', result['hash_seconds'], bytes=result['size'])
+        return result
+    
     def _save_config(self, package: Package, output_dir: Path) -> str:
         """保存配置文件"""
         import json
         
         config_path = output_dir / f"{package.package_name}_v{package.version}.json"
         
+        # 文件清单单独流式写出，配置文件只记录引用
+        manifest_path = output_dir / f"{package.package_name}_v{package.version}.manifest.ndjson.gz"
+        package.manifest.save(str(manifest_path))
+        
         config_data = {
             'package_name': str(package.package_name),
             'version': package.version,
@@ -174,7 +217,11 @@ class PublisherService:
                 'file_count': package.file_count,
                 'hash': str(package.archive_hash)
             },
-            'files': [f.to_dict() for f in package.files],
+            'manifest': {
+                'file': manifest_path.name,
+                'format': 'ndjson+gzip',
+                'file_count': len(package.manifest)
+            },
             'git_info': package.git_info.to_dict() if package.git_info else None,
             'storage': package.storage_location.to_dict() if package.storage_location else None,
             'description': package.description,
@@ -9,9 +9,12 @@ from pathlib import Path
 from typing import Optional
 
 from ..application import PublisherService, GroupService, DownloaderService
+from ..domain.value_objects import Hash
 from ..infrastructure.storage import LocalStorage, S3Storage
 from ..infrastructure.database import SQLitePackageRepository, SQLiteGroupRepository
 from ..shared.logger import Logger
+from ..shared.instrumentation import StageTimer
+from ..shared.profiling import run_profiled
 
 
 class BinaryManagerCLI:
@@ -65,7 +68,8 @@ class BinaryManagerCLI:
                 description=args.description,
                 metadata={'metadata': args.metadata} if args.metadata else None,
                 ignore_patterns=args.ignore.split(',') if args.ignore else None,
-                extract_git=not args.no_git
+                extract_git=not args.no_git,
+                hash_algorithm=args.hash_algorithm
             )
         else:
             result = publisher.publish(
@@ -75,12 +79,14 @@ class BinaryManagerCLI:
                 description=args.description,
                 metadata={'metadata': args.metadata} if args.metadata else None,
                 ignore_patterns=args.ignore.split(',') if args.ignore else None,
-                extract_git=not args.no_git
+                extract_git=not args.no_git,
+                hash_algorithm=args.hash_algorithm
             )
         
         print(f"✓ Package published successfully!")
         print(f"  Package ID: {result['package_id']}")
         print(f"  Archive: {result.get('archive_path', result.get('s3_key'))}")
+        self._print_timings(result.get('timings'))
         
         return 0
     
@@ -94,21 +100,56 @@ class BinaryManagerCLI:
             result = downloader.download_by_config(args.config, args.output)
         elif args.package_id:
             result = downloader.download_by_id(args.package_id, args.output)
-        elif args.package_name and args.version:
-            result = downloader.download_by_name_version(
-                args.package_name, args.version, args.output
-            )
+        elif args.package_name:
+            if args.version and self._is_exact_version(args.version):
+                result = downloader.download_by_name_version(
+                    args.package_name, args.version, args.output
+                )
+            else:
+                result = downloader.download_latest(
+                    args.package_name, args.version, args.output
+                )
         elif args.group_id:
-            result = downloader.download_group(args.group_id, args.output)
+            result = downloader.download_group(args.group_id, args.output, max_workers=args.jobs)
         else:
             self.logger.error("No download source specified")
             return 1
         
         print(f"✓ Package downloaded successfully!")
-        print(f"  Location: {result['output_path']}")
+        print(f"  Location: {result.get('output_path', args.output)}")
+        for level, names in enumerate(result.get('install_plan', []), 1):
+            print(f"  Stage {level}: {', '.join(names)}")
+        self._print_timings(result.get('timings'))
+        for package_result in result.get('packages', []):
+            self._print_timings(package_result.get('timings'), f"{package_result['package_name']}: ")
         
         return 0
     
+    @staticmethod
+    def _print_timings(timings: Optional[dict], prefix: str = '') -> None:
+        """输出各阶段耗时与吞吐"""
+        if not timings:
+            return
+        print(f"  {prefix}{timings['total_seconds']:.3f}s total")
+        for stage in timings['stages']:
+            line = f"    {stage['stage']:<13} {stage['seconds']:8.3f}s"
+            if stage['bytes']:
+                line += f"  {stage['bytes'] / 1024 / 1024:9.2f} MB"
+            if 'mb_per_sec' in stage:
+                line += f"  {stage['mb_per_sec']:8.2f} MB/s"
+            if stage['items']:
+                line += f"  {stage['items']} items"
+            print(line)
+    
+    @staticmethod
+    def _is_exact_version(version: str) -> bool:
+        """精确版本号（包括非语义化的版本字符串）按名称+版本直接查找"""
+        from ..domain.entities import VersionConstraint
+        try:
+            return VersionConstraint(version).is_exact()
+        except ValueError:
+            return True
+    
     def cmd_group(self, args) -> int:
         """分组管理"""
         group_service = GroupService()
@@ -130,6 +171,11 @@ class BinaryManagerCLI:
     
     def _group_create(self, service, args) -> int:
         """创建分组"""
+        depends = {}
+        for dep_spec in args.depends or []:
+            name, deps = dep_spec.split('=', 1)
+            depends[name] = [dep for dep in deps.split(',') if dep]
+        
         packages = []
         for pkg_spec in args.packages or []:
             name, version = pkg_spec.split(':')
@@ -137,7 +183,8 @@ class BinaryManagerCLI:
                 'package_name': name,
                 'version': version,
                 'install_order': len(packages),
-                'required': True
+                'required': True,
+                'depends_on': depends.get(name, [])
             })
         
         result = service.create_group(
@@ -155,7 +202,7 @@ class BinaryManagerCLI:
     
     def _group_list(self, service, args) -> int:
         """列出分组"""
-        groups = service.list_groups()
+        groups = service.list_group_summaries()
         
         if not groups:
             print("No groups found")
@@ -163,10 +210,10 @@ class BinaryManagerCLI:
         
         print(f"Found {len(groups)} groups:\n")
         for group in groups:
-            print(f"  {group.group_name} v{group.version}")
-            print(f"    ID: {group.id if hasattr(group, 'id') else 'N/A'}")
-            print(f"    Description: {group.description or 'N/A'}")
-            print(f"    Packages: {len(group.packages)}")
+            print(f"  {group['group_name']} v{group['version']}")
+            print(f"    ID: {group['id']}")
+            print(f"    Description: {group['description'] or 'N/A'}")
+            print(f"    Packages: {group['package_count']}")
             print()
         
         return 0
@@ -229,6 +276,12 @@ class BinaryManagerCLI:
             description='Binary Manager V2 - 发布和下载管理系统'
         )
         
+        parser.add_argument('--profile', metavar='DIR',
+                            help='在 cProfile/tracemalloc 下运行，并把报告写入 DIR'
+                                 '（包含命令结束前退出的工作线程）')
+        parser.add_argument('--metrics', metavar='FILE',
+                            help='把各阶段耗时以 JSON lines 追加写入 FILE')
+        
         subparsers = parser.add_subparsers(dest='command', help='Available commands')
         
         # 发布命令
@@ -241,6 +294,9 @@ class BinaryManagerCLI:
         publish_parser.add_argument('--metadata', help='元数据(JSON)')
         publish_parser.add_argument('--ignore', help='忽略模式(逗号分隔)')
         publish_parser.add_argument('--no-git', action='store_true', help='不提取Git信息')
+        publish_parser.add_argument('--hash-algorithm', default='sha256',
+                                    choices=sorted(Hash.VALID_ALGORITHMS),
+                                    help='摘要算法（blake3/xxh3_128 需安装可选依赖）')
         publish_parser.add_argument('--s3-bucket', help='S3存储桶')
         publish_parser.add_argument('--s3-access-key', help='S3访问密钥')
         publish_parser.add_argument('--s3-secret-key', help='S3秘密密钥')
@@ -251,9 +307,10 @@ class BinaryManagerCLI:
         download_parser.add_argument('-c', '--config', help='配置文件路径')
         download_parser.add_argument('--package-id', type=int, help='包ID')
         download_parser.add_argument('--package-name', help='包名称')
-        download_parser.add_argument('--version', help='版本号')
+        download_parser.add_argument('--version', help='版本号或约束（如 1.2.3、^1.2、~1.2.3、>=1.0,<2），省略时取最新版本')
         download_parser.add_argument('--group-id', type=int, help='分组ID')
         download_parser.add_argument('-o', '--output', default='./downloads', help='输出目录')
+        download_parser.add_argument('-j', '--jobs', type=int, default=4, help='分组下载的并发数')
         
         # 分组命令
         group_parser = subparsers.add_parser('group', help='分组管理')
@@ -263,6 +320,7 @@ class BinaryManagerCLI:
         create_parser.add_argument('--group-name', required=True, help='分组名称')
         create_parser.add_argument('--version', required=True, help='版本号')
         create_parser.add_argument('--packages', nargs='+', help='包列表(name:version)')
+        create_parser.add_argument('--depends', nargs='+', help='成员依赖(name=dep1,dep2)')
         create_parser.add_argument('--description', help='分组描述')
         
         list_parser = group_subparsers.add_parser('list', help='列出分组')
@@ -290,6 +348,12 @@ def main():
     parser = cli.parser
     args = parser.parse_args()
     
+    if args.metrics:
+        StageTimer.set_sink(args.metrics)
+    
+    if args.profile:
+        sys.exit(run_profiled(lambda: cli.run(args), args.profile, args.command or 'cli'))
+    
     sys.exit(cli.run(args))
 
 
@@ -1,13 +1,16 @@
 from .file_info import FileInfo, Publisher
+from .manifest import FileManifest
 from .package import Package
-from .version import Version
+from .version import Version, VersionConstraint
 from .group import Group, GroupPackage
 
 __all__ = [
     'FileInfo',
     'Publisher',
+    'FileManifest',
     'Package',
     'Version',
+    'VersionConstraint',
     'Group',
     'GroupPackage'
 ]
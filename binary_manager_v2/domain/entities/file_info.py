@@ -4,6 +4,8 @@ from ..value_objects import Hash, GitInfo, StorageLocation, PackageName
 
 
 class FileInfo:
+    __slots__ = ('_path', '_size', '_hash')
+    
     def __init__(self, path: str, size: int, hash_value: Hash):
         self._path = path
         self._size = size
@@ -1,7 +1,10 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, TYPE_CHECKING
 from datetime import datetime
 from ..value_objects import PackageName
 
+if TYPE_CHECKING:
+    from .package import Package
+
 
 class Group:
     def __init__(
@@ -11,8 +14,10 @@ class Group:
         created_by: str,
         description: Optional[str] = None,
         environment_config: Optional[Dict] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        id: Optional[int] = None
     ):
+        self._id = id
         self._group_name = group_name
         self._version = version
         self._created_by = created_by
@@ -22,6 +27,14 @@ class Group:
         self._created_at = datetime.utcnow()
         self._packages: List[GroupPackage] = []
     
+    @property
+    def id(self) -> Optional[int]:
+        return self._id
+    
+    @id.setter
+    def id(self, value: int) -> None:
+        self._id = value
+    
     @property
     def group_name(self) -> PackageName:
         return self._group_name
@@ -59,13 +72,15 @@ class Group:
         package_name: str,
         package_version: str,
         install_order: int = 0,
-        required: bool = True
+        required: bool = True,
+        depends_on: Optional[List[str]] = None
     ) -> None:
         group_pkg = GroupPackage(
             package_name=package_name,
             package_version=package_version,
             install_order=install_order,
-            required=required
+            required=required,
+            depends_on=depends_on
         )
         self._packages.append(group_pkg)
     
@@ -120,13 +135,17 @@ class GroupPackage:
         package_version: str,
         install_order: int = 0,
         required: bool = True,
-        package_id: Optional[int] = None
+        package_id: Optional[int] = None,
+        package: Optional['Package'] = None,
+        depends_on: Optional[List[str]] = None
     ):
         self._package_name = package_name
         self._package_version = package_version
         self._install_order = install_order
         self._required = required
         self._package_id = package_id
+        self._package = package
+        self._depends_on = list(depends_on or [])
     
     @property
     def package_name(self) -> str:
@@ -152,13 +171,32 @@ class GroupPackage:
     def package_id(self, value: int) -> None:
         self._package_id = value
     
+    @property
+    def depends_on(self) -> List[str]:
+        """同一分组内必须先安装的成员包名称"""
+        return list(self._depends_on)
+    
+    @depends_on.setter
+    def depends_on(self, value: List[str]) -> None:
+        self._depends_on = list(value or [])
+    
+    @property
+    def package(self) -> Optional['Package']:
+        """预加载的包实体；未预加载或包已删除时为 None"""
+        return self._package
+    
+    @package.setter
+    def package(self, value: Optional['Package']) -> None:
+        self._package = value
+    
     def to_dict(self) -> Dict:
         return {
             'package_name': self._package_name,
             'package_version': self._package_version,
             'install_order': self._install_order,
             'required': self._required,
-            'package_id': self._package_id
+            'package_id': self._package_id,
+            'depends_on': list(self._depends_on)
         }
     
     @classmethod
@@ -168,7 +206,8 @@ class GroupPackage:
             package_version=data['package_version'],
             install_order=data.get('install_order', 0),
             required=data.get('required', True),
-            package_id=data.get('package_id')
+            package_id=data.get('package_id'),
+            depends_on=data.get('depends_on')
         )
     
     def __eq__(self, other) -> bool:
@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, TYPE_CHECKING
 from datetime import datetime
 from ..value_objects import Hash, GitInfo, StorageLocation, PackageName
+from .manifest import FileManifest
 
 if TYPE_CHECKING:
     from .file_info import FileInfo
@@ -33,7 +34,7 @@ class Package:
         self._description = description
         self._metadata = metadata or {}
         self._created_at = datetime.utcnow()
-        self._files: List['FileInfo'] = []
+        self._files = FileManifest()
     
     @property
     def id(self) -> Optional[int]:
@@ -89,11 +90,19 @@ class Package:
     
     @property
     def files(self) -> List['FileInfo']:
-        return self._files.copy()
+        return list(self._files)
+    
+    @property
+    def manifest(self) -> FileManifest:
+        """文件清单（列式存储，按需构造 FileInfo）"""
+        return self._files
     
     def add_file(self, file_info: 'FileInfo') -> None:
         self._files.append(file_info)
     
+    def set_manifest(self, manifest: FileManifest) -> None:
+        self._files = manifest
+    
     def with_storage(self, storage_location: StorageLocation) -> 'Package':
         self._storage_location = storage_location
         return self
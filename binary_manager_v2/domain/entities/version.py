@@ -1,7 +1,13 @@
-from typing import Optional, List, Dict
+import re
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
 
+# 版本排序键：(major, minor, patch, 正式版标记, 预发布标识)
+# 正式版标记为 1、预发布为 0，使 1.0.0-rc.1 排在 1.0.0 之前
+VersionKey = Tuple[int, int, int, int, str]
+
+
 class Version:
     def __init__(
         self,
@@ -54,6 +60,12 @@ class Version:
             build=match.group('build')
         )
     
+    def sort_key(self) -> VersionKey:
+        """可直接比较、可存入索引列的排序键"""
+        if self._prerelease:
+            return (self._major, self._minor, self._patch, 0, self._prerelease)
+        return (self._major, self._minor, self._patch, 1, '')
+    
     def __str__(self) -> str:
         version = f"{self._major}.{self._minor}.{self._patch}"
         if self._prerelease:
@@ -99,3 +111,148 @@ class Version:
     
     def __repr__(self) -> str:
         return f"Version('{self}')"
+
+
+class VersionConstraint:
+    """
+    版本约束，解析为排序键上的一个区间
+    
+    支持的写法（多个比较式用逗号或空格分隔，取交集）：
+    - 精确版本：1.2.3、=1.2.3、1.2.3-rc.1
+    - 部分版本/通配：1、1.2、1.x、1.2.*、*
+    - 插入符：^1.2.3、^0.2、^0.0.3
+    - 波浪号：~1.2.3、~1.2
+    - 比较：>=1.0、>1.2.3、<2、<=1.4.0
+    
+    未显式写出预发布版本的约束默认不匹配预发布版本。
+    """
+    
+    _PART = r'(?:\d+|[xX*])'
+    _PATTERN = re.compile(
+        r'^(?P<op>\^|~|>=|<=|>|<|=)?\s*v?(?P<major>' + _PART + r')'
+        r'(?:\.(?P<minor>' + _PART + r'))?(?:\.(?P<patch>' + _PART + r'))?'
+        r'(?:-(?P<prerelease>[a-zA-Z0-9.-]+))?(?:\+[a-zA-Z0-9.-]+)?$'
+    )
+    
+    def __init__(self, expression: Optional[str] = None, include_prerelease: bool = False):
+        self.expression = (expression or '').strip()
+        self.lower: Optional[Tuple[VersionKey, bool]] = None    # (键, 是否包含)
+        self.upper: Optional[Tuple[VersionKey, bool]] = None
+        self.include_prerelease = include_prerelease
+        
+        for part in re.split(r'[,\s]+(?![\d.])', self.expression):
+            part = part.strip()
+            if part and part not in ('*', 'x', 'X', 'latest'):
+                self._apply(part)
+    
+    @staticmethod
+    def _floor(major: int, minor: int = 0, patch: int = 0) -> VersionKey:
+        """某个版本号下最小的键（低于它的所有预发布版本）"""
+        return (major, minor, patch, 0, '')
+    
+    def _apply(self, part: str):
+        match = self._PATTERN.match(part.replace(' ', ''))
+        if not match:
+            raise ValueError(f"Invalid version constraint: {part}")
+        
+        op = match.group('op') or '='
+        numbers = []
+        for name in ('major', 'minor', 'patch'):
+            value = match.group(name)
+            if value is None or value in ('x', 'X', '*'):
+                break
+            numbers.append(int(value))
+        prerelease = match.group('prerelease')
+        
+        if not numbers:
+            return
+        if prerelease:
+            if len(numbers) < 3:
+                raise ValueError(f"Invalid version constraint: {part}")
+            self.include_prerelease = True
+        
+        if len(numbers) == 3:
+            exact = Version(*numbers, prerelease=prerelease).sort_key()
+        else:
+            exact = None
+        major = numbers[0]
+        minor = numbers[1] if len(numbers) > 1 else 0
+        patch = numbers[2] if len(numbers) > 2 else 0
+        low = exact or self._floor(major, minor, patch)
+        
+        # 部分版本 1.2 的上界是 1.3.0 之前
+        if len(numbers) == 1:
+            partial_next = self._floor(major + 1)
+        elif len(numbers) == 2:
+            partial_next = self._floor(major, minor + 1)
+        else:
+            partial_next = None
+        
+        if op == '^':
+            if major > 0 or len(numbers) == 1:
+                upper = self._floor(major + 1)
+            elif minor > 0 or len(numbers) == 2:
+                upper = self._floor(0, minor + 1)
+            else:
+                upper = self._floor(0, 0, patch + 1)
+            self._set_lower(low, True)
+            self._set_upper(upper, False)
+        elif op == '~':
+            upper = self._floor(major + 1) if len(numbers) == 1 else self._floor(major, minor + 1)
+            self._set_lower(low, True)
+            self._set_upper(upper, False)
+        elif op == '=':
+            if exact:
+                self._set_lower(exact, True)
+                self._set_upper(exact, True)
+            else:
+                self._set_lower(low, True)
+                self._set_upper(partial_next, False)
+        elif op == '>=':
+            self._set_lower(low, True)
+        elif op == '>':
+            if exact:
+                self._set_lower(exact, False)
+            else:
+                self._set_lower(partial_next, True)
+        elif op == '<':
+            self._set_upper(low, False)
+        elif op == '<=':
+            if exact:
+                self._set_upper(exact, True)
+            else:
+                self._set_upper(partial_next, False)
+    
+    def _set_lower(self, key: VersionKey, inclusive: bool):
+        if self.lower is None or key > self.lower[0] or (key == self.lower[0] and not inclusive):
+            self.lower = (key, inclusive)
+    
+    def _set_upper(self, key: VersionKey, inclusive: bool):
+        if self.upper is None or key < self.upper[0] or (key == self.upper[0] and not inclusive):
+            self.upper = (key, inclusive)
+    
+    def matches(self, version: Version) -> bool:
+        """判断版本是否满足约束"""
+        key = version.sort_key()
+        if version.prerelease and not self.include_prerelease:
+            return False
+        if self.lower:
+            bound, inclusive = self.lower
+            if key < bound or (key == bound and not inclusive):
+                return False
+        if self.upper:
+            bound, inclusive = self.upper
+            if key > bound or (key == bound and not inclusive):
+                return False
+        return True
+    
+    def is_exact(self) -> bool:
+        """约束是否只匹配一个确定的版本"""
+        return (self.lower is not None and self.upper is not None and
+                self.lower == self.upper and self.lower[1])
+    
+    def __str__(self) -> str:
+        return self.expression or '*'
+    
+    def __repr__(self) -> str:
+        return f"VersionConstraint('{self}')"
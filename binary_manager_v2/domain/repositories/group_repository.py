@@ -34,6 +34,10 @@ class GroupRepository(ABC):
     def find_all(self, filters: Optional[Dict] = None) -> List[Group]:
         pass
     
+    @abstractmethod
+    def list_summaries(self, filters: Optional[Dict] = None) -> List[Dict]:
+        pass
+    
     @abstractmethod
     def add_package(
         self,
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from ..entities import Package
 from ..value_objects import PackageName
 
@@ -22,6 +22,27 @@ class PackageRepository(ABC):
     ) -> Optional[Package]:
         pass
     
+    @abstractmethod
+    def find_versions(
+        self,
+        package_name: str,
+        constraint: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Package]:
+        pass
+    
+    @abstractmethod
+    def latest(self, package_name: str, constraint: Optional[str] = None) -> Optional[Package]:
+        pass
+    
+    @abstractmethod
+    def resolve_ids(self, specs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        pass
+    
+    @abstractmethod
+    def find_summaries_by_ids(self, package_ids: List[int]) -> Dict[int, Dict]:
+        pass
+    
     @abstractmethod
     def find_by_name(self, package_name: str) -> List[Package]:
         pass
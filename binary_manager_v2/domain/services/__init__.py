@@ -1,9 +1,16 @@
 from .hash_calculator import HashCalculator
 from .file_scanner import FileScanner
+from .ignore_matcher import IgnoreMatcher
 from .packager import Packager
+from .zip_extractor import ParallelZipExtractor
+from .dependency_graph import DependencyGraph, DependencyCycleError
 
 __all__ = [
     'HashCalculator',
     'FileScanner',
-    'Packager'
+    'IgnoreMatcher',
+    'Packager',
+    'ParallelZipExtractor',
+    'DependencyGraph',
+    'DependencyCycleError'
 ]
@@ -0,0 +1,113 @@
+from typing import Dict, Hashable, Iterable, List, Optional
+
+
+class DependencyCycleError(ValueError):
+    """依赖关系存在环"""
+    
+    def __init__(self, cycle: List):
+        self.cycle = cycle
+        super().__init__("Dependency cycle detected: " + " -> ".join(str(node) for node in cycle))
+
+
+class DependencyGraph:
+    """有向无环依赖图 - 计算安装计划（拓扑分层）"""
+    
+    def __init__(
+        self,
+        dependencies: Dict[Hashable, Iterable[Hashable]],
+        order: Optional[Dict[Hashable, int]] = None
+    ):
+        """
+        Args:
+            dependencies: 节点 -> 它依赖的节点
+            order: 同一层内的排序键（如 install_order），缺省按插入顺序
+        """
+        self._dependencies = {node: list(dict.fromkeys(deps)) for node, deps in dependencies.items()}
+        self._order = order or {node: index for index, node in enumerate(self._dependencies)}
+        self._dependents: Dict[Hashable, List[Hashable]] = {node: [] for node in self._dependencies}
+        
+        for node, deps in self._dependencies.items():
+            for dep in deps:
+                if dep not in self._dependencies:
+                    raise ValueError(f"{node} depends on unknown member: {dep}")
+                if dep == node:
+                    raise DependencyCycleError([node, node])
+                self._dependents[dep].append(node)
+    
+    @classmethod
+    def from_group_packages(cls, group_packages: Iterable) -> 'DependencyGraph':
+        """按包名称为分组成员建图"""
+        dependencies = {}
+        order = {}
+        for pkg in group_packages:
+            if pkg.package_name in dependencies:
+                raise ValueError(f"Duplicate group member: {pkg.package_name}")
+            dependencies[pkg.package_name] = pkg.depends_on
+            order[pkg.package_name] = pkg.install_order
+        return cls(dependencies, order)
+    
+    @property
+    def nodes(self) -> List[Hashable]:
+        return list(self._dependencies)
+    
+    def dependencies(self, node: Hashable) -> List[Hashable]:
+        return list(self._dependencies[node])
+    
+    def dependents(self, node: Hashable) -> List[Hashable]:
+        return list(self._dependents[node])
+    
+    def find_cycle(self) -> Optional[List[Hashable]]:
+        """返回一个环（首尾相同的节点列表），无环时返回 None"""
+        visiting, visited = set(), set()
+        
+        for root in self._dependencies:
+            if root in visited:
+                continue
+            # 迭代式 DFS，避免深依赖链触发递归上限
+            path = [root]
+            stack = [iter(self._dependencies[root])]
+            visiting.add(root)
+            while stack:
+                dep = next(stack[-1], None)
+                if dep is None:
+                    stack.pop()
+                    node = path.pop()
+                    visiting.discard(node)
+                    visited.add(node)
+                elif dep in visiting:
+                    return path[path.index(dep):] + [dep]
+                elif dep not in visited:
+                    visiting.add(dep)
+                    path.append(dep)
+                    stack.append(iter(self._dependencies[dep]))
+        
+        return None
+    
+    def validate(self) -> None:
+        """存在环时抛出 DependencyCycleError"""
+        cycle = self.find_cycle()
+        if cycle:
+            raise DependencyCycleError(cycle)
+    
+    def levels(self) -> List[List[Hashable]]:
+        """拓扑分层：每层内的节点互不依赖，可并行安装"""
+        self.validate()
+        
+        remaining = {node: len(deps) for node, deps in self._dependencies.items()}
+        current = sorted((n for n, count in remaining.items() if count == 0), key=self._order.get)
+        levels = []
+        
+        while current:
+            levels.append(current)
+            following = []
+            for node in current:
+                for dependent in self._dependents[node]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        following.append(dependent)
+            current = sorted(following, key=self._order.get)
+        
+        return levels
+    
+    def topological_order(self) -> List[Hashable]:
+        return [node for level in self.levels() for node in level]
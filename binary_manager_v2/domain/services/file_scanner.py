@@ -1,9 +1,10 @@
 import os
+import time
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
-from ..entities import FileInfo
-from ..value_objects import Hash
+from typing import Iterator, List, Tuple, Optional, Sequence
+from ..entities import FileManifest
 from .hash_calculator import HashCalculator
+from .ignore_matcher import IgnoreMatcher, load_ignore_files, match_stack
 
 
 class FileScanner:
@@ -25,10 +26,29 @@ class FileScanner:
         '*.so'
     ]
     
-    def __init__(self, ignore_patterns: Optional[List[str]] = None):
+    # 扫描时逐目录读取的忽略文件，规则相对所在目录生效
+    IGNORE_FILES = ('.binaryignore',)
+    
+    def __init__(self, ignore_patterns: Optional[List[str]] = None,
+                 ignore_files: Optional[Sequence[str]] = None,
+                 hash_algorithm: str = 'sha256'):
+        """
+        Args:
+            ignore_patterns: .gitignore 语法的忽略规则，优先级低于目录中的忽略文件
+            ignore_files: 要读取的忽略文件名（如再加上 '.gitignore'），默认只读 .binaryignore
+            hash_algorithm: 文件摘要算法，见 Hash.VALID_ALGORITHMS
+        """
         self._ignore_patterns = ignore_patterns or self.DEFAULT_IGNORE_PATTERNS
+        self._ignore_files = tuple(self.IGNORE_FILES if ignore_files is None else ignore_files)
+        self._matcher = IgnoreMatcher(self._ignore_patterns)
+        self._hash_calculator = HashCalculator(hash_algorithm)
     
-    def scan_directory(self, directory: str) -> Tuple[List[FileInfo], dict]:
+    def scan_directory(self, directory: str) -> Tuple[FileManifest, dict]:
+        """扫描目录并计算摘要
+        
+        返回的 FileManifest 可像 List[FileInfo] 一样迭代和索引，但按列存储，
+        大目录也不会为每个文件保留多个 Python 对象。
+        """
         base_path = Path(directory)
         if not base_path.exists():
             raise ValueError(f"Directory does not exist: {directory}")
@@ -36,59 +56,68 @@ class FileScanner:
         if not base_path.is_dir():
             raise ValueError(f"Path is not a directory: {directory}")
         
-        file_list: List[FileInfo] = []
+        manifest = FileManifest(self._hash_calculator.algorithm)
         total_size = 0
-        file_count = 0
+        hash_seconds = 0.0
+        started = time.perf_counter()
         
-        for file_path in base_path.rglob('*'):
-            if file_path.is_file() and not self._should_ignore(file_path):
-                try:
-                    file_info = self._create_file_info(file_path, base_path)
-                    if file_info:
-                        file_list.append(file_info)
-                        total_size += file_info.size
-                        file_count += 1
-                except Exception:
-                    pass
+        for rel_path, file_path in self.iter_files(base_path):
+            try:
+                file_size = file_path.stat().st_size
+                hash_started = time.perf_counter()
+                digest = self._hash_calculator.digest_file(str(file_path))
+                hash_seconds += time.perf_counter() - hash_started
+            except OSError:
+                continue
+            manifest.add(rel_path, file_size, digest)
+            total_size += file_size
         
+        # 遍历与哈希交错进行，分别累计以便定位瓶颈
         scan_info = {
-            'total_files': file_count,
-            'total_size': total_size
+            'total_files': len(manifest),
+            'total_size': total_size,
+            'scan_seconds': time.perf_counter() - started - hash_seconds,
+            'hash_seconds': hash_seconds
         }
         
-        return file_list, scan_info
+        return manifest, scan_info
     
-    def _should_ignore(self, file_path: Path) -> bool:
-        for pattern in self._ignore_patterns:
-            if self._matches_pattern(file_path, pattern):
-                return True
-        return False
-    
-    def _matches_pattern(self, file_path: Path, pattern: str) -> bool:
-        if pattern.startswith('.'):
-            if file_path.name == pattern:
-                return True
-            if any(part == pattern for part in file_path.parts):
-                return True
+    def iter_files(self, base_path: Path) -> Iterator[Tuple[str, Path]]:
+        """遍历未被忽略的文件，返回 (以 '/' 分隔的相对路径, 绝对路径)
         
-        if '*' in pattern:
-            if file_path.match(pattern):
-                return True
+        被忽略的目录不会进入，条目按名称排序以保证清单顺序稳定。
+        """
+        stack = [(Path(base_path), '', [('', self._matcher)])]
         
-        return file_path.name == pattern
-    
-    def _create_file_info(self, file_path: Path, base_path: Path) -> Optional[FileInfo]:
-        try:
-            relative_path = file_path.relative_to(base_path)
-            file_size = file_path.stat().st_size
+        while stack:
+            directory, rel_dir, matchers = stack.pop()
             
-            hash_calculator = HashCalculator('sha256')
-            file_hash = hash_calculator.calculate_file(str(file_path))
+            local = load_ignore_files(directory, self._ignore_files) if self._ignore_files else None
+            if local is not None:
+                matchers = matchers + [(rel_dir, local)]
             
-            return FileInfo(
-                path=str(relative_path),
-                size=file_size,
-                hash_value=file_hash
-            )
-        except Exception:
-            return None
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                rel_path = rel_dir + entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if match_stack(matchers, rel_path, is_dir):
+                        continue
+                    if is_dir:
+                        subdirs.append((Path(entry.path), rel_path + '/', matchers))
+                    elif entry.is_file():
+                        yield rel_path, Path(entry.path)
+                except OSError:
+                    continue
+            
+            stack.extend(reversed(subdirs))
+    
+    def _should_ignore(self, rel_path: str, is_dir: bool = False) -> bool:
+        """按扫描器的全局规则判断相对路径是否被忽略（含上级目录）"""
+        return self._matcher.is_ignored(rel_path, is_dir)
@@ -1,38 +1,137 @@
 import hashlib
-from typing import BinaryIO
+import mmap
+import os
+import threading
+from typing import BinaryIO, Optional
 from ..value_objects import Hash
 
+try:
+    import blake3 as _blake3
+except ImportError:  # 可选依赖
+    _blake3 = None
+
+try:
+    import xxhash as _xxhash
+except ImportError:  # 可选依赖
+    _xxhash = None
+
+
+def new_hasher(algorithm: str):
+    """创建摘要对象；blake3/xxh3_128 需要安装对应的可选依赖"""
+    if algorithm == 'blake3':
+        if _blake3 is None:
+            raise ValueError("Hash algorithm blake3 requires the 'blake3' package")
+        return _blake3.blake3()
+    if algorithm == 'xxh3_128':
+        if _xxhash is None:
+            raise ValueError("Hash algorithm xxh3_128 requires the 'xxhash' package")
+        return _xxhash.xxh3_128()
+    return hashlib.new(algorithm)
+
+
+def available_algorithms() -> set:
+    """当前环境可计算的算法"""
+    algorithms = set(Hash.VALID_ALGORITHMS)
+    if _blake3 is None:
+        algorithms.discard('blake3')
+    if _xxhash is None:
+        algorithms.discard('xxh3_128')
+    return algorithms
+
 
 class HashCalculator:
+    """文件/数据摘要计算
+    
+    文件用无缓冲 readinto 读入可复用的页对齐缓冲区（每线程一个），
+    大文件走 mmap；两者都提示内核按顺序预读。
+    """
+    
+    CHUNK_SIZE = 1024 * 1024
+    MMAP_THRESHOLD = 64 * 1024 * 1024
+    
+    _buffers = threading.local()
     
     def __init__(self, algorithm: str = 'sha256'):
         if algorithm not in Hash.VALID_ALGORITHMS:
             raise ValueError(f"Invalid hash algorithm: {algorithm}")
         self._algorithm = algorithm
+        # 提前检查可选依赖是否存在
+        new_hasher(algorithm)
     
     def calculate_file(self, file_path: str) -> Hash:
-        hash_func = hashlib.new(self._algorithm)
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                hash_func.update(chunk)
-        return Hash(hash_func.hexdigest(), self._algorithm)
+        return Hash(self.digest_file(file_path).hex(), self._algorithm)
+    
+    def digest_file(self, file_path: str) -> bytes:
+        """返回文件的原始摘要字节"""
+        hash_func = new_hasher(self._algorithm)
+        with open(file_path, 'rb', buffering=0) as f:
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+            self._advise_sequential(fd, size)
+            if size >= self.MMAP_THRESHOLD:
+                self._update_from_mmap(hash_func, fd, size)
+            else:
+                self._update_from_reader(hash_func, f)
+        return hash_func.digest()
     
     def calculate_string(self, data: str, encoding: str = 'utf-8') -> Hash:
-        hash_func = hashlib.new(self._algorithm)
+        hash_func = new_hasher(self._algorithm)
         hash_func.update(data.encode(encoding))
         return Hash(hash_func.hexdigest(), self._algorithm)
     
     def calculate_bytes(self, data: bytes) -> Hash:
-        hash_func = hashlib.new(self._algorithm)
+        hash_func = new_hasher(self._algorithm)
         hash_func.update(data)
         return Hash(hash_func.hexdigest(), self._algorithm)
     
     def calculate_stream(self, stream: BinaryIO) -> Hash:
-        hash_func = hashlib.new(self._algorithm)
-        for chunk in iter(lambda: stream.read(8192), b''):
-            hash_func.update(chunk)
+        hash_func = new_hasher(self._algorithm)
+        if hasattr(stream, 'readinto'):
+            self._update_from_reader(hash_func, stream)
+        else:
+            for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b''):
+                hash_func.update(chunk)
         return Hash(hash_func.hexdigest(), self._algorithm)
     
+    def verify_file(self, file_path: str, expected_hash: str) -> bool:
+        """按 'algo:value' 字符串（无前缀时为 sha256）校验文件"""
+        expected = Hash.from_string(expected_hash)
+        return HashCalculator(expected.algorithm).calculate_file(file_path) == expected
+    
+    def _buffer(self) -> memoryview:
+        view: Optional[memoryview] = getattr(self._buffers, 'view', None)
+        if view is None or len(view) != self.CHUNK_SIZE:
+            # 匿名 mmap 按页对齐
+            view = memoryview(mmap.mmap(-1, self.CHUNK_SIZE))
+            self._buffers.view = view
+        return view
+    
+    def _update_from_reader(self, hash_func, reader) -> None:
+        view = self._buffer()
+        while True:
+            n = reader.readinto(view)
+            if not n:
+                break
+            hash_func.update(view[:n])
+    
+    def _update_from_mmap(self, hash_func, fd: int, size: int) -> None:
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mapped) as view:
+                # 分段更新，避免单次调用持有过大的映射区域
+                step = self.CHUNK_SIZE * 16
+                for offset in range(0, size, step):
+                    hash_func.update(view[offset:offset + step])
+    
+    @staticmethod
+    def _advise_sequential(fd: int, size: int) -> None:
+        if size and hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+    
     @property
     def algorithm(self) -> str:
         return self._algorithm
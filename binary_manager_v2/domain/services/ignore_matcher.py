@@ -0,0 +1,211 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _translate_glob(pattern: str) -> str:
+    """把 gitignore 风格的通配符转换为正则（'*' 和 '?' 不跨越 '/'）"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            j = i
+            while j < n and pattern[j] == '*':
+                j += 1
+            at_start = i == 0 or pattern[i - 1] == '/'
+            at_end = j == n or pattern[j] == '/'
+            if j - i == 2 and at_start and at_end:
+                if j == n:
+                    # 末尾的 '/**'：目录下的全部内容
+                    out.append('.+' if i else '.*')
+                    i = j
+                else:
+                    # '**/'：零个或多个目录
+                    out.append('(?:.*/)?')
+                    i = j + 1
+                continue
+            out.append('[^/]*')
+            i = j
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', '^', ']') else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                negate = body[:1] in ('!', '^')
+                if negate:
+                    body = body[1:]
+                body = body.replace('\\', '\\\\')
+                out.append(f"[^/{body}]" if negate else f"[{body}]")
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+_GLOB_CHARS = re.compile(r'[*?\[\\]')
+
+
+class IgnoreRule:
+    """单条忽略规则"""
+    
+    def __init__(self, pattern: str, negate: bool, dir_only: bool, anchored: bool):
+        self.pattern = pattern
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+    
+    @property
+    def literal(self) -> bool:
+        return not self.anchored and not _GLOB_CHARS.search(self.pattern)
+    
+    @classmethod
+    def parse(cls, line: str) -> Optional['IgnoreRule']:
+        """解析一行 .gitignore 语法，空行和注释返回 None"""
+        line = line.rstrip('\n').rstrip('\r')
+        if not line or line.startswith('#'):
+            return None
+        
+        # 去掉未转义的尾随空格
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+        
+        anchored = '/' in line
+        return cls(line.lstrip('/'), negate, dir_only, anchored)
+
+
+class _CompiledRules:
+    """一类路径（文件或目录）可用的规则，编译为名称字典加两个组合正则
+    
+    组合正则中各规则按优先级从高到低排列，fullmatch 返回的第一个
+    分支即为最后出现的匹配规则；字面名称用字典记录最大规则序号。
+    """
+    
+    def __init__(self, indexed_rules: List[Tuple[int, IgnoreRule]]):
+        self.names: Dict[str, int] = {}
+        name_rules, path_rules = [], []
+        for index, rule in indexed_rules:
+            if rule.literal:
+                self.names[rule.pattern] = index
+            elif rule.anchored:
+                path_rules.append((index, rule))
+            else:
+                name_rules.append((index, rule))
+        self.name_regex, self._name_index = self._combine(name_rules)
+        self.path_regex, self._path_index = self._combine(path_rules)
+    
+    @staticmethod
+    def _combine(indexed_rules):
+        if not indexed_rules:
+            return None, ()
+        ordered = sorted(indexed_rules, key=lambda item: item[0], reverse=True)
+        regex = re.compile('|'.join(f'({_translate_glob(rule.pattern)})' for _, rule in ordered), re.DOTALL)
+        # lastindex 从 1 开始
+        return regex, (None,) + tuple(index for index, _ in ordered)
+    
+    def last_match(self, rel_path: str, name: str) -> int:
+        """返回匹配规则中最大的序号，没有匹配时返回 -1"""
+        best = self.names.get(name, -1)
+        if self.name_regex is not None:
+            m = self.name_regex.fullmatch(name)
+            if m is not None:
+                best = max(best, self._name_index[m.lastindex])
+        if self.path_regex is not None:
+            m = self.path_regex.fullmatch(rel_path)
+            if m is not None:
+                best = max(best, self._path_index[m.lastindex])
+        return best
+
+
+class IgnoreMatcher:
+    """编译后的忽略规则集合（.gitignore 语义）
+    
+    支持注释、'!' 取反、尾部 '/' 限定目录、含 '/' 的规则相对根目录锚定、
+    '*'/'?'/'[...]' 以及 '**'。无论规则多少，每次判定只需一次字典查找
+    和最多两次正则匹配；后出现的规则优先。
+    """
+    
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.rules: List[IgnoreRule] = []
+        for line in patterns:
+            rule = IgnoreRule.parse(line)
+            if rule is not None:
+                self.rules.append(rule)
+        
+        indexed = list(enumerate(self.rules))
+        self._file_rules = _CompiledRules([(i, rule) for i, rule in indexed if not rule.dir_only])
+        self._dir_rules = _CompiledRules(indexed)
+    
+    @classmethod
+    def from_file(cls, path) -> 'IgnoreMatcher':
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls(f.read().splitlines())
+    
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+    
+    def match(self, rel_path: str, is_dir: bool = False) -> Optional[bool]:
+        """只看路径本身（不检查上级目录）
+        
+        Args:
+            rel_path: 相对根目录、以 '/' 分隔的路径
+        
+        Returns:
+            True 忽略，False 被 '!' 规则重新包含，None 没有规则匹配
+        """
+        name = rel_path.rsplit('/', 1)[-1]
+        compiled = self._dir_rules if is_dir else self._file_rules
+        index = compiled.last_match(rel_path, name)
+        if index < 0:
+            return None
+        return not self.rules[index].negate
+    
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """路径或其任一上级目录被忽略时返回 True（与 git 相同，被忽略目录下的文件无法重新包含）"""
+        parts = rel_path.strip('/').split('/')
+        for depth in range(1, len(parts)):
+            if self.match('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return bool(self.match('/'.join(parts), is_dir))
+
+
+def load_ignore_files(directory: Path, names: Iterable[str]) -> Optional[IgnoreMatcher]:
+    """读取目录下的忽略文件（如 .binaryignore），没有规则时返回 None"""
+    patterns: List[str] = []
+    for name in names:
+        path = directory / name
+        if path.is_file():
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                patterns.extend(f.read().splitlines())
+    matcher = IgnoreMatcher(patterns)
+    return matcher if matcher else None
+
+
+def match_stack(matchers: List[Tuple[str, IgnoreMatcher]], rel_path: str, is_dir: bool) -> bool:
+    """按由深到浅的顺序询问各目录的规则，第一个给出结论的生效"""
+    for prefix, matcher in reversed(matchers):
+        result = matcher.match(rel_path[len(prefix):], is_dir)
+        if result is not None:
+            return result
+    return False
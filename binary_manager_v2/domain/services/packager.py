@@ -1,15 +1,17 @@
 import os
+import time
 import zipfile
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from ..entities import FileInfo
 from ..value_objects import Hash
 
 
 class Packager:
     
-    def __init__(self, output_dir: str = './releases'):
+    def __init__(self, output_dir: str = './releases', hash_algorithm: str = 'sha256'):
         self._output_dir = Path(output_dir)
+        self._hash_algorithm = hash_algorithm
         self._output_dir.mkdir(parents=True, exist_ok=True)
     
     def create_zip(
@@ -23,35 +25,39 @@ class Packager:
         zip_name = f"{package_name}_v{version}.zip"
         zip_path = self._output_dir / zip_name
         
+        started = time.perf_counter()
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for file_info in file_list:
                 file_path = source_path / file_info.path
                 if file_path.exists():
                     zipf.write(file_path, file_info.path)
         
+        zip_seconds = time.perf_counter() - started
         zip_size = zip_path.stat().st_size
-        hash_calculator = HashCalculator('sha256')
+        
+        started = time.perf_counter()
+        hash_calculator = HashCalculator(self._hash_algorithm)
         zip_hash = hash_calculator.calculate_file(str(zip_path))
+        hash_seconds = time.perf_counter() - started
         
         return {
             'archive_name': zip_name,
             'archive_path': str(zip_path),
             'size': zip_size,
             'file_count': len(file_list),
-            'hash': str(zip_hash)
+            'hash': str(zip_hash),
+            'zip_seconds': zip_seconds,
+            'hash_seconds': hash_seconds
         }
     
-    def extract_zip(self, zip_path: str, output_dir: str) -> List[str]:
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        extracted_files = []
-        
-        with zipfile.ZipFile(zip_path, 'r') as zipf:
-            zipf.extractall(output_path)
-            extracted_files = zipf.namelist()
+    def extract_zip(self, zip_path: str, output_dir: str, workers: Optional[int] = None) -> List[str]:
+        """解压到 output_dir，返回归档中的成员名（同 ZipFile.namelist）
         
-        return extracted_files
+        Args:
+            workers: 解压线程数，默认见 ParallelZipExtractor
+        """
+        members, _ = ParallelZipExtractor(workers=workers).extract(zip_path, output_dir)
+        return [info.filename for info in members]
     
     def verify_zip(self, zip_path: str, expected_hash: Hash) -> bool:
         hash_calculator = HashCalculator(expected_hash.algorithm)
@@ -65,3 +71,4 @@ class Packager:
 
 
 from .hash_calculator import HashCalculator
+from .zip_extractor import ParallelZipExtractor
@@ -1,5 +1,4 @@
 from typing import NewType
-import hashlib
 
 
 HashAlgorithm = NewType('HashAlgorithm', str)
@@ -10,7 +9,8 @@ class InvalidHashError(Exception):
 
 
 class Hash:
-    VALID_ALGORITHMS = {'sha256', 'sha512', 'md5'}
+    # blake3/xxh3_128 需要可选依赖才能计算，但任何环境都能解析和保存
+    VALID_ALGORITHMS = {'sha256', 'sha512', 'md5', 'blake2b', 'blake3', 'xxh3_128'}
     
     def __init__(self, value: str, algorithm: str = 'sha256'):
         if not value:
@@ -31,11 +31,8 @@ class Hash:
     
     @classmethod
     def from_file(cls, file_path: str, algorithm: str = 'sha256') -> 'Hash':
-        hash_func = hashlib.new(algorithm)
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                hash_func.update(chunk)
-        return cls(hash_func.hexdigest(), algorithm)
+        from ..services.hash_calculator import HashCalculator
+        return HashCalculator(algorithm).calculate_file(file_path)
     
     @property
     def algorithm(self) -> str:
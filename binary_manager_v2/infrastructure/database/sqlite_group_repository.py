@@ -1,10 +1,12 @@
 import sqlite3
 import json
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from ...domain.repositories import GroupRepository
-from ...domain.entities import Group
+from ...domain.entities import Group, GroupPackage
+from ...domain.value_objects import PackageName
 from .base_repository import BaseSQLiteRepository
+from .sqlite_package_repository import row_to_package
 
 
 class SQLiteGroupRepository(BaseSQLiteRepository, GroupRepository):
@@ -37,78 +39,92 @@ class SQLiteGroupRepository(BaseSQLiteRepository, GroupRepository):
             
             group_id = cursor.lastrowid
             
-            for pkg in group.packages:
-                cursor.execute('''
-                    INSERT INTO group_packages (group_id, package_id, package_name, package_version, install_order, required)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+            # 成员行一次性批量插入，与分组行在同一事务中提交
+            cursor.executemany('''
+                INSERT INTO group_packages (group_id, package_id, package_name, package_version, install_order, required)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (
                     group_id,
                     pkg.package_id,
                     pkg.package_name,
                     pkg.package_version,
                     pkg.install_order,
                     1 if pkg.required else 0
-                ))
+                )
+                for pkg in group.packages
+            ])
+            
+            # 成员间依赖按包ID保存
+            member_ids = {pkg.package_name: pkg.package_id for pkg in group.packages}
+            cursor.executemany('''
+                INSERT INTO dependencies (group_id, package_id, depends_on_package_id, constraint_type)
+                VALUES (?, ?, ?, 'exact')
+            ''', [
+                (group_id, pkg.package_id, member_ids[dep])
+                for pkg in group.packages
+                for dep in pkg.depends_on
+            ])
             
             self.conn.commit()
-            self.logger.info(f"Group saved with ID: {group_id}")
+            self.logger.info(f"Group saved with ID: {group_id} ({len(group.packages)} packages)")
             return group_id
             
         except sqlite3.IntegrityError as e:
+            # 回滚已插入的部分，避免留下没有成员的分组
+            self.conn.rollback()
             self.logger.warning(f"Group already exists: {e}")
             cursor.execute('''
                 SELECT id FROM groups WHERE group_name = ? AND version = ?
-            ''', (group.group_name, group.version))
+            ''', (str(group.group_name), group.version))
             row = cursor.fetchone()
             return row['id'] if row else None
+        except Exception:
+            self.conn.rollback()
+            raise
     
-    def find_by_id(self, group_id: int) -> Optional[Group]:
-        """根据ID查找分组"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM groups WHERE id = ?', (group_id,))
-        row = cursor.fetchone()
+    def find_by_id(self, group_id: int, include_packages: bool = False) -> Optional[Group]:
+        """根据ID查找分组
         
-        if row:
-            return self._row_to_group(row)
-        return None
+        Args:
+            group_id: 分组ID
+            include_packages: 是否同时加载成员包实体（GroupPackage.package）
+        """
+        groups = self._find_groups('id = ?', [group_id], include_packages)
+        return groups[0] if groups else None
     
-    def find_by_name_and_version(self, name: str, version: str) -> Optional[Group]:
+    def find_by_name_and_version(self, name: str, version: str,
+                                 include_packages: bool = False) -> Optional[Group]:
         """根据名称和版本查找分组"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT * FROM groups WHERE group_name = ? AND version = ?',
-            (name, version)
-        )
-        row = cursor.fetchone()
-        
-        if row:
-            return self._row_to_group(row)
-        return None
+        groups = self._find_groups('group_name = ? AND version = ?', [name, version], include_packages)
+        return groups[0] if groups else None
     
-    def find_all(self, filters: Optional[Dict] = None) -> List[Group]:
-        """查找所有分组"""
-        cursor = self.conn.cursor()
-        
-        query = 'SELECT * FROM groups WHERE 1=1'
-        params = []
-        
-        if filters:
-            if 'group_name' in filters:
-                query += ' AND group_name = ?'
-                params.append(filters['group_name'])
-            if 'version' in filters:
-                query += ' AND version = ?'
-                params.append(filters['version'])
-            if 'created_by' in filters:
-                query += ' AND created_by = ?'
-                params.append(filters['created_by'])
-        
-        query += ' ORDER BY created_at DESC'
+    def find_all(self, filters: Optional[Dict] = None,
+                 include_packages: bool = False) -> List[Group]:
+        """查找所有分组
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        分组行和成员行各一次查询（成员查询复用相同的过滤条件），
+        不随分组数量增加查询次数。
+        """
+        where, params = self._build_filters(filters)
+        return self._find_groups(where, params, include_packages)
+    
+    def list_summaries(self, filters: Optional[Dict] = None) -> List[Dict]:
+        """列表视图的轻量投影
         
-        return [self._row_to_group(row) for row in rows]
+        一次聚合查询返回分组基本字段和成员数，不解码
+        environment_config/metadata，也不构造实体。
+        """
+        where, params = self._build_filters(filters, alias='g')
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT g.id, g.group_name, g.version, g.created_by, g.created_at, g.description,
+                   (SELECT COUNT(*) FROM group_packages gp WHERE gp.group_id = g.id) AS package_count
+            FROM groups g
+            WHERE {where}
+            ORDER BY g.created_at DESC
+        ''', params)
+        return [dict(row) for row in cursor.fetchall()]
     
     def find_by_name(self, group_name: str) -> List[Group]:
         """根据名称查找分组"""
@@ -122,8 +138,10 @@ class SQLiteGroupRepository(BaseSQLiteRepository, GroupRepository):
         """删除分组"""
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM groups WHERE id = ?', (group_id,))
+        deleted = cursor.rowcount > 0
+        cursor.execute('DELETE FROM dependencies WHERE group_id = ?', (group_id,))
         self.conn.commit()
-        return cursor.rowcount > 0
+        return deleted
     
     def exists(self, name: str, version: str) -> bool:
         """检查分组是否存在"""
@@ -165,33 +183,103 @@ class SQLiteGroupRepository(BaseSQLiteRepository, GroupRepository):
             'DELETE FROM group_packages WHERE group_id = ? AND package_id = ?',
             (group_id, package_id)
         )
+        removed = cursor.rowcount > 0
+        cursor.execute(
+            'DELETE FROM dependencies WHERE group_id = ? AND (package_id = ? OR depends_on_package_id = ?)',
+            (group_id, package_id, package_id)
+        )
         self.conn.commit()
-        return cursor.rowcount > 0
+        return removed
     
-    def _row_to_group(self, row: sqlite3.Row) -> Group:
-        """将数据库行转换为Group实体"""
-        from ...domain.entities import GroupPackage
-        from ...domain.value_objects import PackageName
+    @staticmethod
+    def _build_filters(filters: Optional[Dict], alias: Optional[str] = None) -> Tuple[str, List]:
+        """构建分组过滤条件"""
+        prefix = f"{alias}." if alias else ""
+        clauses = ['1=1']
+        params = []
+        
+        if filters:
+            for column in ('group_name', 'version', 'created_by'):
+                if column in filters:
+                    clauses.append(f'{prefix}{column} = ?')
+                    params.append(filters[column])
         
+        return ' AND '.join(clauses), params
+    
+    def _find_groups(self, where: str, params: List, include_packages: bool) -> List[Group]:
+        """按条件加载分组及其成员"""
         cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT package_id, package_name, package_version, install_order, required FROM group_packages WHERE group_id = ? ORDER BY install_order',
-            (row['id'],)
-        )
-        package_rows = cursor.fetchall()
-        
-        packages = [
-            GroupPackage(
-                package_name=r['package_name'],
-                package_version=r['package_version'],
-                package_id=r['package_id'],
-                install_order=r['install_order'],
-                required=bool(r['required'])
+        cursor.execute(f'SELECT * FROM groups WHERE {where} ORDER BY created_at DESC', params)
+        groups = [self._row_to_group(row) for row in cursor.fetchall()]
+        
+        if not groups:
+            return groups
+        
+        members = self._load_members(where, params, include_packages)
+        for group in groups:
+            group._packages = members.get(group.id, [])
+        
+        return groups
+    
+    def _load_members(self, where: str, params: List,
+                      include_packages: bool) -> Dict[int, List[GroupPackage]]:
+        """一次查询加载满足条件的所有分组的成员，可选连接包行"""
+        cursor = self.conn.cursor()
+        member_columns = '''
+            gp.group_id AS gp_group_id, gp.package_id AS gp_package_id,
+            gp.package_name AS gp_package_name, gp.package_version AS gp_package_version,
+            gp.install_order AS gp_install_order, gp.required AS gp_required,
+            (SELECT GROUP_CONCAT(d.depends_on_package_id) FROM dependencies d
+             WHERE d.group_id = gp.group_id AND d.package_id = gp.package_id
+               AND d.depends_on_package_id IS NOT NULL) AS gp_depends_on
+        '''
+        
+        if include_packages:
+            query = f'''
+                SELECT {member_columns}, p.*
+                FROM group_packages gp
+                LEFT JOIN packages p ON p.id = gp.package_id
+            '''
+        else:
+            query = f'SELECT {member_columns} FROM group_packages gp'
+        
+        query += f'''
+            WHERE gp.group_id IN (SELECT id FROM groups WHERE {where})
+            ORDER BY gp.group_id, gp.install_order
+        '''
+        cursor.execute(query, params)
+        
+        members: Dict[int, List[GroupPackage]] = {}
+        declared: List[Tuple[int, GroupPackage, List[str]]] = []
+        for r in cursor.fetchall():
+            package = row_to_package(r) if include_packages and r['id'] is not None else None
+            member = GroupPackage(
+                package_name=r['gp_package_name'],
+                package_version=r['gp_package_version'],
+                package_id=r['gp_package_id'],
+                install_order=r['gp_install_order'],
+                required=bool(r['gp_required']),
+                package=package
             )
-            for r in package_rows
-        ]
+            members.setdefault(r['gp_group_id'], []).append(member)
+            if r['gp_depends_on']:
+                declared.append((r['gp_group_id'], member, r['gp_depends_on'].split(',')))
+        
+        # 依赖以包ID存储，转换为同组成员的包名称
+        names = {
+            (group_id, str(m.package_id)): m.package_name
+            for group_id, group_members in members.items()
+            for m in group_members
+        }
+        for group_id, member, dep_ids in declared:
+            member.depends_on = [names[(group_id, dep)] for dep in dep_ids if (group_id, dep) in names]
         
+        return members
+    
+    def _row_to_group(self, row: sqlite3.Row) -> Group:
+        """将数据库行转换为Group实体（不含成员）"""
         group = Group(
+            id=row['id'],
             group_name=PackageName(row['group_name']),
             version=row['version'],
             created_by=row['created_by'],
@@ -200,7 +288,10 @@ class SQLiteGroupRepository(BaseSQLiteRepository, GroupRepository):
             metadata=json.loads(row['metadata']) if row['metadata'] else {}
         )
         
-        # 手动添加packages
-        group._packages = packages
+        if row['created_at']:
+            try:
+                group._created_at = datetime.fromisoformat(row['created_at'])
+            except ValueError:
+                pass
         
         return group
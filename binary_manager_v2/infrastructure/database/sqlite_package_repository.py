@@ -2,16 +2,84 @@ import sqlite3
 import json
 import uuid
 import socket
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from ...domain.repositories import PackageRepository
-from ...domain.entities import Package
+from ...domain.entities import Package, Version, VersionConstraint
 from .base_repository import BaseSQLiteRepository
 
 
+SEMVER_COLUMNS = ('version_major', 'version_minor', 'version_patch',
+                  'version_pre_rank', 'version_prerelease')
+
+
+def semver_columns(version: str) -> Tuple:
+    """版本号对应的排序键列值；非语义化版本的 version_pre_rank 记为 -1，其余为 NULL"""
+    try:
+        return Version.parse(version.lstrip('vV')).sort_key()
+    except ValueError:
+        return (None, None, None, -1, None)
+
+
+def row_to_package(row: sqlite3.Row) -> Package:
+    """将数据库行转换为Package实体"""
+    from ...domain.value_objects import Hash, GitInfo, StorageLocation, PackageName
+    
+    git_info = None
+    if row['git_commit_hash']:
+        # 转换为dict以便使用.get()方法
+        row_dict = dict(row)
+        
+        # 处理git_remotes - 可能是None
+        remotes = []
+        if row_dict.get('git_remotes'):
+            try:
+                remotes = json.loads(row_dict['git_remotes'])
+            except (json.JSONDecodeError, TypeError):
+                remotes = []
+        
+        git_info = GitInfo(
+            commit_hash=row['git_commit_hash'],
+            commit_short=row['git_commit_short'],
+            branch=row['git_branch'],
+            tag=row['git_tag'],
+            author=row['git_author'],
+            author_email=row['git_author_email'],
+            commit_time=row['git_commit_time'],
+            commit_message=row_dict.get('git_commit_message'),
+            remotes=remotes,
+            is_dirty=bool(row['git_is_dirty'])
+        )
+    
+    storage = None
+    if row['storage_path']:
+        from ...domain.value_objects import StorageType
+        storage = StorageLocation(
+            storage_type=StorageType(row['storage_type']),
+            path=row['storage_path']
+        )
+    
+    return Package(
+        id=row['id'],
+        package_name=PackageName(row['package_name']),
+        version=row['version'],
+        archive_hash=Hash.from_string(row['archive_hash']),
+        archive_size=row['archive_size'],
+        file_count=row['file_count'],
+        git_info=git_info,
+        storage_location=storage,
+        publisher_id=row['publisher_id'],
+        description=row['description'],
+        metadata=json.loads(row['metadata']) if row['metadata'] else {}
+    )
+
+
 class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
     """SQLite包仓储实现"""
     
+    # 每条批量查询的 (名称, 版本) 对数，保持在 SQLite 变量数上限以内
+    RESOLVE_BATCH_SIZE = 400
+    
     def __init__(self, db_path: Optional[str] = None):
         super().__init__(db_path)
         self._initialize_database()
@@ -70,8 +138,9 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
                     git_commit_hash, git_commit_short, git_branch, git_tag,
                     git_author, git_author_email, git_commit_time, git_commit_message, git_remotes, git_is_dirty,
                     archive_name, archive_size, archive_hash, file_count,
-                    storage_type, storage_path, description, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    storage_type, storage_path, description, metadata,
+                    version_major, version_minor, version_patch, version_pre_rank, version_prerelease
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 str(package.package_name),
                 package.version,
@@ -95,7 +164,8 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
                 storage.storage_type.value if storage else 'local',
                 storage.path if storage else '',
                 package.description,
-                json.dumps(package.metadata)
+                json.dumps(package.metadata),
+                *semver_columns(package.version)
             ))
             
             package_id = cursor.lastrowid
@@ -136,6 +206,98 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
             return self._row_to_package(row)
         return None
     
+    def resolve_ids(self, specs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """批量解析 (名称, 版本) 到包ID
+        
+        每批一次 VALUES 连接查询，只读取 ID 列，不构造 Package；
+        同名同版本存在多个提交时取最早入库的一条。未找到的对不在结果中。
+        """
+        unique_specs = list(dict.fromkeys((str(name), str(version)) for name, version in specs))
+        resolved = {}
+        cursor = self.conn.cursor()
+        
+        for start in range(0, len(unique_specs), self.RESOLVE_BATCH_SIZE):
+            batch = unique_specs[start:start + self.RESOLVE_BATCH_SIZE]
+            values = ', '.join(['(?, ?)'] * len(batch))
+            cursor.execute(f'''
+                WITH wanted(package_name, version) AS (VALUES {values})
+                SELECT p.package_name, p.version, MIN(p.id) AS id
+                FROM wanted
+                JOIN packages p ON p.package_name = wanted.package_name
+                               AND p.version = wanted.version
+                GROUP BY p.package_name, p.version
+            ''', [value for spec in batch for value in spec])
+            
+            for row in cursor.fetchall():
+                resolved[(row['package_name'], row['version'])] = row['id']
+        
+        return resolved
+    
+    def find_summaries_by_ids(self, package_ids: List[int]) -> Dict[int, Dict]:
+        """按ID批量读取包的摘要字段（名称、版本、短提交号）"""
+        summaries = {}
+        cursor = self.conn.cursor()
+        unique_ids = list(dict.fromkeys(package_ids))
+        
+        for start in range(0, len(unique_ids), self.RESOLVE_BATCH_SIZE):
+            batch = unique_ids[start:start + self.RESOLVE_BATCH_SIZE]
+            cursor.execute(
+                f'''SELECT id, package_name, version, git_commit_short FROM packages
+                   WHERE id IN ({', '.join('?' * len(batch))})''',
+                batch
+            )
+            for row in cursor.fetchall():
+                summaries[row['id']] = {
+                    'package_name': row['package_name'],
+                    'version': row['version'],
+                    'git_commit_short': row['git_commit_short'] or None
+                }
+        
+        return summaries
+    
+    def find_versions(self, package_name: str, constraint: Optional[str] = None,
+                      limit: Optional[int] = None) -> List[Package]:
+        """按语义化版本从高到低查找满足约束的包
+        
+        约束被转换为排序键列上的区间条件，走 (package_name, 版本键) 复合索引，
+        只读取命中的行；非语义化版本不参与匹配。
+        
+        Args:
+            package_name: 包名称
+            constraint: 版本约束，如 "^1.2"、">=1.0,<2"、"1.x"；为空表示任意正式版
+            limit: 最多返回的条数
+        """
+        parsed = constraint if isinstance(constraint, VersionConstraint) else VersionConstraint(constraint)
+        key_columns = '(' + ', '.join(SEMVER_COLUMNS) + ')'
+        
+        query = 'SELECT * FROM packages WHERE package_name = ? AND version_pre_rank >= 0'
+        params: List = [package_name]
+        
+        if not parsed.include_prerelease:
+            query += ' AND version_pre_rank = 1'
+        if parsed.lower:
+            key, inclusive = parsed.lower
+            query += f" AND {key_columns} {'>=' if inclusive else '>'} (?, ?, ?, ?, ?)"
+            params.extend(key)
+        if parsed.upper:
+            key, inclusive = parsed.upper
+            query += f" AND {key_columns} {'<=' if inclusive else '<'} (?, ?, ?, ?, ?)"
+            params.extend(key)
+        
+        query += ' ORDER BY ' + ', '.join(f'{column} DESC' for column in SEMVER_COLUMNS) + ', id DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return [self._row_to_package(row) for row in cursor.fetchall()]
+    
+    def latest(self, package_name: str, constraint: Optional[str] = None) -> Optional[Package]:
+        """满足约束的最高版本"""
+        packages = self.find_versions(package_name, constraint, limit=1)
+        return packages[0] if packages else None
+    
     def find_all(self, filters: Optional[Dict] = None) -> List[Package]:
         """查找所有包"""
         cursor = self.conn.cursor()
@@ -208,55 +370,7 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
     
     def _row_to_package(self, row: sqlite3.Row) -> Package:
         """将数据库行转换为Package实体"""
-        from ...domain.value_objects import Hash, GitInfo, StorageLocation, PackageName
-        
-        git_info = None
-        if row['git_commit_hash']:
-            # 转换为dict以便使用.get()方法
-            row_dict = dict(row)
-            
-            # 处理git_remotes - 可能是None
-            remotes = []
-            if row_dict.get('git_remotes'):
-                try:
-                    remotes = json.loads(row_dict['git_remotes'])
-                except (json.JSONDecodeError, TypeError):
-                    remotes = []
-            
-            git_info = GitInfo(
-                commit_hash=row['git_commit_hash'],
-                commit_short=row['git_commit_short'],
-                branch=row['git_branch'],
-                tag=row['git_tag'],
-                author=row['git_author'],
-                author_email=row['git_author_email'],
-                commit_time=row['git_commit_time'],
-                commit_message=row_dict.get('git_commit_message'),
-                remotes=remotes,
-                is_dirty=bool(row['git_is_dirty'])
-            )
-        
-        storage = None
-        if row['storage_path']:
-            from ...domain.value_objects import StorageType
-            storage = StorageLocation(
-                storage_type=StorageType(row['storage_type']),
-                path=row['storage_path']
-            )
-        
-        return Package(
-            id=row['id'],
-            package_name=PackageName(row['package_name']),
-            version=row['version'],
-            archive_hash=Hash.from_string(row['archive_hash']),
-            archive_size=row['archive_size'],
-            file_count=row['file_count'],
-            git_info=git_info,
-            storage_location=storage,
-            publisher_id=row['publisher_id'],
-            description=row['description'],
-            metadata=json.loads(row['metadata']) if row['metadata'] else {}
-        )
+        return row_to_package(row)
     
     def _initialize_database(self):
         """初始化数据库表"""
@@ -321,6 +435,21 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
         except sqlite3.OperationalError:
             pass  # 列已存在
         
+        # 语义化版本排序键列（保存时填充，旧数据在下方回填）
+        for column, column_type in zip(SEMVER_COLUMNS, ('INTEGER', 'INTEGER', 'INTEGER', 'INTEGER', 'TEXT')):
+            try:
+                cursor.execute(f'ALTER TABLE packages ADD COLUMN {column} {column_type}')
+            except sqlite3.OperationalError:
+                pass  # 列已存在
+        
+        cursor.execute('SELECT id, version FROM packages WHERE version_pre_rank IS NULL')
+        backfill = [(*semver_columns(row['version']), row['id']) for row in cursor.fetchall()]
+        if backfill:
+            cursor.executemany(
+                'UPDATE packages SET ' + ', '.join(f'{c} = ?' for c in SEMVER_COLUMNS) + ' WHERE id = ?',
+                backfill
+            )
+        
         # 创建groups表
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS groups (
@@ -353,6 +482,28 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
             )
         ''')
         
+        # 创建dependencies表（分组成员之间的安装依赖）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dependencies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                package_id INTEGER,
+                depends_on_group_id INTEGER,
+                depends_on_package_id INTEGER,
+                constraint_type TEXT NOT NULL DEFAULT 'exact',
+                version_constraint TEXT,
+                FOREIGN KEY (group_id) REFERENCES groups(id) ON DELETE CASCADE,
+                FOREIGN KEY (package_id) REFERENCES packages(id) ON DELETE CASCADE,
+                FOREIGN KEY (depends_on_group_id) REFERENCES groups(id) ON DELETE CASCADE,
+                FOREIGN KEY (depends_on_package_id) REFERENCES packages(id) ON DELETE CASCADE,
+                CHECK (
+                    (package_id IS NOT NULL) OR
+                    (depends_on_group_id IS NOT NULL) OR
+                    (depends_on_package_id IS NOT NULL)
+                )
+            )
+        ''')
+        
         # 添加新列到group_packages（如果表已存在且没有这些列）
         try:
             cursor.execute('ALTER TABLE group_packages ADD COLUMN package_name TEXT')
@@ -366,10 +517,16 @@ class SQLitePackageRepository(BaseSQLiteRepository, PackageRepository):
         
         # 创建索引
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_packages_name_version ON packages(package_name, version)')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_packages_name_semver ON packages(package_name, '
+            + ', '.join(SEMVER_COLUMNS) + ')'
+        )
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_packages_git_commit ON packages(git_commit_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_packages_publisher ON packages(publisher_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_name_version ON groups(group_name, version)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_created_at ON groups(created_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_group_packages_group ON group_packages(group_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_group_packages_package ON group_packages(package_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_dependencies_group ON dependencies(group_id, package_id)')
         
         self.conn.commit()
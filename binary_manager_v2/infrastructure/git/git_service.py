@@ -1,24 +1,39 @@
 import subprocess
+import threading
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple, Union
 from ...domain.value_objects import GitInfo
 from ...shared.logger import Logger
 
 
 class GitService:
-    """Git服务，用于提取Git仓库信息"""
+    """Git服务，用于提取Git仓库信息
+    
+    提交元数据用一次 ``git log -1`` 取得，HEAD 和引用直接从 .git 目录读取，
+    结果按 (仓库, HEAD, 引用/配置修改时间) 缓存在进程内；同一提交上重复
+    发布只需再执行一次 ``git status`` 检查工作区。
+    """
+    
+    # 字段以 NUL 分隔，提交标题放在最后
+    LOG_FORMAT = '%H%x00%h%x00%an%x00%ae%x00%ci%x00%D%x00%s'
+    
+    _metadata_cache: Dict[Tuple, Dict] = {}
+    _cache_lock = threading.Lock()
     
     def __init__(self, repo_path: str):
         self.repo_path = Path(repo_path).resolve()
         if not self.repo_path.exists():
             raise ValueError(f"Repository path does not exist: {repo_path}")
         self.logger = Logger.get(self.__class__.__name__)
+        self._git_dir: Optional[Path] = None
+        self._common_dir: Optional[Path] = None
     
-    def _run_git_command(self, command: str) -> str:
-        """执行Git命令并返回输出"""
+    def _run_git_command(self, command: Union[str, List[str]]) -> str:
+        """执行Git命令并返回输出（command 为字符串时按空白拆分）"""
+        argv = command.split() if isinstance(command, str) else list(command)
         try:
             result = subprocess.run(
-                ['git'] + command.split(),
+                ['git'] + argv,
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
@@ -32,6 +47,136 @@ class GitService:
             self.logger.error("Git is not installed or not in PATH")
             return ""
     
+    def _find_git_dir(self) -> Optional[Path]:
+        """向上查找 .git（目录，或工作树/子模块使用的 gitdir 文件）"""
+        if self._git_dir is not None:
+            return self._git_dir
+        
+        for candidate in (self.repo_path, *self.repo_path.parents):
+            dot_git = candidate / '.git'
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                content = dot_git.read_text().strip()
+                if not content.startswith('gitdir:'):
+                    continue
+                git_dir = (candidate / content[len('gitdir:'):].strip()).resolve()
+            else:
+                continue
+            
+            if not (git_dir / 'HEAD').is_file():
+                continue
+            
+            common_dir = git_dir
+            commondir_file = git_dir / 'commondir'
+            if commondir_file.is_file():
+                common_dir = (git_dir / commondir_file.read_text().strip()).resolve()
+            
+            self._git_dir, self._common_dir = git_dir, common_dir
+            return git_dir
+        
+        return None
+    
+    def _resolve_ref(self, ref: str) -> Optional[str]:
+        """从松散引用或 packed-refs 解析引用对应的 commit"""
+        for base in (self._git_dir, self._common_dir):
+            path = base / ref
+            if path.is_file():
+                value = path.read_text().strip()
+                # 嵌套的符号引用交给 git 解析
+                return None if value.startswith('ref:') else value or None
+        
+        packed = self._common_dir / 'packed-refs'
+        if packed.is_file():
+            for line in packed.read_text().splitlines():
+                if not line or line[0] in '#^':
+                    continue
+                sha, _, name = line.partition(' ')
+                if name == ref:
+                    return sha
+        return None
+    
+    def _read_head(self) -> Tuple[Optional[str], Optional[str]]:
+        """直接读取 HEAD，返回 (符号引用, commit 哈希)；无法解析的部分为 None"""
+        if self._find_git_dir() is None:
+            return None, None
+        try:
+            head = (self._git_dir / 'HEAD').read_text().strip()
+            if head.startswith('ref:'):
+                ref = head[len('ref:'):].strip()
+                return ref, self._resolve_ref(ref)
+            return None, head or None
+        except OSError:
+            return None, None
+    
+    def _cache_key(self) -> Optional[Tuple]:
+        """缓存键：HEAD 与标签/远程配置的修改时间，任一变化即重新提取"""
+        ref, commit = self._read_head()
+        if commit is None:
+            return None
+        
+        stamps = []
+        for path in (self._common_dir / 'refs' / 'tags', self._common_dir / 'packed-refs',
+                     self._common_dir / 'config'):
+            try:
+                stamps.append(path.stat().st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return (str(self._git_dir), ref, commit, tuple(stamps))
+    
+    def _extract_metadata(self) -> Dict:
+        """一次 git log 提取提交元数据，远程仓库另取一次"""
+        output = self._run_git_command(['log', '-1', '--no-color', f'--format={self.LOG_FORMAT}'])
+        fields = output.split('\x00')
+        if len(fields) != 7:
+            return {}
+        
+        commit_hash, commit_short, author, email, commit_time, decorations, message = fields
+        
+        branch, tags = None, []
+        for decoration in decorations.split(', '):
+            if decoration.startswith('HEAD -> '):
+                branch = decoration[len('HEAD -> '):]
+            elif decoration.startswith('tag: '):
+                tags.append(decoration[len('tag: '):])
+        
+        ref, _ = self._read_head()
+        if ref and ref.startswith('refs/heads/'):
+            branch = ref[len('refs/heads/'):]
+        
+        return {
+            'commit_hash': commit_hash,
+            'commit_short': commit_short,
+            'branch': branch,
+            'tag': tags[0] if tags else None,
+            'author': author,
+            'author_email': email,
+            'commit_time': commit_time.replace(' ', 'T') + 'Z' if commit_time else "",
+            'commit_message': message,
+            'remotes': self._parse_remotes(self._run_git_command('remote -v'))
+        }
+    
+    def _metadata(self) -> Dict:
+        """带缓存的提交元数据"""
+        key = self._cache_key()
+        if key is not None:
+            with self._cache_lock:
+                cached = self._metadata_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        metadata = self._extract_metadata()
+        if key is not None and metadata:
+            with self._cache_lock:
+                self._metadata_cache[key] = metadata
+        return metadata
+    
+    @classmethod
+    def clear_cache(cls):
+        """清空进程内的元数据缓存"""
+        with cls._cache_lock:
+            cls._metadata_cache.clear()
+    
     def get_git_info(self) -> Optional[GitInfo]:
         """获取Git仓库完整信息"""
         if not self.is_git_repo():
@@ -39,17 +184,20 @@ class GitService:
             return None
         
         try:
+            metadata = self._metadata()
+            if not metadata:
+                return None
             return GitInfo(
-                commit_hash=self.get_commit_hash(),
-                commit_short=self.get_commit_short(),
-                branch=self.get_branch(),
-                tag=self.get_tag(),
-                author=self.get_author(),
-                author_email=self.get_author_email(),
-                commit_message=self.get_commit_message(),
-                commit_time=self.get_commit_time(),
+                commit_hash=metadata['commit_hash'],
+                commit_short=metadata['commit_short'],
+                branch=metadata['branch'],
+                tag=metadata['tag'],
+                author=metadata['author'],
+                author_email=metadata['author_email'],
+                commit_message=metadata['commit_message'],
+                commit_time=metadata['commit_time'],
                 is_dirty=self.is_dirty(),
-                remotes=self.get_remotes()
+                remotes=[dict(remote) for remote in metadata['remotes']]
             )
         except Exception as e:
             self.logger.error(f"Failed to get git info: {e}")
@@ -57,51 +205,46 @@ class GitService:
     
     def get_commit_hash(self) -> str:
         """获取完整的commit哈希"""
-        return self._run_git_command('rev-parse HEAD')
+        return self._metadata().get('commit_hash', "")
     
     def get_commit_short(self) -> str:
         """获取短哈希"""
-        return self._run_git_command('rev-parse --short HEAD')
+        return self._metadata().get('commit_short', "")
     
     def get_branch(self) -> Optional[str]:
         """获取当前分支名称"""
-        try:
-            branch = self._run_git_command('rev-parse --abbrev-ref HEAD')
-            return branch if branch and branch != 'HEAD' else None
-        except Exception:
-            return None
+        return self._metadata().get('branch')
     
     def get_tag(self) -> Optional[str]:
-        """获取最新的tag（如果有）"""
-        try:
-            tag = self._run_git_command('describe --tags --abbrev=0 --exact-match 2>/dev/null || true')
-            return tag if tag else None
-        except Exception:
-            return None
+        """获取指向当前提交的tag（如果有）"""
+        return self._metadata().get('tag')
     
     def get_author(self) -> str:
         """获取作者姓名"""
-        return self._run_git_command('log -1 --pretty=format:%an')
+        return self._metadata().get('author', "")
     
     def get_author_email(self) -> str:
         """获取作者邮箱"""
-        return self._run_git_command('log -1 --pretty=format:%ae')
+        return self._metadata().get('author_email', "")
     
     def get_commit_time(self) -> str:
         """获取提交时间"""
-        time_str = self._run_git_command('log -1 --pretty=format:%ci')
-        if time_str:
-            return time_str.replace(' ', 'T') + 'Z'
-        return ""
+        return self._metadata().get('commit_time', "")
     
     def get_commit_message(self) -> str:
         """获取提交信息"""
-        return self._run_git_command('log -1 --pretty=format:%s')
+        return self._metadata().get('commit_message', "")
     
-    def is_dirty(self) -> bool:
-        """检查是否有未提交的更改"""
+    def is_dirty(self, include_untracked: bool = False) -> bool:
+        """检查是否有未提交的更改
+        
+        默认只检查已跟踪文件，避免在大仓库中扫描未跟踪文件。
+        """
+        untracked = 'normal' if include_untracked else 'no'
         try:
-            status = self._run_git_command('status --porcelain')
+            status = self._run_git_command(
+                ['status', '--porcelain=v2', f'--untracked-files={untracked}']
+            )
             return len(status) > 0
         except Exception:
             return False
@@ -116,20 +259,22 @@ class GitService:
     
     def get_remotes(self) -> List[dict]:
         """获取远程仓库URL"""
-        try:
-            output = self._run_git_command('remote -v')
-            remotes = []
-            for line in output.split('\n'):
-                if line:
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        remotes.append({'name': parts[0], 'url': parts[1]})
-            return remotes
-        except Exception:
-            return []
+        return [dict(remote) for remote in self._metadata().get('remotes', [])]
+    
+    @staticmethod
+    def _parse_remotes(output: str) -> List[dict]:
+        remotes = []
+        for line in output.split('\n'):
+            if line:
+                parts = line.split()
+                if len(parts) >= 3:
+                    remotes.append({'name': parts[0], 'url': parts[1]})
+        return remotes
     
     def is_git_repo(self) -> bool:
-        """验证是否为有效的Git仓库"""
+        """验证是否为有效的Git仓库（优先直接查找 .git，不启动子进程）"""
+        if self._find_git_dir() is not None:
+            return True
         try:
             result = self._run_git_command('rev-parse --git-dir')
             return bool(result)
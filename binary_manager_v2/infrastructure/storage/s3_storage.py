@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from urllib3 import PoolManager, HTTPResponse
 from ...domain.repositories import StorageRepository
+from ...domain.services import HashCalculator
 from ...shared.logger import Logger
 
 
@@ -178,19 +179,7 @@ class S3Storage(StorageRepository):
     
     def verify_file(self, local_path: str, expected_hash: str) -> bool:
         try:
-            if ':' in expected_hash:
-                algorithm, hash_value = expected_hash.split(':', 1)
-            else:
-                algorithm = 'sha256'
-                hash_value = expected_hash
-            
-            hash_func = hashlib.new(algorithm)
-            with open(local_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    hash_func.update(chunk)
-            
-            actual_hash = hash_func.hexdigest()
-            return actual_hash.lower() == hash_value.lower()
+            return HashCalculator().verify_file(local_path, expected_hash)
         except Exception as e:
             self.logger.error(f"Failed to verify file: {e}")
             return False
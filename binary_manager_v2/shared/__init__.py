@@ -1,10 +1,13 @@
 from .config import Config
 from .logger import Logger
+from .instrumentation import StageRecord, StageTimer
 from .progress import ProgressReporter, ConsoleProgress, TqdmProgress, create_progress
 
 __all__ = [
     'Config',
     'Logger',
+    'StageRecord',
+    'StageTimer',
     'ProgressReporter',
     'ConsoleProgress',
     'TqdmProgress',
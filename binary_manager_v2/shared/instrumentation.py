@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+class StageRecord:
+    """单个阶段的计量结果，阶段内可补充字节数和条目数"""
+    
+    __slots__ = ('name', 'seconds', 'bytes', 'items')
+    
+    def __init__(self, name: str, seconds: float = 0.0, bytes: int = 0, items: int = 0):
+        self.name = name
+        self.seconds = seconds
+        self.bytes = bytes
+        self.items = items
+    
+    def to_dict(self) -> Dict:
+        data = {
+            'stage': self.name,
+            'seconds': round(self.seconds, 6),
+            'bytes': self.bytes,
+            'items': self.items
+        }
+        if self.bytes and self.seconds > 0:
+            data['mb_per_sec'] = round(self.bytes / self.seconds / (1024 * 1024), 2)
+        return data
+
+
+class StageTimer:
+    """按阶段记录一次操作（发布、下载）的耗时和字节数
+    
+    结果由 summary() 返回并放进服务的结果字典；配置了指标文件时，
+    每个阶段结束即追加一行 JSON（便于 jq/日志系统聚合）。
+    """
+    
+    _sink_path: Optional[str] = None
+    _sink_lock = threading.Lock()
+    
+    def __init__(self, operation: str, **context):
+        self.operation = operation
+        self.context = context
+        self._records: List[StageRecord] = []
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+    
+    @classmethod
+    def set_sink(cls, path: Optional[str]) -> None:
+        """设置 JSON lines 指标文件，None 表示关闭"""
+        cls._sink_path = path
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        record = StageRecord(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self._add(record)
+    
+    def add(self, name: str, seconds: float, bytes: int = 0, items: int = 0) -> StageRecord:
+        """记录在别处测得的阶段（如扫描器内部累计的哈希耗时）"""
+        record = StageRecord(name, seconds, bytes, items)
+        self._add(record)
+        return record
+    
+    def _add(self, record: StageRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+        self._emit(record)
+    
+    def _emit(self, record: StageRecord) -> None:
+        path = self._sink_path
+        if not path:
+            return
+        line = dict(record.to_dict(), event='stage', operation=self.operation,
+                    timestamp=datetime.utcnow().isoformat() + 'Z', **self.context)
+        with self._sink_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+    
+    @property
+    def records(self) -> List[StageRecord]:
+        with self._lock:
+            return list(self._records)
+    
+    def summary(self) -> Dict:
+        return {
+            'operation': self.operation,
+            'total_seconds': round(time.perf_counter() - self._started, 6),
+            'stages': [record.to_dict() for record in self.records]
+        }
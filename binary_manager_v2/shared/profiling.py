@@ -0,0 +1,110 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class _ThreadProfilers:
+    """为剖析期间启动的线程各建一个 cProfile
+    
+    cProfile.Profile.enable() 只记录调用它的线程；下载的线程池和
+    ParallelZipExtractor 中的工作都在其他线程里完成。通过
+    threading.setprofile 在新线程的第一个事件里启用该线程自己的剖析器，
+    结束后把已退出线程的数据合并到主报告。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profilers: List[Tuple[threading.Thread, cProfile.Profile]] = []
+        self.active = True
+    
+    def hook(self, frame, event, arg):
+        sys.setprofile(None)
+        if not self.active:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ 的 cProfile 基于 sys.monitoring，主剖析器已覆盖所有线程
+            return
+        with self._lock:
+            self._profilers.append((threading.current_thread(), profiler))
+    
+    def finished(self) -> Tuple[List[cProfile.Profile], int]:
+        """返回 (已退出线程的剖析器, 仍在运行而未计入的线程数)"""
+        with self._lock:
+            done = [profiler for thread, profiler in self._profilers if not thread.is_alive()]
+            return done, len(self._profilers) - len(done)
+
+
+def run_profiled(func: Callable[[], T], output_dir: str, label: str, top: int = 30) -> T:
+    """在 cProfile 和 tracemalloc 下执行 func，结束后写出报告
+    
+    生成两个文件：
+      <label>-<时间>.prof  pstats 原始数据（可用 snakeviz / pstats 查看）
+      <label>-<时间>.txt   按累计耗时排序的前 top 个函数、内存峰值与分配最多的代码行
+    
+    func 执行期间启动并在结束前退出的线程（如下载线程池）一并计入；
+    结束时仍在运行的线程不计入，数量写在报告开头。
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    stem = out / f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    
+    profiler = cProfile.Profile()
+    threads = _ThreadProfilers()
+    previous_hook = threading.getprofile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(10)
+    tracemalloc.reset_peak()
+    
+    try:
+        threading.setprofile(threads.hook)
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+            threading.setprofile(previous_hook)
+            threads.active = False
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        worker_profilers, still_running = threads.finished()
+        _write_reports(profiler, worker_profilers, still_running, snapshot, stem, current, peak, top)
+
+
+def _write_reports(profiler: cProfile.Profile, worker_profilers: List[cProfile.Profile],
+                   still_running: int, snapshot, stem: Path, current: int, peak: int,
+                   top: int) -> Dict[str, str]:
+    text = io.StringIO()
+    text.write(f"threads: main + {len(worker_profilers)} worker thread(s)")
+    if still_running:
+        text.write(f", {still_running} still running and not included")
+    text.write("\n")
+    
+    stats = pstats.Stats(profiler, stream=text)
+    for worker in worker_profilers:
+        stats.add(worker)
+    stats.dump_stats(f"{stem}.prof")
+    stats.sort_stats('cumulative').print_stats(top)
+    
+    text.write("\n=== tracemalloc ===\n")
+    text.write(f"current: {current / 1024 / 1024:.2f} MB\n")
+    text.write(f"peak:    {peak / 1024 / 1024:.2f} MB\n\n")
+    for stat in snapshot.statistics('lineno')[:top]:
+        text.write(f"{stat}\n")
+    
+    Path(f"{stem}.txt").write_text(text.getvalue(), encoding='utf-8')
+    return {'stats': f"{stem}.prof", 'report': f"{stem}.txt"}
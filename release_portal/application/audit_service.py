@@ -2,18 +2,27 @@
 审计日志服务
 """
 
-from typing import Optional, Dict, Any, List
+import base64
+import time
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..domain.entities.audit_log import AuditLog, AuditAction, AuditLogFilter
 from ..domain.repositories.audit_log_repository import AuditLogRepository
 from ..infrastructure.repositories.sqlite_audit_log_repository import SQLiteAuditLogRepository
+from ..shared.metrics import AUDIT_PENDING, AUDIT_WRITE_LATENCY
 
 
 class AuditService:
     """审计日志服务"""
     
+    COUNT_CACHE_TTL = 60  # 缓存总数的有效期（秒）
+    COUNT_CACHE_SIZE = 1024
+    
+    # 容器按请求创建，缓存需在实例间共享（键中包含数据库路径）
+    _count_cache: Dict[tuple, Tuple[float, int]] = {}
+    
     def __init__(self, audit_repository: AuditLogRepository):
         """
         初始化审计服务
@@ -73,7 +82,9 @@ class AuditService:
             error_message=error_message
         )
         
-        return self.audit_repository.save(audit_log)
+        # 审计写入与请求同步进行，pending 即排队等待 SQLite 写锁的写入数
+        with AUDIT_PENDING.track_inprogress(), AUDIT_WRITE_LATENCY.time():
+            return self.audit_repository.save(audit_log)
     
     def query_logs(
         self,
@@ -94,17 +105,104 @@ class AuditService:
         """
         return self.audit_repository.find_all(filters, limit, offset)
     
-    def get_log_count(self, filters: Optional[AuditLogFilter] = None) -> int:
+    def query_logs_page(
+        self,
+        filters: Optional[AuditLogFilter] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[AuditLog], Optional[str]]:
+        """
+        按游标分页查询审计日志（每页耗时与页码无关）
+        
+        Args:
+            filters: 过滤器
+            limit: 每页数量
+            cursor: 上一页返回的游标，为空表示第一页
+        
+        Returns:
+            (审计日志列表, 下一页游标)，没有更多数据时游标为 None
+        
+        Raises:
+            ValueError: 游标格式无效
+        """
+        after = self.decode_cursor(cursor) if cursor else None
+        logs = self.audit_repository.find_page(filters, limit, after)
+        
+        next_cursor = None
+        if len(logs) == limit and logs:
+            next_cursor = self.encode_cursor(logs[-1])
+        
+        return logs, next_cursor
+    
+    def iter_logs(
+        self,
+        filters: Optional[AuditLogFilter] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[AuditLog]:
+        """
+        按 (timestamp, id) 倒序逐块迭代全部匹配的审计日志
+        
+        每块是一次独立的游标分页查询，不会长期持有数据库读锁，
+        内存占用与总行数无关。
+        
+        Args:
+            filters: 过滤器
+            chunk_size: 每次查询的行数
+        """
+        after = None
+        while True:
+            logs = self.audit_repository.find_page(filters, chunk_size, after)
+            yield from logs
+            if len(logs) < chunk_size:
+                return
+            after = (logs[-1].timestamp.isoformat(), logs[-1].id)
+    
+    @staticmethod
+    def encode_cursor(audit_log: AuditLog) -> str:
+        """将日志的 (timestamp, id) 编码为不透明游标"""
+        raw = f"{audit_log.timestamp.isoformat()}|{audit_log.id}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """解析游标为 (timestamp, id)"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            timestamp, log_id = raw.rsplit('|', 1)
+            datetime.fromisoformat(timestamp)
+            return timestamp, int(log_id)
+        except (ValueError, UnicodeError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def get_log_count(self, filters: Optional[AuditLogFilter] = None,
+                      use_cache: bool = False) -> int:
         """
         获取日志数量
         
         Args:
             filters: 过滤器
+            use_cache: 是否允许返回 COUNT_CACHE_TTL 秒内缓存的结果
         
         Returns:
             日志数量
         """
-        return self.audit_repository.count(filters)
+        if not use_cache:
+            return self.audit_repository.count(filters)
+        
+        key = (
+            getattr(self.audit_repository, 'db_path', id(self.audit_repository)),
+            tuple(sorted(filters.to_dict().items())) if filters else ()
+        )
+        now = time.monotonic()
+        cached = self._count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        total = self.audit_repository.count(filters)
+        if len(self._count_cache) >= self.COUNT_CACHE_SIZE:
+            self._count_cache.clear()
+        self._count_cache[key] = (now + self.COUNT_CACHE_TTL, total)
+        return total
     
     def get_user_activity_summary(self, user_id: str, days: int = 30) -> Dict:
         """
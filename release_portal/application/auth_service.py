@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Tuple
 from ..domain.entities.user import User
 from ..domain.repositories import UserRepository, LicenseRepository, RoleRepository
-from ..infrastructure.auth import PasswordHasher, TokenService, UUIDGenerator
+from ..infrastructure.auth import PasswordHasher, TokenService, UUIDGenerator, token_cache
 
 
 class AuthService:
@@ -81,6 +81,27 @@ class AuthService:
             return None
         return self._user_repository.find_by_id(user_info['user_id'])
     
+    def authenticate(self, token: str) -> Optional[Tuple[dict, User]]:
+        """验证 Token 并加载用户，结果写入进程内缓存
+        
+        Returns:
+            (payload, user)；Token 无效、用户不存在或已停用时返回 None
+        """
+        cached = token_cache.get(token)
+        if cached:
+            return cached.payload, cached.user
+        
+        payload = self._token_service.verify_token(token)
+        if not payload:
+            return None
+        
+        user = self._user_repository.find_by_id(payload['user_id'])
+        if not user or not user.is_active:
+            return None
+        
+        token_cache.put(token, payload, user)
+        return payload, user
+    
     def change_password(self, user_id: str, old_password: str, new_password: str) -> None:
         user = self._user_repository.find_by_id(user_id)
         if not user:
@@ -0,0 +1,391 @@
+"""
+备份调度器
+
+- 类 cron 的调度策略（五段式表达式或固定间隔），可附加随机抖动，
+  避免多实例在同一时刻同时启动备份
+- 调度线程按最近一次到期时间休眠，不做固定间隔轮询
+- 每个任务互斥：同一进程内用锁，跨进程用 lock_dir 下的文件锁，
+  上一次运行未结束时本次记为 skipped，运行永不重叠
+- 任务在独立线程中以较低的 CPU（nice）和 I/O（ionice idle）优先级运行，
+  优先级只作用于该线程及其创建的压缩线程，不影响 Web 请求线程
+- 每个任务记录上一次运行结果和下一次运行时间
+"""
+
+import ctypes
+import logging
+import os
+import platform
+import random
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from ..shared.metrics import BACKUP_JOB_DURATION, BACKUP_JOB_RUNNING
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class CronSchedule:
+    """五段式 cron 表达式：分 时 日 月 周（周日为 0 或 7）"""
+    
+    ALIASES = {
+        '@hourly': '0 * * * *',
+        '@daily': '0 0 * * *',
+        '@weekly': '0 0 * * 0',
+        '@monthly': '0 0 1 * *',
+    }
+    # 搜索上限：超过该年数仍无匹配说明表达式不可能满足（如 2 月 31 日）
+    MAX_YEARS = 5
+    
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = self.ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+        
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in self._parse_field(fields[4], 0, 7)}
+        # 标准 cron 语义：日和周都被限定时，满足其一即可
+        self._day_restricted = fields[2] != '*'
+        self._weekday_restricted = fields[4] != '*'
+    
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {field}")
+            
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+    
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        # datetime.weekday(): 周一为 0；cron: 周日为 0
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+    
+    def next_after(self, dt: datetime) -> datetime:
+        """严格晚于 dt 的下一个匹配时刻"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * self.MAX_YEARS)
+        
+        # 按月/日/时/分逐级跳过不匹配的区间，而不是逐分钟尝试
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                candidate = candidate.replace(year=year, month=candidate.month % 12 + 1,
+                                              day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+    
+    def __str__(self) -> str:
+        return self.expression
+
+
+class IntervalSchedule:
+    """固定间隔调度"""
+    
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+    
+    def next_after(self, dt: datetime) -> datetime:
+        return dt + timedelta(seconds=self.seconds)
+    
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _lower_thread_priority(nice: int, ionice_idle: bool):
+    """降低当前线程的 CPU/I/O 优先级（尽力而为，失败时忽略）"""
+    if not hasattr(os, 'setpriority') or not hasattr(threading, 'get_native_id'):
+        return
+    
+    tid = threading.get_native_id()
+    try:
+        # Linux 上 PRIO_PROCESS + 线程 ID 只作用于该线程，新建线程会继承
+        current = os.getpriority(os.PRIO_PROCESS, tid)
+        if nice > current:
+            os.setpriority(os.PRIO_PROCESS, tid, nice)
+    except OSError:
+        pass
+    
+    if ionice_idle and platform.system() == 'Linux':
+        syscall_numbers = {'x86_64': 251, 'aarch64': 30, 'i686': 289, 'armv7l': 314}
+        number = syscall_numbers.get(platform.machine())
+        if number is None:
+            return
+        ioprio_who_process, ioprio_class_idle, ioprio_class_shift = 1, 3, 13
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.syscall(number, ioprio_who_process, tid,
+                         ioprio_class_idle << ioprio_class_shift)
+        except (OSError, AttributeError):
+            pass
+
+
+class BackupJob:
+    """调度任务"""
+    
+    def __init__(self, name: str, func: Callable[[], object], schedule,
+                 jitter_seconds: float = 0, nice: int = 10, ionice_idle: bool = True):
+        """
+        初始化任务
+        
+        Args:
+            name: 任务名（同时用作跨进程锁文件名）
+            func: 任务函数
+            schedule: CronSchedule 或 IntervalSchedule
+            jitter_seconds: 每次计算下一次运行时间时追加的随机延迟上限
+            nice: 运行线程的 nice 值
+            ionice_idle: 是否以 idle I/O 优先级运行
+        """
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.jitter_seconds = jitter_seconds
+        self.nice = nice
+        self.ionice_idle = ionice_idle
+        
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[Dict] = None
+        self.run_count = 0
+        self.running = False
+        self._lock = threading.Lock()
+    
+    def compute_next_run(self, now: datetime) -> datetime:
+        next_run = self.schedule.next_after(now)
+        if self.jitter_seconds:
+            next_run += timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        self.next_run = next_run
+        return next_run
+    
+    def status(self) -> Dict:
+        return {
+            'name': self.name,
+            'schedule': str(self.schedule),
+            'jitter_seconds': self.jitter_seconds,
+            'running': self.running,
+            'run_count': self.run_count,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'last_run': dict(self.last_run) if self.last_run else None
+        }
+
+
+class BackupScheduler:
+    """备份调度器"""
+    
+    def __init__(self, lock_dir: Optional[str] = None):
+        """
+        初始化调度器
+        
+        Args:
+            lock_dir: 跨进程任务锁目录；为空时只做进程内互斥
+        """
+        self.lock_dir = Path(lock_dir) if lock_dir else None
+        self._jobs: Dict[str, BackupJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def add_job(self, name: str, func: Callable[[], object], schedule,
+                jitter_seconds: float = 0, nice: int = 10,
+                ionice_idle: bool = True) -> BackupJob:
+        """添加或替换任务；替换时保留上一次运行记录"""
+        job = BackupJob(name, func, schedule, jitter_seconds, nice, ionice_idle)
+        with self._jobs_lock:
+            previous = self._jobs.get(name)
+            if previous:
+                job.last_run = previous.last_run
+                job.run_count = previous.run_count
+                job._lock = previous._lock
+            job.compute_next_run(datetime.now())
+            self._jobs[name] = job
+        self._wake.set()
+        return job
+    
+    def remove_job(self, name: str) -> bool:
+        with self._jobs_lock:
+            removed = self._jobs.pop(name, None) is not None
+        self._wake.set()
+        return removed
+    
+    def get_job(self, name: str) -> Optional[BackupJob]:
+        return self._jobs.get(name)
+    
+    def start(self):
+        """启动调度线程（重复调用无副作用）"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="backup-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("备份调度器已启动")
+    
+    def stop(self, timeout: Optional[float] = None):
+        """停止调度线程；正在运行的任务会继续执行完"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("备份调度器已停止")
+    
+    def run_job(self, name: str, wait: bool = True) -> Optional[Dict]:
+        """立即运行一次任务（仍受互斥约束），wait 时返回本次运行记录"""
+        job = self._jobs.get(name)
+        if job is None:
+            raise ValueError(f"Job not found: {name}")
+        
+        thread = self._spawn(job)
+        if not wait:
+            return None
+        thread.join()
+        return job.last_run
+    
+    def status(self) -> Dict:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())
+        return {
+            'running': self.running,
+            'jobs': [job.status() for job in jobs]
+        }
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            now = datetime.now()
+            with self._jobs_lock:
+                jobs = list(self._jobs.values())
+            
+            for job in jobs:
+                if job.next_run and job.next_run <= now:
+                    job.compute_next_run(now)
+                    self._spawn(job)
+            
+            next_runs = [job.next_run for job in jobs if job.next_run]
+            timeout = None
+            if next_runs:
+                timeout = max(0.0, (min(next_runs) - datetime.now()).total_seconds())
+            
+            # 休眠到最近一次到期；任务变更或停止时提前唤醒
+            self._wake.wait(timeout)
+            self._wake.clear()
+    
+    def _spawn(self, job: BackupJob) -> threading.Thread:
+        # 每次运行使用新线程，降低的优先级不会带回调度线程或调用方线程
+        thread = threading.Thread(target=self._execute, args=(job,),
+                                  name=f"backup-job-{job.name}", daemon=True)
+        thread.start()
+        return thread
+    
+    def _execute(self, job: BackupJob):
+        started = datetime.now()
+        if not job._lock.acquire(blocking=False):
+            self._record_skip(job, started, "previous run still in progress")
+            return
+        
+        lock_file = None
+        try:
+            lock_file = self._acquire_file_lock(job)
+            if lock_file is False:
+                self._record_skip(job, started, "job is running in another process")
+                return
+            
+            job.running = True
+            BACKUP_JOB_RUNNING.set(1, job=job.name)
+            _lower_thread_priority(job.nice, job.ionice_idle)
+            logger.info(f"备份任务开始: {job.name}")
+            
+            status, error = 'success', None
+            try:
+                job.func()
+            except Exception as e:
+                status, error = 'failed', str(e)
+                logger.error(f"备份任务失败 {job.name}: {e}")
+            
+            finished = datetime.now()
+            BACKUP_JOB_DURATION.observe((finished - started).total_seconds(), job=job.name, status=status)
+            job.run_count += 1
+            job.last_run = {
+                'started_at': started.isoformat(),
+                'finished_at': finished.isoformat(),
+                'duration_seconds': round((finished - started).total_seconds(), 3),
+                'status': status,
+                'error': error
+            }
+            logger.info(f"备份任务结束: {job.name} ({status})")
+        finally:
+            job.running = False
+            BACKUP_JOB_RUNNING.set(0, job=job.name)
+            if lock_file:
+                lock_file.close()
+            job._lock.release()
+    
+    def _acquire_file_lock(self, job: BackupJob):
+        """获取跨进程锁；返回文件对象，无需加锁时返回 None，被占用时返回 False"""
+        if self.lock_dir is None or fcntl is None:
+            return None
+        
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_dir / f"{job.name}.lock", 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        return lock_file
+    
+    @staticmethod
+    def _record_skip(job: BackupJob, started: datetime, reason: str):
+        logger.warning(f"跳过备份任务 {job.name}: {reason}")
+        BACKUP_JOB_DURATION.observe(0.0, job=job.name, status='skipped')
+        job.last_run = {
+            'started_at': started.isoformat(),
+            'finished_at': started.isoformat(),
+            'duration_seconds': 0.0,
+            'status': 'skipped',
+            'error': reason
+        }
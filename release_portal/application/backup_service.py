@@ -11,14 +11,51 @@ import tarfile
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 import hashlib
+import io
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from ..shared.parallel_gzip import ParallelGzipWriter
+from ..shared.throttle import ThrottledWriter, make_bucket
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 
 class BackupService:
-    """数据备份服务"""
+    """数据备份服务
+    
+    支持两种备份模式：
+    - 完整备份：数据库与存储打包为单个 .tar.gz
+    - 增量备份：文件按 sha256 去重保存在 blobs/ 内容寻址存储中，
+      每次备份只写入新增或变化的文件，并生成一份 manifests/<name>.json
+      清单，任何一份清单都可独立还原出当时的完整数据
+    
+    创建增量备份与回收数据块互斥（进程内用锁，跨进程用备份目录下的
+    文件锁），避免回收掉正在创建、尚未写入清单的备份所用的数据块。
+    """
+    
+    BLOB_DIR = "blobs"
+    MANIFEST_DIR = "manifests"
+    LOCK_FILE = ".blobs.lock"
+    COPY_CHUNK_SIZE = 1024 * 1024
+    
+    # 备份目录 -> 进程内锁；服务实例按请求创建，锁必须按目录共享
+    _store_locks: Dict[str, threading.Lock] = {}
+    _store_locks_guard = threading.Lock()
     
-    def __init__(self, db_path: str, storage_path: str, backup_dir: str = "./backups"):
+    def __init__(self, db_path: str, storage_path: str, backup_dir: str = "./backups",
+                 snapshot_pages_per_step: int = 1024,
+                 snapshot_step_sleep: float = 0.0,
+                 compression_threads: Optional[int] = None,
+                 compression_level: int = 6,
+                 io_bytes_per_sec: Optional[int] = None):
         """
         初始化备份服务
         
@@ -26,17 +63,30 @@ class BackupService:
             db_path: 数据库文件路径
             storage_path: 存储目录路径
             backup_dir: 备份文件存储目录
+            snapshot_pages_per_step: 数据库快照每步复制的页数（每步之间释放读锁）
+            snapshot_step_sleep: 每步之后的休眠秒数，用于限制快照对线上流量的影响
+            compression_threads: 完整备份的压缩线程数（默认使用全部 CPU）
+            compression_level: gzip 压缩级别
+            io_bytes_per_sec: 备份写盘速率上限（字节/秒），为空表示不限速
         """
         self.db_path = db_path
         self.storage_path = storage_path
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_pages_per_step = snapshot_pages_per_step
+        self.snapshot_step_sleep = snapshot_step_sleep
+        self.compression_threads = compression_threads
+        self.compression_level = compression_level
+        self.io_bucket = make_bucket(io_bytes_per_sec)
     
     def create_backup(self, name: Optional[str] = None, 
                      include_storage: bool = True) -> Dict[str, any]:
         """
         创建备份
         
+        存储文件直接从原路径流式写入 tar，不再复制到临时目录；压缩由
+        ParallelGzipWriter 多线程完成，并在写出时同步计算校验和。
+        
         Args:
             name: 备份名称（可选）
             include_storage: 是否包含存储文件
@@ -48,77 +98,95 @@ class BackupService:
         backup_name = name or f"backup_{timestamp}"
         backup_filename = f"{backup_name}.tar.gz"
         backup_path = self.backup_dir / backup_filename
+        partial_path = self.backup_dir / f".{backup_filename}.partial"
         
-        # 创建临时目录
-        temp_dir = self.backup_dir / f"temp_{timestamp}"
-        temp_dir.mkdir(exist_ok=True)
+        storage_exists = include_storage and os.path.exists(self.storage_path)
         
-        try:
-            # 1. 备份数据库
-            db_backup_path = temp_dir / "portal.db"
-            shutil.copy2(self.db_path, db_backup_path)
-            
-            # 2. 备份存储文件（如果需要）
-            if include_storage and os.path.exists(self.storage_path):
-                storage_backup_path = temp_dir / "storage"
-                if os.path.isdir(self.storage_path):
-                    shutil.copytree(self.storage_path, storage_backup_path)
-                else:
-                    shutil.copy2(self.storage_path, storage_backup_path)
-            
-            # 3. 创建备份元数据
-            metadata = {
-                "name": backup_name,
-                "created_at": datetime.now().isoformat(),
-                "database_size": os.path.getsize(db_backup_path),
-                "includes_storage": include_storage,
-                "db_path": self.db_path,
-                "storage_path": self.storage_path
-            }
-            
-            if include_storage and os.path.exists(self.storage_path):
-                metadata["storage_size"] = self._get_dir_size(storage_backup_path)
-            
-            metadata_path = temp_dir / "metadata.json"
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            
-            # 4. 创建压缩包
-            with tarfile.open(backup_path, "w:gz") as tar:
-                tar.add(temp_dir, arcname=backup_name)
-            
-            # 5. 计算校验和
-            checksum = self._calculate_checksum(backup_path)
-            
-            # 6. 获取文件大小
-            file_size = os.path.getsize(backup_path)
-            
-            return {
-                "backup_id": backup_name,
-                "filename": backup_filename,
-                "path": str(backup_path),
-                "size": file_size,
-                "checksum": checksum,
-                "created_at": metadata["created_at"],
-                "includes_storage": include_storage,
-                "metadata": metadata
-            }
+        # 数据库快照较小，仍落盘到临时目录；存储文件不做任何复制
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as snapshot_dir:
+            try:
+                # 1. 备份数据库
+                db_backup_path = Path(snapshot_dir) / "portal.db"
+                snapshot = self.snapshot_database(str(db_backup_path))
+                
+                # 2. 创建备份元数据
+                metadata = {
+                    "name": backup_name,
+                    "created_at": datetime.now().isoformat(),
+                    "database_size": os.path.getsize(db_backup_path),
+                    "database_snapshot": snapshot,
+                    "includes_storage": include_storage,
+                    "db_path": self.db_path,
+                    "storage_path": self.storage_path
+                }
+                
+                if storage_exists:
+                    if os.path.isdir(self.storage_path):
+                        metadata["storage_size"] = self._get_dir_size(Path(self.storage_path))
+                    else:
+                        metadata["storage_size"] = os.path.getsize(self.storage_path)
+                
+                # 3. 流式写入压缩包（元数据放在首位，读取时无需解压整个包）
+                with open(partial_path, "wb") as raw:
+                    gz = ParallelGzipWriter(ThrottledWriter(raw, self.io_bucket),
+                                            level=self.compression_level,
+                                            threads=self.compression_threads)
+                    with gz:
+                        with tarfile.open(fileobj=gz, mode="w|") as tar:
+                            metadata_bytes = json.dumps(metadata, indent=2, ensure_ascii=False).encode('utf-8')
+                            info = tarfile.TarInfo(f"{backup_name}/metadata.json")
+                            info.size = len(metadata_bytes)
+                            info.mtime = int(time.time())
+                            tar.addfile(info, io.BytesIO(metadata_bytes))
+                            
+                            tar.add(db_backup_path, arcname=f"{backup_name}/portal.db")
+                            
+                            if storage_exists:
+                                tar.add(self.storage_path, arcname=f"{backup_name}/storage")
+                
+                os.replace(partial_path, backup_path)
+            finally:
+                if partial_path.exists():
+                    partial_path.unlink()
         
-        finally:
-            # 清理临时目录
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
+        # 4. 校验和在写出时已计算，另存一份供列表和详情使用
+        checksum = gz.hexdigest()
+        self._checksum_path(backup_path).write_text(checksum, encoding='utf-8')
+        
+        return {
+            "backup_id": backup_name,
+            "filename": backup_filename,
+            "path": str(backup_path),
+            "size": gz.bytes_out,
+            "checksum": checksum,
+            "created_at": metadata["created_at"],
+            "includes_storage": include_storage,
+            "metadata": metadata
+        }
     
     def restore_backup(self, backup_filename: str, 
                       target_db_path: Optional[str] = None,
-                      target_storage_path: Optional[str] = None) -> Dict[str, any]:
+                      target_storage_path: Optional[str] = None,
+                      restore_database: bool = True,
+                      restore_storage: bool = True,
+                      storage_paths: Optional[List[str]] = None) -> Dict[str, any]:
         """
         恢复备份
         
+        单次顺序读取压缩包，成员直接写到目标位置旁的临时路径后 rename，
+        不解压整包、不做存储目录的安全副本：
+        - 完整恢复存储时，先流式写入同级的暂存目录，再把当前存储 rename
+          为 <storage>.backup_<timestamp> 并把暂存目录 rename 到位
+        - 指定 storage_paths 时只恢复这些路径（存储内相对路径或其前缀，
+          如某个包的目录），逐个文件原子替换，其余文件保持不动
+        
         Args:
             backup_filename: 备份文件名
             target_db_path: 目标数据库路径（可选，默认使用原路径）
             target_storage_path: 目标存储路径（可选，默认使用原路径）
+            restore_database: 是否恢复数据库
+            restore_storage: 是否恢复存储文件
+            storage_paths: 只恢复这些存储路径（可选）
         
         Returns:
             恢复信息字典
@@ -128,78 +196,414 @@ class BackupService:
         if not backup_path.exists():
             raise ValueError(f"Backup file not found: {backup_filename}")
         
-        # 创建临时目录
-        temp_dir = self.backup_dir / f"restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        temp_dir.mkdir(exist_ok=True)
+        selectors = self._normalize_selectors(storage_paths)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target_db = target_db_path or self.db_path
+        target_storage = Path(target_storage_path or self.storage_path)
+        
+        # 完整恢复时写入与目标同级的暂存目录，保证最后一步是同文件系统的 rename
+        staging = None
+        if restore_storage and selectors is None:
+            staging = target_storage.with_name(f".{target_storage.name}.restoring_{stamp}")
+        
+        metadata = {}
+        db_temp = None
+        restored_files = 0
+        kept_storage = None
         
         try:
-            # 1. 解压备份文件
-            with tarfile.open(backup_path, "r:gz") as tar:
-                tar.extractall(temp_dir)
-            
-            # 2. 查找解压后的目录
-            extracted_dirs = [d for d in temp_dir.iterdir() if d.is_dir()]
-            if not extracted_dirs:
-                raise ValueError("Invalid backup file: no data found")
-            
-            backup_dir = extracted_dirs[0]
-            
-            # 3. 读取元数据
-            metadata_path = backup_dir / "metadata.json"
-            if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-            else:
-                metadata = {}
+            with tarfile.open(backup_path, "r|gz") as tar:
+                for member in tar:
+                    parts = member.name.split("/", 2)
+                    if len(parts) < 2:
+                        continue
+                    
+                    if len(parts) == 2 and parts[1] == "metadata.json" and member.isfile():
+                        metadata = json.load(tar.extractfile(member))
+                    
+                    elif len(parts) == 2 and parts[1] == "portal.db" and member.isfile():
+                        if restore_database:
+                            db_temp = Path(f"{target_db}.incoming_{stamp}")
+                            self._extract_member(tar, member, db_temp)
+                    
+                    elif parts[1] == "storage" and restore_storage and member.isfile():
+                        rel_path = parts[2] if len(parts) == 3 else ""
+                        if not self._is_safe_relative(rel_path):
+                            raise ValueError(f"Unsafe path in backup: {member.name}")
+                        
+                        if staging is not None:
+                            self._extract_member(tar, member, staging / rel_path)
+                            restored_files += 1
+                        elif self._is_selected(rel_path, selectors):
+                            destination = target_storage / rel_path
+                            temp_path = destination.with_name(f".{destination.name}.restoring")
+                            self._extract_member(tar, member, temp_path)
+                            os.replace(temp_path, destination)
+                            restored_files += 1
             
-            # 4. 恢复数据库
-            db_backup_path = backup_dir / "portal.db"
-            if db_backup_path.exists():
-                target_db = target_db_path or self.db_path
-                
-                # 备份当前数据库
-                if os.path.exists(target_db):
-                    backup_current = f"{target_db}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    shutil.copy2(target_db, backup_current)
-                
-                # 恢复数据库
-                shutil.copy2(db_backup_path, target_db)
-            else:
-                raise ValueError("Database backup not found in backup file")
+            # 恢复数据库（保留当前数据库并原子替换）
+            if restore_database:
+                if db_temp is None:
+                    raise ValueError("Database backup not found in backup file")
+                self.swap_database(str(db_temp), target_db)
             
-            # 5. 恢复存储文件（如果存在）
-            storage_backup_path = backup_dir / "storage"
-            if storage_backup_path.exists():
-                target_storage = target_storage_path or self.storage_path
-                
-                # 备份当前存储
-                if os.path.exists(target_storage):
-                    backup_current_storage = f"{target_storage}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    if os.path.isdir(target_storage):
-                        shutil.copytree(target_storage, backup_current_storage)
-                    else:
-                        shutil.copy2(target_storage, backup_current_storage)
-                
-                # 恢复存储
-                if os.path.isdir(target_storage):
-                    shutil.rmtree(target_storage)
-                
-                if os.path.isdir(storage_backup_path):
-                    shutil.copytree(storage_backup_path, target_storage)
-                else:
-                    shutil.copy2(storage_backup_path, target_storage)
+            # 替换整个存储目录
+            if staging is not None and staging.exists():
+                kept_storage = self._swap_directory(staging, target_storage, stamp)
             
             return {
                 "success": True,
                 "backup_filename": backup_filename,
                 "restored_at": datetime.now().isoformat(),
+                "restored_database": restore_database,
+                "restored_files": restored_files,
+                "previous_storage_path": kept_storage,
                 "metadata": metadata
             }
         
         finally:
-            # 清理临时目录
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            if db_temp is not None and db_temp.exists():
+                db_temp.unlink()
+            if staging is not None and staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+    
+    def create_incremental_backup(self, name: Optional[str] = None,
+                                  include_storage: bool = True) -> Dict[str, any]:
+        """
+        创建增量去重备份
+        
+        与上一份清单相比大小和修改时间都未变化的文件直接沿用其哈希，
+        不再读取；新增或变化的文件在一次读取中完成哈希和入库。
+        
+        Args:
+            name: 备份名称（可选）
+            include_storage: 是否包含存储文件
+        
+        Returns:
+            备份信息字典
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_name = name or f"incremental_{timestamp}"
+        manifest_path = self._manifest_path(backup_name)
+        
+        with self._blob_store_lock():
+            if manifest_path.exists():
+                raise ValueError(f"Backup already exists: {backup_name}")
+            return self._create_incremental_backup(backup_name, manifest_path, include_storage)
+    
+    def _create_incremental_backup(self, backup_name: str, manifest_path: Path,
+                                   include_storage: bool) -> Dict[str, any]:
+        parent = self._latest_manifest()
+        parent_files = parent.get("files", {}) if parent else {}
+        stats = {"new_blobs": 0, "new_bytes": 0, "reused_files": 0, "hashed_files": 0}
+        
+        # 1. 数据库（先做一致性快照再入库）
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as snapshot_dir:
+            snapshot_path = Path(snapshot_dir) / "portal.db"
+            snapshot = self.snapshot_database(str(snapshot_path))
+            database = self._store_blob(snapshot_path, stats)
+        
+        # 2. 存储文件
+        files = {}
+        if include_storage and os.path.isdir(self.storage_path):
+            storage_root = Path(self.storage_path)
+            for dirpath, dirnames, filenames in os.walk(storage_root):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    file_path = Path(dirpath) / filename
+                    rel_path = file_path.relative_to(storage_root).as_posix()
+                    stat = file_path.stat()
+                    
+                    previous = parent_files.get(rel_path)
+                    if (previous and previous["size"] == stat.st_size
+                            and previous["mtime_ns"] == stat.st_mtime_ns
+                            and self._blob_path(previous["sha256"]).exists()):
+                        files[rel_path] = previous
+                        stats["reused_files"] += 1
+                        continue
+                    
+                    entry = self._store_blob(file_path, stats)
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    files[rel_path] = entry
+        
+        # 3. 写入清单（最后写入，清单存在即表示备份完整）
+        manifest = {
+            "name": backup_name,
+            "type": "incremental",
+            "created_at": datetime.now().isoformat(),
+            "parent": parent["name"] if parent else None,
+            "includes_storage": include_storage,
+            "db_path": self.db_path,
+            "storage_path": self.storage_path,
+            "database": database,
+            "database_snapshot": snapshot,
+            "files": files,
+            "stats": stats
+        }
+        self._write_json_atomic(manifest_path, manifest)
+        
+        return {
+            "backup_id": backup_name,
+            "filename": manifest_path.name,
+            "path": str(manifest_path),
+            "created_at": manifest["created_at"],
+            "includes_storage": include_storage,
+            "parent": manifest["parent"],
+            "file_count": len(files),
+            "total_size": database["size"] + sum(f["size"] for f in files.values()),
+            **stats
+        }
+    
+    def restore_incremental_backup(self, backup_name: str,
+                                   target_db_path: Optional[str] = None,
+                                   target_storage_path: Optional[str] = None,
+                                   restore_database: bool = True,
+                                   restore_storage: bool = True,
+                                   storage_paths: Optional[List[str]] = None) -> Dict[str, any]:
+        """
+        从增量备份清单还原某一时间点的数据
+        
+        选择性恢复的语义与 restore_backup 相同。
+        
+        Args:
+            backup_name: 备份名称
+            target_db_path: 目标数据库路径（可选，默认使用原路径）
+            target_storage_path: 目标存储路径（可选，默认使用原路径）
+            restore_database: 是否恢复数据库
+            restore_storage: 是否恢复存储文件
+            storage_paths: 只恢复这些存储路径（可选）
+        
+        Returns:
+            恢复信息字典
+        """
+        manifest = self._read_manifest(backup_name)
+        if manifest is None:
+            raise ValueError(f"Incremental backup not found: {backup_name}")
+        
+        selectors = self._normalize_selectors(storage_paths)
+        restore_storage = restore_storage and manifest["includes_storage"]
+        files = {}
+        if restore_storage:
+            files = {rel: entry for rel, entry in manifest["files"].items()
+                     if self._is_selected(rel, selectors)}
+        
+        # 先校验所有数据块都存在，避免还原到一半才失败
+        entries = list(files.values())
+        if restore_database:
+            entries.append(manifest["database"])
+        missing = [e["sha256"] for e in entries if not self._blob_path(e["sha256"]).exists()]
+        if missing:
+            raise ValueError(f"Backup {backup_name} is missing {len(missing)} blob(s)")
+        
+        if restore_database:
+            target_db = target_db_path or self.db_path
+            self.swap_database(str(self._blob_path(manifest["database"]["sha256"])), target_db)
+        
+        kept_storage = None
+        if restore_storage:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            target_storage = Path(target_storage_path or self.storage_path)
+            
+            if selectors is None:
+                staging = target_storage.with_name(f".{target_storage.name}.restoring_{stamp}")
+                try:
+                    for rel_path, entry in files.items():
+                        self._copy_blob_to(entry["sha256"], staging / rel_path)
+                    staging.mkdir(parents=True, exist_ok=True)
+                    kept_storage = self._swap_directory(staging, target_storage, stamp)
+                finally:
+                    if staging.exists():
+                        shutil.rmtree(staging, ignore_errors=True)
+            else:
+                for rel_path, entry in files.items():
+                    self._copy_blob_to(entry["sha256"], target_storage / rel_path)
+        
+        return {
+            "success": True,
+            "backup_filename": backup_name,
+            "restored_at": datetime.now().isoformat(),
+            "restored_database": restore_database,
+            "restored_files": len(files),
+            "previous_storage_path": kept_storage,
+            "metadata": {k: v for k, v in manifest.items() if k != "files"}
+        }
+    
+    def list_incremental_backups(self) -> List[Dict[str, any]]:
+        """
+        列出所有增量备份
+        
+        Returns:
+            备份摘要列表（按创建时间倒序）
+        """
+        backups = []
+        
+        for manifest in self._iter_manifests():
+            backups.append({
+                "name": manifest["name"],
+                "created_at": manifest["created_at"],
+                "parent": manifest.get("parent"),
+                "includes_storage": manifest["includes_storage"],
+                "file_count": len(manifest["files"]),
+                "stats": manifest.get("stats", {})
+            })
+        
+        backups.sort(key=lambda x: x["created_at"], reverse=True)
+        return backups
+    
+    def delete_incremental_backup(self, backup_name: str) -> Dict[str, any]:
+        """
+        删除增量备份清单，并回收不再被任何清单引用的数据块
+        
+        Args:
+            backup_name: 备份名称
+        
+        Returns:
+            删除结果
+        """
+        manifest_path = self._manifest_path(backup_name)
+        with self._blob_store_lock():
+            if not manifest_path.exists():
+                return {"success": False, "removed_blobs": 0, "freed_bytes": 0}
+            
+            manifest_path.unlink()
+            removed, freed = self._collect_garbage()
+        
+        return {"success": True, "removed_blobs": removed, "freed_bytes": freed}
+    
+    def collect_garbage(self) -> tuple:
+        """
+        删除未被任何清单引用的数据块
+        
+        Returns:
+            (删除的数据块数, 释放的字节数)
+        """
+        with self._blob_store_lock():
+            return self._collect_garbage()
+    
+    def _collect_garbage(self) -> tuple:
+        referenced = set()
+        for manifest in self._iter_manifests():
+            referenced.add(manifest["database"]["sha256"])
+            referenced.update(entry["sha256"] for entry in manifest["files"].values())
+        
+        removed = 0
+        freed = 0
+        blob_root = self.backup_dir / self.BLOB_DIR
+        if blob_root.exists():
+            for blob in blob_root.glob("*/*"):
+                if blob.name not in referenced:
+                    freed += blob.stat().st_size
+                    blob.unlink()
+                    removed += 1
+        
+        return removed, freed
+    
+    def snapshot_database(self, dest_path: str,
+                          progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, any]:
+        """
+        使用 SQLite 在线备份 API 生成事务一致的数据库快照
+        
+        按 snapshot_pages_per_step 分步复制，每步之间释放读锁让写入者继续；
+        复制过程中源库被修改时 SQLite 会自动重新开始，保证结果一致。
+        
+        Args:
+            dest_path: 快照文件路径
+            progress: 进度回调 progress(remaining_pages, total_pages)
+        
+        Returns:
+            快照统计（页数、耗时、每秒页数）
+        """
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+        
+        def on_step(status, remaining, total):
+            if progress:
+                progress(remaining, total)
+            if self.io_bucket and remaining:
+                self.io_bucket.consume(self.snapshot_pages_per_step * page_size)
+            if self.snapshot_step_sleep and remaining:
+                time.sleep(self.snapshot_step_sleep)
+        
+        started = time.monotonic()
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(dest_path)
+        try:
+            page_size = source.execute("PRAGMA page_size").fetchone()[0]
+            source.backup(target, pages=self.snapshot_pages_per_step, progress=on_step)
+            pages = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+            source.close()
+        
+        elapsed = time.monotonic() - started
+        return {
+            "pages": pages,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(pages / elapsed, 1) if elapsed > 0 else None
+        }
+    
+    def swap_database(self, source_path: str, target_db: str) -> Optional[str]:
+        """
+        用备份中的数据库原子替换目标数据库
+        
+        先复制到目标目录下的临时文件并做完整性检查，再 rename 覆盖，
+        其他进程要么看到旧库要么看到新库。原数据库通过硬链接保留为
+        <target>.backup_<timestamp>，无需整库复制。目标库处于 WAL 模式
+        （存在 -wal 文件）时改用在线备份 API 写入，避免与残留 WAL 不一致。
+        
+        Args:
+            source_path: 备份中的数据库文件
+            target_db: 目标数据库路径
+        
+        Returns:
+            保留的原数据库路径（目标原本不存在时为 None）
+        """
+        target = Path(target_db)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        wal_mode = os.path.exists(f"{target_db}-wal")
+        kept_path = None
+        if target.exists():
+            kept_path = f"{target_db}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        if wal_mode:
+            if kept_path:
+                self._sqlite_copy(target_db, kept_path)
+            self._sqlite_copy(source_path, target_db)
+            return kept_path
+        
+        temp_path = target.with_name(f".{target.name}.restoring")
+        try:
+            shutil.copyfile(source_path, temp_path)
+            conn = sqlite3.connect(temp_path)
+            try:
+                result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            finally:
+                conn.close()
+            if result != "ok":
+                raise ValueError(f"Backup database failed integrity check: {result}")
+            
+            if kept_path:
+                try:
+                    os.link(target, kept_path)
+                except OSError:
+                    shutil.copy2(target, kept_path)
+            os.replace(temp_path, target)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        
+        return kept_path
+    
+    def _sqlite_copy(self, source_path: str, dest_path: str):
+        """通过在线备份 API 复制数据库"""
+        source = sqlite3.connect(source_path)
+        dest = sqlite3.connect(dest_path)
+        try:
+            source.backup(dest, pages=self.snapshot_pages_per_step)
+        finally:
+            dest.close()
+            source.close()
     
     def list_backups(self) -> List[Dict[str, any]]:
         """
@@ -222,7 +626,7 @@ class BackupService:
                     "filename": backup_file.name,
                     "size": stat.st_size,
                     "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "checksum": self._calculate_checksum(backup_file),
+                    "checksum": self._read_checksum(backup_file),
                     "metadata": metadata
                 })
             
@@ -252,6 +656,9 @@ class BackupService:
         
         try:
             backup_path.unlink()
+            checksum_path = self._checksum_path(backup_path)
+            if checksum_path.exists():
+                checksum_path.unlink()
             return True
         except Exception:
             return False
@@ -278,7 +685,7 @@ class BackupService:
             "filename": backup_filename,
             "size": stat.st_size,
             "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-            "checksum": self._calculate_checksum(backup_path),
+            "checksum": self._read_checksum(backup_path),
             "metadata": metadata
         }
     
@@ -299,6 +706,159 @@ class BackupService:
         
         return str(backup_path)
     
+    @contextmanager
+    def _blob_store_lock(self):
+        """独占数据块存储（阻塞等待），用于创建增量备份和回收数据块"""
+        key = str(self.backup_dir.resolve())
+        with BackupService._store_locks_guard:
+            lock = BackupService._store_locks.setdefault(key, threading.Lock())
+        
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.backup_dir / self.LOCK_FILE, 'a') as lock_file:
+                # 关闭文件时释放文件锁
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                yield
+    
+    def _blob_path(self, digest: str) -> Path:
+        """数据块在内容寻址存储中的路径"""
+        return self.backup_dir / self.BLOB_DIR / digest[:2] / digest
+    
+    def _manifest_path(self, backup_name: str) -> Path:
+        """增量备份清单路径"""
+        if not backup_name or "/" in backup_name or backup_name.startswith("."):
+            raise ValueError(f"Invalid backup name: {backup_name}")
+        return self.backup_dir / self.MANIFEST_DIR / f"{backup_name}.json"
+    
+    def _read_manifest(self, backup_name: str) -> Optional[Dict]:
+        """读取增量备份清单"""
+        manifest_path = self._manifest_path(backup_name)
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _iter_manifests(self):
+        """遍历所有增量备份清单"""
+        manifest_dir = self.backup_dir / self.MANIFEST_DIR
+        if not manifest_dir.exists():
+            return
+        for manifest_path in manifest_dir.glob("*.json"):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+    
+    def _latest_manifest(self) -> Optional[Dict]:
+        """最近一次增量备份的清单"""
+        return max(self._iter_manifests(), key=lambda m: m["created_at"], default=None)
+    
+    def _store_blob(self, source: Path, stats: Dict) -> Dict:
+        """一次读取完成哈希计算和入库；内容已存在时丢弃临时文件"""
+        blob_root = self.backup_dir / self.BLOB_DIR
+        blob_root.mkdir(parents=True, exist_ok=True)
+        
+        sha256_hash = hashlib.sha256()
+        size = 0
+        fd, temp_name = tempfile.mkstemp(dir=blob_root, prefix=".incoming_")
+        try:
+            with os.fdopen(fd, "wb") as out, open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(self.COPY_CHUNK_SIZE), b""):
+                    if self.io_bucket:
+                        self.io_bucket.consume(len(chunk))
+                    sha256_hash.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            
+            digest = sha256_hash.hexdigest()
+            blob_path = self._blob_path(digest)
+            stats["hashed_files"] += 1
+            
+            if blob_path.exists():
+                os.unlink(temp_name)
+            else:
+                blob_path.parent.mkdir(exist_ok=True)
+                os.replace(temp_name, blob_path)
+                stats["new_blobs"] += 1
+                stats["new_bytes"] += size
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+        
+        return {"sha256": digest, "size": size}
+    
+    def _copy_blob_to(self, digest: str, target: Path):
+        """将数据块原子地复制到目标路径"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_target = target.with_name(f".{target.name}.restoring")
+        shutil.copyfile(self._blob_path(digest), temp_target)
+        os.replace(temp_target, target)
+    
+    @staticmethod
+    def _normalize_selectors(storage_paths: Optional[List[str]]) -> Optional[List[str]]:
+        """规范化选择性恢复的路径列表"""
+        if storage_paths is None:
+            return None
+        selectors = [p.strip("/") for p in storage_paths if p and p.strip("/")]
+        for selector in selectors:
+            if not BackupService._is_safe_relative(selector):
+                raise ValueError(f"Invalid storage path: {selector}")
+        return selectors
+    
+    @staticmethod
+    def _is_selected(rel_path: str, selectors: Optional[List[str]]) -> bool:
+        """路径是否等于某个选择项或位于其目录之下"""
+        if selectors is None:
+            return True
+        return any(rel_path == s or rel_path.startswith(s + "/") for s in selectors)
+    
+    @staticmethod
+    def _is_safe_relative(rel_path: str) -> bool:
+        """拒绝绝对路径和 .. 以防写到存储目录之外"""
+        if rel_path.startswith("/") or "\\" in rel_path:
+            return False
+        return ".." not in rel_path.split("/")
+    
+    def _extract_member(self, tar: tarfile.TarFile, member: tarfile.TarInfo, destination: Path):
+        """将 tar 成员流式写到指定路径"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        source = tar.extractfile(member)
+        with open(destination, "wb") as out:
+            shutil.copyfileobj(source, out, self.COPY_CHUNK_SIZE)
+        os.utime(destination, (member.mtime, member.mtime))
+    
+    def _swap_directory(self, staging: Path, target: Path, stamp: str) -> Optional[str]:
+        """用暂存目录替换目标目录，原目录 rename 保留；返回保留路径"""
+        kept_path = None
+        if target.exists():
+            kept_path = str(target.with_name(f"{target.name}.backup_{stamp}"))
+            os.rename(target, kept_path)
+        os.rename(staging, target)
+        return kept_path
+    
+    def _write_json_atomic(self, path: Path, data: Dict):
+        """先写临时文件再重命名，保证读者看不到半个文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    def _checksum_path(self, backup_path: Path) -> Path:
+        """备份校验和文件路径"""
+        return backup_path.with_name(f"{backup_path.name}.sha256")
+    
+    def _read_checksum(self, backup_path: Path) -> str:
+        """读取创建时记录的校验和，没有记录的旧备份才回读计算"""
+        checksum_path = self._checksum_path(backup_path)
+        if checksum_path.exists():
+            return checksum_path.read_text(encoding='utf-8').strip()
+        return self._calculate_checksum(backup_path)
+    
     def _calculate_checksum(self, file_path: Path) -> str:
         """计算文件校验和"""
         sha256_hash = hashlib.sha256()
@@ -322,29 +882,15 @@ class BackupService:
         return total_size
     
     def _read_metadata_from_file(self, backup_path: Path) -> Optional[Dict]:
-        """从备份文件中读取元数据"""
-        import tempfile
-        
-        temp_dir = None
+        """从备份文件中读取元数据（流式读取，找到 metadata.json 即停止）"""
         try:
-            temp_dir = Path(tempfile.mkdtemp())
-            
-            # 解压备份文件
-            with tarfile.open(backup_path, "r:gz") as tar:
-                tar.extractall(temp_dir)
-            
-            # 查找元数据文件
-            metadata_files = list(temp_dir.glob("*/metadata.json"))
-            
-            if metadata_files:
-                with open(metadata_files[0], 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            with tarfile.open(backup_path, "r|gz") as tar:
+                for member in tar:
+                    if member.isfile() and member.name.count("/") == 1 \
+                            and member.name.endswith("/metadata.json"):
+                        return json.load(tar.extractfile(member))
             
             return None
         
         except Exception:
             return None
-        
-        finally:
-            if temp_dir and temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
@@ -21,18 +21,281 @@ import json
 import shutil
 import tarfile
 import hashlib
+import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Iterable
 from abc import ABC, abstractmethod
-import threading
-import schedule
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ..shared import Config
+from ..shared.throttle import TokenBucket, copy_throttled, make_bucket
+from .backup_scheduler import BackupScheduler, CronSchedule, IntervalSchedule
+
+
+def _file_sha256(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """流式计算文件 sha256，内存占用与文件大小无关"""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for byte_block in iter(lambda: f.read(chunk_size), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+
+class ArchiveCatalog:
+    """
+    归档目录 - SQLite 存储的归档记录
+    
+    archive_id/created_at/expires_at/status/size/checksum 为带索引的列，
+    完整记录以 JSON 存在 record 列中。写操作都在 BEGIN IMMEDIATE 事务中执行，
+    多个进程或调度线程同时写入时由 SQLite 锁串行化，不会出现整文件覆盖
+    导致的记录丢失。首次打开时会导入旧版 JSON 元数据文件。
+    """
+    
+    BATCH_SIZE = 500
+    
+    def __init__(self, db_path: str, legacy_json: Optional[str] = None):
+        """
+        初始化归档目录
+        
+        Args:
+            db_path: 目录数据库路径
+            legacy_json: 旧版 JSON 元数据文件，存在时导入后重命名为 *.migrated
+        """
+        self.db_path = str(db_path)
+        self._init_database()
+        if legacy_json:
+            self._import_legacy(Path(legacy_json))
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """写事务：开始时即获取写锁，避免读-改-写之间被其他写者插入"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    def _init_database(self):
+        """初始化目录表和索引"""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS archive_catalog (
+                    archive_id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    expires_at TEXT,
+                    status TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    checksum TEXT,
+                    record TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_archive_catalog_expires_at
+                    ON archive_catalog(expires_at);
+                CREATE INDEX IF NOT EXISTS idx_archive_catalog_created_at
+                    ON archive_catalog(created_at);
+                CREATE INDEX IF NOT EXISTS idx_archive_catalog_status
+                    ON archive_catalog(status);
+            """)
+        finally:
+            conn.close()
+    
+    def _import_legacy(self, legacy_path: Path):
+        """导入旧版 JSON 元数据（已存在的记录不覆盖）"""
+        if not legacy_path.exists():
+            return
+        
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO archive_catalog VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._row(dict(record, archive_id=archive_id))
+                 for archive_id, record in records.items()]
+            )
+        
+        try:
+            legacy_path.rename(legacy_path.with_name(legacy_path.name + '.migrated'))
+        except FileNotFoundError:
+            # 另一个进程已完成迁移
+            pass
+    
+    @staticmethod
+    def _row(record: Dict) -> tuple:
+        """从记录中提取索引列"""
+        nested = record.get('metadata') or {}
+        return (
+            record['archive_id'],
+            record.get('created_at') or record.get('stored_at') or datetime.now().isoformat(),
+            record.get('expires_at'),
+            record.get('status', 'archived'),
+            record.get('size', nested.get('size', 0)) or 0,
+            record.get('checksum', nested.get('checksum')),
+            json.dumps(record, ensure_ascii=False)
+        )
+    
+    def put(self, record: Dict):
+        """写入或替换一条记录"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO archive_catalog VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(record)
+            )
+    
+    def get(self, archive_id: str) -> Optional[Dict]:
+        """按 ID 读取记录"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT record FROM archive_catalog WHERE archive_id = ?", (archive_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['record']) if row else None
+    
+    def get_many(self, archive_ids: Iterable[str]) -> Dict[str, Dict]:
+        """按批用 IN 查询读取多条记录，返回 ID -> 记录（不存在的 ID 不出现）"""
+        archive_ids = list(archive_ids)
+        records = {}
+        if not archive_ids:
+            return records
+        
+        conn = self._connect()
+        try:
+            for start in range(0, len(archive_ids), self.BATCH_SIZE):
+                batch = archive_ids[start:start + self.BATCH_SIZE]
+                rows = conn.execute(
+                    f"SELECT archive_id, record FROM archive_catalog "
+                    f"WHERE archive_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for row in rows:
+                    records[row['archive_id']] = json.loads(row['record'])
+        finally:
+            conn.close()
+        return records
+    
+    def __contains__(self, archive_id: str) -> bool:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM archive_catalog WHERE archive_id = ?", (archive_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row is not None
+    
+    def update(self, archive_id: str, changes: Dict) -> Optional[Dict]:
+        """
+        原子地合并字段到已有记录
+        
+        Returns:
+            更新后的记录；记录不存在时返回 None
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT record FROM archive_catalog WHERE archive_id = ?", (archive_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            record = json.loads(row['record'])
+            record.update(changes)
+            conn.execute(
+                "INSERT OR REPLACE INTO archive_catalog VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(record)
+            )
+        return record
+    
+    def delete(self, archive_id: str) -> bool:
+        """删除一条记录"""
+        return self.delete_many([archive_id]) == 1
+    
+    def delete_many(self, archive_ids: Iterable[str]) -> int:
+        """在一个事务中批量删除记录，返回删除条数"""
+        archive_ids = list(archive_ids)
+        if not archive_ids:
+            return 0
+        
+        deleted = 0
+        with self._transaction() as conn:
+            for start in range(0, len(archive_ids), self.BATCH_SIZE):
+                batch = archive_ids[start:start + self.BATCH_SIZE]
+                cursor = conn.execute(
+                    f"DELETE FROM archive_catalog WHERE archive_id IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                deleted += cursor.rowcount
+        return deleted
+    
+    def list_all(self) -> List[Dict]:
+        """按创建时间倒序列出全部记录"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT record FROM archive_catalog ORDER BY created_at DESC"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row['record']) for row in rows]
+    
+    def find_expired(self, now: Optional[str] = None) -> List[str]:
+        """按 expires_at 索引做范围查询，返回已过期的归档 ID"""
+        now = now or datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT archive_id FROM archive_catalog "
+                "WHERE expires_at IS NOT NULL AND expires_at < ? ORDER BY expires_at",
+                (now,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row['archive_id'] for row in rows]
+    
+    def stats(self) -> Dict:
+        """归档数量和总大小"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) AS archive_count, COALESCE(SUM(size), 0) AS total_size "
+                "FROM archive_catalog"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {'archive_count': row['archive_count'], 'total_size': row['total_size']}
 
 
 class ColdStorageBackend(ABC):
     """冷存储后端抽象基类"""
     
+    # 归档的恢复状态
+    STATE_AVAILABLE = 'available'    # 可直接检索
+    STATE_ARCHIVED = 'archived'      # 已深度归档，需要先发起恢复
+    STATE_RESTORING = 'restoring'    # 恢复进行中
+    STATE_RESTORED = 'restored'      # 已恢复出临时副本，可检索
+    
+    # 传输限速（字节/秒），由 set_bandwidth_limit 设置
+    bandwidth: Optional[TokenBucket] = None
+    
+    def set_bandwidth_limit(self, bytes_per_sec: Optional[int]):
+        """设置存储/检索的传输速率上限，为空表示不限速"""
+        self.bandwidth = make_bucket(bytes_per_sec)
+    
     @abstractmethod
     def store(self, backup_path: str, metadata: Dict) -> Dict:
         """存储备份到冷存储"""
@@ -57,6 +320,18 @@ class ColdStorageBackend(ABC):
     def get_storage_info(self) -> Dict:
         """获取存储信息"""
         pass
+    
+    def delete_many(self, backup_ids: List[str]) -> List[str]:
+        """批量删除归档，返回删除成功的 ID；后端可覆盖为批量接口"""
+        return [backup_id for backup_id in backup_ids if self.delete(backup_id)]
+    
+    def get_restore_status(self, backup_id: str) -> Dict:
+        """查询恢复状态；不需要解冻的后端始终可直接检索"""
+        return {'state': self.STATE_AVAILABLE, 'expiry': None}
+    
+    def request_restore(self, backup_id: str) -> Dict:
+        """发起恢复请求；不需要解冻的后端无需任何操作"""
+        return self.get_restore_status(backup_id)
 
 
 class LocalFileSystemBackend(ColdStorageBackend):
@@ -65,21 +340,10 @@ class LocalFileSystemBackend(ColdStorageBackend):
     def __init__(self, storage_path: str):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.metadata_file = self.storage_path / "archive_metadata.json"
-        self._load_metadata()
-    
-    def _load_metadata(self):
-        """加载元数据"""
-        if self.metadata_file.exists():
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
-        else:
-            self.metadata = {}
-    
-    def _save_metadata(self):
-        """保存元数据"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        self.catalog = ArchiveCatalog(
+            self.storage_path / "archive_catalog.db",
+            legacy_json=self.storage_path / "archive_metadata.json"
+        )
     
     def store(self, backup_path: str, metadata: Dict) -> Dict:
         """存储备份到本地文件系统"""
@@ -88,7 +352,11 @@ class LocalFileSystemBackend(ColdStorageBackend):
         archive_path = self.storage_path / archive_filename
         
         # 复制备份文件
-        shutil.copy2(backup_path, archive_path)
+        if self.bandwidth:
+            copy_throttled(backup_path, archive_path, self.bandwidth)
+            shutil.copystat(backup_path, archive_path)
+        else:
+            shutil.copy2(backup_path, archive_path)
         
         # 计算校验和
         checksum = self._calculate_checksum(archive_path)
@@ -106,53 +374,60 @@ class LocalFileSystemBackend(ColdStorageBackend):
         }
         
         # 保存元数据
-        self.metadata[archive_id] = archive_metadata
-        self._save_metadata()
+        self.catalog.put(dict(archive_metadata, status='stored'))
         
         return archive_metadata
     
     def retrieve(self, backup_id: str, local_path: str) -> bool:
         """从本地文件系统检索备份"""
-        if backup_id not in self.metadata:
+        archive_metadata = self.catalog.get(backup_id)
+        if archive_metadata is None:
             return False
         
-        archive_metadata = self.metadata[backup_id]
         archive_path = self.storage_path / archive_metadata['filename']
         
         if not archive_path.exists():
             return False
         
-        shutil.copy2(archive_path, local_path)
+        if self.bandwidth:
+            copy_throttled(archive_path, local_path, self.bandwidth)
+        else:
+            shutil.copy2(archive_path, local_path)
         return True
     
     def list_archives(self) -> List[Dict]:
         """列出所有归档"""
-        return list(self.metadata.values())
+        return self.catalog.list_all()
     
     def delete(self, backup_id: str) -> bool:
         """删除归档"""
-        if backup_id not in self.metadata:
-            return False
-        
-        archive_metadata = self.metadata[backup_id]
-        archive_path = self.storage_path / archive_metadata['filename']
-        
-        if archive_path.exists():
-            archive_path.unlink()
-        
-        del self.metadata[backup_id]
-        self._save_metadata()
+        return self.delete_many([backup_id]) == [backup_id]
+    
+    def delete_many(self, backup_ids: List[str]) -> List[str]:
+        """批量删除归档文件，文件名按批一次查出，目录记录在一个事务中删除"""
+        records = self.catalog.get_many(backup_ids)
+        deleted = []
+        for backup_id in backup_ids:
+            archive_metadata = records.get(backup_id)
+            if archive_metadata is None:
+                continue
+            
+            archive_path = self.storage_path / archive_metadata['filename']
+            if archive_path.exists():
+                archive_path.unlink()
+            deleted.append(backup_id)
         
-        return True
+        self.catalog.delete_many(deleted)
+        return deleted
     
     def get_storage_info(self) -> Dict:
         """获取存储信息"""
-        total_size = sum(m['size'] for m in self.metadata.values())
+        stats = self.catalog.stats()
         return {
             'storage_type': 'local',
             'storage_path': str(self.storage_path),
-            'archive_count': len(self.metadata),
-            'total_size': total_size,
+            'archive_count': stats['archive_count'],
+            'total_size': stats['total_size'],
             'available_space': shutil.disk_usage(self.storage_path).free
         }
     
@@ -166,11 +441,25 @@ class LocalFileSystemBackend(ColdStorageBackend):
 
 
 class S3ColdStorageBackend(ColdStorageBackend):
-    """S3 兼容存储后端（支持 AWS Glacier）"""
+    """S3 兼容存储后端（支持 AWS Glacier）
+    
+    上传使用分片并发（part_size / max_concurrency 可调），校验和以流式方式
+    计算并写入对象元数据；下载按字节范围并发拉取到 .part 文件，进度记录在
+    .part.json 中，中断后再次调用会跳过已完成的分片。GLACIER/DEEP_ARCHIVE
+    对象需先通过 request_restore 发起解冻，get_restore_status 查询进度。
+    """
+    
+    ARCHIVE_CLASSES = ('GLACIER', 'DEEP_ARCHIVE')
     
     def __init__(self, bucket: str, prefix: str = "", 
                  region: str = "us-east-1",
-                 storage_class: str = "GLACIER"):
+                 storage_class: str = "GLACIER",
+                 endpoint_url: Optional[str] = None,
+                 part_size: int = 64 * 1024 * 1024,
+                 max_concurrency: int = 8,
+                 restore_days: int = 7,
+                 restore_tier: str = "Standard",
+                 s3_client=None):
         """
         初始化 S3 后端
         
@@ -179,44 +468,81 @@ class S3ColdStorageBackend(ColdStorageBackend):
             prefix: 对象前缀
             region: AWS 区域
             storage_class: 存储类型（STANDARD, GLACIER, DEEP_ARCHIVE）
+            endpoint_url: 自定义 S3 端点（如 MinIO 等本地兼容服务）
+            part_size: 分片上传/分段下载的分片大小（字节）
+            max_concurrency: 并发传输的分片数
+            restore_days: Glacier 恢复副本保留天数
+            restore_tier: Glacier 恢复速度（Expedited, Standard, Bulk）
+            s3_client: 预先构造的 S3 客户端（可选）
         """
         self.bucket = bucket
         self.prefix = prefix
         self.region = region
         self.storage_class = storage_class
+        self.endpoint_url = endpoint_url
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.restore_days = restore_days
+        self.restore_tier = restore_tier
+        
+        if s3_client is not None:
+            self.s3_client = s3_client
+            self.boto3_available = True
+            return
         
         # 尝试导入 boto3
         try:
             import boto3
-            self.s3_client = boto3.client('s3', region_name=region)
+            self.s3_client = boto3.client('s3', region_name=region, endpoint_url=endpoint_url)
             self.boto3_available = True
         except ImportError:
             self.boto3_available = False
             print("Warning: boto3 not available. Install with: pip install boto3")
     
+    def _object_key(self, backup_id: str) -> str:
+        return f"{self.prefix}{backup_id}.tar.gz"
+    
+    def _transfer_config(self):
+        """分片上传配置（boto3 不可用时返回 None）"""
+        try:
+            from boto3.s3.transfer import TransferConfig
+        except ImportError:
+            return None
+        return TransferConfig(
+            multipart_threshold=self.part_size,
+            multipart_chunksize=self.part_size,
+            max_concurrency=self.max_concurrency
+        )
+    
     def store(self, backup_path: str, metadata: Dict) -> Dict:
         """存储备份到 S3"""
         if not self.boto3_available:
             raise RuntimeError("boto3 is not installed")
         
         archive_id = metadata.get('name', f"archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-        object_key = f"{self.prefix}{archive_id}.tar.gz"
+        object_key = self._object_key(archive_id)
         
-        # 计算校验和
-        with open(backup_path, 'rb') as f:
-            file_content = f.read()
-        checksum = hashlib.sha256(file_content).hexdigest()
+        # 流式计算校验和
+        checksum = _file_sha256(backup_path)
         
-        # 上传到 S3
-        extra_args = {}
+        # 分片并发上传
+        extra_args = {'Metadata': {'sha256': checksum}}
         if self.storage_class:
             extra_args['StorageClass'] = self.storage_class
         
+        upload_kwargs = {'ExtraArgs': extra_args}
+        if self.bandwidth:
+            # 传输回调在每个分片写出后触发，阻塞回调即可压低上传速率
+            upload_kwargs['Callback'] = self.bandwidth.consume
+        transfer_config = self._transfer_config()
+        if transfer_config is not None:
+            upload_kwargs['Config'] = transfer_config
+        
         self.s3_client.upload_file(
             backup_path,
             self.bucket,
             object_key,
-            ExtraArgs=extra_args
+            **upload_kwargs
         )
         
         # 获取对象信息
@@ -235,23 +561,146 @@ class S3ColdStorageBackend(ColdStorageBackend):
             'region': self.region
         }
     
+    def get_restore_status(self, backup_id: str) -> Dict:
+        """
+        查询对象的恢复状态
+        
+        Returns:
+            {'state': available|archived|restoring|restored, 'expiry': ...}
+        """
+        head = self.s3_client.head_object(Bucket=self.bucket, Key=self._object_key(backup_id))
+        return self._restore_state(head)
+    
+    def request_restore(self, backup_id: str) -> Dict:
+        """
+        对归档对象发起 Glacier 恢复请求（已在恢复中或无需恢复时不重复发起）
+        
+        Returns:
+            发起后的恢复状态
+        """
+        status = self.get_restore_status(backup_id)
+        if status['state'] != self.STATE_ARCHIVED:
+            return status
+        
+        self.s3_client.restore_object(
+            Bucket=self.bucket,
+            Key=self._object_key(backup_id),
+            RestoreRequest={
+                'Days': self.restore_days,
+                'GlacierJobParameters': {'Tier': self.restore_tier}
+            }
+        )
+        return {'state': self.STATE_RESTORING, 'expiry': None}
+    
+    def _restore_state(self, head: Dict) -> Dict:
+        """根据 head_object 的 StorageClass 和 Restore 字段判断状态"""
+        restore = head.get('Restore')
+        if restore:
+            if 'ongoing-request="true"' in restore:
+                return {'state': self.STATE_RESTORING, 'expiry': None}
+            expiry = None
+            if 'expiry-date="' in restore:
+                expiry = restore.split('expiry-date="', 1)[1].split('"', 1)[0]
+            return {'state': self.STATE_RESTORED, 'expiry': expiry}
+        
+        if head.get('StorageClass') in self.ARCHIVE_CLASSES:
+            return {'state': self.STATE_ARCHIVED, 'expiry': None}
+        return {'state': self.STATE_AVAILABLE, 'expiry': None}
+    
     def retrieve(self, backup_id: str, local_path: str) -> bool:
-        """从 S3 检索备份"""
+        """从 S3 检索备份（并发分段下载，支持断点续传）"""
         if not self.boto3_available:
             return False
         
-        # 如果是 GLACIER 存储需要先恢复
         try:
-            object_key = f"{self.prefix}{backup_id}.tar.gz"
-            self.s3_client.download_file(
-                self.bucket,
-                object_key,
-                local_path
-            )
+            object_key = self._object_key(backup_id)
+            head = self.s3_client.head_object(Bucket=self.bucket, Key=object_key)
+            
+            # GLACIER 对象需要先恢复
+            if self._restore_state(head)['state'] in (self.STATE_ARCHIVED, self.STATE_RESTORING):
+                return False
+            
+            self._download_ranges(object_key, head, local_path)
             return True
         except Exception:
             return False
     
+    def _download_ranges(self, object_key: str, head: Dict, local_path: str):
+        """按字节范围并发下载；进度文件记录已完成分片以便续传"""
+        size = head['ContentLength']
+        etag = head.get('ETag', '')
+        part_path = f"{local_path}.part"
+        state_path = f"{local_path}.part.json"
+        
+        state = None
+        if os.path.exists(part_path) and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+        if not state or state.get('etag') != etag or state.get('size') != size \
+                or state.get('part_size') != self.part_size:
+            state = {'etag': etag, 'size': size, 'part_size': self.part_size, 'done': []}
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+        
+        done = set(state['done'])
+        ranges = [
+            (index, start, min(start + self.part_size, size) - 1)
+            for index, start in enumerate(range(0, size, self.part_size))
+            if index not in done
+        ]
+        
+        def fetch(index: int, start: int, end: int) -> int:
+            kwargs = {'Bucket': self.bucket, 'Key': object_key, 'Range': f"bytes={start}-{end}"}
+            if etag:
+                kwargs['IfMatch'] = etag
+            body = self.s3_client.get_object(**kwargs)['Body']
+            fd = os.open(part_path, os.O_WRONLY)
+            try:
+                offset = start
+                for chunk in iter(lambda: body.read(1024 * 1024), b""):
+                    if self.bandwidth:
+                        self.bandwidth.consume(len(chunk))
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+            finally:
+                os.close(fd)
+            if offset != end + 1:
+                raise IOError(f"Short read for range {start}-{end} of {object_key}")
+            return index
+        
+        def save_state():
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump({**state, 'done': sorted(done)}, f)
+        
+        # 某个分片失败时仍记录其余已完成的分片，下次只补齐缺失部分
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = [pool.submit(fetch, *r) for r in ranges]
+            for future in as_completed(futures):
+                try:
+                    index = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                done.add(index)
+                save_state()
+        
+        if error is not None:
+            save_state()
+            raise error
+        
+        expected = (head.get('Metadata') or {}).get('sha256')
+        if expected and _file_sha256(part_path) != expected:
+            os.remove(part_path)
+            os.remove(state_path)
+            raise IOError(f"Checksum mismatch for {object_key}")
+        
+        os.replace(part_path, local_path)
+        os.remove(state_path)
+    
     def list_archives(self) -> List[Dict]:
         """列出 S3 中的归档"""
         if not self.boto3_available:
@@ -282,12 +731,34 @@ class S3ColdStorageBackend(ColdStorageBackend):
             return False
         
         try:
-            object_key = f"{self.prefix}{backup_id}.tar.gz"
+            object_key = self._object_key(backup_id)
             self.s3_client.delete_object(Bucket=self.bucket, Key=object_key)
             return True
         except Exception:
             return False
     
+    def delete_many(self, backup_ids: List[str]) -> List[str]:
+        """用 DeleteObjects 批量删除（每次请求最多 1000 个对象）"""
+        if not self.boto3_available:
+            return []
+        
+        deleted = []
+        for start in range(0, len(backup_ids), 1000):
+            batch = backup_ids[start:start + 1000]
+            keys = {self._object_key(backup_id): backup_id for backup_id in batch}
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+                )
+            except Exception:
+                continue
+            
+            failed = {error['Key'] for error in response.get('Errors', [])}
+            deleted.extend(backup_id for key, backup_id in keys.items() if key not in failed)
+        
+        return deleted
+    
     def get_storage_info(self) -> Dict:
         """获取 S3 存储信息"""
         return {
@@ -303,7 +774,12 @@ class ColdBackupService:
     """冷备份服务"""
     
     def __init__(self, backup_dir: str, cold_storage_backend: ColdStorageBackend,
-                 retention_days: int = 365):
+                 retention_days: int = 365,
+                 db_path: Optional[str] = None,
+                 storage_path: str = './releases',
+                 disk_bytes_per_sec: Optional[int] = None,
+                 network_bytes_per_sec: Optional[int] = None,
+                 scheduler: Optional[BackupScheduler] = None):
         """
         初始化冷备份服务
         
@@ -311,29 +787,27 @@ class ColdBackupService:
             backup_dir: 热备份目录
             cold_storage_backend: 冷存储后端
             retention_days: 保留天数
+            db_path: 要备份的数据库，默认取 Config.get_default_db_path()
+            storage_path: 要备份的存储目录
+            disk_bytes_per_sec: 热备份写盘速率上限（字节/秒）
+            network_bytes_per_sec: 冷存储传输速率上限（字节/秒）
+            scheduler: 共享的备份调度器，默认新建
         """
         self.backup_dir = Path(backup_dir)
         self.cold_storage = cold_storage_backend
         self.retention_days = retention_days
-        self.scheduler_running = False
-        self.scheduler_thread = None
-        
-        # 归档元数据
-        self.archive_metadata_file = self.backup_dir / "cold_archive_metadata.json"
-        self._load_archive_metadata()
-    
-    def _load_archive_metadata(self):
-        """加载归档元数据"""
-        if self.archive_metadata_file.exists():
-            with open(self.archive_metadata_file, 'r', encoding='utf-8') as f:
-                self.archive_metadata = json.load(f)
-        else:
-            self.archive_metadata = {}
-    
-    def _save_archive_metadata(self):
-        """保存归档元数据"""
-        with open(self.archive_metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.archive_metadata, f, indent=2, ensure_ascii=False)
+        self.db_path = db_path or Config.get_default_db_path()
+        self.storage_path = storage_path
+        self.disk_bytes_per_sec = disk_bytes_per_sec
+        self.cold_storage.set_bandwidth_limit(network_bytes_per_sec)
+        self.scheduler = scheduler or BackupScheduler(lock_dir=str(self.backup_dir / ".locks"))
+        
+        # 归档目录
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = ArchiveCatalog(
+            self.backup_dir / "cold_archive_catalog.db",
+            legacy_json=self.backup_dir / "cold_archive_metadata.json"
+        )
     
     def create_cold_backup(self, backup_name: Optional[str] = None,
                           include_storage: bool = True) -> Dict:
@@ -354,9 +828,10 @@ class ColdBackupService:
         hot_backup_name = backup_name or f"hot_backup_{timestamp}"
         
         backup_service = BackupService(
-            db_path='./data/portal.db',
-            storage_path='./releases',
-            backup_dir=str(self.backup_dir)
+            db_path=self.db_path,
+            storage_path=self.storage_path,
+            backup_dir=str(self.backup_dir),
+            io_bytes_per_sec=self.disk_bytes_per_sec
         )
         
         backup_info = backup_service.create_backup(
@@ -374,15 +849,14 @@ class ColdBackupService:
         
         # 3. 保存归档记录
         archive_id = archive_metadata['archive_id']
-        self.archive_metadata[archive_id] = {
+        self.catalog.put({
             'archive_id': archive_id,
             'hot_backup_name': hot_backup_name,
             'created_at': datetime.now().isoformat(),
             'expires_at': (datetime.now() + timedelta(days=self.retention_days)).isoformat(),
             'status': 'archived',
             'metadata': archive_metadata
-        }
-        self._save_archive_metadata()
+        })
         
         # 4. 可选：删除热备份文件
         # os.remove(backup_path)
@@ -401,104 +875,157 @@ class ColdBackupService:
         Returns:
             是否成功
         """
-        if archive_id not in self.archive_metadata:
+        if archive_id not in self.catalog:
+            return False
+        
+        restore = self.request_retrieval(archive_id)
+        if restore['state'] in (ColdStorageBackend.STATE_ARCHIVED,
+                                ColdStorageBackend.STATE_RESTORING):
             return False
         
         return self.cold_storage.retrieve(archive_id, restore_path)
     
+    def request_retrieval(self, archive_id: str) -> Dict:
+        """
+        推进归档的恢复状态机，并记录到归档元数据
+        
+        archived -> restoring -> restored；对已归档对象自动发起恢复请求，
+        重复调用只会查询进度。
+        
+        Args:
+            archive_id: 归档 ID
+        
+        Returns:
+            恢复状态 {'state', 'expiry', 'requested_at', 'updated_at'}
+        """
+        record = self.catalog.get(archive_id)
+        if record is None:
+            raise ValueError(f"Archive not found: {archive_id}")
+        
+        restore = dict(record.get('restore') or {})
+        now = datetime.now().isoformat()
+        
+        status = self.cold_storage.get_restore_status(archive_id)
+        if status['state'] == ColdStorageBackend.STATE_ARCHIVED:
+            status = self.cold_storage.request_restore(archive_id)
+            restore['requested_at'] = now
+        
+        restore.update(state=status['state'], expiry=status.get('expiry'), updated_at=now)
+        
+        if restore != record.get('restore'):
+            changes = {'restore': restore}
+            if status['state'] in (ColdStorageBackend.STATE_RESTORING,
+                                   ColdStorageBackend.STATE_RESTORED):
+                changes['status'] = status['state']
+            self.catalog.update(archive_id, changes)
+        
+        return restore
+    
     def list_cold_archives(self) -> List[Dict]:
         """列出所有冷归档"""
-        archives = []
-        
-        for archive_id, metadata in self.archive_metadata.items():
-            archive_info = {
-                'archive_id': archive_id,
-                'hot_backup_name': metadata['hot_backup_name'],
-                'created_at': metadata['created_at'],
-                'expires_at': metadata['expires_at'],
-                'status': metadata['status'],
-                'metadata': metadata['metadata']
+        # 目录按创建时间倒序返回
+        return [
+            {
+                'archive_id': record['archive_id'],
+                'hot_backup_name': record['hot_backup_name'],
+                'created_at': record['created_at'],
+                'expires_at': record['expires_at'],
+                'status': record['status'],
+                'metadata': record['metadata']
             }
-            archives.append(archive_info)
-        
-        # 按创建时间倒序
-        archives.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        return archives
+            for record in self.catalog.list_all()
+        ]
     
     def delete_cold_archive(self, archive_id: str) -> bool:
         """删除冷归档"""
-        if archive_id not in self.archive_metadata:
+        if archive_id not in self.catalog:
             return False
         
         success = self.cold_storage.delete(archive_id)
         
         if success:
-            del self.archive_metadata[archive_id]
-            self._save_archive_metadata()
+            self.catalog.delete(archive_id)
         
         return success
     
     def cleanup_expired_archives(self) -> int:
-        """清理过期的归档"""
-        now = datetime.now()
-        expired_archives = []
+        """
+        清理过期的归档
         
-        for archive_id, metadata in list(self.archive_metadata.items()):
-            expires_at = datetime.fromisoformat(metadata['expires_at'])
-            if now > expires_at:
-                if self.delete_cold_archive(archive_id):
-                    expired_archives.append(archive_id)
+        一次索引范围查询取出过期 ID，按批调用后端批量删除，
+        每批删除成功的记录在一个事务中从目录移除。
+        """
+        expired = self.catalog.find_expired(datetime.now().isoformat())
+        removed = 0
         
-        return len(expired_archives)
+        for start in range(0, len(expired), ArchiveCatalog.BATCH_SIZE):
+            batch = expired[start:start + ArchiveCatalog.BATCH_SIZE]
+            deleted = self.cold_storage.delete_many(batch)
+            removed += self.catalog.delete_many(deleted)
+        
+        return removed
     
     def get_storage_info(self) -> Dict:
         """获取冷存储信息"""
         return self.cold_storage.get_storage_info()
     
-    def schedule_automatic_backup(self, interval_hours: int = 24):
+    SCHEDULE_JOB_NAME = 'cold_backup'
+    
+    def schedule_automatic_backup(self, interval_hours: Optional[float] = 24,
+                                  cron: Optional[str] = None,
+                                  jitter_seconds: float = 0,
+                                  nice: int = 10,
+                                  ionice_idle: bool = True) -> Dict:
         """
         定时自动备份
         
+        每次运行先创建冷备份再清理过期归档；同一任务的运行不会重叠
+        （跨进程同样互斥），并以低 CPU/I/O 优先级执行。
+        
         Args:
-            interval_hours: 备份间隔（小时）
+            interval_hours: 备份间隔（小时），指定 cron 时忽略
+            cron: 五段式 cron 表达式，如 "30 3 * * *"
+            jitter_seconds: 随机延迟上限，错开多实例的启动时间
+            nice: 运行线程的 nice 值
+            ionice_idle: 是否以 idle I/O 优先级运行
+        
+        Returns:
+            任务状态
         """
+        schedule = CronSchedule(cron) if cron else IntervalSchedule(float(interval_hours) * 3600)
+        
         def backup_job():
-            try:
-                print(f"[{datetime.now()}] Starting automatic cold backup...")
-                self.create_cold_backup()
-                print(f"[{datetime.now()}] Automatic cold backup completed")
-            except Exception as e:
-                print(f"[{datetime.now()}] Automatic cold backup failed: {e}")
-        
-        schedule.every(interval_hours).hours.do(backup_job)
-        
-        # 启动调度器
-        if not self.scheduler_running:
-            self.scheduler_running = True
-            self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-            self.scheduler_thread.start()
-    
-    def _run_scheduler(self):
-        """运行调度器"""
-        while self.scheduler_running:
-            schedule.run_pending()
-            time.sleep(60)
+            self.create_cold_backup()
+            self.cleanup_expired_archives()
+        
+        job = self.scheduler.add_job(self.SCHEDULE_JOB_NAME, backup_job, schedule,
+                                     jitter_seconds=jitter_seconds, nice=nice,
+                                     ionice_idle=ionice_idle)
+        self.scheduler.start()
+        return job.status()
+    
+    @property
+    def scheduler_running(self) -> bool:
+        return self.scheduler.running
     
     def stop_scheduler(self):
         """停止调度器"""
-        self.scheduler_running = False
-        if self.scheduler_thread:
-            self.scheduler_thread.join()
+        self.scheduler.stop()
     
     def get_backup_policy(self) -> Dict:
         """获取备份策略"""
         return {
             'retention_days': self.retention_days,
             'scheduler_running': self.scheduler_running,
+            'schedule': self.scheduler.status()['jobs'],
+            'throttle': {
+                'disk_bytes_per_sec': self.disk_bytes_per_sec,
+                'network_bytes_per_sec': self.cold_storage.bandwidth.rate
+                if self.cold_storage.bandwidth else None
+            },
             'storage_backend': type(self.cold_storage).__name__,
             'storage_info': self.get_storage_info(),
-            'archive_count': len(self.archive_metadata)
+            'archive_count': self.catalog.stats()['archive_count']
         }
 
 
@@ -507,6 +1034,7 @@ class ColdBackupManager:
     
     _instance = None
     _service = None
+    _scheduler = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -521,7 +1049,8 @@ class ColdBackupManager:
         Args:
             backup_dir: 备份目录
             storage_type: 存储类型（local, s3）
-            storage_config: 存储配置
+            storage_config: 存储配置；除后端参数外还可包含 db_path、
+                source_storage_path、disk_bytes_per_sec、network_bytes_per_sec
         """
         # 创建存储后端
         if storage_type == "local":
@@ -533,16 +1062,32 @@ class ColdBackupManager:
                 bucket=storage_config.get('bucket', ''),
                 prefix=storage_config.get('prefix', 'cold_backups/'),
                 region=storage_config.get('region', 'us-east-1'),
-                storage_class=storage_config.get('storage_class', 'GLACIER')
+                storage_class=storage_config.get('storage_class', 'GLACIER'),
+                endpoint_url=storage_config.get('endpoint_url'),
+                part_size=int(storage_config.get('part_size', 64 * 1024 * 1024)),
+                max_concurrency=int(storage_config.get('max_concurrency', 8)),
+                restore_days=int(storage_config.get('restore_days', 7)),
+                restore_tier=storage_config.get('restore_tier', 'Standard')
             )
         else:
             raise ValueError(f"Unsupported storage type: {storage_type}")
         
+        # 调度器在进程内共享，重新初始化服务不会丢失已调度的任务
+        if ColdBackupManager._scheduler is None:
+            ColdBackupManager._scheduler = BackupScheduler(
+                lock_dir=str(Path(backup_dir) / ".locks")
+            )
+        
         # 创建服务
         self._service = ColdBackupService(
             backup_dir=backup_dir,
             cold_storage_backend=backend,
-            retention_days=storage_config.get('retention_days', 365)
+            retention_days=storage_config.get('retention_days', 365),
+            db_path=storage_config.get('db_path'),
+            storage_path=storage_config.get('source_storage_path', './releases'),
+            disk_bytes_per_sec=storage_config.get('disk_bytes_per_sec'),
+            network_bytes_per_sec=storage_config.get('network_bytes_per_sec'),
+            scheduler=ColdBackupManager._scheduler
         )
         
         return self._service
@@ -0,0 +1,122 @@
+"""
+下载限流 - 按用户和许可证限制请求速率、并发数和带宽
+
+限额来自 License.download_limits。状态保存在进程内（令牌桶和并发计数），
+多 worker 部署时每个 worker 各自计数，实际上限约为设定值乘以 worker 数。
+"""
+import math
+import threading
+from typing import Dict, Optional, Tuple
+
+from ..domain.value_objects import DownloadLimits
+from ..shared import RateLimitError
+from ..shared.metrics import DOWNLOADS_THROTTLED
+from ..shared.throttle import TokenBucket
+
+# 并发数已满时无法预知何时空出名额，给出固定的建议重试间隔
+CONCURRENCY_RETRY_AFTER = 5
+
+
+class DownloadSlot:
+    """一次已获准的下载；下载结束（或失败）时必须 release"""
+    
+    def __init__(self, limiter: 'DownloadLimiter', keys: Tuple, bandwidth: Optional[TokenBucket]):
+        self._limiter = limiter
+        self._keys = keys
+        self.bandwidth = bandwidth
+        self._released = False
+    
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release(self._keys)
+
+
+class DownloadLimiter:
+    """进程内下载限流器"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (范围, ID) -> ((速率, 容量), 令牌桶)；限额变更后按新参数重建
+        self._buckets: Dict[Tuple[str, str], Tuple[Tuple[float, float], TokenBucket]] = {}
+        self._active: Dict[Tuple[str, str], int] = {}
+    
+    def acquire(self, user_id: str, license_id: Optional[str],
+                limits: Optional[DownloadLimits]) -> DownloadSlot:
+        """检查限额并占用一个下载名额
+        
+        Raises:
+            RateLimitError: 超出速率或并发限制
+        """
+        if not license_id or limits is None or limits.is_unlimited():
+            return DownloadSlot(self, (), None)
+        
+        user_key = ('user', user_id)
+        license_key = ('license', license_id)
+        
+        with self._lock:
+            # 先检查并发：被拒绝的请求不消耗速率令牌
+            for key, maximum, reason in (
+                (user_key, limits.max_concurrent_per_user, 'user_concurrency'),
+                (license_key, limits.max_concurrent_per_license, 'license_concurrency')
+            ):
+                if maximum and self._active.get(key, 0) >= maximum:
+                    self._reject(f"Too many concurrent downloads ({maximum} allowed)",
+                                 CONCURRENCY_RETRY_AFTER, reason)
+            
+            buckets = []
+            for key, per_minute, reason in (
+                (user_key, limits.requests_per_minute, 'user_rate'),
+                (license_key, limits.license_requests_per_minute, 'license_rate')
+            ):
+                if per_minute:
+                    bucket = self._bucket(('rate',) + key, per_minute / 60.0, limits.burst or per_minute)
+                    wait = bucket.wait_time(1)
+                    if wait:
+                        self._reject(f"Download rate limit exceeded ({per_minute}/min)", wait, reason)
+                    buckets.append(bucket)
+            for bucket in buckets:
+                bucket.try_consume(1)
+            
+            keys = (user_key, license_key)
+            for key in keys:
+                self._active[key] = self._active.get(key, 0) + 1
+            
+            bandwidth = None
+            if limits.bandwidth_bytes_per_sec:
+                rate = limits.bandwidth_bytes_per_sec
+                bandwidth = self._bucket(('bandwidth',) + license_key, rate, rate)
+        
+        return DownloadSlot(self, keys, bandwidth)
+    
+    def active(self, scope: str, key: str) -> int:
+        return self._active.get((scope, key), 0)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._active.clear()
+    
+    def _bucket(self, key, rate: float, burst: float) -> TokenBucket:
+        entry = self._buckets.get(key)
+        if entry is None or entry[0] != (rate, burst):
+            entry = self._buckets[key] = ((rate, burst), TokenBucket(rate, burst))
+        return entry[1]
+    
+    def _release(self, keys: Tuple) -> None:
+        with self._lock:
+            for key in keys:
+                remaining = self._active.get(key, 0) - 1
+                if remaining > 0:
+                    self._active[key] = remaining
+                else:
+                    self._active.pop(key, None)
+    
+    @staticmethod
+    def _reject(message: str, retry_after: float, reason: str) -> None:
+        DOWNLOADS_THROTTLED.inc(reason=reason)
+        raise RateLimitError(message, retry_after=max(1, math.ceil(retry_after)), reason=reason)
+
+
+# 进程内共享：容器按请求创建，计数不能挂在服务实例上
+download_limiter = DownloadLimiter()
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
 from ..domain.entities.license import License
-from ..domain.value_objects import ResourceType, AccessLevel
+from ..domain.value_objects import ResourceType, AccessLevel, DownloadLimits
 from ..domain.repositories import LicenseRepository
 from ..infrastructure.auth import UUIDGenerator
 
@@ -16,7 +16,8 @@ class LicenseService:
         access_level: AccessLevel,
         allowed_resource_types: list,
         expires_at: Optional[datetime] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        download_limits: Optional[DownloadLimits] = None
     ) -> License:
         license_id = UUIDGenerator.generate_license_id()
         
@@ -31,7 +32,8 @@ class LicenseService:
             access_level=access_level,
             allowed_resource_types=resource_types,
             expires_at=expires_at,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            download_limits=download_limits
         )
         
         self._license_repository.save(license)
@@ -85,3 +87,12 @@ class LicenseService:
         license._metadata = metadata
         self._license_repository.save(license)
         return license
+    
+    def set_download_limits(self, license_id: str, limits: DownloadLimits) -> License:
+        license = self._license_repository.find_by_id(license_id)
+        if not license:
+            raise ValueError(f"License '{license_id}' not found")
+        
+        license.set_download_limits(limits)
+        self._license_repository.save(license)
+        return license
@@ -58,6 +58,11 @@ class AuditAction(Enum):
     CONFIG_CHANGE = "CONFIG_CHANGE"
     SYSTEM_STARTUP = "SYSTEM_STARTUP"
     SYSTEM_SHUTDOWN = "SYSTEM_SHUTDOWN"
+    
+    @classmethod
+    def from_string(cls, value: str) -> 'AuditAction':
+        """从字符串解析（不区分大小写）"""
+        return cls(value.upper())
 
 
 @dataclass
@@ -115,6 +120,7 @@ class AuditLogFilter:
     resource_id: Optional[str] = None
     status: Optional[str] = None
     ip_address: Optional[str] = None
+    query: Optional[str] = None  # 全文检索（用户名、资源名、错误信息、详情）
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -127,5 +133,6 @@ class AuditLogFilter:
             'resource_type': self.resource_type,
             'resource_id': self.resource_id,
             'status': self.status,
-            'ip_address': self.ip_address
+            'ip_address': self.ip_address,
+            'query': self.query
         }
@@ -1,6 +1,6 @@
 from typing import Optional, List, Dict, Set
 from datetime import datetime
-from ..value_objects import ResourceType, AccessLevel
+from ..value_objects import ResourceType, AccessLevel, DownloadLimits
 
 
 class License:
@@ -11,7 +11,8 @@ class License:
         access_level: AccessLevel,
         allowed_resource_types: Set[ResourceType],
         expires_at: Optional[datetime] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        download_limits: Optional[DownloadLimits] = None
     ):
         if not license_id or not isinstance(license_id, str):
             raise ValueError("License ID must be a non-empty string")
@@ -28,6 +29,7 @@ class License:
         self._allowed_resource_types = allowed_resource_types.copy()
         self._expires_at = expires_at
         self._metadata = metadata or {}
+        self._download_limits = download_limits or DownloadLimits()
         self._created_at = datetime.utcnow()
         self._is_active = True
     
@@ -55,6 +57,13 @@ class License:
     def metadata(self) -> Dict:
         return self._metadata.copy()
     
+    @property
+    def download_limits(self) -> DownloadLimits:
+        return self._download_limits
+    
+    def set_download_limits(self, limits: Optional[DownloadLimits]) -> None:
+        self._download_limits = limits or DownloadLimits()
+    
     @property
     def created_at(self) -> datetime:
         return self._created_at
@@ -97,7 +106,8 @@ class License:
             'expires_at': self._expires_at.isoformat() if self._expires_at else None,
             'created_at': self._created_at.isoformat(),
             'is_active': self._is_active,
-            'metadata': self._metadata
+            'metadata': self._metadata,
+            'download_limits': self._download_limits.to_dict()
         }
     
     @classmethod
@@ -108,7 +118,8 @@ class License:
             access_level=AccessLevel.from_string(data['access_level']),
             allowed_resource_types={ResourceType.from_string(rt) for rt in data['allowed_resource_types']},
             expires_at=datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
-            metadata=data.get('metadata', {})
+            metadata=data.get('metadata', {}),
+            download_limits=DownloadLimits.from_dict(data.get('download_limits'))
         )
         license_obj._created_at = datetime.fromisoformat(data['created_at'])
         license_obj._is_active = data.get('is_active', True)
@@ -3,7 +3,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 
 from ..entities.audit_log import AuditLog, AuditAction, AuditLogFilter
@@ -28,6 +28,12 @@ class AuditLogRepository(ABC):
         """查找审计日志"""
         pass
     
+    @abstractmethod
+    def find_page(self, filters: Optional[AuditLogFilter] = None, limit: int = 100,
+                  after: Optional[Tuple[str, int]] = None) -> List[AuditLog]:
+        """按 (timestamp, id) 游标分页查找审计日志"""
+        pass
+    
     @abstractmethod
     def count(self, filters: Optional[AuditLogFilter] = None) -> int:
         """统计审计日志数量"""
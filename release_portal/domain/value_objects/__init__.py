@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Set, Dict
+from typing import Set, Dict, Optional
 
 
 class ResourceType(Enum):
@@ -115,3 +115,93 @@ class Permission:
     
     def __repr__(self) -> str:
         return f"Permission(resource='{self._resource}', types={[str(rt) for rt in self._resource_types]})"
+
+
+class DownloadLimits:
+    """许可证的下载限额，各项为 None 表示不限制
+    
+    requests_per_minute / license_requests_per_minute 按令牌桶计，
+    分别作用于单个用户和整个许可证；burst 为桶容量（默认等于每分钟额度）。
+    bandwidth_bytes_per_sec 为许可证下所有下载共享的带宽上限。
+    """
+    
+    FIELDS = (
+        'requests_per_minute',
+        'license_requests_per_minute',
+        'burst',
+        'max_concurrent_per_user',
+        'max_concurrent_per_license',
+        'bandwidth_bytes_per_sec'
+    )
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        license_requests_per_minute: Optional[int] = None,
+        burst: Optional[int] = None,
+        max_concurrent_per_user: Optional[int] = None,
+        max_concurrent_per_license: Optional[int] = None,
+        bandwidth_bytes_per_sec: Optional[int] = None
+    ):
+        values = (requests_per_minute, license_requests_per_minute, burst,
+                  max_concurrent_per_user, max_concurrent_per_license, bandwidth_bytes_per_sec)
+        for name, value in zip(self.FIELDS, values):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value <= 0):
+                raise ValueError(f"{name} must be a positive integer or None")
+        
+        self._requests_per_minute = requests_per_minute
+        self._license_requests_per_minute = license_requests_per_minute
+        self._burst = burst
+        self._max_concurrent_per_user = max_concurrent_per_user
+        self._max_concurrent_per_license = max_concurrent_per_license
+        self._bandwidth_bytes_per_sec = bandwidth_bytes_per_sec
+    
+    @property
+    def requests_per_minute(self) -> Optional[int]:
+        return self._requests_per_minute
+    
+    @property
+    def license_requests_per_minute(self) -> Optional[int]:
+        return self._license_requests_per_minute
+    
+    @property
+    def burst(self) -> Optional[int]:
+        return self._burst
+    
+    @property
+    def max_concurrent_per_user(self) -> Optional[int]:
+        return self._max_concurrent_per_user
+    
+    @property
+    def max_concurrent_per_license(self) -> Optional[int]:
+        return self._max_concurrent_per_license
+    
+    @property
+    def bandwidth_bytes_per_sec(self) -> Optional[int]:
+        return self._bandwidth_bytes_per_sec
+    
+    def is_unlimited(self) -> bool:
+        return all(getattr(self, name) is None for name in self.FIELDS)
+    
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'DownloadLimits':
+        data = data or {}
+        unknown = set(data) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown download limit fields: {sorted(unknown)}")
+        return cls(**data)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DownloadLimits):
+            return False
+        return self.to_dict() == other.to_dict()
+    
+    def __hash__(self) -> int:
+        return hash(tuple(self.to_dict().values()))
+    
+    def __repr__(self) -> str:
+        limits = ', '.join(f"{k}={v}" for k, v in self.to_dict().items() if v is not None)
+        return f"DownloadLimits({limits or 'unlimited'})"
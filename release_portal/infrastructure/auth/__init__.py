@@ -1,3 +1,4 @@
 from .token_service import TokenService, PasswordHasher, UUIDGenerator
+from .token_cache import TokenCache, CachedIdentity, token_cache
 
-__all__ = ['TokenService', 'PasswordHasher', 'UUIDGenerator']
+__all__ = ['TokenService', 'PasswordHasher', 'UUIDGenerator', 'TokenCache', 'CachedIdentity', 'token_cache']
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+
+class CachedIdentity(NamedTuple):
+    payload: Dict
+    user: object
+    expires_at: float
+
+
+class TokenCache:
+    """已验证 Token 的有界 TTL/LRU 缓存：token -> (payload, 已加载的 User)
+    
+    命中时认证只需一次字典查找，不再解码 Token、查询用户和角色。
+    用户、角色或许可证保存/删除时由仓储调用 invalidate_* 清除相关条目；
+    缓存是进程内的，多 worker 部署时其他进程中的条目最迟在 ttl 秒后过期。
+    缓存中的 User 在请求间共享，只能读取，不要修改。
+    """
+    
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CachedIdentity]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, token: str) -> Optional[CachedIdentity]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[token]
+                return None
+            # 命中的条目移到末尾，容量满时先淘汰最久未使用的
+            self._entries.move_to_end(token)
+            return entry
+    
+    def put(self, token: str, payload: Dict, user) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        # 不超过 Token 自身的过期时间
+        remaining = payload.get('exp', 0) - time.time()
+        ttl = min(self.ttl_seconds, remaining)
+        if ttl <= 0:
+            return
+        
+        with self._lock:
+            self._entries[token] = CachedIdentity(payload, user, time.monotonic() + ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate_user(self, user_id: str) -> None:
+        self._invalidate(lambda user: user.user_id == user_id)
+    
+    def invalidate_role(self, role_id: str) -> None:
+        self._invalidate(lambda user: user.role.role_id == role_id)
+    
+    def invalidate_license(self, license_id: str) -> None:
+        self._invalidate(lambda user: user.license_id == license_id)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def _invalidate(self, predicate) -> None:
+        with self._lock:
+            stale = [token for token, entry in self._entries.items() if predicate(entry.user)]
+            for token in stale:
+                del self._entries[token]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _create_token_cache() -> TokenCache:
+    from ...shared import Config
+    return TokenCache(Config.get_auth_cache_ttl(), Config.get_auth_cache_size())
+
+
+# 进程内共享：容器按请求创建，缓存不能挂在 AuthService 实例上
+token_cache = _create_token_cache()
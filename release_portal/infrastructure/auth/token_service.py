@@ -1,4 +1,7 @@
+import base64
 import hashlib
+import hmac
+import json
 import uuid
 from typing import Dict, Optional
 from datetime import datetime, timedelta
@@ -7,11 +10,10 @@ from datetime import datetime, timedelta
 class TokenService:
     def __init__(self, secret_key: str, token_expiry_hours: int = 24):
         self._secret_key = secret_key
+        self._secret_key_bytes = secret_key.encode()
         self._token_expiry_hours = token_expiry_hours
     
     def generate_token(self, user_id: str, username: str, role: str) -> str:
-        import json
-        import base64
         payload = {
             'user_id': user_id,
             'username': username,
@@ -22,33 +24,31 @@ class TokenService:
         
         payload_json = json.dumps(payload, sort_keys=True)
         payload_b64 = base64.b64encode(payload_json.encode()).decode()
-        signature = hashlib.sha256(f"{payload_b64}.{self._secret_key}".encode()).hexdigest()
-        return f"{payload_b64}.{signature}"
+        return f"{payload_b64}.{self._sign(payload_b64)}"
     
     def verify_token(self, token: str) -> Optional[Dict]:
         try:
-            import json
-            import base64
-            parts = token.split('.')
-            if len(parts) != 2:
-                return None
-            
-            payload_b64, signature = parts
-            expected_signature = hashlib.sha256(f"{payload_b64}.{self._secret_key}".encode()).hexdigest()
-            
-            if signature != expected_signature:
-                return None
-            
-            payload_json = base64.b64decode(payload_b64.encode()).decode()
-            payload = json.loads(payload_json)
-            
+            payload_b64, signature = token.split('.')
+        except (AttributeError, ValueError):
+            return None
+        
+        # 常量时间比较，避免按前缀逐字节猜测签名
+        if not hmac.compare_digest(signature.encode(), self._sign(payload_b64).encode()):
+            return None
+        
+        try:
+            payload = json.loads(base64.b64decode(payload_b64.encode()))
             exp = datetime.fromtimestamp(payload['exp'])
-            if datetime.utcnow() > exp:
-                return None
-            
-            return payload
-        except Exception:
+        except (ValueError, TypeError, KeyError):
             return None
+        
+        if datetime.utcnow() > exp:
+            return None
+        
+        return payload
+    
+    def _sign(self, payload_b64: str) -> str:
+        return hmac.new(self._secret_key_bytes, payload_b64.encode(), hashlib.sha256).hexdigest()
     
     def extract_user_info(self, token: str) -> Optional[Dict]:
         payload = self.verify_token(token)
@@ -1,6 +1,8 @@
 import sqlite3
+import time
 from typing import Optional
 from contextlib import contextmanager
+from ...shared.metrics import DB_QUERIES, DB_QUERY_LATENCY
 
 
 class DatabaseConfig:
@@ -26,13 +28,26 @@ class BaseSQLiteRepository:
             conn.close()
     
     def _execute_query(self, query: str, params: tuple = ()):
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+        started = time.perf_counter()
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        finally:
+            self._record_query('query', started)
     
     def _execute_update(self, query: str, params: tuple = ()):
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.lastrowid
+        started = time.perf_counter()
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return cursor.lastrowid
+        finally:
+            self._record_query('update', started)
+    
+    def _record_query(self, kind: str, started: float) -> None:
+        # 耗时包含建立/关闭连接：每条语句都新开连接，这部分开销同样需要观测
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started, kind=kind)
+        DB_QUERIES.inc(repository=type(self).__name__, kind=kind)
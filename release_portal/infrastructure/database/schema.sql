@@ -25,7 +25,8 @@ CREATE TABLE IF NOT EXISTS licenses (
     expires_at TIMESTAMP,
     is_active BOOLEAN DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    metadata TEXT
+    metadata TEXT,
+    download_limits TEXT
 );
 
 -- 许可证资源类型关联表
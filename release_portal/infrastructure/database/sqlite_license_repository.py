@@ -1,18 +1,49 @@
 import json
+import sqlite3
+import threading
 from typing import List, Optional
 from datetime import datetime
 from ...domain.entities.license import License
-from ...domain.value_objects import ResourceType, AccessLevel
+from ...domain.value_objects import ResourceType, AccessLevel, DownloadLimits
 from ...domain.repositories import LicenseRepository
 from .base_repository import BaseSQLiteRepository
+from ..auth import token_cache
 
 
 class SQLiteLicenseRepository(BaseSQLiteRepository, LicenseRepository):
+    # 仓储按请求创建，旧库补列检查每个进程每个数据库只做一次
+    _schema_checked = set()
+    _schema_lock = threading.Lock()
+    
+    def __init__(self, db_path: str = ":memory:"):
+        super().__init__(db_path)
+        self._ensure_schema()
+    
+    def _ensure_schema(self) -> None:
+        """为旧数据库补齐 licenses.download_limits 列（无需手动执行 init）"""
+        if self._db_path in self._schema_checked:
+            return
+        with self._schema_lock:
+            if self._db_path in self._schema_checked:
+                return
+            with self._get_connection() as conn:
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(licenses)")}
+                if not columns:
+                    return  # 表尚未创建，由 DatabaseInitializer 建表后再检查
+                if 'download_limits' not in columns:
+                    try:
+                        conn.execute("ALTER TABLE licenses ADD COLUMN download_limits TEXT")
+                    except sqlite3.OperationalError:
+                        pass  # 其他进程已添加
+            # 内存库每个连接都是新库，不缓存检查结果
+            if self._db_path != ":memory:":
+                self._schema_checked.add(self._db_path)
+    
     def save(self, license_obj: License) -> None:
         self._execute_update(
             """INSERT OR REPLACE INTO licenses 
-               (license_id, organization, access_level, expires_at, is_active, created_at, metadata) 
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+               (license_id, organization, access_level, expires_at, is_active, created_at, metadata, download_limits) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 license_obj.license_id,
                 license_obj.organization,
@@ -20,7 +51,8 @@ class SQLiteLicenseRepository(BaseSQLiteRepository, LicenseRepository):
                 license_obj.expires_at.isoformat() if license_obj.expires_at else None,
                 license_obj.is_active,
                 license_obj.created_at.isoformat(),
-                json.dumps(license_obj.metadata)
+                json.dumps(license_obj.metadata),
+                json.dumps(license_obj.download_limits.to_dict())
             )
         )
         
@@ -34,6 +66,9 @@ class SQLiteLicenseRepository(BaseSQLiteRepository, LicenseRepository):
                 "INSERT INTO license_resource_types (license_id, resource_type) VALUES (?, ?)",
                 (license_obj.license_id, str(resource_type))
             )
+        
+        # 许可证停用或变更后，持有该许可证的用户需重新加载
+        token_cache.invalidate_license(license_obj.license_id)
     
     def find_by_id(self, license_id: str) -> Optional[License]:
         rows = self._execute_query(
@@ -66,15 +101,14 @@ class SQLiteLicenseRepository(BaseSQLiteRepository, LicenseRepository):
             "DELETE FROM licenses WHERE license_id = ?",
             (license_id,)
         )
+        token_cache.invalidate_license(license_id)
     
     def exists_by_id(self, license_id: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM licenses WHERE license_id = ?",
-                (license_id,)
-            )
-            return cursor.fetchone() is not None
+        rows = self._execute_query(
+            "SELECT 1 FROM licenses WHERE license_id = ? LIMIT 1",
+            (license_id,)
+        )
+        return bool(rows)
     
     def _row_to_license(self, row) -> License:
         rt_rows = self._execute_query(
@@ -92,7 +126,11 @@ class SQLiteLicenseRepository(BaseSQLiteRepository, LicenseRepository):
             access_level=AccessLevel.from_string(row['access_level']),
             allowed_resource_types=resource_types,
             expires_at=datetime.fromisoformat(row['expires_at']) if row['expires_at'] else None,
-            metadata=json.loads(row['metadata']) if row['metadata'] else {}
+            metadata=json.loads(row['metadata']) if row['metadata'] else {},
+            download_limits=DownloadLimits.from_dict(
+                json.loads(row['download_limits'])
+                if 'download_limits' in row.keys() and row['download_limits'] else None
+            )
         )
         license_obj._created_at = datetime.fromisoformat(row['created_at'])
         license_obj._is_active = bool(row['is_active'])
@@ -79,13 +79,11 @@ class SQLiteReleaseRepository(BaseSQLiteRepository, ReleaseRepository):
         )
     
     def exists_by_id(self, release_id: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM releases WHERE release_id = ?",
-                (release_id,)
-            )
-            return cursor.fetchone() is not None
+        rows = self._execute_query(
+            "SELECT 1 FROM releases WHERE release_id = ? LIMIT 1",
+            (release_id,)
+        )
+        return bool(rows)
     
     def _row_to_release(self, row) -> Release:
         release = Release(
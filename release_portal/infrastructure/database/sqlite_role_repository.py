@@ -4,6 +4,7 @@ from ...domain.entities.role import Role
 from ...domain.value_objects import ResourceType, Permission
 from ...domain.repositories import RoleRepository
 from .base_repository import BaseSQLiteRepository
+from ..auth import token_cache
 
 
 class SQLiteRoleRepository(BaseSQLiteRepository, RoleRepository):
@@ -24,6 +25,8 @@ class SQLiteRoleRepository(BaseSQLiteRepository, RoleRepository):
                     "INSERT INTO role_permissions (role_id, permission, resource_type) VALUES (?, ?, ?)",
                     (role.role_id, permission.resource, str(resource_type))
                 )
+        
+        token_cache.invalidate_role(role.role_id)
     
     def find_by_id(self, role_id: str) -> Optional[Role]:
         rows = self._execute_query(
@@ -52,6 +55,7 @@ class SQLiteRoleRepository(BaseSQLiteRepository, RoleRepository):
             "DELETE FROM roles WHERE role_id = ?",
             (role_id,)
         )
+        token_cache.invalidate_role(role_id)
     
     def _row_to_role(self, row) -> Role:
         role = Role(
@@ -4,6 +4,7 @@ from ...domain.entities.role import Role
 from ...domain.repositories import UserRepository
 from .sqlite_role_repository import SQLiteRoleRepository
 from .base_repository import BaseSQLiteRepository
+from ..auth import token_cache
 
 
 class SQLiteUserRepository(BaseSQLiteRepository, UserRepository):
@@ -27,6 +28,8 @@ class SQLiteUserRepository(BaseSQLiteRepository, UserRepository):
                 user.created_at.isoformat()
             )
         )
+        # 停用、换角色或换许可证后，已缓存的身份不能再使用
+        token_cache.invalidate_user(user.user_id)
     
     def find_by_id(self, user_id: str) -> Optional[User]:
         rows = self._execute_query(
@@ -64,24 +67,21 @@ class SQLiteUserRepository(BaseSQLiteRepository, UserRepository):
             "DELETE FROM users WHERE user_id = ?",
             (user_id,)
         )
+        token_cache.invalidate_user(user_id)
     
     def exists_by_username(self, username: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM users WHERE username = ?",
-                (username,)
-            )
-            return cursor.fetchone() is not None
+        rows = self._execute_query(
+            "SELECT 1 FROM users WHERE username = ? LIMIT 1",
+            (username,)
+        )
+        return bool(rows)
     
     def exists_by_email(self, email: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM users WHERE email = ?",
-                (email,)
-            )
-            return cursor.fetchone() is not None
+        rows = self._execute_query(
+            "SELECT 1 FROM users WHERE email = ? LIMIT 1",
+            (email,)
+        )
+        return bool(rows)
     
     def _row_to_user(self, row) -> User:
         from datetime import datetime
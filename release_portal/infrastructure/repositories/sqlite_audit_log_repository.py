@@ -5,11 +5,11 @@ SQLite 审计日志仓储实现
 import sqlite3
 import json
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 
-from ..domain.repositories.audit_log_repository import AuditLogRepository
-from ..entities.audit_log import AuditLog, AuditAction, AuditLogFilter
+from ...domain.repositories.audit_log_repository import AuditLogRepository
+from ...domain.entities.audit_log import AuditLog, AuditAction, AuditLogFilter
 
 
 class SQLiteAuditLogRepository(AuditLogRepository):
@@ -22,6 +22,7 @@ class SQLiteAuditLogRepository(AuditLogRepository):
             db_path: 数据库文件路径
         """
         self.db_path = db_path
+        self.fts_enabled = False
         self._init_database()
     
     def _init_database(self):
@@ -71,9 +72,63 @@ class SQLiteAuditLogRepository(AuditLogRepository):
             ON audit_logs(resource_id)
         """)
         
+        # 常用筛选组合的复合索引（rowid 隐含在索引末尾，可直接支撑游标分页）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_user_timestamp 
+            ON audit_logs(user_id, timestamp)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_action_timestamp 
+            ON audit_logs(action, timestamp)
+        """)
+        
         conn.commit()
+        
+        # 全文搜索索引（SQLite 未编译 FTS5 时回退到 LIKE 扫描）
+        try:
+            self._init_fts(cursor)
+            conn.commit()
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            conn.rollback()
+        
         conn.close()
     
+    def _init_fts(self, cursor):
+        """创建 FTS5 外部内容索引及同步触发器"""
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_logs_fts'"
+        )
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS audit_logs_fts USING fts5(
+                username, resource_name, error_message, details,
+                content='audit_logs', content_rowid='id'
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS audit_logs_fts_insert
+            AFTER INSERT ON audit_logs BEGIN
+                INSERT INTO audit_logs_fts (rowid, username, resource_name, error_message, details)
+                VALUES (new.id, new.username, new.resource_name, new.error_message, new.details);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS audit_logs_fts_delete
+            AFTER DELETE ON audit_logs BEGIN
+                INSERT INTO audit_logs_fts (audit_logs_fts, rowid, username, resource_name, error_message, details)
+                VALUES ('delete', old.id, old.username, old.resource_name, old.error_message, old.details);
+            END
+        """)
+        
+        # 已有数据的旧库首次建立索引时需要全量重建
+        if not exists:
+            cursor.execute("INSERT INTO audit_logs_fts (audit_logs_fts) VALUES ('rebuild')")
+    
     def save(self, audit_log: AuditLog) -> AuditLog:
         """保存审计日志"""
         conn = sqlite3.connect(self.db_path)
@@ -86,7 +141,7 @@ class SQLiteAuditLogRepository(AuditLogRepository):
                 action, user_id, username, role, ip_address, user_agent,
                 resource_type, resource_id, resource_name, details,
                 status, error_message, timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             audit_log.action.value if audit_log.action else None,
             audit_log.user_id,
@@ -133,53 +188,26 @@ class SQLiteAuditLogRepository(AuditLogRepository):
     
     def find_all(self, filters: Optional[AuditLogFilter] = None,
                 limit: int = 100, offset: int = 0) -> List[AuditLog]:
-        """查找审计日志"""
+        """查找审计日志
+        
+        指定 filters.query 时按全文检索相关度排序，否则按时间倒序。
+        """
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # 构建查询
-        query = "SELECT * FROM audit_logs WHERE 1=1"
-        params = []
+        where, params = self._build_where(filters)
+        
+        if filters and filters.query and self.fts_enabled:
+            query = f"""
+                SELECT audit_logs.* FROM audit_logs_fts
+                JOIN audit_logs ON audit_logs.id = audit_logs_fts.rowid
+                WHERE {where}
+                ORDER BY bm25(audit_logs_fts), audit_logs.timestamp DESC
+            """
+        else:
+            query = f"SELECT * FROM audit_logs WHERE {where} ORDER BY timestamp DESC"
         
-        if filters:
-            if filters.start_date:
-                query += " AND timestamp >= ?"
-                params.append(filters.start_date.isoformat())
-            
-            if filters.end_date:
-                query += " AND timestamp <= ?"
-                params.append(filters.end_date.isoformat())
-            
-            if filters.user_id:
-                query += " AND user_id = ?"
-                params.append(filters.user_id)
-            
-            if filters.username:
-                query += " AND username LIKE ?"
-                params.append(f"%{filters.username}%")
-            
-            if filters.action:
-                query += " AND action = ?"
-                params.append(filters.action.value)
-            
-            if filters.resource_type:
-                query += " AND resource_type = ?"
-                params.append(filters.resource_type)
-            
-            if filters.resource_id:
-                query += " AND resource_id = ?"
-                params.append(filters.resource_id)
-            
-            if filters.status:
-                query += " AND status = ?"
-                params.append(filters.status)
-            
-            if filters.ip_address:
-                query += " AND ip_address = ?"
-                params.append(filters.ip_address)
-        
-        query += " ORDER BY timestamp DESC"
         query += " LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
@@ -189,34 +217,58 @@ class SQLiteAuditLogRepository(AuditLogRepository):
         
         return [self._row_to_audit_log(row) for row in rows]
     
+    def find_page(self, filters: Optional[AuditLogFilter] = None, limit: int = 100,
+                  after: Optional[Tuple[str, int]] = None) -> List[AuditLog]:
+        """按 (timestamp, id) 倒序进行游标分页
+        
+        Args:
+            filters: 过滤器（全文检索在此模式下按时间而非相关度排序）
+            limit: 每页数量
+            after: 上一页最后一条记录的 (timestamp, id)
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        where, params = self._build_where(filters)
+        
+        if after:
+            where += " AND (audit_logs.timestamp < ? OR (audit_logs.timestamp = ? AND audit_logs.id < ?))"
+            params.extend([after[0], after[0], after[1]])
+        
+        if filters and filters.query and self.fts_enabled:
+            query = f"""
+                SELECT audit_logs.* FROM audit_logs_fts
+                JOIN audit_logs ON audit_logs.id = audit_logs_fts.rowid
+                WHERE {where}
+            """
+        else:
+            query = f"SELECT * FROM audit_logs WHERE {where}"
+        
+        query += " ORDER BY audit_logs.timestamp DESC, audit_logs.id DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_audit_log(row) for row in rows]
+    
     def count(self, filters: Optional[AuditLogFilter] = None) -> int:
         """统计审计日志数量"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        query = "SELECT COUNT(*) FROM audit_logs WHERE 1=1"
-        params = []
+        where, params = self._build_where(filters)
         
-        if filters:
-            if filters.start_date:
-                query += " AND timestamp >= ?"
-                params.append(filters.start_date.isoformat())
-            
-            if filters.end_date:
-                query += " AND timestamp <= ?"
-                params.append(filters.end_date.isoformat())
-            
-            if filters.user_id:
-                query += " AND user_id = ?"
-                params.append(filters.user_id)
-            
-            if filters.action:
-                query += " AND action = ?"
-                params.append(filters.action.value)
-            
-            if filters.status:
-                query += " AND status = ?"
-                params.append(filters.status)
+        if filters and filters.query and self.fts_enabled:
+            query = f"""
+                SELECT COUNT(*) FROM audit_logs_fts
+                JOIN audit_logs ON audit_logs.id = audit_logs_fts.rowid
+                WHERE {where}
+            """
+        else:
+            query = f"SELECT COUNT(*) FROM audit_logs WHERE {where}"
         
         cursor.execute(query, params)
         count = cursor.fetchone()[0]
@@ -224,6 +276,72 @@ class SQLiteAuditLogRepository(AuditLogRepository):
         
         return count
     
+    def _build_where(self, filters: Optional[AuditLogFilter]) -> Tuple[str, list]:
+        """根据过滤器构建 WHERE 子句和参数"""
+        clauses = ["1=1"]
+        params = []
+        
+        if not filters:
+            return " AND ".join(clauses), params
+        
+        if filters.query:
+            if self.fts_enabled:
+                clauses.append("audit_logs_fts MATCH ?")
+                params.append(self._to_fts_query(filters.query))
+            else:
+                for term in filters.query.split():
+                    clauses.append(
+                        "(audit_logs.username LIKE ? OR audit_logs.resource_name LIKE ?"
+                        " OR audit_logs.error_message LIKE ? OR audit_logs.details LIKE ?)"
+                    )
+                    params.extend([f"%{term}%"] * 4)
+        
+        if filters.start_date:
+            clauses.append("audit_logs.timestamp >= ?")
+            params.append(filters.start_date.isoformat())
+        
+        if filters.end_date:
+            clauses.append("audit_logs.timestamp <= ?")
+            params.append(filters.end_date.isoformat())
+        
+        if filters.user_id:
+            clauses.append("audit_logs.user_id = ?")
+            params.append(filters.user_id)
+        
+        if filters.username:
+            clauses.append("audit_logs.username LIKE ?")
+            params.append(f"%{filters.username}%")
+        
+        if filters.action:
+            clauses.append("audit_logs.action = ?")
+            params.append(filters.action.value)
+        
+        if filters.resource_type:
+            clauses.append("audit_logs.resource_type = ?")
+            params.append(filters.resource_type)
+        
+        if filters.resource_id:
+            clauses.append("audit_logs.resource_id = ?")
+            params.append(filters.resource_id)
+        
+        if filters.status:
+            clauses.append("audit_logs.status = ?")
+            params.append(filters.status)
+        
+        if filters.ip_address:
+            clauses.append("audit_logs.ip_address = ?")
+            params.append(filters.ip_address)
+        
+        return " AND ".join(clauses), params
+    
+    @staticmethod
+    def _to_fts_query(text: str) -> str:
+        """将用户输入转换为安全的 FTS5 查询（各词条前缀匹配，隐式 AND）"""
+        terms = []
+        for term in text.split():
+            terms.append('"' + term.replace('"', '""') + '"*')
+        return " ".join(terms) or '""'
+    
     def delete_old_logs(self, days: int) -> int:
         """删除旧日志"""
         cutoff_date = datetime.now() - timedelta(days=days)
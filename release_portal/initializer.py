@@ -33,9 +33,22 @@ class DatabaseInitializer:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.executescript(schema_sql)
+        self._upgrade_schema(cursor)
         conn.commit()
         conn.close()
     
+    # 已有数据库中缺失的列：(表, 列, 类型)
+    ADDED_COLUMNS = [
+        ('licenses', 'download_limits', 'TEXT'),
+    ]
+    
+    def _upgrade_schema(self, cursor) -> None:
+        """为旧数据库补齐后续版本新增的列（CREATE TABLE IF NOT EXISTS 不会修改已有表）"""
+        for table, column, column_type in self.ADDED_COLUMNS:
+            columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    
     def _create_default_roles(self) -> None:
         role_repo = SQLiteRoleRepository(self.db_path)
         
@@ -73,6 +86,8 @@ def create_container(db_path: str = None):
         AuthService, ReleaseService, DownloadService, 
         LicenseService, AuthorizationService, StorageServiceAdapter
     )
+    from .application.audit_service import AuditService
+    from .infrastructure.repositories.sqlite_audit_log_repository import SQLiteAuditLogRepository
     from binary_manager_v2.application import PublisherService, DownloaderService
     from binary_manager_v2.infrastructure.database import SQLitePackageRepository
     
@@ -83,6 +98,7 @@ def create_container(db_path: str = None):
     license_repo = SQLiteLicenseRepository(db_path)
     release_repo = SQLiteReleaseRepository(db_path)
     package_repo = SQLitePackageRepository(db_path)
+    audit_repo = SQLiteAuditLogRepository(db_path)
     
     token_service = TokenService(
         secret_key=Config.get_secret_key(),
@@ -129,6 +145,8 @@ def create_container(db_path: str = None):
         license_repository=license_repo
     )
     
+    audit_service = AuditService(audit_repository=audit_repo)
+    
     class Container:
         def __init__(self):
             self.auth_service = auth_service
@@ -136,10 +154,12 @@ def create_container(db_path: str = None):
             self.download_service = download_service
             self.license_service = license_service
             self.authorization_service = authorization_service
+            self.audit_service = audit_service
             self.role_repository = role_repo
             self.user_repository = user_repo
             self.license_repository = license_repo
             self.release_repository = release_repo
             self.package_repository = package_repo
+            self.audit_repository = audit_repo
     
     return Container()
@@ -13,5 +13,6 @@ from .downloads import downloads_bp
 from .licenses import licenses_bp
 from .backup import backup_bp
 from .cold_backup import cold_backup_bp
+from .audit import audit_bp
 
-__all__ = ['auth_bp', 'releases_bp', 'downloads_bp', 'licenses_bp', 'backup_bp', 'cold_backup_bp']
+__all__ = ['auth_bp', 'releases_bp', 'downloads_bp', 'licenses_bp', 'backup_bp', 'cold_backup_bp', 'audit_bp']
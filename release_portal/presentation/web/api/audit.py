@@ -13,6 +13,7 @@ def list_audit_logs():
     """查询审计日志
     
     Query Parameters:
+        q: 全文检索（用户名、资源名、错误信息、详情），结果按相关度排序
         user_id: 用户ID筛选
         username: 用户名筛选（支持模糊搜索）
         action: 操作类型
@@ -23,12 +24,17 @@ def list_audit_logs():
         end_date: 结束日期 (ISO8601)
         limit: 返回数量限制（默认100）
         offset: 偏移量（默认0）
+        cursor: 游标分页，取上一页返回的 next_cursor（首页传空字符串）；
+                按 (timestamp, id) 倒序，忽略 offset 和相关度排序
+        total: 总数计算方式 exact | cached | none
+               （默认：偏移分页为 exact，游标分页为 none）
     
     Response:
         {
             "logs": [...],
             "count": 100,
-            "total": 1500
+            "total": 1500,
+            "next_cursor": "..."
         }
     """
     try:
@@ -40,6 +46,7 @@ def list_audit_logs():
         container = create_container(db_path)
         
         # 获取查询参数
+        q = request.args.get('q')
         user_id = request.args.get('user_id')
         username = request.args.get('username')
         action_str = request.args.get('action')
@@ -50,9 +57,19 @@ def list_audit_logs():
         end_date_str = request.args.get('end_date')
         limit = int(request.args.get('limit', 100))
         offset = int(request.args.get('offset', 0))
+        cursor = request.args.get('cursor')
+        total_mode = request.args.get('total', 'exact' if cursor is None else 'none')
+        
+        if total_mode not in ('exact', 'cached', 'none'):
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'Invalid total mode: {total_mode}'
+            }), 400
         
         # 构建过滤器
         filters = {}
+        if q:
+            filters['query'] = q
         if user_id:
             filters['user_id'] = user_id
         if username:
@@ -75,8 +92,25 @@ def list_audit_logs():
         filter_obj = AuditLogFilter(**filters) if filters else None
         
         # 查询日志
-        logs = container.audit_service.query_logs(filter_obj, limit, offset)
-        total = container.audit_service.get_log_count(filter_obj)
+        next_cursor = None
+        if cursor is not None:
+            try:
+                logs, next_cursor = container.audit_service.query_logs_page(
+                    filter_obj, limit, cursor or None
+                )
+            except ValueError as e:
+                return jsonify({
+                    'error': 'Bad Request',
+                    'message': str(e)
+                }), 400
+        else:
+            logs = container.audit_service.query_logs(filter_obj, limit, offset)
+        
+        total = None
+        if total_mode != 'none':
+            total = container.audit_service.get_log_count(
+                filter_obj, use_cache=(total_mode == 'cached')
+            )
         
         # 转换为字典
         logs_data = [log.to_dict() for log in logs]
@@ -86,7 +120,8 @@ def list_audit_logs():
             'count': len(logs_data),
             'total': total,
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -239,11 +274,65 @@ def cleanup_old_logs():
         }), 500
 
 
+CSV_HEADER = [
+    'ID', 'Action', 'User ID', 'Username', 'Role',
+    'IP Address', 'Resource Type', 'Resource ID',
+    'Resource Name', 'Status', 'Error Message',
+    'Timestamp'
+]
+
+
+def _csv_row(log) -> list:
+    """将审计日志转换为 CSV 行"""
+    return [
+        log.id,
+        log.action.value if log.action else '',
+        log.user_id,
+        log.username,
+        log.role,
+        log.ip_address,
+        log.resource_type,
+        log.resource_id,
+        log.resource_name,
+        log.status,
+        log.error_message or '',
+        log.timestamp.isoformat()
+    ]
+
+
+def _parse_export_filters(filters_data: dict):
+    """根据导出请求中的 filters 构建 AuditLogFilter"""
+    from datetime import datetime
+    from release_portal.domain.entities.audit_log import AuditLogFilter, AuditAction
+    
+    filters = AuditLogFilter()
+    
+    if filters_data:
+        if 'start_date' in filters_data:
+            filters.start_date = datetime.fromisoformat(filters_data['start_date'])
+        if 'end_date' in filters_data:
+            filters.end_date = datetime.fromisoformat(filters_data['end_date'])
+        if 'user_id' in filters_data:
+            filters.user_id = filters_data['user_id']
+        if 'action' in filters_data:
+            filters.action = AuditAction.from_string(filters_data['action'])
+        if 'resource_type' in filters_data:
+            filters.resource_type = filters_data['resource_type']
+        if 'status' in filters_data:
+            filters.status = filters_data['status']
+        if 'q' in filters_data:
+            filters.query = filters_data['q']
+    
+    return filters
+
+
 @audit_bp.route('/logs/export', methods=['POST'])
 @require_role('Admin')
 def export_logs():
     """导出审计日志为 CSV
     
+    最多导出 10,000 条，完整导出请使用 /logs/export/stream。
+    
     Request:
         {
             "filters": {...},  // 可选的过滤条件
@@ -267,22 +356,7 @@ def export_logs():
         export_format = data.get('format', 'csv')
         
         # 构建过滤器
-        from release_portal.domain.entities.audit_log import AuditLogFilter, AuditAction
-        filters = AuditLogFilter()
-        
-        if filters_data:
-            if 'start_date' in filters_data:
-                filters['start_date'] = datetime.fromisoformat(filters_data['start_date'])
-            if 'end_date' in filters_data:
-                filters['end_date'] = datetime.fromisoformat(filters_data['end_date'])
-            if 'user_id' in filters_data:
-                filters['user_id'] = filters_data['user_id']
-            if 'action' in filters_data:
-                filters['action'] = AuditAction.from_string(filters_data['action'])
-            if 'resource_type' in filters_data:
-                filters['resource_type'] = filters_data['resource_type']
-            if 'status' in filters_data:
-                filters['status'] = filters_data['status']
+        filters = _parse_export_filters(filters_data)
         
         # 查询日志
         logs = container.audit_service.query_logs(filters, limit=10000)
@@ -305,29 +379,11 @@ def export_logs():
             writer = csv.writer(output)
             
             # 写入表头
-            writer.writerow([
-                'ID', 'Action', 'User ID', 'Username', 'Role',
-                'IP Address', 'Resource Type', 'Resource ID',
-                'Resource Name', 'Status', 'Error Message',
-                'Timestamp'
-            ])
+            writer.writerow(CSV_HEADER)
             
             # 写入数据
             for log in logs:
-                writer.writerow([
-                    log.id,
-                    log.action.value if log.action else '',
-                    log.user_id,
-                    log.username,
-                    log.role,
-                    log.ip_address,
-                    log.resource_type,
-                    log.resource_id,
-                    log.resource_name,
-                    log.status,
-                    log.error_message or '',
-                    log.timestamp.isoformat()
-                ])
+                writer.writerow(_csv_row(log))
             
             return jsonify({
                 'filename': f'audit_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
@@ -340,3 +396,117 @@ def export_logs():
             'error': 'Internal Server Error',
             'message': str(e)
         }), 500
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'json': ('application/json', 'json'),
+}
+
+STREAM_CHUNK_BYTES = 64 * 1024  # 流式导出每次输出的大致字节数
+
+
+def _render_export(logs, export_format: str):
+    """将日志迭代器逐块渲染为导出格式的文本片段"""
+    import csv
+    import io
+    import json
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    if export_format == 'csv':
+        writer.writerow(CSV_HEADER)
+    elif export_format == 'json':
+        buffer.write('[')
+    
+    first = True
+    for log in logs:
+        if export_format == 'csv':
+            writer.writerow(_csv_row(log))
+        elif export_format == 'ndjson':
+            buffer.write(json.dumps(log.to_dict(), ensure_ascii=False))
+            buffer.write('\n')
+        else:
+            if not first:
+                buffer.write(',')
+            buffer.write(json.dumps(log.to_dict(), ensure_ascii=False))
+        first = False
+        
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if export_format == 'json':
+        buffer.write(']')
+    
+    yield buffer.getvalue()
+
+
+def _gzip_stream(chunks):
+    """对文本片段流进行增量 gzip 压缩"""
+    import zlib
+    
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@audit_bp.route('/logs/export/stream', methods=['POST'])
+@require_role('Admin')
+def export_logs_stream():
+    """以分块传输流式导出审计日志（不限行数，内存占用恒定）
+    
+    Request:
+        {
+            "filters": {...},  // 可选的过滤条件（同 /logs/export，另支持 q 全文检索）
+            "format": "csv",   // csv、ndjson 或 json
+            "gzip": false      // 是否 gzip 压缩输出
+        }
+    
+    Response: chunked 文件下载（Content-Disposition: attachment）
+    """
+    try:
+        from release_portal.initializer import create_container
+        from datetime import datetime
+        from flask import current_app, Response, stream_with_context
+        
+        db_path = current_app.config.get('DB_PATH')
+        container = create_container(db_path)
+        
+        data = request.get_json() or {}
+        export_format = data.get('format', 'csv')
+        use_gzip = bool(data.get('gzip', False))
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'Unsupported export format: {export_format}'
+            }), 400
+        
+        filters = _parse_export_filters(data.get('filters', {}))
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f'audit_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+        
+        body = _render_export(container.audit_service.iter_logs(filters), export_format)
+        if use_gzip:
+            body = _gzip_stream(body)
+            mimetype = 'application/gzip'
+            filename += '.gz'
+        
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
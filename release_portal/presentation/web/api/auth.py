@@ -58,9 +58,8 @@ def login():
         
         token = container.auth_service.login(username, password)
         
-        # 获取用户信息
-        user_info = container.auth_service.verify_token(token)
-        user = container.auth_service.get_user_from_token(token)
+        # 获取用户信息（同时预热认证缓存）
+        user_info, user = container.auth_service.authenticate(token)
         
         return jsonify({
             'token': token,
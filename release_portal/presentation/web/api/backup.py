@@ -48,10 +48,12 @@ def list_backups():
         )
         
         backups = backup_service.list_backups()
+        incremental_backups = backup_service.list_incremental_backups()
         
         return jsonify({
             'backups': backups,
-            'count': len(backups)
+            'count': len(backups),
+            'incremental_backups': incremental_backups
         }), 200
     
     except Exception as e:
@@ -69,7 +71,11 @@ def create_backup():
     Request:
         {
             "name": "my_backup",  // 可选
-            "include_storage": true  // 可选，默认 true
+            "include_storage": true,  // 可选，默认 true
+            "mode": "full",  // 可选，full 或 incremental（只保存新增/变化的文件）
+            "snapshot_pages_per_step": 1024,  // 可选，数据库快照每步页数
+            "snapshot_step_sleep": 0.0,  // 可选，快照每步间隔秒数（限速）
+            "compression_threads": 4  // 可选，完整备份压缩线程数，默认全部 CPU
         }
     
     Response:
@@ -89,24 +95,51 @@ def create_backup():
         
         name = data.get('name')
         include_storage = data.get('include_storage', True)
+        mode = data.get('mode', 'full')
+        
+        if mode not in ('full', 'incremental'):
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'Invalid backup mode: {mode}'
+            }), 400
         
         db_path = data.get('db_path', './data/portal.db')
         storage_path = data.get('storage_path', './releases')
         backup_dir = data.get('backup_dir', './backups')
         
+        compression_threads = data.get('compression_threads')
+        if compression_threads is not None:
+            compression_threads = int(compression_threads)
+            if compression_threads < 1:
+                raise ValueError(f'Invalid compression_threads: {compression_threads}')
+        
         backup_service = BackupService(
             db_path=db_path,
             storage_path=storage_path,
-            backup_dir=backup_dir
+            backup_dir=backup_dir,
+            snapshot_pages_per_step=int(data.get('snapshot_pages_per_step', 1024)),
+            snapshot_step_sleep=float(data.get('snapshot_step_sleep', 0.0)),
+            compression_threads=compression_threads
         )
         
-        backup_info = backup_service.create_backup(
-            name=name,
-            include_storage=include_storage
-        )
+        if mode == 'incremental':
+            backup_info = backup_service.create_incremental_backup(
+                name=name,
+                include_storage=include_storage
+            )
+        else:
+            backup_info = backup_service.create_backup(
+                name=name,
+                include_storage=include_storage
+            )
         
         return jsonify(backup_info), 201
     
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'error': 'Internal Server Error',
@@ -208,7 +241,11 @@ def restore_backup():
         {
             "backup_filename": "backup_20240302_120000.tar.gz",
             "target_db_path": "./data/portal.db",  // 可选
-            "target_storage_path": "./releases"  // 可选
+            "target_storage_path": "./releases",  // 可选
+            "mode": "full",  // 可选，incremental 时 backup_filename 为增量备份名称
+            "restore_database": true,  // 可选，是否恢复数据库
+            "restore_storage": true,  // 可选，是否恢复存储文件
+            "storage_paths": ["pkg_a"]  // 可选，只恢复这些存储路径（包目录或文件）
         }
     
     Response:
@@ -244,11 +281,24 @@ def restore_backup():
             backup_dir=backup_dir
         )
         
-        restore_info = backup_service.restore_backup(
-            backup_filename=backup_filename,
-            target_db_path=target_db_path,
-            target_storage_path=target_storage_path
-        )
+        restore_options = {
+            'target_db_path': target_db_path,
+            'target_storage_path': target_storage_path,
+            'restore_database': data.get('restore_database', True),
+            'restore_storage': data.get('restore_storage', True),
+            'storage_paths': data.get('storage_paths')
+        }
+        
+        if data.get('mode', 'full') == 'incremental':
+            restore_info = backup_service.restore_incremental_backup(
+                backup_name=backup_filename,
+                **restore_options
+            )
+        else:
+            restore_info = backup_service.restore_backup(
+                backup_filename=backup_filename,
+                **restore_options
+            )
         
         return jsonify(restore_info), 200
     
@@ -269,6 +319,9 @@ def restore_backup():
 def delete_backup(backup_filename: str):
     """删除备份
     
+    Query Parameters:
+        mode: full（默认）或 incremental；删除增量备份时同时回收无引用的数据块
+    
     Response:
         {
             "success": true,
@@ -288,7 +341,10 @@ def delete_backup(backup_filename: str):
             backup_dir=backup_dir
         )
         
-        success = backup_service.delete_backup(backup_filename)
+        if request.args.get('mode') == 'incremental':
+            success = backup_service.delete_incremental_backup(backup_filename)['success']
+        else:
+            success = backup_service.delete_backup(backup_filename)
         
         if not success:
             return jsonify({
@@ -28,7 +28,9 @@ def get_cold_backup_service():
         'bucket': request.args.get('bucket', ''),
         'prefix': request.args.get('prefix', 'cold_backups/'),
         'region': request.args.get('region', 'us-east-1'),
-        'retention_days': int(request.args.get('retention_days', 365))
+        'retention_days': int(request.args.get('retention_days', 365)),
+        'disk_bytes_per_sec': request.args.get('disk_bytes_per_sec', type=int),
+        'network_bytes_per_sec': request.args.get('network_bytes_per_sec', type=int)
     }
     
     try:
@@ -189,6 +191,13 @@ def retrieve_cold_archive(archive_id: str):
             "success": true,
             "local_path": "/tmp/restore.tar.gz"
         }
+    
+        归档位于 Glacier 等深度存储时先发起恢复并返回 202：
+        {
+            "success": false,
+            "restore": {"state": "restoring", "requested_at": "..."}
+        }
+        恢复完成前重复调用即可轮询进度。
     """
     try:
         data = request.get_json() or {}
@@ -202,6 +211,21 @@ def retrieve_cold_archive(archive_id: str):
                 'message': 'Failed to initialize cold backup service'
             }), 500
         
+        try:
+            restore = service.request_retrieval(archive_id)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Not Found',
+                'message': str(e)
+            }), 404
+        
+        if restore['state'] in ('archived', 'restoring'):
+            return jsonify({
+                'success': False,
+                'archive_id': archive_id,
+                'restore': restore
+            }), 202
+        
         success = service.retrieve_from_cold_storage(archive_id, restore_path)
         
         if not success:
@@ -306,6 +330,8 @@ def get_backup_policy():
         {
             "retention_days": 365,
             "scheduler_running": false,
+            "schedule": [{"name": "cold_backup", "next_run": "...", "last_run": {...}}],
+            "throttle": {"disk_bytes_per_sec": null, "network_bytes_per_sec": null},
             "storage_backend": "LocalFileSystemBackend",
             "archive_count": 10
         }
@@ -337,19 +363,34 @@ def schedule_automatic_backup():
     
     Request:
         {
-            "interval_hours": 24
+            "interval_hours": 24,         // 可选，固定间隔
+            "cron": "30 3 * * *",         // 可选，优先于 interval_hours
+            "jitter_seconds": 600,        // 可选，随机延迟上限
+            "nice": 10,                   // 可选
+            "ionice_idle": true           // 可选
         }
     
     Response:
         {
             "success": true,
-            "message": "Scheduled automatic backup every 24 hours"
+            "message": "Scheduled automatic backup: 30 3 * * *",
+            "job": {"name": "cold_backup", "next_run": "...", "last_run": null, ...}
         }
     """
     try:
         data = request.get_json() or {}
         interval_hours = data.get('interval_hours', 24)
         
+        try:
+            interval_hours = float(interval_hours)
+            jitter_seconds = float(data.get('jitter_seconds', 0))
+            nice = int(data.get('nice', 10))
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'interval_hours, jitter_seconds and nice must be numbers'
+            }), 400
+        
         service = get_cold_backup_service()
         
         if not service:
@@ -358,11 +399,24 @@ def schedule_automatic_backup():
                 'message': 'Failed to initialize cold backup service'
             }), 500
         
-        service.schedule_automatic_backup(interval_hours)
+        try:
+            job = service.schedule_automatic_backup(
+                interval_hours,
+                cron=data.get('cron'),
+                jitter_seconds=jitter_seconds,
+                nice=nice,
+                ionice_idle=bool(data.get('ionice_idle', True))
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': str(e)
+            }), 400
         
         return jsonify({
             'success': True,
-            'message': f'Scheduled automatic backup every {interval_hours} hours'
+            'message': f"Scheduled automatic backup: {job['schedule']}",
+            'job': job
         }), 200
     
     except Exception as e:
@@ -3,6 +3,9 @@
 """
 from flask import Blueprint, request, jsonify, send_file
 from release_portal.presentation.web.auth_middleware import require_auth
+from release_portal.application.download_limiter import download_limiter
+from release_portal.shared import RateLimitError
+from release_portal.shared.throttle import ThrottledStream
 import tempfile
 import os
 
@@ -68,8 +71,12 @@ def get_available_packages(release_id: str):
 def download_package(release_id: str, content_type: str):
     """下载包
     
+    受许可证下载限额约束：超出速率或并发限制时返回 429 和 Retry-After，
+    设置了带宽上限时按该速率分块发送。
+    
     Response: Binary file stream
     """
+    slot = None
     try:
         from release_portal.initializer import create_container
         
@@ -83,6 +90,14 @@ def download_package(release_id: str, content_type: str):
                 'message': 'User not authenticated'
             }), 401
         
+        # 占用下载名额（在准备文件之前，避免被拒绝的请求消耗磁盘 I/O）
+        license = container.license_repository.find_by_id(user.license_id) if user.license_id else None
+        slot = download_limiter.acquire(
+            user.user_id,
+            user.license_id,
+            license.download_limits if license else None
+        )
+        
         # 创建临时目录
         temp_dir = tempfile.mkdtemp()
         
@@ -105,18 +120,31 @@ def download_package(release_id: str, content_type: str):
             
             package_file = os.path.join(temp_dir, files[0])
             
-            # 发送文件
-            return send_file(
+            # 发送文件；名额在响应发送完毕（或客户端断开）时释放。
+            # send_file 的响应直通 WSGI 服务器，只有响应体的 close 会被调用，
+            # HEAD/304 等空响应则走 call_on_close
+            response = send_file(
                 package_file,
                 as_attachment=True,
                 download_name=files[0]
             )
+            response.response = ThrottledStream(response.response, slot.bandwidth, slot.release)
+            response.call_on_close(slot.release)
+            slot = None
+            return response
         
         finally:
             # 清理临时文件（在发送后）
             import atexit
             atexit.register(lambda: __import__('shutil').rmtree(temp_dir, ignore_errors=True))
     
+    except RateLimitError as e:
+        response = jsonify({
+            'error': 'Too Many Requests',
+            'message': str(e)
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
     except ValueError as e:
         return jsonify({
             'error': 'Bad Request',
@@ -127,6 +155,10 @@ def download_package(release_id: str, content_type: str):
             'error': 'Internal Server Error',
             'message': str(e)
         }), 500
+    finally:
+        # 未交给响应的名额（出错或提前返回）在此释放
+        if slot:
+            slot.release()
 
 
 @downloads_bp.route('/releases', methods=['GET'])
@@ -3,7 +3,7 @@
 """
 from flask import Blueprint, request, jsonify
 from release_portal.presentation.web.auth_middleware import require_auth, require_role
-from release_portal.domain.value_objects import AccessLevel, ResourceType
+from release_portal.domain.value_objects import AccessLevel, ResourceType, DownloadLimits
 from datetime import datetime, timedelta
 
 licenses_bp = Blueprint('licenses', __name__)
@@ -92,7 +92,8 @@ def create_license():
             "access_level": "FULL_ACCESS",
             "allowed_resource_types": ["BSP", "DRIVER"],
             "expires_at": "ISO8601",
-            "days": 365  // 可选，与 expires_at 二选一
+            "days": 365,  // 可选，与 expires_at 二选一
+            "download_limits": {...}  // 可选，见 PUT /<license_id>/download-limits
         }
     
     Response:
@@ -115,6 +116,7 @@ def create_license():
         allowed_resource_types_str = data.get('allowed_resource_types', [])
         expires_at_str = data.get('expires_at')
         days = data.get('days')
+        download_limits = DownloadLimits.from_dict(data.get('download_limits'))
         
         if not all([organization, access_level_str, allowed_resource_types_str]):
             return jsonify({
@@ -144,7 +146,8 @@ def create_license():
             organization=organization,
             access_level=access_level,
             allowed_resource_types=allowed_resource_types,
-            expires_at=expires_at
+            expires_at=expires_at,
+            download_limits=download_limits
         )
         
         return jsonify(license.to_dict()), 201
@@ -276,3 +279,55 @@ def extend_license(license_id: str):
             'error': 'Internal Server Error',
             'message': str(e)
         }), 500
+
+
+@licenses_bp.route('/<license_id>/download-limits', methods=['PUT'])
+@require_role('Admin')
+def set_download_limits(license_id: str):
+    """设置许可证下载限额（仅管理员），省略或为 null 的项表示不限制
+    
+    Request:
+        {
+            "requests_per_minute": 30,           // 每个用户
+            "license_requests_per_minute": 120,  // 许可证合计
+            "burst": 10,
+            "max_concurrent_per_user": 2,
+            "max_concurrent_per_license": 8,
+            "bandwidth_bytes_per_sec": 10485760  // 许可证合计
+        }
+    
+    Response:
+        {
+            "license": {...}
+        }
+    """
+    try:
+        data = request.get_json()
+        
+        if data is None:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'Missing request body'
+            }), 400
+        
+        limits = DownloadLimits.from_dict(data)
+        
+        from release_portal.initializer import create_container
+        container = create_container()
+        
+        license = container.license_service.set_download_limits(license_id, limits)
+        
+        return jsonify({
+            'license': license.to_dict()
+        }), 200
+    
+    except (ValueError, TypeError) as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': str(e)
+        }), 500
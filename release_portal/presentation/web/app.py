@@ -36,14 +36,19 @@ def create_app(db_path: str = None):
     # 启用 CORS
     CORS(app)
     
+    # 请求指标与 /metrics 端点
+    from .metrics_middleware import init_metrics
+    init_metrics(app)
+    
     # 注册蓝图
-    from .api import auth_bp, releases_bp, downloads_bp, licenses_bp, backup_bp, cold_backup_bp
+    from .api import auth_bp, releases_bp, downloads_bp, licenses_bp, backup_bp, cold_backup_bp, audit_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(releases_bp, url_prefix='/api/releases')
     app.register_blueprint(downloads_bp, url_prefix='/api/downloads')
     app.register_blueprint(licenses_bp, url_prefix='/api/licenses')
     app.register_blueprint(backup_bp, url_prefix='/api/backup')
     app.register_blueprint(cold_backup_bp, url_prefix='/api/cold-backup')
+    app.register_blueprint(audit_bp, url_prefix='/api/audit')
     
     # 注册 Web UI 路由
     from .ui import ui_bp
@@ -4,12 +4,13 @@
 from functools import wraps
 from flask import request, jsonify
 from ...shared import AuthenticationError
+from ...infrastructure.auth import token_cache
 
 
 def require_auth(f):
     """要求用户认证的装饰器
     
-    验证请求头中的 JWT Token
+    验证请求头中的 JWT Token，已验证的 Token 由 token_cache 缓存
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -32,23 +33,20 @@ def require_auth(f):
         
         token = auth_header[7:]  # Remove 'Bearer ' prefix
         
-        # 验证 Token
-        container = create_container()
+        # 验证 Token：缓存命中时无需创建容器和查询数据库
         try:
-            user_info = container.auth_service.verify_token(token)
-            if not user_info:
-                return jsonify({
-                    'error': 'Unauthorized',
-                    'message': 'Invalid or expired token'
-                }), 401
-            
-            # 获取完整用户信息
-            user = container.auth_service.get_user_from_token(token)
-            if not user:
-                return jsonify({
-                    'error': 'Unauthorized',
-                    'message': 'User not found'
-                }), 401
+            cached = token_cache.get(token)
+            if cached:
+                user_info, user = cached.payload, cached.user
+            else:
+                container = create_container()
+                identity = container.auth_service.authenticate(token)
+                if not identity:
+                    return jsonify({
+                        'error': 'Unauthorized',
+                        'message': 'Invalid or expired token'
+                    }), 401
+                user_info, user = identity
             
             # 将用户信息添加到请求上下文
             request.current_user = user
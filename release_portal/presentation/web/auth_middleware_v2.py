@@ -5,6 +5,7 @@
 from functools import wraps
 from flask import request, jsonify
 from ...shared import AuthenticationError
+from ...infrastructure.auth import token_cache
 
 
 def require_auth(f):
@@ -16,18 +17,18 @@ def require_auth(f):
         if not auth_header or not auth_header.startswith('Bearer '):
             return jsonify({'error': 'Unauthorized', 'message': '缺少认证信息'}), 401
         
-        # 验证用户
-        from ...initializer import create_container
-        container = create_container()
-        
+        # 验证用户（优先查缓存）
+        token = auth_header[7:]
         try:
-            user_info = container.auth_service.verify_token(auth_header[7:])
-            if not user_info:
-                return jsonify({'error': 'Unauthorized', 'message': 'Token无效或已过期'}), 401
-            
-            user = container.auth_service.get_user_from_token(auth_header[7:])
-            if not user:
-                return jsonify({'error': 'Unauthorized', 'message': '用户不存在'}), 401
+            cached = token_cache.get(token)
+            if cached:
+                user = cached.user
+            else:
+                from ...initializer import create_container
+                identity = create_container().auth_service.authenticate(token)
+                if not identity:
+                    return jsonify({'error': 'Unauthorized', 'message': 'Token无效或已过期'}), 401
+                user = identity[1]
             
             request.current_user = user
             return f(*args, **kwargs)
@@ -0,0 +1,70 @@
+"""
+指标中间件 - 记录每个路由的延迟、进行中请求数和下载字节数，并提供 /metrics
+"""
+import time
+
+from flask import Response, g, request
+
+from ...shared.metrics import (
+    REGISTRY,
+    HTTP_REQUESTS,
+    HTTP_LATENCY,
+    HTTP_IN_FLIGHT,
+    HTTP_RESPONSE_BYTES,
+    DOWNLOAD_BYTES
+)
+
+METRICS_PATH = '/metrics'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _route_label() -> str:
+    # 使用路由模板而不是实际路径，避免 ID 造成标签基数爆炸
+    return request.url_rule.rule if request.url_rule else '<unmatched>'
+
+
+def _record(status: int, response=None) -> None:
+    route = _route_label()
+    elapsed = time.perf_counter() - g._metrics_started
+    HTTP_LATENCY.observe(elapsed, method=request.method, route=route)
+    HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+
+    length = response.content_length if response is not None else None
+    if length:
+        HTTP_RESPONSE_BYTES.inc(length, route=route)
+        disposition = response.headers.get('Content-Disposition', '')
+        if disposition.startswith('attachment'):
+            DOWNLOAD_BYTES.inc(length, route=route)
+    g._metrics_recorded = True
+
+
+def init_metrics(app) -> None:
+    """为应用注册指标钩子和 /metrics 端点"""
+
+    @app.before_request
+    def _metrics_start():
+        if request.path == METRICS_PATH:
+            return
+        g._metrics_started = time.perf_counter()
+        g._metrics_recorded = False
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _metrics_after(response):
+        if getattr(g, '_metrics_started', None) is not None:
+            _record(response.status_code, response)
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(error=None):
+        if getattr(g, '_metrics_started', None) is None:
+            return
+        # 未经 after_request 的请求（处理中抛出异常）按 500 计
+        if not g._metrics_recorded:
+            _record(500)
+        HTTP_IN_FLIGHT.dec()
+        g._metrics_started = None
+
+    @app.route(METRICS_PATH)
+    def metrics():
+        return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -24,6 +24,15 @@ class Config:
     @staticmethod
     def get_token_expiry_hours() -> int:
         return int(os.environ.get('RELEASE_PORTAL_TOKEN_EXPIRY_HOURS', '24'))
+    
+    @staticmethod
+    def get_auth_cache_ttl() -> float:
+        """已验证 Token 的缓存时间（秒），0 表示关闭缓存"""
+        return float(os.environ.get('RELEASE_PORTAL_AUTH_CACHE_TTL', '60'))
+    
+    @staticmethod
+    def get_auth_cache_size() -> int:
+        return int(os.environ.get('RELEASE_PORTAL_AUTH_CACHE_SIZE', '10000'))
 
 
 class ReleasePortalError(Exception):
@@ -44,3 +53,12 @@ class ValidationError(ReleasePortalError):
 
 class NotFoundError(ReleasePortalError):
     pass
+
+
+class RateLimitError(ReleasePortalError):
+    """超出下载限额；retry_after 为建议的重试等待秒数"""
+    
+    def __init__(self, message: str, retry_after: float, reason: str = ''):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
@@ -0,0 +1,133 @@
+"""
+多线程 gzip 写入器 - 按块并行压缩（pigz 方式）
+
+输入按固定大小切块，每块在线程池中独立做原始 deflate 压缩
+（zlib 压缩期间释放 GIL），并以前一块末尾 32 KiB 作为预置字典，
+块之间用 Z_SYNC_FLUSH 对齐字节边界，按顺序拼接后即为一个标准的
+单成员 gzip 流，任何 gzip 实现都能解压。写出的压缩字节同时计算
+sha256，调用方无需再回读文件计算校验和。
+"""
+import hashlib
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional
+
+
+class ParallelGzipWriter:
+    """并行 gzip 写入器（类文件对象，仅支持 write/close）"""
+    
+    DICT_SIZE = 32 * 1024
+    
+    def __init__(self, fileobj: BinaryIO, level: int = 6,
+                 threads: Optional[int] = None, block_size: int = 1024 * 1024):
+        """
+        初始化写入器
+        
+        Args:
+            fileobj: 输出文件对象（二进制写）
+            level: 压缩级别（1-9）
+            threads: 压缩线程数，默认使用全部 CPU
+            block_size: 每个压缩块的未压缩大小
+        """
+        self.fileobj = fileobj
+        self.level = level
+        self.threads = threads or os.cpu_count() or 1
+        self.block_size = block_size
+        
+        self.sha256 = hashlib.sha256()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        
+        self._crc = 0
+        self._buffer = bytearray()
+        self._dictionary = b""
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+        self._closed = False
+        
+        # gzip 头：无文件名、无额外字段，OS=255（未知）
+        self._emit(b"\x1f\x8b\x08\x00" + struct.pack("<I", int(time.time())) + b"\x00\xff")
+    
+    def write(self, data) -> int:
+        """写入未压缩数据"""
+        if self._closed:
+            raise ValueError("write to closed ParallelGzipWriter")
+        
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block)
+        
+        return len(data)
+    
+    def close(self):
+        """压缩剩余数据并写出 gzip 尾部；不关闭底层文件对象"""
+        if self._closed:
+            return
+        
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            
+            while self._pending:
+                self._emit(self._result(self._pending.popleft()))
+            
+            # 空的结束块
+            self._emit(zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS).flush(zlib.Z_FINISH))
+            self._emit(struct.pack("<II", self._crc, self.bytes_in & 0xFFFFFFFF))
+        finally:
+            self._closed = True
+            if self._executor:
+                self._executor.shutdown()
+    
+    def hexdigest(self) -> str:
+        """已写出的压缩数据的 sha256"""
+        return self.sha256.hexdigest()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._executor:
+            self._executor.shutdown(cancel_futures=True)
+    
+    def _submit(self, block: bytes):
+        """提交一个块；在途块数受限，内存占用保持恒定"""
+        self._crc = zlib.crc32(block, self._crc)
+        self.bytes_in += len(block)
+        
+        dictionary = self._dictionary
+        self._dictionary = block[-self.DICT_SIZE:]
+        
+        if self._executor:
+            self._pending.append(self._executor.submit(self._compress_block, block, dictionary, self.level))
+        else:
+            self._pending.append(self._compress_block(block, dictionary, self.level))
+        
+        while len(self._pending) > self.threads * 2:
+            self._emit(self._result(self._pending.popleft()))
+    
+    @staticmethod
+    def _result(pending) -> bytes:
+        return pending if isinstance(pending, bytes) else pending.result()
+    
+    @staticmethod
+    def _compress_block(block: bytes, dictionary: bytes, level: int) -> bytes:
+        if dictionary:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def _emit(self, data: bytes):
+        self.fileobj.write(data)
+        self.sha256.update(data)
+        self.bytes_out += len(data)
@@ -0,0 +1,128 @@
+"""
+带宽限速 - 令牌桶
+
+用于后台任务（备份、冷归档上传/下载）限制磁盘和网络吞吐，
+避免与线上下载流量争抢 I/O。多个线程可共享同一个令牌桶，
+总速率不超过设定值。也用于下载接口的请求限流和流式响应限速。
+"""
+import threading
+import time
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+
+class TokenBucket:
+    """线程安全的令牌桶（单位：字节/秒）"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒补充的字节数
+            burst: 桶容量（允许的突发字节数），默认等于一秒的速率
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def consume(self, amount: int):
+        """取走 amount 个令牌，不足时阻塞等待；超过桶容量的请求按速率透支"""
+        if amount <= 0:
+            return
+        
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        
+        # 在锁外休眠：透支部分已记入，其他线程会排在后面继续等待
+        if wait:
+            time.sleep(wait)
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def wait_time(self, amount: float = 1) -> float:
+        """当前令牌不足 amount 时还需等待的秒数（不取走令牌）"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (amount - self._tokens) / self.rate)
+    
+    def try_consume(self, amount: float = 1) -> float:
+        """非阻塞取令牌：成功返回 0，不足时不取走令牌并返回需等待的秒数"""
+        with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                return (amount - self._tokens) / self.rate
+            self._tokens -= amount
+            return 0.0
+
+
+class ThrottledWriter:
+    """按令牌桶限速的写入包装（类文件对象，仅支持 write/flush）"""
+    
+    def __init__(self, fileobj: BinaryIO, bucket: Optional[TokenBucket]):
+        self.fileobj = fileobj
+        self.bucket = bucket
+    
+    def write(self, data) -> int:
+        if self.bucket:
+            self.bucket.consume(len(data))
+        return self.fileobj.write(data)
+    
+    def flush(self):
+        self.fileobj.flush()
+
+
+def make_bucket(rate: Optional[float]) -> Optional[TokenBucket]:
+    """rate 为空或非正数时表示不限速"""
+    return TokenBucket(rate) if rate and rate > 0 else None
+
+
+class ThrottledStream:
+    """按令牌桶节奏产出数据块的可迭代对象（用于流式响应）
+    
+    close 时关闭原迭代器并执行 on_close 回调（仅一次）。WSGI 服务器在响应
+    发送完毕或客户端断开时调用 close，可据此释放下载名额等资源。
+    """
+    
+    def __init__(self, chunks: Iterable[bytes], bucket: Optional[TokenBucket],
+                 on_close: Optional[Callable[[], None]] = None):
+        self.chunks = chunks
+        self.bucket = bucket
+        self._on_close = on_close
+        self._closed = False
+    
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.chunks:
+            if self.bucket:
+                self.bucket.consume(len(chunk))
+            yield chunk
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self.chunks, "close", None)
+            if close:
+                close()
+        finally:
+            if self._on_close:
+                self._on_close()
+
+
+def copy_throttled(source_path, target_path, bucket: Optional[TokenBucket],
+                   chunk_size: int = 1024 * 1024):
+    """按令牌桶限速复制文件；不限速时退化为普通分块复制"""
+    with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+        for chunk in iter(lambda: src.read(chunk_size), b""):
+            if bucket:
+                bucket.consume(len(chunk))
+            dst.write(chunk)
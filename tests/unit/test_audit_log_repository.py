@@ -0,0 +1,173 @@
+"""
+SQLiteAuditLogRepository 测试
+"""
+import sqlite3
+
+import pytest
+
+from release_portal.domain.entities.audit_log import AuditLog, AuditAction, AuditLogFilter
+from release_portal.infrastructure.repositories.sqlite_audit_log_repository import SQLiteAuditLogRepository
+
+
+class TestAuditLogFullTextSearch:
+    """审计日志全文检索测试"""
+
+    @pytest.fixture
+    def repository(self, tmp_path):
+        repo = SQLiteAuditLogRepository(str(tmp_path / "audit.db"))
+
+        repo.save(AuditLog(action=AuditAction.LOGIN, user_id="u1", username="alice", role="Admin"))
+        repo.save(AuditLog(
+            action=AuditAction.DOWNLOAD, user_id="u2", username="bob", role="Customer",
+            resource_name="bsp-firmware", details={"package": "kernel-image"}
+        ))
+        repo.save(AuditLog(
+            action=AuditAction.UPLOAD_PACKAGE, user_id="u1", username="alice", role="Admin",
+            resource_name="driver-pack", status="FAILED", error_message="checksum mismatch"
+        ))
+        return repo
+
+    def test_fts_index_is_enabled(self, repository):
+        assert repository.fts_enabled
+
+    def test_search_matches_all_indexed_columns(self, repository):
+        assert [log.username for log in repository.find_all(AuditLogFilter(query="bob"))] == ["bob"]
+        assert len(repository.find_all(AuditLogFilter(query="firmware"))) == 1
+        assert len(repository.find_all(AuditLogFilter(query="checksum"))) == 1
+        assert len(repository.find_all(AuditLogFilter(query="kernel"))) == 1
+
+    def test_search_is_prefix_and_conjunctive(self, repository):
+        assert len(repository.find_all(AuditLogFilter(query="ali"))) == 2
+        assert len(repository.find_all(AuditLogFilter(query="alice checksum"))) == 1
+
+    def test_search_combines_with_filters_and_count(self, repository):
+        filters = AuditLogFilter(query="alice", action=AuditAction.LOGIN)
+
+        assert len(repository.find_all(filters)) == 1
+        assert repository.count(filters) == 1
+        assert repository.count(AuditLogFilter(query="alice")) == 2
+
+    def test_search_tolerates_fts_syntax(self, repository):
+        assert repository.find_all(AuditLogFilter(query='"AND (bob*')) == []
+
+    def test_existing_rows_indexed_on_upgrade(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        SQLiteAuditLogRepository(db_path).save(
+            AuditLog(action=AuditAction.LOGIN, user_id="u1", username="legacy", role="Admin")
+        )
+
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            DROP TRIGGER audit_logs_fts_insert;
+            DROP TRIGGER audit_logs_fts_delete;
+            DROP TABLE audit_logs_fts;
+        """)
+        conn.close()
+
+        repo = SQLiteAuditLogRepository(db_path)
+        assert len(repo.find_all(AuditLogFilter(query="legacy"))) == 1
+
+    def test_deleted_rows_leave_index(self, repository):
+        conn = sqlite3.connect(repository.db_path)
+        conn.execute("UPDATE audit_logs SET timestamp = '2000-01-01T00:00:00'")
+        conn.commit()
+        conn.close()
+
+        assert repository.delete_old_logs(days=1) == 3
+        assert repository.find_all(AuditLogFilter(query="alice")) == []
+
+
+class TestAuditLogKeysetPagination:
+    """审计日志游标分页测试"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        from datetime import datetime
+        from release_portal.application.audit_service import AuditService
+
+        repo = SQLiteAuditLogRepository(str(tmp_path / "audit.db"))
+        same_time = datetime(2024, 3, 1, 12, 0, 0)
+        for i in range(7):
+            repo.save(AuditLog(
+                action=AuditAction.DOWNLOAD if i % 2 else AuditAction.LOGIN,
+                user_id=f"u{i % 3}", username=f"user{i}", role="Customer",
+                timestamp=same_time if i < 4 else datetime(2024, 3, 2, i)
+            ))
+        return AuditService(repo)
+
+    def test_pages_cover_all_rows_once_in_order(self, service):
+        seen = []
+        logs, cursor = service.query_logs_page(limit=3)
+        seen.extend(logs)
+        while cursor:
+            logs, cursor = service.query_logs_page(limit=3, cursor=cursor)
+            seen.extend(logs)
+
+        keys = [(log.timestamp, log.id) for log in seen]
+        assert len(keys) == 7
+        assert keys == sorted(keys, reverse=True)
+
+    def test_pages_respect_filters(self, service):
+        filters = AuditLogFilter(action=AuditAction.LOGIN)
+        first, cursor = service.query_logs_page(filters, limit=2)
+        second, cursor = service.query_logs_page(filters, limit=2, cursor=cursor)
+
+        assert len(first) + len(second) == 4
+        assert all(log.action == AuditAction.LOGIN for log in first + second)
+
+    def test_invalid_cursor_rejected(self, service):
+        with pytest.raises(ValueError):
+            service.query_logs_page(limit=2, cursor="not-a-cursor")
+
+    def test_cached_count(self, service):
+        assert service.get_log_count(use_cache=True) == 7
+        service.log_action(AuditAction.LOGIN, "u9", "late", "Admin")
+
+        assert service.get_log_count(use_cache=True) == 7
+        assert service.get_log_count() == 8
+
+
+class TestAuditLogStreamingExport:
+    """审计日志流式导出测试"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        from release_portal.application.audit_service import AuditService
+
+        service = AuditService(SQLiteAuditLogRepository(str(tmp_path / "audit.db")))
+        for i in range(25):
+            service.log_action(AuditAction.DOWNLOAD, f"u{i}", f"user{i}", "Customer",
+                               details={"n": i})
+        return service
+
+    def test_iter_logs_spans_chunks(self, service):
+        logs = list(service.iter_logs(chunk_size=10))
+
+        assert len(logs) == 25
+        assert len({log.id for log in logs}) == 25
+
+    @pytest.mark.parametrize("export_format", ["csv", "ndjson", "json"])
+    def test_render_formats(self, service, export_format):
+        import csv
+        import io
+        import json
+        from release_portal.presentation.web.api.audit import _render_export
+
+        text = "".join(_render_export(service.iter_logs(chunk_size=7), export_format))
+
+        if export_format == "csv":
+            rows = list(csv.reader(io.StringIO(text)))
+            assert len(rows) == 26
+        elif export_format == "ndjson":
+            assert len([json.loads(line) for line in text.splitlines()]) == 25
+        else:
+            assert len(json.loads(text)) == 25
+
+    def test_gzip_stream(self, service):
+        import gzip
+        import json
+        from release_portal.presentation.web.api.audit import _render_export, _gzip_stream
+
+        body = b"".join(_gzip_stream(_render_export(service.iter_logs(), "json")))
+
+        assert len(json.loads(gzip.decompress(body))) == 25
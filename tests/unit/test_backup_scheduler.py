@@ -0,0 +1,125 @@
+"""
+备份调度器与限速测试
+"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from release_portal.application.backup_scheduler import (
+    BackupScheduler, CronSchedule, IntervalSchedule
+)
+from release_portal.shared.throttle import TokenBucket
+
+
+class TestCronSchedule:
+    """cron 表达式测试"""
+
+    @pytest.mark.parametrize("expression, now, expected", [
+        ("30 3 * * *", datetime(2024, 5, 1, 3, 29), datetime(2024, 5, 1, 3, 30)),
+        ("30 3 * * *", datetime(2024, 5, 1, 3, 30), datetime(2024, 5, 2, 3, 30)),
+        ("*/15 * * * *", datetime(2024, 5, 1, 10, 7, 42), datetime(2024, 5, 1, 10, 15)),
+        ("0 0 1 * *", datetime(2024, 12, 15), datetime(2025, 1, 1)),
+        ("0 2 * * 0", datetime(2024, 5, 1), datetime(2024, 5, 5, 2, 0)),
+        ("0 9-17/4 * * 1-5", datetime(2024, 5, 3, 17, 0), datetime(2024, 5, 6, 9, 0)),
+        ("@daily", datetime(2024, 2, 28, 12), datetime(2024, 2, 29)),
+    ])
+    def test_next_after(self, expression, now, expected):
+        assert CronSchedule(expression).next_after(now) == expected
+
+    def test_day_or_weekday_when_both_restricted(self):
+        # 每月 13 日或每周五
+        schedule = CronSchedule("0 0 13 * 5")
+        assert schedule.next_after(datetime(2024, 5, 1)) == datetime(2024, 5, 3)
+
+    @pytest.mark.parametrize("expression", ["* * *", "60 * * * *", "*/0 * * * *", "0 0 31 2 *"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            CronSchedule(expression).next_after(datetime(2024, 1, 1))
+
+
+class TestBackupScheduler:
+    """调度器测试"""
+
+    def test_runs_due_jobs_and_reports_status(self, tmp_path):
+        scheduler = BackupScheduler(lock_dir=str(tmp_path / "locks"))
+        ran = threading.Event()
+        scheduler.add_job("job", ran.set, IntervalSchedule(0.05))
+        scheduler.start()
+        try:
+            assert ran.wait(2)
+        finally:
+            scheduler.stop()
+
+        status = scheduler.status()["jobs"][0]
+        for _ in range(50):
+            if status["last_run"]:
+                break
+            time.sleep(0.02)
+            status = scheduler.status()["jobs"][0]
+        assert status["last_run"]["status"] == "success"
+        assert status["next_run"] > status["last_run"]["started_at"]
+
+    def test_runs_never_overlap(self, tmp_path):
+        scheduler = BackupScheduler(lock_dir=str(tmp_path / "locks"))
+        release = threading.Event()
+        calls = []
+
+        def slow_job():
+            calls.append(1)
+            release.wait(2)
+
+        scheduler.add_job("job", slow_job, IntervalSchedule(3600))
+        scheduler.run_job("job", wait=False)
+        while not scheduler.get_job("job").running:
+            time.sleep(0.01)
+
+        assert scheduler.run_job("job")["status"] == "skipped"
+        release.set()
+        while scheduler.get_job("job").running:
+            time.sleep(0.01)
+        assert len(calls) == 1
+
+    def test_file_lock_excludes_other_scheduler(self, tmp_path):
+        lock_dir = str(tmp_path / "locks")
+        first, second = BackupScheduler(lock_dir), BackupScheduler(lock_dir)
+        release = threading.Event()
+        first.add_job("job", lambda: release.wait(2), IntervalSchedule(3600))
+        second.add_job("job", lambda: None, IntervalSchedule(3600))
+
+        first.run_job("job", wait=False)
+        while not first.get_job("job").running:
+            time.sleep(0.01)
+
+        assert second.run_job("job")["status"] == "skipped"
+        release.set()
+
+    def test_failure_recorded(self):
+        scheduler = BackupScheduler()
+
+        def broken():
+            raise RuntimeError("disk full")
+
+        scheduler.add_job("job", broken, IntervalSchedule(3600))
+        last_run = scheduler.run_job("job")
+
+        assert last_run["status"] == "failed"
+        assert last_run["error"] == "disk full"
+
+
+class TestTokenBucket:
+    """令牌桶限速测试"""
+
+    def test_rate_is_enforced(self):
+        bucket = TokenBucket(rate=100_000, burst=10_000)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.consume(10_000)
+
+        # 突发 10 KB 之后的 50 KB 需要约 0.5 秒
+        assert time.monotonic() - started >= 0.45
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
@@ -0,0 +1,355 @@
+"""
+BackupService 测试
+"""
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from release_portal.application.backup_service import BackupService
+
+
+@pytest.fixture
+def backup_env(tmp_path):
+    """创建数据库、存储目录和备份服务"""
+    db_path = tmp_path / "portal.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.execute("INSERT INTO items VALUES ('v1')")
+    conn.commit()
+    conn.close()
+
+    storage = tmp_path / "storage"
+    (storage / "pkg_a").mkdir(parents=True)
+    (storage / "pkg_a" / "a.zip").write_bytes(b"A" * 5000)
+    (storage / "pkg_b").mkdir()
+    (storage / "pkg_b" / "b.zip").write_bytes(b"B" * 3000)
+    (storage / "pkg_b" / "copy_of_a.zip").write_bytes(b"A" * 5000)
+
+    service = BackupService(str(db_path), str(storage), str(tmp_path / "backups"))
+    return service, db_path, storage
+
+
+class TestIncrementalBackup:
+    """增量去重备份测试"""
+
+    def test_first_backup_deduplicates_identical_files(self, backup_env):
+        service, _, _ = backup_env
+
+        info = service.create_incremental_backup(name="b1")
+
+        assert info["file_count"] == 3
+        assert info["new_blobs"] == 3  # 数据库 + 两份不同内容
+        assert info["parent"] is None
+
+    def test_second_backup_only_stores_churn(self, backup_env):
+        service, _, storage = backup_env
+        service.create_incremental_backup(name="b1")
+
+        (storage / "pkg_c.zip").write_bytes(b"C" * 100)
+        info = service.create_incremental_backup(name="b2")
+
+        assert info["parent"] == "b1"
+        assert info["reused_files"] == 3
+        assert info["new_blobs"] == 1  # 数据库未变，只有新文件
+        assert info["new_bytes"] == 100
+
+    def test_restore_any_point_in_time(self, backup_env, tmp_path):
+        service, _, storage = backup_env
+        service.create_incremental_backup(name="b1")
+        (storage / "pkg_b" / "b.zip").write_bytes(b"changed")
+        os.remove(storage / "pkg_a" / "a.zip")
+        service.create_incremental_backup(name="b2")
+
+        target = tmp_path / "restored"
+        service.restore_incremental_backup(
+            "b1", target_db_path=str(tmp_path / "r.db"), target_storage_path=str(target)
+        )
+
+        assert (target / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+        assert (target / "pkg_b" / "b.zip").read_bytes() == b"B" * 3000
+        conn = sqlite3.connect(tmp_path / "r.db")
+        assert conn.execute("SELECT name FROM items").fetchall() == [("v1",)]
+        conn.close()
+
+    def test_delete_collects_unreferenced_blobs(self, backup_env):
+        service, _, storage = backup_env
+        service.create_incremental_backup(name="b1")
+        (storage / "pkg_b" / "b.zip").write_bytes(b"changed")
+        service.create_incremental_backup(name="b2")
+
+        result = service.delete_incremental_backup("b1")
+
+        assert result["success"]
+        assert result["removed_blobs"] == 1
+        assert result["freed_bytes"] == 3000
+        assert [b["name"] for b in service.list_incremental_backups()] == ["b2"]
+
+    def test_duplicate_name_rejected(self, backup_env):
+        service, _, _ = backup_env
+        service.create_incremental_backup(name="b1")
+
+        with pytest.raises(ValueError):
+            service.create_incremental_backup(name="b1")
+
+    def test_gc_waits_for_running_backup(self, backup_env, tmp_path):
+        service, db_path, storage = backup_env
+        service.create_incremental_backup(name="b1")
+        (storage / "pkg_c.zip").write_bytes(b"C" * 100)
+
+        # 新数据块已入库、清单尚未写入时暂停创建
+        stored, resume = threading.Event(), threading.Event()
+        store_blob = service._store_blob
+
+        def paused_store_blob(source, stats):
+            entry = store_blob(source, stats)
+            if source.name == "pkg_c.zip":
+                stored.set()
+                resume.wait(5)
+            return entry
+
+        service._store_blob = paused_store_blob
+        creator = threading.Thread(target=service.create_incremental_backup, kwargs={"name": "b2"})
+        creator.start()
+        assert stored.wait(5)
+
+        # 另一个服务实例（如另一个请求）删除 b1 并回收数据块
+        other = BackupService(str(db_path), str(storage), str(tmp_path / "backups"))
+        deleted = []
+        deleter = threading.Thread(target=lambda: deleted.append(other.delete_incremental_backup("b1")))
+        deleter.start()
+        deleter.join(0.3)
+        assert deleter.is_alive()
+
+        resume.set()
+        creator.join(5)
+        deleter.join(5)
+
+        assert deleted[0]["removed_blobs"] == 0
+        target = tmp_path / "restored"
+        service.restore_incremental_backup("b2", target_db_path=str(tmp_path / "r.db"),
+                                           target_storage_path=str(target))
+        assert (target / "pkg_c.zip").read_bytes() == b"C" * 100
+        assert (target / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+
+
+class TestDatabaseSnapshot:
+    """在线数据库快照与原子替换测试"""
+
+    def test_snapshot_reports_progress_and_throughput(self, backup_env, tmp_path):
+        service, db_path, _ = backup_env
+        conn = sqlite3.connect(db_path)
+        conn.executemany("INSERT INTO items VALUES (?)", [("x" * 500,) for _ in range(200)])
+        conn.commit()
+        conn.close()
+        service.snapshot_pages_per_step = 5
+        steps = []
+
+        stats = service.snapshot_database(str(tmp_path / "snap.db"),
+                                          progress=lambda remaining, total: steps.append(remaining))
+
+        assert stats["pages"] > 5
+        assert len(steps) > 1 and steps[-1] == 0
+        conn = sqlite3.connect(tmp_path / "snap.db")
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 201
+        conn.close()
+
+    def test_snapshot_is_consistent_with_open_writer(self, backup_env, tmp_path):
+        service, db_path, _ = backup_env
+        writer = sqlite3.connect(db_path)
+        writer.execute("INSERT INTO items VALUES ('uncommitted')")
+
+        service.snapshot_database(str(tmp_path / "snap.db"))
+        writer.rollback()
+        writer.close()
+
+        conn = sqlite3.connect(tmp_path / "snap.db")
+        assert conn.execute("SELECT name FROM items").fetchall() == [("v1",)]
+        conn.close()
+
+    def test_swap_keeps_previous_database(self, backup_env, tmp_path):
+        service, db_path, _ = backup_env
+        service.snapshot_database(str(tmp_path / "snap.db"))
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO items VALUES ('v2')")
+        conn.commit()
+        conn.close()
+
+        kept = service.swap_database(str(tmp_path / "snap.db"), str(db_path))
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        conn.close()
+        conn = sqlite3.connect(kept)
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        conn.close()
+
+    def test_swap_rejects_corrupt_backup(self, backup_env, tmp_path):
+        service, db_path, _ = backup_env
+        bad = tmp_path / "bad.db"
+        bad.write_bytes(b"not a database" * 100)
+
+        with pytest.raises((ValueError, sqlite3.DatabaseError)):
+            service.swap_database(str(bad), str(db_path))
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT name FROM items").fetchall() == [("v1",)]
+        conn.close()
+
+
+class TestStreamingFullBackup:
+    """流式完整备份测试"""
+
+    def test_archive_roundtrip_and_checksum(self, backup_env, tmp_path):
+        import hashlib
+        import tarfile
+
+        service, _, _ = backup_env
+        service.compression_threads = 2
+
+        info = service.create_backup(name="full1")
+
+        with open(info["path"], "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == info["checksum"]
+        with tarfile.open(info["path"], "r:gz") as tar:
+            names = tar.getnames()
+        assert names[0] == "full1/metadata.json"
+        assert "full1/storage/pkg_b/copy_of_a.zip" in names
+        assert not [p for p in os.listdir(service.backup_dir) if p.startswith(("temp_", "tmp", "."))]
+
+    def test_list_uses_recorded_checksum_and_metadata(self, backup_env):
+        service, _, _ = backup_env
+        info = service.create_backup(name="full1", include_storage=False)
+
+        listed = service.list_backups()
+
+        assert listed[0]["checksum"] == info["checksum"]
+        assert listed[0]["metadata"]["name"] == "full1"
+        assert service.delete_backup("full1.tar.gz")
+        assert os.listdir(service.backup_dir) == []
+
+    def test_restore_full_backup(self, backup_env, tmp_path):
+        service, _, _ = backup_env
+        service.create_backup(name="full1")
+
+        target = tmp_path / "restored"
+        service.restore_backup("full1.tar.gz", target_db_path=str(tmp_path / "r.db"),
+                               target_storage_path=str(target))
+
+        assert (target / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+
+
+class TestSelectiveRestore:
+    """选择性与流式恢复测试"""
+
+    def test_full_restore_swaps_storage_by_rename(self, backup_env):
+        service, _, storage = backup_env
+        service.create_backup(name="full1")
+        (storage / "pkg_a" / "a.zip").write_bytes(b"corrupted")
+        (storage / "stray.zip").write_bytes(b"x")
+
+        result = service.restore_backup("full1.tar.gz")
+
+        assert (storage / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+        assert not (storage / "stray.zip").exists()
+        previous = result["previous_storage_path"]
+        assert os.path.exists(os.path.join(previous, "stray.zip"))
+
+    def test_restore_only_selected_package(self, backup_env, tmp_path):
+        service, db_path, storage = backup_env
+        service.create_backup(name="full1")
+        (storage / "pkg_a" / "a.zip").write_bytes(b"corrupted")
+        (storage / "pkg_b" / "b.zip").write_bytes(b"newer")
+        db_before = db_path.read_bytes()
+
+        result = service.restore_backup("full1.tar.gz", restore_database=False,
+                                        storage_paths=["pkg_a"])
+
+        assert result["restored_files"] == 1
+        assert (storage / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+        assert (storage / "pkg_b" / "b.zip").read_bytes() == b"newer"
+        assert db_path.read_bytes() == db_before
+        assert result["previous_storage_path"] is None
+
+    def test_restore_database_only(self, backup_env):
+        service, db_path, storage = backup_env
+        service.create_backup(name="full1")
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM items")
+        conn.commit()
+        conn.close()
+        (storage / "pkg_b" / "b.zip").write_bytes(b"newer")
+
+        service.restore_backup("full1.tar.gz", restore_storage=False)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT name FROM items").fetchall() == [("v1",)]
+        conn.close()
+        assert (storage / "pkg_b" / "b.zip").read_bytes() == b"newer"
+
+    def test_incremental_selective_restore(self, backup_env):
+        service, _, storage = backup_env
+        service.create_incremental_backup(name="b1")
+        (storage / "pkg_a" / "a.zip").write_bytes(b"corrupted")
+        (storage / "pkg_b" / "b.zip").write_bytes(b"newer")
+
+        service.restore_incremental_backup("b1", restore_database=False,
+                                           storage_paths=["pkg_a/a.zip"])
+
+        assert (storage / "pkg_a" / "a.zip").read_bytes() == b"A" * 5000
+        assert (storage / "pkg_b" / "b.zip").read_bytes() == b"newer"
+
+    def test_rejects_path_traversal(self, backup_env):
+        service, _, _ = backup_env
+        service.create_backup(name="full1", include_storage=False)
+
+        with pytest.raises(ValueError):
+            service.restore_backup("full1.tar.gz", storage_paths=["../etc"])
+
+
+class TestCreateBackupRoute:
+    """创建备份接口参数校验测试"""
+
+    @pytest.fixture
+    def client(self):
+        import time
+
+        from flask import Flask
+
+        from release_portal.infrastructure.auth import token_cache
+        from release_portal.presentation.web.api.backup import backup_bp
+
+        class Admin:
+            user_id = 'admin'
+            license_id = None
+            role = type('Role', (), {'role_id': 'role_admin', 'name': 'Admin'})()
+
+        token_cache.put('backup-admin-token', {'user_id': 'admin', 'exp': time.time() + 3600}, Admin())
+        app = Flask(__name__)
+        app.register_blueprint(backup_bp, url_prefix='/api/backup')
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = 'Bearer backup-admin-token'
+        yield client
+        token_cache.clear()
+
+    @pytest.mark.parametrize("threads", ["many", 0])
+    def test_bad_compression_threads_rejected(self, client, backup_env, tmp_path, threads):
+        _, db_path, storage = backup_env
+
+        response = client.post('/api/backup/create', json={
+            'db_path': str(db_path), 'storage_path': str(storage),
+            'backup_dir': str(tmp_path / "backups"), 'compression_threads': threads
+        })
+
+        assert response.status_code == 400
+
+    def test_compression_threads_string_accepted(self, client, backup_env, tmp_path):
+        _, db_path, storage = backup_env
+
+        response = client.post('/api/backup/create', json={
+            'db_path': str(db_path), 'storage_path': str(storage),
+            'backup_dir': str(tmp_path / "backups"), 'compression_threads': '2'
+        })
+
+        assert response.status_code == 201
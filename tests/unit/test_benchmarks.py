@@ -0,0 +1,105 @@
+"""
+基准套件工具测试（目录树生成、结果对比与负载测试辅助函数）
+"""
+import argparse
+import hashlib
+import tempfile
+
+import pytest
+
+from benchmarks.compare import compare_reports
+from benchmarks.portal_load import DEFAULT_MIX, parse_mix, percentile, run
+from benchmarks.treegen import generate_tree
+
+
+def tree_digest(root):
+    digest = hashlib.sha256()
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def report(seconds, rss=30.0, syscalls=(100, 10), scale=0.1):
+    return {
+        "format": "binary-manager-bench",
+        "meta": {"profile": "mixed", "seed": 0, "scale": scale, "hash_algorithm": "sha256"},
+        "results": {
+            "scan": {"seconds": seconds, "peak_rss_mb": rss,
+                     "syscalls_read": syscalls[0], "syscalls_write": syscalls[1]}
+        }
+    }
+
+
+class TestTreeGenerator:
+    """合成目录树测试"""
+
+    def test_same_seed_produces_identical_tree(self, tmp_path):
+        first = generate_tree(str(tmp_path / "a"), "mixed", seed=7, scale=0.005)
+        second = generate_tree(str(tmp_path / "b"), "mixed", seed=7, scale=0.005)
+
+        assert first["files"] == second["files"] and first["bytes"] == second["bytes"]
+        assert tree_digest(tmp_path / "a") == tree_digest(tmp_path / "b")
+
+    def test_existing_tree_is_reused(self, tmp_path):
+        info = generate_tree(str(tmp_path / "t"), "small", seed=1, scale=0.001)
+        marker = tmp_path / "t.treegen.json"
+        mtime = marker.stat().st_mtime_ns
+
+        assert generate_tree(str(tmp_path / "t"), "small", seed=1, scale=0.001) == info
+        assert marker.stat().st_mtime_ns == mtime
+
+
+class TestCompare:
+    """回退判定测试"""
+
+    def test_flags_slowdown_beyond_threshold(self):
+        comparison = compare_reports(report(1.0), report(1.2))
+
+        assert [(r["benchmark"], r["metric"]) for r in comparison["regressions"]] == [("scan", "seconds")]
+
+    def test_noise_and_improvements(self):
+        comparison = compare_reports(report(0.001, rss=30.0), report(0.0015, rss=31.0, syscalls=(40, 10)))
+
+        assert comparison["regressions"] == []
+        assert [r["metric"] for r in comparison["improvements"]] == ["syscalls"]
+
+    def test_warns_when_trees_differ(self):
+        comparison = compare_reports(report(1.0), report(1.0, scale=1.0))
+
+        assert comparison["warnings"] == ["scale differs: baseline=0.1 current=1.0"]
+
+
+class TestPortalLoadHelpers:
+    """负载测试辅助函数测试"""
+
+    def test_parse_mix(self):
+        assert parse_mix("login=1, releases=3,download") == {"login": 1, "releases": 3, "download": 1}
+        with pytest.raises(ValueError):
+            parse_mix("upload=1")
+        with pytest.raises(ValueError):
+            parse_mix("login=0")
+
+    def test_nearest_rank_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([7.0], 95) == 7.0
+        assert percentile([], 50) is None
+
+
+class TestPortalLoadRun:
+    """负载测试冒烟测试"""
+
+    def test_default_workdir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        args = argparse.Namespace(users=3, licenses=1, releases=2, package_kb=4, concurrency=2,
+                                  duration=5.0, requests=20, mix=DEFAULT_MIX, seed=0,
+                                  workdir=None, output=None, serve=False)
+
+        result = run(args)
+
+        assert result["load"]["requests"] == 20
+        # 未指定 --workdir 时临时目录在结束后删除
+        assert list(tmp_path.iterdir()) == []
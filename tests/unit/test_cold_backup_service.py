@@ -0,0 +1,308 @@
+"""
+冷备份服务测试
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from release_portal.application.cold_backup_service import (
+    ArchiveCatalog, ColdBackupService, ColdStorageBackend, LocalFileSystemBackend,
+    S3ColdStorageBackend
+)
+
+
+class FakeS3Client:
+    """内存中的 S3 替身，实现冷备份后端用到的接口"""
+
+    def __init__(self):
+        self.objects = {}
+        self.range_requests = []
+        self.fail_ranges = set()
+
+    def upload_file(self, filename, bucket, key, ExtraArgs=None, Config=None):
+        extra = ExtraArgs or {}
+        with open(filename, "rb") as f:
+            data = f.read()
+        self.objects[key] = {
+            "data": data,
+            "metadata": extra.get("Metadata", {}),
+            "storage_class": extra.get("StorageClass", "STANDARD"),
+            "restore": None,
+            "etag": '"%s"' % hashlib.md5(data).hexdigest(),
+        }
+
+    def head_object(self, Bucket, Key):
+        obj = self.objects[Key]
+        head = {
+            "ContentLength": len(obj["data"]),
+            "ETag": obj["etag"],
+            "Metadata": obj["metadata"],
+            "StorageClass": obj["storage_class"],
+        }
+        if obj["restore"]:
+            head["Restore"] = obj["restore"]
+        return head
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        obj = self.objects[Key]
+        assert IfMatch in (None, obj["etag"])
+        start, end = (int(x) for x in Range.split("=", 1)[1].split("-"))
+        if start in self.fail_ranges:
+            raise IOError("connection reset")
+        self.range_requests.append(start)
+        return {"Body": io.BytesIO(obj["data"][start:end + 1])}
+
+    def restore_object(self, Bucket, Key, RestoreRequest):
+        self.objects[Key]["restore"] = 'ongoing-request="true"'
+
+    def finish_restore(self, key):
+        self.objects[key]["restore"] = 'ongoing-request="false", expiry-date="Fri, 21 Dec 2030 00:00:00 GMT"'
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_requests = getattr(self, "delete_requests", 0) + 1
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+        return {}
+
+
+@pytest.fixture
+def backup_file(tmp_path):
+    path = tmp_path / "backup.tar.gz"
+    path.write_bytes(os.urandom(10_000))
+    return path
+
+
+class TestS3ColdStorageBackend:
+    """S3 冷存储后端测试"""
+
+    def make_backend(self, client, storage_class="STANDARD"):
+        return S3ColdStorageBackend(bucket="b", prefix="cold/", storage_class=storage_class,
+                                    part_size=1024, max_concurrency=4, s3_client=client)
+
+    def test_store_records_streaming_checksum(self, backup_file):
+        client = FakeS3Client()
+        info = self.make_backend(client).store(str(backup_file), {"name": "a1"})
+
+        expected = hashlib.sha256(backup_file.read_bytes()).hexdigest()
+        assert info["checksum"] == expected
+        assert client.objects["cold/a1.tar.gz"]["metadata"]["sha256"] == expected
+
+    def test_parallel_ranged_retrieve(self, backup_file, tmp_path):
+        client = FakeS3Client()
+        backend = self.make_backend(client)
+        backend.store(str(backup_file), {"name": "a1"})
+
+        target = tmp_path / "out.tar.gz"
+        assert backend.retrieve("a1", str(target))
+
+        assert target.read_bytes() == backup_file.read_bytes()
+        assert sorted(client.range_requests) == list(range(0, 10_000, 1024))
+        assert not os.path.exists(f"{target}.part.json")
+
+    def test_retrieve_resumes_after_failure(self, backup_file, tmp_path):
+        client = FakeS3Client()
+        backend = self.make_backend(client)
+        backend.store(str(backup_file), {"name": "a1"})
+        target = tmp_path / "out.tar.gz"
+
+        client.fail_ranges = {5 * 1024}
+        assert not backend.retrieve("a1", str(target))
+        first_attempt = len(client.range_requests)
+
+        client.fail_ranges = set()
+        client.range_requests = []
+        assert backend.retrieve("a1", str(target))
+
+        assert target.read_bytes() == backup_file.read_bytes()
+        assert len(client.range_requests) == 10 - first_attempt
+
+    def test_glacier_restore_state_machine(self, backup_file, tmp_path):
+        client = FakeS3Client()
+        backend = self.make_backend(client, storage_class="GLACIER")
+        backend.store(str(backup_file), {"name": "a1"})
+
+        assert backend.get_restore_status("a1")["state"] == ColdStorageBackend.STATE_ARCHIVED
+        assert not backend.retrieve("a1", str(tmp_path / "out"))
+
+        assert backend.request_restore("a1")["state"] == ColdStorageBackend.STATE_RESTORING
+        client.finish_restore("cold/a1.tar.gz")
+
+        status = backend.get_restore_status("a1")
+        assert status["state"] == ColdStorageBackend.STATE_RESTORED
+        assert status["expiry"].startswith("Fri, 21 Dec 2030")
+        assert backend.retrieve("a1", str(tmp_path / "out"))
+
+
+class TestColdBackupRetrieval:
+    """冷备份检索状态跟踪测试"""
+
+    def test_restore_state_tracked_in_archive_metadata(self, backup_file, tmp_path):
+        client = FakeS3Client()
+        backend = S3ColdStorageBackend(bucket="b", storage_class="GLACIER", s3_client=client)
+        service = ColdBackupService(str(tmp_path / "backups"), backend)
+        backend.store(str(backup_file), {"name": "a1"})
+        service.catalog.put({
+            "archive_id": "a1", "hot_backup_name": "a1", "created_at": "2024-01-01T00:00:00",
+            "expires_at": "2099-01-01T00:00:00", "status": "archived", "metadata": {}
+        })
+
+        assert not service.retrieve_from_cold_storage("a1", str(tmp_path / "out"))
+        record = service.catalog.get("a1")
+        assert record["status"] == "restoring"
+        assert record["restore"]["requested_at"]
+
+        client.finish_restore("a1.tar.gz")
+        assert service.retrieve_from_cold_storage("a1", str(tmp_path / "out"))
+        assert service.catalog.get("a1")["restore"]["state"] == "restored"
+
+
+def _record(archive_id, expires_at, created_at="2024-01-01T00:00:00"):
+    return {
+        "archive_id": archive_id, "hot_backup_name": archive_id, "created_at": created_at,
+        "expires_at": expires_at, "status": "archived",
+        "metadata": {"size": 10, "checksum": "c-" + archive_id}
+    }
+
+
+class TestArchiveCatalog:
+    """归档目录测试"""
+
+    def test_indexed_columns_and_record_roundtrip(self, tmp_path):
+        catalog = ArchiveCatalog(tmp_path / "catalog.db")
+        catalog.put(_record("a1", "2030-01-01T00:00:00"))
+
+        assert catalog.get("a1")["metadata"]["checksum"] == "c-a1"
+        assert catalog.stats() == {"archive_count": 1, "total_size": 10}
+        assert "a1" in catalog and "a2" not in catalog
+
+    def test_expiry_uses_index_range_scan(self, tmp_path):
+        import sqlite3
+
+        catalog = ArchiveCatalog(tmp_path / "catalog.db")
+        catalog.put(_record("old", "2020-01-01T00:00:00"))
+        catalog.put(_record("new", "2099-01-01T00:00:00"))
+
+        assert catalog.find_expired("2024-01-01T00:00:00") == ["old"]
+        conn = sqlite3.connect(catalog.db_path)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT archive_id FROM archive_catalog "
+            "WHERE expires_at IS NOT NULL AND expires_at < ? ORDER BY expires_at", ("x",)
+        ).fetchall()
+        conn.close()
+        assert "idx_archive_catalog_expires_at" in str(plan)
+
+    def test_update_merges_fields(self, tmp_path):
+        catalog = ArchiveCatalog(tmp_path / "catalog.db")
+        catalog.put(_record("a1", "2030-01-01T00:00:00"))
+
+        catalog.update("a1", {"status": "restoring"})
+
+        assert catalog.get("a1")["status"] == "restoring"
+        assert catalog.get("a1")["hot_backup_name"] == "a1"
+        assert catalog.update("missing", {"status": "x"}) is None
+
+    def test_legacy_json_imported_once(self, tmp_path):
+        legacy = tmp_path / "cold_archive_metadata.json"
+        legacy.write_text(json.dumps({"a1": _record("a1", "2030-01-01T00:00:00")}))
+
+        catalog = ArchiveCatalog(tmp_path / "catalog.db", legacy_json=legacy)
+
+        assert catalog.get("a1")["expires_at"] == "2030-01-01T00:00:00"
+        assert not legacy.exists()
+        assert (tmp_path / "cold_archive_metadata.json.migrated").exists()
+
+    def test_concurrent_writers_do_not_lose_records(self, tmp_path):
+        db_path = tmp_path / "catalog.db"
+        ArchiveCatalog(db_path)
+
+        def writer(worker):
+            catalog = ArchiveCatalog(db_path)
+            for i in range(20):
+                catalog.put(_record(f"w{worker}-{i}", "2030-01-01T00:00:00"))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert ArchiveCatalog(db_path).stats()["archive_count"] == 80
+
+
+class TestColdArchiveCleanup:
+    """过期归档清理测试"""
+
+    def test_cleanup_local_backend(self, backup_file, tmp_path):
+        backend = LocalFileSystemBackend(str(tmp_path / "cold"))
+        service = ColdBackupService(str(tmp_path / "backups"), backend)
+        for name, expires_at in [("old1", "2020-01-01T00:00:00"),
+                                 ("old2", "2021-01-01T00:00:00"),
+                                 ("keep", "2099-01-01T00:00:00")]:
+            backend.store(str(backup_file), {"name": name})
+            service.catalog.put(_record(name, expires_at))
+
+        assert service.cleanup_expired_archives() == 2
+
+        assert [a["archive_id"] for a in service.list_cold_archives()] == ["keep"]
+        assert [a["archive_id"] for a in backend.list_archives()] == ["keep"]
+        assert not (tmp_path / "cold" / "old1.tar.gz").exists()
+
+    def test_local_delete_reads_catalog_in_batches(self, backup_file, tmp_path, monkeypatch):
+        backend = LocalFileSystemBackend(str(tmp_path / "cold"))
+        for i in range(5):
+            backend.store(str(backup_file), {"name": f"old{i}"})
+        monkeypatch.setattr(ArchiveCatalog, "BATCH_SIZE", 2)
+        monkeypatch.setattr(backend.catalog, "get", lambda _id: pytest.fail("per-id catalog lookup"))
+
+        assert backend.delete_many(["old0", "missing", "old1", "old2", "old3"]) == ["old0", "old1", "old2", "old3"]
+
+        assert [a["archive_id"] for a in backend.list_archives()] == ["old4"]
+        assert not (tmp_path / "cold" / "old3.tar.gz").exists()
+
+    def test_cleanup_s3_uses_batch_delete(self, backup_file, tmp_path):
+        client = FakeS3Client()
+        backend = S3ColdStorageBackend(bucket="b", s3_client=client)
+        service = ColdBackupService(str(tmp_path / "backups"), backend)
+        for i in range(3):
+            backend.store(str(backup_file), {"name": f"old{i}"})
+            service.catalog.put(_record(f"old{i}", "2020-01-01T00:00:00"))
+
+        assert service.cleanup_expired_archives() == 3
+        assert client.delete_requests == 1
+        assert client.objects == {}
+
+
+class TestColdBackupConfiguration:
+    """冷备份源路径与限速配置测试"""
+
+    def test_backs_up_configured_database_with_throttle(self, tmp_path):
+        import sqlite3
+
+        db_path = tmp_path / "portal.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.close()
+        (tmp_path / "releases").mkdir()
+        (tmp_path / "releases" / "pkg.bin").write_bytes(b"x" * 1000)
+
+        backend = LocalFileSystemBackend(str(tmp_path / "cold"))
+        service = ColdBackupService(str(tmp_path / "backups"), backend,
+                                    db_path=str(db_path),
+                                    storage_path=str(tmp_path / "releases"),
+                                    disk_bytes_per_sec=50 * 1024 * 1024,
+                                    network_bytes_per_sec=50 * 1024 * 1024)
+
+        info = service.create_cold_backup("nightly")
+
+        record = service.catalog.get(info["archive_id"])
+        assert record["hot_backup_name"] == "nightly"
+        assert record["metadata"]["backup_metadata"]["metadata"]["db_path"] == str(db_path)
+        assert service.get_backup_policy()["throttle"]["network_bytes_per_sec"] == 50 * 1024 * 1024
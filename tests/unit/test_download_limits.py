@@ -0,0 +1,231 @@
+"""
+下载限额测试（令牌桶、限流器、许可证持久化与下载接口 429）
+"""
+import sqlite3
+import time
+
+import pytest
+from flask import Flask
+
+from release_portal.application.download_limiter import DownloadLimiter, download_limiter
+from release_portal.domain.value_objects import DownloadLimits
+from release_portal.shared import RateLimitError
+from release_portal.shared.throttle import ThrottledStream, TokenBucket
+
+
+class TestTokenBucketNonBlocking:
+    """非阻塞取令牌测试"""
+
+    def test_try_consume_reports_wait_without_taking_tokens(self):
+        bucket = TokenBucket(rate=1, burst=2)
+
+        assert bucket.try_consume() == 0
+        assert bucket.try_consume() == 0
+        wait = bucket.try_consume()
+
+        assert 0 < wait <= 1
+        assert bucket.wait_time() == pytest.approx(wait, abs=0.05)
+
+    def test_throttled_stream_paces_and_closes_once(self):
+        closed = []
+
+        class Source:
+            def __iter__(self):
+                return iter([b'a' * 100] * 3)
+
+            def close(self):
+                closed.append('source')
+
+        stream = ThrottledStream(Source(), TokenBucket(rate=1000, burst=100), lambda: closed.append('slot'))
+        started = time.monotonic()
+        data = b''.join(stream)
+        stream.close()
+        stream.close()
+
+        assert len(data) == 300
+        assert time.monotonic() - started >= 0.15
+        assert closed == ['source', 'slot']
+
+
+class TestDownloadLimits:
+    """限额值对象测试"""
+
+    def test_round_trip_and_validation(self):
+        limits = DownloadLimits(requests_per_minute=30, max_concurrent_per_user=2)
+
+        assert DownloadLimits.from_dict(limits.to_dict()) == limits
+        assert DownloadLimits().is_unlimited()
+        with pytest.raises(ValueError):
+            DownloadLimits(max_concurrent_per_user=0)
+        with pytest.raises(ValueError):
+            DownloadLimits.from_dict({'max_connections': 1})
+
+
+class TestDownloadLimiter:
+    """限流器测试"""
+
+    def test_unlimited_license_is_not_counted(self):
+        limiter = DownloadLimiter()
+
+        limiter.acquire('u1', None, DownloadLimits(max_concurrent_per_user=1))
+        limiter.acquire('u1', 'lic1', DownloadLimits())
+
+        assert limiter.active('user', 'u1') == 0
+
+    def test_concurrency_per_user_and_license(self):
+        limiter = DownloadLimiter()
+        limits = DownloadLimits(max_concurrent_per_user=1, max_concurrent_per_license=2)
+
+        first = limiter.acquire('u1', 'lic1', limits)
+        limiter.acquire('u2', 'lic1', limits)
+        with pytest.raises(RateLimitError) as user_full:
+            limiter.acquire('u1', 'lic1', limits)
+        with pytest.raises(RateLimitError) as license_full:
+            limiter.acquire('u3', 'lic1', limits)
+
+        assert user_full.value.reason == 'user_concurrency'
+        assert license_full.value.reason == 'license_concurrency'
+
+        first.release()
+        first.release()
+        limiter.acquire('u3', 'lic1', limits)
+        assert limiter.active('license', 'lic1') == 2
+
+    def test_rate_limit_sets_retry_after(self):
+        limiter = DownloadLimiter()
+        limits = DownloadLimits(requests_per_minute=1, license_requests_per_minute=120)
+
+        limiter.acquire('u1', 'lic1', limits).release()
+        with pytest.raises(RateLimitError) as exc:
+            limiter.acquire('u1', 'lic1', limits)
+
+        assert exc.value.reason == 'user_rate'
+        assert exc.value.retry_after == 60
+        # 被拒绝的请求不消耗许可证级令牌
+        limiter.acquire('u2', 'lic1', limits)
+
+    def test_bandwidth_bucket_shared_per_license(self):
+        limiter = DownloadLimiter()
+        limits = DownloadLimits(bandwidth_bytes_per_sec=1024)
+
+        first = limiter.acquire('u1', 'lic1', limits)
+        second = limiter.acquire('u2', 'lic1', limits)
+
+        assert first.bandwidth is second.bandwidth
+        assert first.bandwidth.rate == 1024
+
+
+class TestLicensePersistence:
+    """许可证限额持久化与旧库升级测试"""
+
+    def test_limits_saved_and_loaded(self, container):
+        from release_portal.domain.value_objects import AccessLevel, ResourceType
+
+        license = container.license_service.create_license(
+            organization='Mirror Inc',
+            access_level=AccessLevel.FULL_ACCESS,
+            allowed_resource_types=[ResourceType.BSP]
+        )
+        limits = DownloadLimits(max_concurrent_per_license=4, bandwidth_bytes_per_sec=1 << 20)
+        container.license_service.set_download_limits(license.license_id, limits)
+
+        assert container.license_repository.find_by_id(license.license_id).download_limits == limits
+
+    def test_initializer_adds_column_to_existing_database(self, tmp_path):
+        from release_portal.initializer import DatabaseInitializer
+
+        db_path = str(tmp_path / 'old.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("""CREATE TABLE licenses (license_id TEXT PRIMARY KEY, organization TEXT NOT NULL,
+                        access_level TEXT NOT NULL, expires_at TIMESTAMP, is_active BOOLEAN DEFAULT 1,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, metadata TEXT)""")
+        conn.close()
+
+        DatabaseInitializer(db_path).initialize()
+
+        conn = sqlite3.connect(db_path)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(licenses)")}
+        conn.close()
+        assert 'download_limits' in columns
+
+
+    def test_repository_upgrades_old_database_without_init(self, tmp_path):
+        from release_portal.domain.entities.license import License
+        from release_portal.domain.value_objects import AccessLevel, ResourceType
+        from release_portal.infrastructure.database import SQLiteLicenseRepository
+
+        db_path = str(tmp_path / 'baseline.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE licenses (license_id TEXT PRIMARY KEY, organization TEXT NOT NULL,
+                access_level TEXT NOT NULL, expires_at TIMESTAMP, is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, metadata TEXT);
+            CREATE TABLE license_resource_types (license_id TEXT NOT NULL, resource_type TEXT NOT NULL);
+            INSERT INTO licenses (license_id, organization, access_level, created_at)
+                VALUES ('lic-old', 'Old Corp', 'FULL_ACCESS', '2024-01-01T00:00:00');
+            INSERT INTO license_resource_types VALUES ('lic-old', 'BSP');
+        """)
+        conn.close()
+
+        repo = SQLiteLicenseRepository(db_path)
+
+        assert repo.find_by_id('lic-old').download_limits.is_unlimited()
+        limits = DownloadLimits(max_concurrent_per_user=2)
+        repo.save(License('lic-new', 'New Corp', AccessLevel.FULL_ACCESS, {ResourceType.BSP},
+                          download_limits=limits))
+        assert repo.find_by_id('lic-new').download_limits == limits
+
+
+class TestDownloadRoute:
+    """下载接口限流测试"""
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path):
+        from release_portal.infrastructure.auth import token_cache
+        from release_portal.presentation.web.api.downloads import downloads_bp
+
+        limits = DownloadLimits(max_concurrent_per_user=1, bandwidth_bytes_per_sec=1 << 20)
+
+        class FakeLicense:
+            download_limits = limits
+
+        class FakeUser:
+            user_id = 'u1'
+            license_id = 'lic1'
+
+        class FakeDownloadService:
+            def download_package(self, user_id, release_id, content_type, output_dir):
+                (tmp_path / 'pkg.zip').write_bytes(b'z' * 4096)
+                import shutil
+                shutil.copy(str(tmp_path / 'pkg.zip'), output_dir)
+
+        class FakeContainer:
+            download_service = FakeDownloadService()
+            license_repository = type('Repo', (), {'find_by_id': lambda self, _id: FakeLicense()})()
+
+        monkeypatch.setattr('release_portal.initializer.create_container', lambda *a, **k: FakeContainer())
+        token_cache.put('limits-token', {'user_id': 'u1', 'exp': time.time() + 3600}, FakeUser())
+        download_limiter.reset()
+
+        app = Flask(__name__)
+        app.register_blueprint(downloads_bp, url_prefix='/api/downloads')
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = 'Bearer limits-token'
+        yield client
+        token_cache.clear()
+        download_limiter.reset()
+
+    def test_second_concurrent_download_gets_429(self, client):
+        first = client.get('/api/downloads/r1/download/BINARY')
+        assert first.status_code == 200
+
+        second = client.get('/api/downloads/r1/download/BINARY')
+        assert second.status_code == 429
+        assert second.headers['Retry-After'] == '5'
+
+        assert first.get_data() == b'z' * 4096
+        first.close()
+        assert download_limiter.active('user', 'u1') == 0
+        third = client.get('/api/downloads/r1/download/BINARY')
+        assert third.status_code == 200
+        third.close()
@@ -0,0 +1,101 @@
+"""
+FileScanner 忽略规则测试
+"""
+import pytest
+
+from binary_manager_v2.domain.services import FileScanner, IgnoreMatcher
+
+
+def make_tree(root, paths):
+    for path in paths:
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(path)
+
+
+def scanned(scanner, root):
+    return sorted(rel for rel, _ in scanner.iter_files(root))
+
+
+class TestIgnoreMatcher:
+    """gitignore 语义测试"""
+
+    @pytest.mark.parametrize("pattern,path,is_dir,expected", [
+        ("*.log", "a/b/debug.log", False, True),
+        ("*.log", "a/log", False, None),
+        ("build/", "src/build", True, True),
+        ("build/", "src/build", False, None),
+        ("/dist", "dist", True, True),
+        ("/dist", "pkg/dist", True, None),
+        ("doc/*.txt", "doc/a.txt", False, True),
+        ("doc/*.txt", "doc/sub/a.txt", False, None),
+        ("**/cache", "x/y/cache", True, True),
+        ("logs/**", "logs/a/b.txt", False, True),
+        ("a/**/b", "a/b", False, True),
+        ("a/**/b", "a/x/y/b", False, True),
+        ("file?.bin", "file1.bin", False, True),
+        ("file[0-9].bin", "filex.bin", False, None),
+        ("file[!0-9].bin", "filex.bin", False, True),
+        ("\\#notes", "#notes", False, True),
+        ("# comment", "# comment", False, None),
+    ])
+    def test_single_pattern(self, pattern, path, is_dir, expected):
+        assert IgnoreMatcher([pattern]).match(path, is_dir) is expected
+
+    def test_last_matching_rule_wins(self):
+        matcher = IgnoreMatcher(["*.so", "!keep.so", "lib/keep.so"])
+
+        assert matcher.match("drop.so") is True
+        assert matcher.match("keep.so") is False
+        assert matcher.match("lib/keep.so") is True
+
+    def test_file_under_ignored_directory_cannot_be_reincluded(self):
+        matcher = IgnoreMatcher(["build/", "!build/app.bin"])
+
+        assert matcher.is_ignored("build/app.bin")
+        assert not matcher.is_ignored("src/app.bin")
+
+
+class TestFileScanner:
+    """目录扫描测试"""
+
+    def test_default_patterns_prune_directories(self, tmp_path):
+        make_tree(tmp_path, ["main.py", "main.pyc", "node_modules/x/index.js",
+                             "pkg/__pycache__/m.cpython.pyc", "pkg/lib.so", "pkg/data.bin",
+                             ".git/HEAD", "sub/.DS_Store"])
+
+        assert scanned(FileScanner(), tmp_path) == ["main.py", "pkg/data.bin"]
+
+    def test_binaryignore_files_are_scoped_to_their_directory(self, tmp_path):
+        make_tree(tmp_path, ["a.tmp", "keep/a.tmp", "keep/b.tmp", "other/a.tmp", "build/out.bin"])
+        (tmp_path / ".binaryignore").write_text("*.tmp\n!build/\n")
+        (tmp_path / "keep" / ".binaryignore").write_text("!a.tmp\n")
+
+        assert scanned(FileScanner(), tmp_path) == [
+            ".binaryignore", "build/out.bin", "keep/.binaryignore", "keep/a.tmp"
+        ]
+
+    def test_gitignore_is_opt_in(self, tmp_path):
+        make_tree(tmp_path, ["out/app.bin", "src/main.c"])
+        (tmp_path / ".gitignore").write_text("out/\n")
+
+        assert "out/app.bin" in scanned(FileScanner(), tmp_path)
+        assert "out/app.bin" not in scanned(
+            FileScanner(ignore_files=[".binaryignore", ".gitignore"]), tmp_path
+        )
+
+    def test_scan_directory_reports_relative_paths(self, tmp_path):
+        make_tree(tmp_path, ["bin/tool", "bin/tool.pyc"])
+
+        files, info = FileScanner().scan_directory(str(tmp_path))
+
+        assert [f.path for f in files] == ["bin/tool"]
+        assert info["total_files"] == 1
+        assert info["total_size"] == len("bin/tool")
+        assert info["scan_seconds"] >= 0 and info["hash_seconds"] >= 0
+
+    def test_scan_root_inside_ignored_name_is_not_ignored(self, tmp_path):
+        root = tmp_path / "build" / "release"
+        make_tree(root, ["app.bin"])
+
+        assert scanned(FileScanner(), root) == ["app.bin"]
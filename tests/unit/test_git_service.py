@@ -0,0 +1,109 @@
+"""
+GitService 元数据提取测试
+"""
+import shutil
+import subprocess
+
+import pytest
+
+from binary_manager_v2.infrastructure.git import GitService
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.name", "Builder")
+    git(tmp_path, "config", "user.email", "builder@example.com")
+    git(tmp_path, "remote", "add", "origin", "https://example.com/repo.git")
+    (tmp_path / "a.txt").write_text("a")
+    git(tmp_path, "add", "a.txt")
+    git(tmp_path, "commit", "-q", "-m", "initial commit")
+    GitService.clear_cache()
+    return tmp_path
+
+
+@pytest.fixture
+def git_calls(monkeypatch):
+    calls = []
+    original = subprocess.run
+
+    def run(argv, *args, **kwargs):
+        if argv and argv[0] == "git":
+            calls.append(argv[1:])
+        return original(argv, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return calls
+
+
+class TestGitMetadata:
+    """提交元数据提取测试"""
+
+    def test_extracts_all_fields(self, repo):
+        info = GitService(str(repo)).get_git_info()
+
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo,
+                              capture_output=True, text=True).stdout.strip()
+        assert info.commit_hash == head
+        assert head.startswith(info.commit_short)
+        assert info.branch == "main"
+        assert info.tag is None
+        assert info.author == "Builder"
+        assert info.author_email == "builder@example.com"
+        assert info.commit_message == "initial commit"
+        assert info.commit_time.endswith("Z")
+        assert not info.is_dirty
+        assert {"name": "origin", "url": "https://example.com/repo.git"} in info.remotes
+
+    def test_repeated_calls_only_check_status(self, repo, git_calls):
+        GitService(str(repo)).get_git_info()
+        first = len(git_calls)
+
+        sub = repo / "sub"
+        sub.mkdir()
+        GitService(str(sub)).get_git_info()
+
+        assert first == 3
+        assert [call[0] for call in git_calls[first:]] == ["status"]
+
+    def test_new_commit_and_tag_invalidate_cache(self, repo):
+        service = GitService(str(repo))
+        first = service.get_commit_hash()
+
+        git(repo, "tag", "v1.0")
+        assert service.get_tag() == "v1.0"
+
+        (repo / "b.txt").write_text("b")
+        git(repo, "add", "b.txt")
+        git(repo, "commit", "-q", "-m", "second")
+
+        assert service.get_commit_hash() != first
+        assert service.get_tag() is None
+        assert service.get_commit_message() == "second"
+
+    def test_detached_head_has_no_branch(self, repo):
+        git(repo, "checkout", "-q", "--detach")
+
+        assert GitService(str(repo)).get_branch() is None
+
+    def test_dirty_ignores_untracked_by_default(self, repo):
+        service = GitService(str(repo))
+        (repo / "new.txt").write_text("x")
+
+        assert not service.is_dirty()
+        assert service.is_dirty(include_untracked=True)
+
+        (repo / "a.txt").write_text("changed")
+        assert service.get_git_info().is_dirty
+
+    def test_non_repository(self, tmp_path):
+        service = GitService(str(tmp_path))
+
+        assert not service.is_git_repo()
+        assert service.get_git_info() is None
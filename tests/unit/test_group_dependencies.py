@@ -0,0 +1,179 @@
+"""
+分组成员依赖与并行安装计划测试
+"""
+import json
+import threading
+
+import pytest
+
+from binary_manager_v2.application.downloader_service import DownloaderService
+from binary_manager_v2.application.group_service import GroupService
+from binary_manager_v2.domain.entities import Package
+from binary_manager_v2.domain.services import DependencyCycleError, DependencyGraph
+from binary_manager_v2.domain.value_objects import Hash, PackageName
+from binary_manager_v2.infrastructure.database import SQLitePackageRepository
+
+
+def make_package(name, version="1.0.0"):
+    return Package(
+        package_name=PackageName(name),
+        version=version,
+        archive_hash=Hash.from_string("sha256:" + "0" * 64),
+        archive_size=100,
+        file_count=1
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "bm.db")
+    packages = SQLitePackageRepository(db_path)
+    for name in ("runtime", "libfoo", "libbar", "app", "tools"):
+        packages.save(make_package(name))
+    return GroupService(package_repository=packages, db_path=db_path)
+
+
+def spec(name, order, depends_on=None, required=True):
+    return {"package_name": name, "version": "1.0.0", "install_order": order,
+            "required": required, "depends_on": depends_on or []}
+
+
+DIAMOND = [
+    spec("app", 0, ["libfoo", "libbar"]),
+    spec("libfoo", 1, ["runtime"]),
+    spec("libbar", 2, ["runtime"]),
+    spec("runtime", 3),
+    spec("tools", 4),
+]
+
+
+class TestDependencyGraph:
+    """依赖图测试"""
+
+    def test_levels_group_independent_nodes(self):
+        graph = DependencyGraph({"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": [], "e": []},
+                                {"a": 0, "b": 2, "c": 1, "d": 3, "e": 4})
+
+        assert graph.levels() == [["d", "e"], ["c", "b"], ["a"]]
+        assert graph.topological_order() == ["d", "e", "c", "b", "a"]
+
+    def test_cycle_is_reported(self):
+        graph = DependencyGraph({"a": ["b"], "b": ["c"], "c": ["a"], "d": ["a"]})
+
+        with pytest.raises(DependencyCycleError) as exc:
+            graph.levels()
+        assert exc.value.cycle == ["a", "b", "c", "a"]
+
+    def test_unknown_and_self_dependencies_rejected(self):
+        with pytest.raises(ValueError):
+            DependencyGraph({"a": ["ghost"]})
+        with pytest.raises(DependencyCycleError):
+            DependencyGraph({"a": ["a"]})
+
+    def test_long_chain_does_not_recurse(self):
+        graph = DependencyGraph({i: [i + 1] if i < 5000 else [] for i in range(5001)})
+
+        assert graph.find_cycle() is None
+        assert graph.topological_order()[0] == 5000
+
+
+class TestGroupDependencies:
+    """分组依赖持久化测试"""
+
+    def test_dependencies_roundtrip(self, service, tmp_path):
+        group_id = service.create_group("stack", "1.0", DIAMOND)["group_id"]
+
+        members = {m.package_name: m for m in service.get_group(group_id).packages}
+        assert sorted(members["app"].depends_on) == ["libbar", "libfoo"]
+        assert members["runtime"].depends_on == []
+
+        data = json.loads(open(service.export_group(group_id, str(tmp_path))).read())
+        exported = {p["package_name"]: p["depends_on"] for p in data["packages"]}
+        assert exported["libfoo"] == ["runtime"]
+
+    def test_cycle_rejected_before_save(self, service):
+        with pytest.raises(DependencyCycleError):
+            service.create_group("stack", "1.0", [spec("libfoo", 0, ["libbar"]),
+                                                  spec("libbar", 1, ["libfoo"])])
+
+        assert service.list_groups() == []
+
+    def test_dependency_on_non_member_rejected(self, service):
+        with pytest.raises(ValueError):
+            service.create_group("stack", "1.0", [spec("app", 0, ["runtime"])])
+
+    def test_import_drops_dependencies_on_missing_packages(self, service, tmp_path):
+        path = tmp_path / "group.json"
+        path.write_text(json.dumps({
+            "group_name": "stack", "version": "1.0",
+            "packages": [spec("app", 0, ["ghost", "runtime"]), spec("runtime", 1),
+                         {"package_name": "ghost", "version": "9"}]
+        }))
+
+        group = service.get_group(service.import_group(str(path)))
+
+        assert {m.package_name: m.depends_on for m in group.packages} == {
+            "app": ["runtime"], "runtime": []
+        }
+
+    def test_remove_package_drops_its_edges(self, service):
+        group_id = service.create_group("stack", "1.0", DIAMOND)["group_id"]
+        repository = service.group_repository
+        runtime_id = next(m.package_id for m in service.get_group(group_id).packages
+                          if m.package_name == "runtime")
+
+        repository.remove_package(group_id, runtime_id)
+
+        members = {m.package_name: m for m in service.get_group(group_id).packages}
+        assert members["libfoo"].depends_on == []
+
+
+class TestParallelGroupDownload:
+    """并行分组下载测试"""
+
+    def make_downloader(self, service, events, fail=None):
+        downloader = DownloaderService(package_repository=service.package_repository)
+        lock = threading.Lock()
+
+        def fetch(package, output_dir, timer=None):
+            with lock:
+                events.append(("fetch", str(package.package_name)))
+            if str(package.package_name) == fail:
+                raise ValueError("Hash verification failed")
+            return output_dir
+
+        def install(package, archive_path, output_path, timer=None):
+            with lock:
+                events.append(("extract", str(package.package_name)))
+            return {"package_name": str(package.package_name), "output_path": str(output_path)}
+
+        downloader._fetch_package = fetch
+        downloader._install_fetched = install
+        return downloader
+
+    def test_extracts_after_dependencies(self, service, tmp_path):
+        group_id = service.create_group("stack", "1.0", DIAMOND)["group_id"]
+        events = []
+
+        result = self.make_downloader(service, events).download_group(
+            group_id, str(tmp_path / "out"), max_workers=3
+        )
+
+        assert result["install_plan"] == [["runtime", "tools"], ["libfoo", "libbar"], ["app"]]
+        assert [p["package_name"] for p in result["packages"]] == [
+            "runtime", "tools", "libfoo", "libbar", "app"
+        ]
+        extracted = [name for stage, name in events if stage == "extract"]
+        assert extracted.index("runtime") < extracted.index("libfoo") < extracted.index("app")
+        assert extracted.index("libbar") < extracted.index("app")
+
+    def test_failed_fetch_stops_install(self, service, tmp_path):
+        group_id = service.create_group("stack", "1.0", DIAMOND)["group_id"]
+        events = []
+
+        with pytest.raises(ValueError):
+            self.make_downloader(service, events, fail="runtime").download_group(
+                group_id, str(tmp_path / "out"), max_workers=1
+            )
+
+        assert ("extract", "app") not in events
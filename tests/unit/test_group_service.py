@@ -0,0 +1,160 @@
+"""
+GroupService 批量创建与导入导出测试
+"""
+import json
+
+import pytest
+
+from binary_manager_v2.application.group_service import GroupService
+from binary_manager_v2.domain.entities import Package
+from binary_manager_v2.domain.value_objects import Hash, PackageName
+from binary_manager_v2.infrastructure.database import SQLitePackageRepository
+
+
+def make_package(name, version):
+    return Package(
+        package_name=PackageName(name),
+        version=version,
+        archive_hash=Hash.from_string("sha256:" + "0" * 64),
+        archive_size=100,
+        file_count=1
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "bm.db")
+    packages = SQLitePackageRepository(db_path)
+    for i in range(300):
+        packages.save(make_package(f"component_{i}", "1.0.0"))
+    packages.save(make_package("component_0", "2.0.0"))
+    return GroupService(package_repository=packages, db_path=db_path)
+
+
+def specs(count, version="1.0.0"):
+    return [{"package_name": f"component_{i}", "version": version, "install_order": i}
+            for i in range(count)]
+
+
+class TestGroupBatchCreation:
+    """批量创建测试"""
+
+    def test_resolves_all_packages_in_batches(self, service):
+        service.package_repository.RESOLVE_BATCH_SIZE = 128
+        resolved = service.package_repository.resolve_ids(
+            [("component_0", "1.0.0"), ("component_0", "2.0.0"), ("component_299", "1.0.0"),
+             ("missing", "1.0.0")]
+        )
+
+        assert set(resolved) == {("component_0", "1.0.0"), ("component_0", "2.0.0"),
+                                 ("component_299", "1.0.0")}
+
+    def test_create_group_with_hundreds_of_members(self, service):
+        result = service.create_group("release", "1.0", specs(300))
+
+        group = service.get_group(result["group_id"])
+        assert len(group.packages) == 300
+        assert [p.install_order for p in group.packages] == list(range(300))
+
+    def test_missing_packages_listed_and_nothing_saved(self, service):
+        with pytest.raises(ValueError) as exc:
+            service.create_group("release", "1.0",
+                                 specs(3) + [{"package_name": "ghost", "version": "9"}])
+
+        assert "ghost v9" in str(exc.value)
+        assert service.list_groups() == []
+
+    def test_duplicate_member_rolls_back_group(self, service):
+        with pytest.raises(ValueError):
+            service.create_group("release", "1.0", specs(2) + specs(1))
+
+        assert service.list_groups() == []
+
+
+class TestGroupImportExport:
+    """导入导出测试"""
+
+    def test_export_then_import_roundtrip(self, service, tmp_path):
+        group_id = service.create_group("release", "1.0", specs(250),
+                                        environment_config={"os": "linux"})["group_id"]
+        service.EXPORT_BATCH_SIZE = 100
+
+        export_path = service.export_group(group_id, str(tmp_path / "out"))
+        data = json.loads(open(export_path).read())
+        assert len(data["packages"]) == 250
+        assert data["environment_config"] == {"os": "linux"}
+
+        data["version"] = "2.0"
+        data["packages"].append({"package_name": "ghost", "version": "9"})
+        import_path = tmp_path / "import.json"
+        import_path.write_text(json.dumps(data))
+
+        imported = service.get_group(service.import_group(str(import_path)))
+        assert len(imported.packages) == 250
+
+    def test_export_empty_group(self, service, tmp_path):
+        group_id = service.create_group("empty", "1.0", [])["group_id"]
+
+        data = json.loads(open(service.export_group(group_id, str(tmp_path))).read())
+        assert data["packages"] == []
+
+
+class TestGroupHydration:
+    """分组预加载测试"""
+
+    @pytest.fixture
+    def groups(self, service):
+        for g in range(20):
+            service.create_group(f"release_{g}", "1.0", specs(5),
+                                 metadata={"n": g})
+        return service
+
+    def count_queries(self, repository, action):
+        statements = []
+        repository.conn.set_trace_callback(
+            lambda sql: statements.append(sql) if sql.lstrip().upper().startswith(("SELECT", "WITH")) else None
+        )
+        try:
+            result = action()
+        finally:
+            repository.conn.set_trace_callback(None)
+        return result, statements
+
+    def test_find_all_uses_constant_queries(self, groups):
+        repository = groups.group_repository
+        loaded, statements = self.count_queries(
+            repository, lambda: repository.find_all(include_packages=True)
+        )
+
+        assert len(loaded) == 20
+        assert len(statements) == 2
+        members = loaded[0].packages
+        assert [m.package.version for m in members] == ["1.0.0"] * 5
+        assert str(members[0].package.package_name) == members[0].package_name
+
+    def test_find_by_id_hydrates_ids_and_members(self, groups):
+        summary = groups.list_group_summaries({"group_name": "release_3"})[0]
+
+        group = groups.get_group_with_packages(summary["id"])
+
+        assert group.id == summary["id"]
+        assert group.metadata == {"n": 3}
+        assert all(m.package is not None for m in group.packages)
+        assert all(m.package is None for m in groups.get_group(summary["id"]).packages)
+
+    def test_summaries_skip_json_columns(self, groups):
+        summaries = groups.list_group_summaries()
+
+        assert len(summaries) == 20
+        assert {s["package_count"] for s in summaries} == {5}
+        assert "metadata" not in summaries[0]
+
+    def test_deleted_package_leaves_empty_member(self, groups):
+        group_id = groups.list_group_summaries({"group_name": "release_0"})[0]["id"]
+        member_id = groups.get_group(group_id).packages[0].package_id
+        conn = groups.package_repository.conn
+        conn.execute("DELETE FROM packages WHERE id = ?", (member_id,))
+        conn.commit()
+
+        group = groups.get_group_with_packages(group_id)
+        assert [m.package_id for m in group.packages if m.package is None] == [member_id]
@@ -0,0 +1,85 @@
+"""
+HashCalculator I/O 与算法测试
+"""
+import hashlib
+import io
+import os
+
+import pytest
+
+from binary_manager_v2.domain.services import HashCalculator
+from binary_manager_v2.domain.services.hash_calculator import available_algorithms
+from binary_manager_v2.domain.value_objects import Hash
+from binary_manager_v2.infrastructure.storage import LocalStorage
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    return path
+
+
+class TestHashCalculator:
+    """摘要计算测试"""
+
+    @pytest.mark.parametrize("algorithm", ["sha256", "sha512", "md5", "blake2b"])
+    def test_matches_hashlib(self, data_file, algorithm):
+        expected = hashlib.new(algorithm, data_file.read_bytes()).hexdigest()
+
+        assert HashCalculator(algorithm).calculate_file(str(data_file)).value == expected
+
+    def test_mmap_path_matches_reader_path(self, data_file, monkeypatch):
+        calculator = HashCalculator("sha256")
+        buffered = calculator.calculate_file(str(data_file))
+
+        monkeypatch.setattr(HashCalculator, "MMAP_THRESHOLD", 1)
+        monkeypatch.setattr(HashCalculator, "CHUNK_SIZE", 64 * 1024)
+
+        assert calculator.calculate_file(str(data_file)) == buffered
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+
+        assert HashCalculator().calculate_file(str(path)).value == hashlib.sha256(b"").hexdigest()
+
+    def test_stream_with_and_without_readinto(self, data_file):
+        class ReadOnly:
+            def __init__(self, data):
+                self._stream = io.BytesIO(data)
+
+            def read(self, size):
+                return self._stream.read(size)
+
+        data = data_file.read_bytes()
+        calculator = HashCalculator("blake2b")
+
+        assert calculator.calculate_stream(io.BytesIO(data)) == calculator.calculate_stream(ReadOnly(data))
+
+    def test_unavailable_optional_algorithm_rejected(self):
+        for algorithm in {"blake3", "xxh3_128"} - available_algorithms():
+            with pytest.raises(ValueError):
+                HashCalculator(algorithm)
+
+    def test_optional_algorithms_when_installed(self, data_file):
+        for algorithm in {"blake3", "xxh3_128"} & available_algorithms():
+            digest = HashCalculator(algorithm).calculate_file(str(data_file))
+            assert str(digest).startswith(algorithm + ":")
+
+
+class TestVerification:
+    """按记录的算法校验测试"""
+
+    def test_storage_verifies_any_recorded_algorithm(self, data_file, tmp_path):
+        storage = LocalStorage(str(tmp_path / "store"))
+        sha = hashlib.sha256(data_file.read_bytes()).hexdigest()
+        blake = hashlib.blake2b(data_file.read_bytes()).hexdigest()
+
+        assert storage.verify_file(str(data_file), sha)
+        assert storage.verify_file(str(data_file), f"sha256:{sha}")
+        assert storage.verify_file(str(data_file), f"blake2b:{blake}")
+        assert not storage.verify_file(str(data_file), f"blake2b:{sha}")
+
+    def test_recorded_hash_parses_without_optional_dependency(self):
+        assert Hash.from_string("blake3:ABC").value == "abc"
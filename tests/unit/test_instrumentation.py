@@ -0,0 +1,116 @@
+"""
+阶段计时与性能剖析测试
+"""
+import json
+import pstats
+
+import pytest
+
+from binary_manager_v2.application.downloader_service import DownloaderService
+from binary_manager_v2.application.publisher_service import PublisherService
+from binary_manager_v2.shared.instrumentation import StageTimer
+from binary_manager_v2.shared.profiling import run_profiled
+
+
+@pytest.fixture
+def sink(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    StageTimer.set_sink(str(path))
+    yield path
+    StageTimer.set_sink(None)
+
+
+class TestStageTimer:
+    """计时器测试"""
+
+    def test_records_stages_in_order(self):
+        timer = StageTimer("publish")
+        with timer.stage("scan") as stage:
+            stage.items = 3
+        timer.add("hash", 0.5, bytes=1024 * 1024, items=3)
+
+        summary = timer.summary()
+        assert summary["operation"] == "publish"
+        assert [s["stage"] for s in summary["stages"]] == ["scan", "hash"]
+        assert summary["stages"][0]["items"] == 3
+        assert summary["stages"][1]["mb_per_sec"] == 2.0
+
+    def test_stage_recorded_when_body_raises(self):
+        timer = StageTimer("download")
+        with pytest.raises(ValueError):
+            with timer.stage("verify"):
+                raise ValueError("bad hash")
+
+        assert [r.name for r in timer.records] == ["verify"]
+
+    def test_emits_json_lines(self, sink):
+        timer = StageTimer("publish", package="demo")
+        timer.add("zip", 0.25, bytes=10)
+
+        line = json.loads(sink.read_text().splitlines()[0])
+        assert line["event"] == "stage"
+        assert line["operation"] == "publish"
+        assert line["package"] == "demo"
+        assert line["stage"] == "zip" and line["bytes"] == 10
+
+
+class TestServiceTimings:
+    """发布与下载结果中的阶段计时"""
+
+    def test_publish_and_download_report_stages(self, tmp_path, sink):
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "a.bin").write_bytes(b"a" * 4096)
+        (source / "b.txt").write_text("b")
+
+        publisher = PublisherService(db_path=str(tmp_path / "bm.db"),
+                                     storage_path=str(tmp_path / "releases"))
+        published = publisher.publish(str(source), "demo", "1.0.0", extract_git=False)
+
+        stages = {s["stage"]: s for s in published["timings"]["stages"]}
+        assert list(stages) == ["scan", "hash", "zip", "archive_hash", "db_save", "config"]
+        assert stages["hash"]["bytes"] == 4097
+        assert stages["scan"]["items"] == 2
+
+        downloader = DownloaderService(package_repository=publisher.package_repository,
+                                       storage=publisher.storage)
+        downloaded = downloader.download_by_name_version("demo", "1.0.0", str(tmp_path / "out"))
+
+        stages = {s["stage"]: s for s in downloaded["timings"]["stages"]}
+        assert list(stages) == ["fetch", "verify", "extract"]
+        assert stages["extract"]["items"] == 2
+        assert stages["extract"]["bytes"] == 4097
+
+        operations = [json.loads(line)["operation"] for line in sink.read_text().splitlines()]
+        assert operations.count("publish") == 6 and operations.count("download") == 3
+
+
+class TestProfiling:
+    """剖析报告测试"""
+
+    def test_writes_pstats_and_memory_report(self, tmp_path):
+        result = run_profiled(lambda: sum(range(1000)), str(tmp_path), "publish")
+
+        assert result == sum(range(1000))
+        assert len(list(tmp_path.glob("publish-*.prof"))) == 1
+        report = next(tmp_path.glob("publish-*.txt")).read_text()
+        assert "cumulative" in report
+        assert "peak:" in report
+
+    def test_includes_worker_threads(self, tmp_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def worker_only_function(n):
+            return sum(range(n))
+
+        def job():
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                return list(pool.map(worker_only_function, [1000] * 4))
+
+        run_profiled(job, str(tmp_path), "download")
+
+        stats = pstats.Stats(str(next(tmp_path.glob("download-*.prof"))))
+        called = {name for _, _, name in stats.stats}
+        assert "worker_only_function" in called
+        report = next(tmp_path.glob("download-*.txt")).read_text()
+        assert report.startswith("threads: main + ")
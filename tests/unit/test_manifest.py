@@ -0,0 +1,99 @@
+"""
+紧凑文件清单测试
+"""
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from binary_manager_v2.application.publisher_service import PublisherService
+from binary_manager_v2.domain.entities import FileInfo, FileManifest, Package
+from binary_manager_v2.domain.value_objects import Hash, PackageName
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).digest()
+
+
+@pytest.fixture
+def manifest():
+    manifest = FileManifest("sha256")
+    for path in ["README", "bin/tool", "lib/x86/libfoo.so", "lib/x86/libbar.so", "资源/图标.png"]:
+        manifest.add(path, len(path), digest(path))
+    return manifest
+
+
+class TestFileManifest:
+    """清单结构测试"""
+
+    def test_lazy_file_info_views(self, manifest):
+        assert len(manifest) == 5
+        info = manifest[2]
+        assert isinstance(info, FileInfo)
+        assert info.path == "lib/x86/libfoo.so"
+        assert info.size == len("lib/x86/libfoo.so")
+        assert info.hash == Hash(digest("lib/x86/libfoo.so").hex(), "sha256")
+        assert manifest[-1].path == "资源/图标.png"
+        assert [f.path for f in manifest[1:3]] == ["bin/tool", "lib/x86/libfoo.so"]
+
+    def test_directory_prefixes_are_interned(self, manifest):
+        assert manifest._dirs == ["", "bin", "lib/x86", "资源"]
+
+    def test_rejects_mixed_algorithms(self, manifest):
+        with pytest.raises(ValueError):
+            manifest.append(FileInfo("x", 1, Hash("ab" * 64, "sha512")))
+
+    def test_roundtrip_through_file_info(self, manifest):
+        rebuilt = FileManifest.from_files(manifest)
+
+        assert list(rebuilt.records()) == list(manifest.records())
+
+    def test_save_and_stream_load(self, manifest, tmp_path):
+        path = tmp_path / "m.ndjson.gz"
+        manifest.save(str(path))
+
+        with gzip.open(path, "rt") as f:
+            header = json.loads(f.readline())
+        assert header["count"] == 5 and header["algorithm"] == "sha256"
+
+        first = next(FileManifest.iter_file(str(path)))
+        assert first == manifest[0].to_dict()
+        assert list(FileManifest.load(str(path)).records()) == list(manifest.records())
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "x.gz"
+        with gzip.open(path, "wt") as f:
+            f.write('{"something": "else"}\n')
+
+        with pytest.raises(ValueError):
+            FileManifest.load(str(path))
+
+    def test_package_keeps_file_api(self, manifest):
+        package = Package(PackageName("demo"), "1.0.0", Hash("0" * 64), 1, len(manifest))
+        package.set_manifest(manifest)
+
+        assert [f.path for f in package.files] == [f.path for f in manifest]
+        restored = Package.from_dict(package.to_dict())
+        assert list(restored.manifest.records()) == list(manifest.records())
+
+
+class TestPublishedManifest:
+    """发布时写出清单测试"""
+
+    def test_config_references_streamed_manifest(self, tmp_path):
+        source = tmp_path / "src"
+        (source / "lib").mkdir(parents=True)
+        (source / "lib" / "a.bin").write_bytes(b"a" * 10)
+        (source / "b.txt").write_text("b")
+
+        publisher = PublisherService(db_path=str(tmp_path / "bm.db"),
+                                     storage_path=str(tmp_path / "releases"))
+        result = publisher.publish(str(source), "demo", "1.0.0", extract_git=False)
+
+        config = json.loads(open(result["config_path"]).read())
+        assert "files" not in config
+        manifest_path = tmp_path / "releases" / config["manifest"]["file"]
+        records = list(FileManifest.iter_file(str(manifest_path)))
+        assert [r["path"] for r in records] == ["b.txt", "lib/a.bin"]
+        assert records[1]["hash"] == "sha256:" + hashlib.sha256(b"a" * 10).hexdigest()
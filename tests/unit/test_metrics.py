@@ -0,0 +1,169 @@
+"""
+指标注册表与 /metrics 端点测试
+"""
+import pytest
+from flask import Flask, abort, send_file
+
+from release_portal.shared.metrics import (
+    MetricsRegistry,
+    DB_QUERIES,
+    DB_QUERY_LATENCY,
+    BACKUP_JOB_DURATION,
+    BACKUP_JOB_RUNNING,
+    DOWNLOAD_BYTES,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUESTS,
+    HTTP_LATENCY
+)
+from release_portal.presentation.web.metrics_middleware import init_metrics
+
+
+class TestRegistry:
+    """指标类型与文本格式测试"""
+
+    def test_counter_and_gauge_exposition(self):
+        registry = MetricsRegistry()
+        requests = registry.counter('demo_requests_total', 'Requests', ('route',))
+        in_flight = registry.gauge('demo_in_flight', 'In flight')
+
+        requests.inc(route='/a')
+        requests.inc(2, route='/b"x')
+        in_flight.inc()
+        in_flight.dec()
+
+        text = registry.render()
+        assert '# TYPE demo_requests_total counter' in text
+        assert 'demo_requests_total{route="/a"} 1' in text
+        assert 'demo_requests_total{route="/b\\"x"} 2' in text
+        assert 'demo_in_flight 0' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram('demo_seconds', 'Latency', buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        lines = registry.render().splitlines()
+        assert 'demo_seconds_bucket{le="0.1"} 2' in lines
+        assert 'demo_seconds_bucket{le="1"} 3' in lines
+        assert 'demo_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'demo_seconds_count 4' in lines
+        assert 'demo_seconds_sum 3.65' in lines
+
+    def test_label_mismatch_and_type_conflicts_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('demo_total', 'Demo', ('kind',))
+
+        assert registry.counter('demo_total', 'Demo', ('kind',)) is counter
+        with pytest.raises(ValueError):
+            counter.inc(other='x')
+        with pytest.raises(ValueError):
+            registry.gauge('demo_total', 'Demo')
+
+
+class TestRepositoryMetrics:
+    """SQLite 仓储查询计数测试"""
+
+    def test_queries_are_counted_per_repository(self, tmp_path):
+        from release_portal.initializer import DatabaseInitializer
+        from release_portal.infrastructure.database import SQLiteLicenseRepository
+
+        db_path = str(tmp_path / 'portal.db')
+        DatabaseInitializer(db_path).initialize()
+        repo = SQLiteLicenseRepository(db_path)
+        before = DB_QUERIES.value(repository='SQLiteLicenseRepository', kind='query')
+        observed = DB_QUERY_LATENCY.count(kind='query')
+
+        assert repo.find_all() == []
+        assert repo.exists_by_id('missing') is False
+
+        assert DB_QUERIES.value(repository='SQLiteLicenseRepository', kind='query') == before + 2
+        assert DB_QUERY_LATENCY.count(kind='query') == observed + 2
+
+
+class TestBackupJobMetrics:
+    """备份任务耗时测试"""
+
+    def test_job_duration_recorded_by_outcome(self):
+        from release_portal.application.backup_scheduler import BackupScheduler, IntervalSchedule
+
+        scheduler = BackupScheduler()
+        scheduler.add_job('metrics-ok', lambda: None, IntervalSchedule(3600))
+        scheduler.add_job('metrics-fail', lambda: 1 / 0, IntervalSchedule(3600))
+
+        scheduler.run_job('metrics-ok')
+        scheduler.run_job('metrics-fail')
+
+        assert BACKUP_JOB_DURATION.count(job='metrics-ok', status='success') == 1
+        assert BACKUP_JOB_DURATION.count(job='metrics-fail', status='failed') == 1
+        assert BACKUP_JOB_RUNNING.value(job='metrics-ok') == 0
+
+
+class TestMetricsMiddleware:
+    """HTTP 中间件测试"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        artifact = tmp_path / 'firmware.bin'
+        artifact.write_bytes(b'x' * 2048)
+
+        app = Flask(__name__)
+        init_metrics(app)
+
+        @app.route('/items/<item_id>')
+        def item(item_id):
+            if item_id == 'missing':
+                abort(404)
+            return {'id': item_id}
+
+        @app.route('/files/<name>')
+        def download(name):
+            return send_file(str(artifact), as_attachment=True, download_name=name)
+
+        @app.route('/boom')
+        def boom():
+            raise RuntimeError('boom')
+
+        return app.test_client()
+
+    def test_records_route_templates_and_status(self, client):
+        before_ok = HTTP_REQUESTS.value(method='GET', route='/items/<item_id>', status='200')
+        before_missing = HTTP_REQUESTS.value(method='GET', route='/items/<item_id>', status='404')
+        before_latency = HTTP_LATENCY.count(method='GET', route='/items/<item_id>')
+
+        client.get('/items/1')
+        client.get('/items/2')
+        client.get('/items/missing')
+
+        assert HTTP_REQUESTS.value(method='GET', route='/items/<item_id>', status='200') == before_ok + 2
+        assert HTTP_REQUESTS.value(method='GET', route='/items/<item_id>', status='404') == before_missing + 1
+        assert HTTP_LATENCY.count(method='GET', route='/items/<item_id>') == before_latency + 3
+        assert HTTP_IN_FLIGHT.value() == 0
+
+    def test_counts_download_bytes(self, client):
+        before = DOWNLOAD_BYTES.value(route='/files/<name>')
+
+        response = client.get('/files/fw.bin')
+        response.close()
+
+        assert DOWNLOAD_BYTES.value(route='/files/<name>') == before + 2048
+
+    def test_unhandled_errors_counted_as_500(self, client):
+        before = HTTP_REQUESTS.value(method='GET', route='/boom', status='500')
+
+        assert client.get('/boom').status_code == 500
+
+        assert HTTP_REQUESTS.value(method='GET', route='/boom', status='500') == before + 1
+        assert HTTP_IN_FLIGHT.value() == 0
+
+    def test_metrics_endpoint_serves_prometheus_text(self, client):
+        client.get('/items/1')
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        body = response.get_data(as_text=True)
+        assert '# TYPE portal_http_request_duration_seconds histogram' in body
+        assert 'route="/metrics"' not in body
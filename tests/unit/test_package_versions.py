@@ -0,0 +1,99 @@
+"""
+语义化版本约束与仓储版本查询测试
+"""
+import sqlite3
+
+import pytest
+
+from binary_manager_v2.domain.entities import Package, Version, VersionConstraint
+from binary_manager_v2.domain.value_objects import Hash, PackageName
+from binary_manager_v2.infrastructure.database import SQLitePackageRepository
+
+
+def make_package(name, version):
+    return Package(
+        package_name=PackageName(name),
+        version=version,
+        archive_hash=Hash.from_string("sha256:" + "0" * 64),
+        archive_size=100,
+        file_count=1
+    )
+
+
+class TestVersionConstraint:
+    """版本约束测试"""
+
+    @pytest.mark.parametrize("expression, matching, not_matching", [
+        ("^1.2", ["1.2.0", "1.9.9"], ["1.1.9", "2.0.0", "1.5.0-beta"]),
+        ("^0.2.3", ["0.2.3", "0.2.9"], ["0.3.0", "0.2.2"]),
+        ("~1.2.3", ["1.2.3", "1.2.10"], ["1.3.0"]),
+        (">=1.0,<2", ["1.0.0", "1.99.0"], ["0.9.9", "2.0.0"]),
+        (">=1.0 <2", ["1.5.0"], ["2.0.0"]),
+        ("1.x", ["1.0.0", "1.8.1"], ["2.0.0"]),
+        ("1.2.3", ["1.2.3"], ["1.2.4", "1.2.3-rc.1"]),
+        (">=1.2.3-rc.1", ["1.2.3-rc.2", "1.2.3"], ["1.2.3-rc.0"]),
+        ("<=1.2", ["1.2.9"], ["1.3.0"]),
+        (">1.2", ["1.3.0"], ["1.2.9"]),
+        ("*", ["0.0.1", "9.0.0"], ["9.0.0-alpha"]),
+    ])
+    def test_matches(self, expression, matching, not_matching):
+        constraint = VersionConstraint(expression)
+        assert all(constraint.matches(Version.parse(v)) for v in matching)
+        assert not any(constraint.matches(Version.parse(v)) for v in not_matching)
+
+    def test_exactness(self):
+        assert VersionConstraint("1.2.3").is_exact()
+        assert not VersionConstraint("^1.2.3").is_exact()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            VersionConstraint("^banana")
+
+    def test_prerelease_sorts_before_release(self):
+        assert Version.parse("1.0.0-rc.1").sort_key() < Version.parse("1.0.0").sort_key()
+
+
+class TestRepositoryVersionQueries:
+    """仓储语义化版本查询测试"""
+
+    @pytest.fixture
+    def repository(self, tmp_path):
+        repo = SQLitePackageRepository(str(tmp_path / "bm.db"))
+        for version in ["1.2.0", "1.10.0", "1.9.3", "2.0.0-rc.1", "2.0.0", "0.9.0", "nightly"]:
+            repo.save(make_package("app", version))
+        repo.save(make_package("other", "5.0.0"))
+        return repo
+
+    def test_latest_uses_semver_order_not_text_order(self, repository):
+        assert repository.latest("app", "^1.2").version == "1.10.0"
+        assert repository.latest("app").version == "2.0.0"
+        assert repository.latest("app", "<2").version == "1.10.0"
+
+    def test_range_query_sorted_descending(self, repository):
+        versions = [p.version for p in repository.find_versions("app", ">=1.0")]
+        assert versions == ["2.0.0", "1.10.0", "1.9.3", "1.2.0"]
+
+    def test_prerelease_only_when_requested(self, repository):
+        versions = [p.version for p in repository.find_versions("app", ">=2.0.0-rc.0")]
+        assert versions == ["2.0.0", "2.0.0-rc.1"]
+
+    def test_no_match(self, repository):
+        assert repository.latest("app", "^3") is None
+
+    def test_query_uses_semver_index(self, repository):
+        plan = repository.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM packages WHERE package_name = ? "
+            "AND (version_major, version_minor, version_patch, version_pre_rank, version_prerelease) "
+            ">= (?, ?, ?, ?, ?)", ("app", 1, 0, 0, 0, "")
+        ).fetchall()
+        assert "idx_packages_name_semver" in str([tuple(row) for row in plan])
+
+    def test_existing_rows_backfilled(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        SQLitePackageRepository(db_path).save(make_package("app", "3.1.4"))
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE packages SET version_major = NULL, version_pre_rank = NULL")
+        conn.commit()
+        conn.close()
+
+        assert SQLitePackageRepository(db_path).latest("app", "^3").version == "3.1.4"
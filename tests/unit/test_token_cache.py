@@ -0,0 +1,156 @@
+"""
+Token 签名与认证缓存测试
+"""
+import time
+
+import pytest
+from flask import Flask, jsonify, request
+
+from release_portal.infrastructure.auth import TokenCache, TokenService, token_cache
+from release_portal.shared.metrics import DB_QUERIES
+
+
+def payload(exp_in=3600):
+    return {'user_id': 'u1', 'exp': int(time.time()) + exp_in}
+
+
+class FakeUser:
+    def __init__(self, user_id='u1', role_id='role_customer', license_id=None):
+        self.user_id = user_id
+        self.role = type('Role', (), {'role_id': role_id})()
+        self.license_id = license_id
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+class TestTokenSignature:
+    """HMAC 签名测试"""
+
+    def test_round_trip(self):
+        service = TokenService('secret')
+        token = service.generate_token('u1', 'alice', 'customer')
+
+        assert service.verify_token(token)['username'] == 'alice'
+
+    def test_tampered_or_foreign_tokens_rejected(self):
+        service = TokenService('secret')
+        payload_b64, signature = service.generate_token('u1', 'alice', 'customer').split('.')
+        forged = TokenService('secret').generate_token('u2', 'mallory', 'admin').split('.')[0]
+
+        assert service.verify_token(f"{forged}.{signature}") is None
+        assert service.verify_token(f"{payload_b64}.{'0' * len(signature)}") is None
+        assert TokenService('other').verify_token(f"{payload_b64}.{signature}") is None
+        assert service.verify_token('not-a-token') is None
+
+
+class TestTokenCache:
+    """缓存过期、容量与失效测试"""
+
+    def test_entry_expires_with_token(self):
+        cache = TokenCache(ttl_seconds=60)
+        cache.put('t1', payload(exp_in=-1), FakeUser())
+        cache.put('t2', payload(), FakeUser())
+
+        assert cache.get('t1') is None
+        assert cache.get('t2').user.user_id == 'u1'
+
+    def test_ttl_and_size_bound(self, monkeypatch):
+        cache = TokenCache(ttl_seconds=1, max_entries=2)
+        for token in ('a', 'b', 'c'):
+            cache.put(token, payload(), FakeUser())
+
+        assert cache.get('a') is None
+        assert len(cache) == 2
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 2)
+        assert cache.get('b') is None
+
+    def test_recently_used_entry_survives_eviction(self):
+        cache = TokenCache(max_entries=2)
+        cache.put('hot', payload(), FakeUser())
+        cache.put('cold', payload(), FakeUser())
+
+        assert cache.get('hot')
+        cache.put('new', payload(), FakeUser())
+
+        assert cache.get('hot') and cache.get('new')
+        assert cache.get('cold') is None
+
+    def test_invalidate_by_user_role_and_license(self):
+        cache = TokenCache()
+        cache.put('a', payload(), FakeUser('u1', 'role_customer', 'lic1'))
+        cache.put('b', payload(), FakeUser('u2', 'role_publisher', None))
+        cache.put('c', payload(), FakeUser('u3', 'role_admin', None))
+
+        cache.invalidate_user('u1')
+        cache.invalidate_role('role_publisher')
+        cache.invalidate_license('lic-none')
+
+        assert [t for t in 'abc' if cache.get(t)] == ['c']
+
+
+class TestAuthenticate:
+    """AuthService.authenticate 与仓储失效联动测试"""
+
+    @pytest.fixture
+    def login(self, container):
+        user = container.auth_service.register('alice', 'alice@example.com', 'pw123456', 'role_customer')
+        return user, container.auth_service.login('alice', 'pw123456')
+
+    def test_cache_hit_skips_database(self, container, login):
+        _, token = login
+        container.auth_service.authenticate(token)
+        before = DB_QUERIES.value(repository='SQLiteUserRepository', kind='query')
+
+        _, user = container.auth_service.authenticate(token)
+
+        assert user.username == 'alice'
+        assert DB_QUERIES.value(repository='SQLiteUserRepository', kind='query') == before
+
+    def test_deactivated_user_rejected_immediately(self, container, login):
+        user, token = login
+        assert container.auth_service.authenticate(token)
+
+        user.deactivate()
+        container.user_repository.save(user)
+
+        assert token_cache.get(token) is None
+        assert container.auth_service.authenticate(token) is None
+
+    def test_role_change_reloads_user(self, container, login):
+        _, token = login
+        container.auth_service.authenticate(token)
+
+        role = container.role_repository.find_by_id('role_customer')
+        container.role_repository.save(role)
+
+        assert token_cache.get(token) is None
+
+
+class TestRequireAuth:
+    """认证中间件缓存命中测试"""
+
+    def test_cached_token_does_not_build_container(self, monkeypatch):
+        from release_portal.presentation.web.auth_middleware import require_auth
+
+        app = Flask(__name__)
+
+        @app.route('/me')
+        @require_auth
+        def me():
+            return jsonify({'user_id': request.current_user.user_id})
+
+        token_cache.put('cached-token', payload(), FakeUser('u9'))
+        monkeypatch.setattr('release_portal.initializer.create_container',
+                            lambda *a, **k: pytest.fail('container built on cache hit'))
+
+        response = app.test_client().get('/me', headers={'Authorization': 'Bearer cached-token'})
+
+        assert response.status_code == 200
+        assert response.get_json() == {'user_id': 'u9'}
@@ -0,0 +1,113 @@
+"""
+并行 ZIP 解压测试
+"""
+import os
+import random
+import stat
+import time
+import zipfile
+
+import pytest
+
+from binary_manager_v2.domain.services import ParallelZipExtractor
+
+
+def snapshot(root):
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames:
+            result[os.path.relpath(os.path.join(dirpath, name), root) + '/'] = None
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                result[os.path.relpath(path, root)] = f.read()
+    return result
+
+
+@pytest.fixture
+def archive(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / 'pkg.zip'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr('docs/', b'')
+        zipf.writestr('empty.txt', b'')
+        for index in range(300):
+            zipf.writestr(f"src/d{index % 7}/sub{index % 3}/f{index}.c", f"int f{index};\n".encode() * (index + 1))
+        zipf.writestr('bin/blob.bin', rng.randbytes(3 * 1024 * 1024))
+        zipf.writestr(zipfile.ZipInfo('raw/stored.dat'), b'stored' * 1000)
+    return str(path)
+
+
+class TestParallelZipExtractor:
+    """解压结果与 extractall 一致性测试"""
+
+    def test_matches_extractall(self, tmp_path, archive):
+        with zipfile.ZipFile(archive) as zipf:
+            zipf.extractall(tmp_path / 'expected')
+
+        members, info = ParallelZipExtractor(workers=4).extract(archive, str(tmp_path / 'out'))
+
+        assert snapshot(tmp_path / 'out') == snapshot(tmp_path / 'expected')
+        assert len(members) == 304
+        assert info['files'] == 303
+        assert info['workers'] > 1
+        assert info['bytes'] == sum(m.file_size for m in members)
+
+    def test_single_worker(self, tmp_path, archive):
+        ParallelZipExtractor(workers=1, fsync=True).extract(archive, str(tmp_path / 'out'))
+
+        with zipfile.ZipFile(archive) as zipf:
+            zipf.extractall(tmp_path / 'expected')
+        assert snapshot(tmp_path / 'out') == snapshot(tmp_path / 'expected')
+
+    def test_unsafe_paths_stay_inside_output(self, tmp_path):
+        path = tmp_path / 'evil.zip'
+        with zipfile.ZipFile(path, 'w') as zipf:
+            zipf.writestr('../escape.txt', b'a')
+            zipf.writestr('/abs/x.txt', b'b')
+            zipf.writestr('dup.txt', b'first')
+        with zipfile.ZipFile(path, 'a') as zipf, pytest.warns(UserWarning):
+            zipf.writestr('dup.txt', b'second')
+
+        ParallelZipExtractor().extract(str(path), str(tmp_path / 'out'))
+
+        assert not (tmp_path / 'escape.txt').exists()
+        assert (tmp_path / 'out' / 'escape.txt').read_bytes() == b'a'
+        assert (tmp_path / 'out' / 'abs' / 'x.txt').read_bytes() == b'b'
+        assert (tmp_path / 'out' / 'dup.txt').read_bytes() == b'second'
+
+    def test_corrupt_member_raises(self, tmp_path):
+        path = tmp_path / 'bad.zip'
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zipf:
+            zipf.writestr('a.txt', b'hello world')
+        data = bytearray(path.read_bytes())
+        offset = data.index(b'hello world')
+        data[offset] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(zipfile.BadZipFile):
+            ParallelZipExtractor().extract(str(path), str(tmp_path / 'out'))
+
+    def test_preserve_metadata(self, tmp_path):
+        path = tmp_path / 'meta.zip'
+        info = zipfile.ZipInfo('tool.sh', date_time=(2020, 5, 17, 12, 30, 0))
+        info.create_system = 3
+        info.external_attr = (stat.S_IFREG | 0o755) << 16
+        with zipfile.ZipFile(path, 'w') as zipf:
+            zipf.writestr(info, b'#!/bin/sh\n')
+
+        ParallelZipExtractor(preserve_metadata=True).extract(str(path), str(tmp_path / 'out'))
+
+        result = os.stat(tmp_path / 'out' / 'tool.sh')
+        assert stat.S_IMODE(result.st_mode) == 0o755
+        assert result.st_mtime == pytest.approx(time.mktime((2020, 5, 17, 12, 30, 0, 0, 0, -1)))
+
+    def test_unsupported_compression_falls_back(self, tmp_path):
+        path = tmp_path / 'bz.zip'
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_BZIP2) as zipf:
+            zipf.writestr('a/b.txt', b'bzip2 data')
+
+        members, info = ParallelZipExtractor().extract(str(path), str(tmp_path / 'out'))
+
+        assert (tmp_path / 'out' / 'a' / 'b.txt').read_bytes() == b'bzip2 data'
+        assert info['workers'] == 1